@@ -8,3 +8,29 @@ class AccountsConfig(AppConfig):
 
     def ready(self):
         import apps.accounts.models
+        from django.db.models.signals import post_migrate
+
+        post_migrate.connect(setup_periodic_tasks, sender=self)
+
+
+def setup_periodic_tasks(sender, **kwargs):
+    try:
+        from django_celery_beat.models import PeriodicTask, CrontabSchedule
+
+        # Safety net for audit-log rows whose location enrichment was never
+        # queued (broker down) — see utils.audit_log.schedule_location_enrichment
+        schedule, created = CrontabSchedule.objects.get_or_create(
+            minute='*/10',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=schedule,
+            name='Enrich Activity Log Locations',
+            task='apps.accounts.tasks.enrich_activity_locations',
+        )
+    except Exception as e:
+        print("Failed to setup periodic tasks for accounts:", str(e))
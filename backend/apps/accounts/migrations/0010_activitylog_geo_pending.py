@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_role_can_manage_admin_config_role_can_view_profile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(condition=models.Q(('city__isnull', True)), fields=['ip_address'], name='activitylog_geo_pending'),
+        ),
+    ]
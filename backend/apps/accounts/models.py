@@ -455,6 +455,12 @@ class ActivityLog(models.Model):
             models.Index(fields=['-timestamp', 'user']),
             models.Index(fields=['model_name', '-timestamp']),
             models.Index(fields=['action', '-timestamp']),
+            # Rows still waiting for geo-IP enrichment (utils/audit_log.py)
+            models.Index(
+                fields=['ip_address'],
+                condition=models.Q(city__isnull=True),
+                name='activitylog_geo_pending',
+            ),
         ]
     
     def __str__(self):
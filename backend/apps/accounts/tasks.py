@@ -0,0 +1,9 @@
+from celery import shared_task
+
+
+@shared_task
+def enrich_activity_locations():
+    """Fill in city/region/country on ActivityLog rows written without one."""
+    from utils.audit_log import enrich_pending_locations
+
+    return enrich_pending_locations()
@@ -1,11 +1,13 @@
-from django.test import TestCase
+import os
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.core import mail
 from datetime import date
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch
-from apps.accounts.models import Role
+from apps.accounts.models import ActivityLog, Role
 from apps.core.models import HouseProject, ProjectMember, ProjectRole
 
 User = get_user_model()
@@ -33,27 +35,29 @@ class AuthenticationTestCase(TestCase):
         self.assertIn('refresh', response.data)
         self.assertIn('user', response.data)
 
+    @override_settings(EMAIL_QUEUE_SYNC=True)
     def test_login_sends_alert_email_with_login_details(self):
-        response = self.client.post('/api/v1/auth/login/', {
-            'email': 'test@example.com',
-            'password': 'testpass123',
-            'login_context': {
-                'browser': 'Google Chrome',
-                'os': 'macOS',
-                'deviceType': 'Desktop',
-                'deviceName': 'MacBook Pro',
-                'platform': 'MacIntel',
-                'language': 'en-US',
-                'timezone': 'Asia/Tokyo',
-                'screenWidth': 1512,
-                'screenHeight': 982,
-                'viewportWidth': 1280,
-                'viewportHeight': 720,
-                'latitude': 27.7172,
-                'longitude': 85.3240,
-                'accuracy': 22.4,
-            },
-        }, format='json', HTTP_USER_AGENT='Mozilla/5.0 Test Browser')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/auth/login/', {
+                'email': 'test@example.com',
+                'password': 'testpass123',
+                'login_context': {
+                    'browser': 'Google Chrome',
+                    'os': 'macOS',
+                    'deviceType': 'Desktop',
+                    'deviceName': 'MacBook Pro',
+                    'platform': 'MacIntel',
+                    'language': 'en-US',
+                    'timezone': 'Asia/Tokyo',
+                    'screenWidth': 1512,
+                    'screenHeight': 982,
+                    'viewportWidth': 1280,
+                    'viewportHeight': 720,
+                    'latitude': 27.7172,
+                    'longitude': 85.3240,
+                    'accuracy': 22.4,
+                },
+            }, format='json', HTTP_USER_AGENT='Mozilla/5.0 Test Browser')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(mail.outbox), 1)
@@ -244,3 +248,67 @@ class AuthenticationTestCase(TestCase):
         self.assertTrue(member.can_manage_workforce)
         self.assertTrue(member.can_upload_media)
         self.assertFalse(member.can_manage_finances)
+
+
+class ActivityLogGeoIPTestCase(TestCase):
+    """Audit-log writes never wait on the geo-IP service"""
+
+    def setUp(self):
+        from utils import geoip
+        geoip.reset()
+        self.addCleanup(geoip.reset)
+        self.user = User.objects.create_user(
+            username='geo', email='geo@example.com', password='testpass123'
+        )
+
+    def _log(self, ip):
+        from django.test import RequestFactory
+        from utils.audit_log import log_activity_automated
+
+        request = RequestFactory().get('/api/v1/phases/', REMOTE_ADDR=ip)
+        log_activity_automated(request, self.user, 'UPDATE', self.user)
+        return ActivityLog.objects.latest('id')
+
+    @patch('apps.accounts.tasks.enrich_activity_locations.apply_async')
+    @patch('requests.post')
+    @patch('requests.get')
+    def test_unknown_ip_is_enriched_by_the_batch_task(self, mocked_get, mocked_post, mocked_queue):
+        from utils.audit_log import enrich_pending_locations
+
+        first = self._log('8.8.8.8')
+        second = self._log('8.8.8.8')
+        mocked_get.assert_not_called()
+        mocked_post.assert_not_called()
+        self.assertIsNone(first.city)
+        self.assertTrue(mocked_queue.called)
+
+        mocked_post.return_value.json.return_value = [
+            {'status': 'success', 'query': '8.8.8.8', 'city': 'Mountain View',
+             'regionName': 'California', 'country': 'United States'},
+        ]
+        self.assertEqual(enrich_pending_locations(), 2)
+        self.assertEqual(mocked_post.call_count, 1)
+        self.assertEqual(mocked_post.call_args.kwargs['json'], ['8.8.8.8'])
+        for row in (first, second):
+            row.refresh_from_db()
+            self.assertEqual((row.city, row.country), ('Mountain View', 'United States'))
+
+        # Cached now — the next write is located inline.
+        self.assertEqual(self._log('8.8.8.8').city, 'Mountain View')
+        self.assertEqual(mocked_post.call_count, 1)
+
+    @patch('requests.post')
+    def test_offline_database_answers_without_network(self, mocked_post):
+        import tempfile
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fh:
+            fh.write('# network,city,region,country\n')
+            fh.write('27.34.0.0/17,Kathmandu,Bagmati,Nepal\n')
+            fh.write('1.1.1.0,1.1.1.255,Sydney,NSW,Australia\n')
+        self.addCleanup(os.remove, fh.name)
+
+        with self.settings(GEOIP_DB_PATH=fh.name):
+            self.assertEqual(self._log('27.34.100.7').city, 'Kathmandu')
+            self.assertEqual(self._log('1.1.1.1').country, 'Australia')
+            self.assertEqual(self._log('10.0.0.5').city, 'Internal Workspace')
+        mocked_post.assert_not_called()
@@ -173,9 +173,13 @@ def log_activity(request, user, action, model_name,
                  changes=None, success=True, error_message=''):
     try:
         if user and user.is_authenticated:
-            from utils.audit_log import resolve_ip_location
+            from utils.audit_log import resolve_ip_location, schedule_location_enrichment
             ip = get_client_ip(request)
             loc = resolve_ip_location(ip) if ip else {}
+            # None → no local answer; left NULL and filled in by a batch task
+            pending = loc is None
+            if pending:
+                loc = dict.fromkeys(('city', 'region', 'country'))
             ActivityLog.objects.create(
                 user=user,
                 username=user.username,
@@ -195,6 +199,8 @@ def log_activity(request, user, action, model_name,
                 success=success,
                 error_message=error_message,
             )
+            if pending:
+                schedule_location_enrichment()
     except Exception as e:
         logger.warning("Failed to log activity: %s", e)
 
@@ -835,8 +841,7 @@ class WorkerFaceLoginView(APIView):
     throttle_classes = [LoginRateThrottle]
 
     def post(self, request):
-        from apps.biometrics.models import UserFaceSignature
-        from apps.biometrics.views import euclidean_distance
+        from apps.biometrics import face_index
         from django.db.models import Q
         
         encoding = request.data.get('encoding')
@@ -851,8 +856,7 @@ class WorkerFaceLoginView(APIView):
             return Response({'error': 'encoding is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-        # Threshold rules: Extremely strict verification
-        SIMILARITY_THRESHOLD = 0.55
+        # Threshold rules: Extremely strict verification (face_index.MATCH_THRESHOLD)
         matched_user = None
         min_distance = float('inf')
 
@@ -866,26 +870,20 @@ class WorkerFaceLoginView(APIView):
                 ).first()
 
                 if user and hasattr(user, 'face_signature') and user.face_signature:
-                    db_vector = user.face_signature.get_encoding()
-                    if db_vector:
-                        distance = euclidean_distance(encoding, db_vector)
-                        if distance < SIMILARITY_THRESHOLD:
-                            matched_user = user
-                            min_distance = distance
+                    distance = face_index.distance(encoding, user.face_signature.get_vector())
+                    if distance < face_index.MATCH_THRESHOLD:
+                        matched_user = user
+                        min_distance = distance
             except Exception as e:
                 logger.error("Error during worker face 1:1 lookup: %s", e)
 
         # Flow B: 1:N database-wide identification
         if not matched_user:
             try:
-                signatures = UserFaceSignature.objects.select_related('user').all()
-                for sig in signatures:
-                    db_vector = sig.get_encoding()
-                    if db_vector:
-                        distance = euclidean_distance(encoding, db_vector)
-                        if distance < min_distance and distance < SIMILARITY_THRESHOLD:
-                            min_distance = distance
-                            matched_user = sig.user
+                user_id, distance = face_index.users_index().best(encoding)
+                if user_id is not None:
+                    matched_user = User.objects.filter(pk=user_id).first()
+                    min_distance = distance
             except Exception as e:
                 logger.error("Error during worker face 1:N lookup: %s", e)
 
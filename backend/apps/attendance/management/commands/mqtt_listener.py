@@ -13,10 +13,17 @@ v2 additions (firmware 2.1.0+):
       payload {"action":"CHECK_IN","worker":"Ram","success":true}
   • Stores all telemetry fields in MQTTScanEvent
 
+Pipelined ingest (--ingest-workers N):
+  The Paho callback only parses and enqueues scans; N worker threads
+  (sharded by NFC UID, so one card's scans stay in order) do the
+  attendance work and scan events / device counters are written in
+  batches.  See apps/attendance/mqtt_ingest.py.
+
 Usage:
   python manage.py mqtt_listener                    # uses first enabled MQTTConfig
   python manage.py mqtt_listener --project 3        # specific project
   python manage.py mqtt_listener --project 3 --host 192.168.1.10 --port 1883
+  python manage.py mqtt_listener --ingest-workers 4  # gate-rush mode
 
 Config source (priority order):
   1. CLI flags  (--host / --port / --topic / --user / --password)
@@ -63,6 +70,16 @@ class Command(BaseCommand):
         parser.add_argument("--topic",    default=None, help="Override subscribe topic")
         parser.add_argument("--user",     default=None, help="Override MQTT username")
         parser.add_argument("--password", default=None, help="Override MQTT password")
+        parser.add_argument(
+            "--ingest-workers",
+            type=int,
+            default=0,
+            help="Process scans on N worker threads with batched writes (0 = inline, default).",
+        )
+        parser.add_argument("--ingest-queue", type=int, default=500,
+                            help="Max queued scans per ingest worker before the listener waits")
+        parser.add_argument("--flush-interval", type=float, default=1.0,
+                            help="Seconds between batched scan-event writes (ingest mode)")
 
     # ── Entry point ───────────────────────────────────────────────────────────
 
@@ -126,9 +143,27 @@ class Command(BaseCommand):
         self._reconnect_count = 0          # how many times we've had to reconnect
         self._backoff         = _MIN_BACKOFF  # current backoff delay in seconds
 
+        self._ingest = None
+        if options["ingest_workers"] > 0:
+            from apps.attendance.mqtt_ingest import ScanIngestPipeline
+            self._ingest = ScanIngestPipeline(
+                self._process_job,
+                workers=options["ingest_workers"],
+                queue_size=options["ingest_queue"],
+                flush_interval=options["flush_interval"],
+            )
+            self._ingest.start()
+            self.stdout.write(
+                f"  Pipelined ingest: {options['ingest_workers']} worker(s), "
+                f"flush every {options['flush_interval']}s"
+            )
+
         def _shutdown(signum, frame):
             self.stdout.write("\nShutting down MQTT listener…")
             client.disconnect()
+            if self._ingest:
+                self.stdout.write(f"  Draining {self._ingest.backlog()} queued scan(s)…")
+                self._ingest.stop()
             cfg.mark_disconnected()
             sys.exit(0)
 
@@ -453,11 +488,16 @@ class Command(BaseCommand):
         # MAC is the middle segment of the topic: nfc/<mac>/state
         mac = self._mac_from_topic(msg.topic)
 
-        self._process_scan(
-            nfc_uid, msg.topic, payload_str, telemetry, mac,
+        scan_args = dict(
             device_ts=device_ts if use_device_ts else None,
             is_queued=(is_queued or (use_device_ts and server_lag_secs > 60)),
         )
+        if self._ingest:
+            from apps.attendance.mqtt_ingest import ScanJob
+            self._ingest.submit(ScanJob(nfc_uid, msg.topic, payload_str, telemetry, mac, **scan_args))
+            return
+
+        self._process_scan(nfc_uid, msg.topic, payload_str, telemetry, mac, **scan_args)
 
     # ── Users request handler ─────────────────────────────────────────────────
 
@@ -479,8 +519,8 @@ class Command(BaseCommand):
           {"uid":"..","username":"..","status":"Active",
            "schedule":true,"start_hour":8,"end_hour":18,"days_mask":62}
         """
-        from apps.attendance.models import AttendanceWorker
         from apps.attendance.mqtt_models import NFCDevice
+        from apps.attendance.uid_directory import worker_directory
 
         if not mac:
             self.stderr.write("  users/request: could not extract MAC from topic")
@@ -506,57 +546,21 @@ class Command(BaseCommand):
             )
             return
 
-        # ── Fetch all active workers with an NFC UID for this project ──────────
+        # ── Precomputed payload of active workers with an NFC UID ──────────────
+        # Served from the worker directory; rebuilt only after a worker change.
+        # An empty array tells the device the project has no enrolled cards.
         try:
-            workers = AttendanceWorker.objects.filter(
-                project=project,
-                is_active=True,
-            ).exclude(nfc_uid="").exclude(nfc_uid__isnull=True)
+            payload, count = worker_directory.users_sync_payload(project.pk)
         except Exception as exc:
-            logger.warning("users/request: worker query failed: %s", exc)
+            logger.warning("users/request: worker directory failed: %s", exc)
             return
 
-        if not workers.exists():
-            # Send empty array so device knows the project has no enrolled cards
-            payload = "[]"
-        else:
-            entries = []
-            for w in workers:
-                uid_clean = str(w.nfc_uid or "").strip()
-                if not uid_clean:
-                    continue
-
-                # Normalise UID to the space-separated uppercase format the
-                # firmware stores (e.g. "AB CD EF 12").  If the stored value is
-                # already in that format this is a no-op; otherwise it formats
-                # from hex (e.g. "ABCDEF12" → "AB CD EF 12").
-                raw = uid_clean.replace(" ", "").replace(":", "")
-                if len(raw) % 2 == 0 and all(c in "0123456789ABCDEFabcdef" for c in raw):
-                    uid_fmt = " ".join(raw[i:i+2].upper() for i in range(0, len(raw), 2))
-                else:
-                    uid_fmt = uid_clean.upper()
-
-                entry = {
-                    "uid":        uid_fmt,
-                    "username":   w.name,
-                    "status":     "Active",
-                    "schedule":   bool(w.use_custom_window),
-                    "start_hour": w.custom_checkin_start.hour if w.custom_checkin_start else 0,
-                    "end_hour":   w.custom_checkout_end.hour  if w.custom_checkout_end  else 23,
-                    "days_mask":  int(w.working_days_mask)     if w.working_days_mask is not None else 127,
-                }
-                entries.append(entry)
-
-            payload = json.dumps(entries)
-
         # ── Publish sync response ──────────────────────────────────────────────
         sync_topic = f"nfc/{mac}/users/sync"
         try:
             self._client.publish(sync_topic, payload, qos=1)
             self.stdout.write(
-                self.style.SUCCESS(
-                    f"  → users/sync → {sync_topic} ({len(entries if workers.exists() else [])} workers)"
-                )
+                self.style.SUCCESS(f"  → users/sync → {sync_topic} ({count} workers)")
             )
         except Exception as exc:
             logger.warning("users/request: publish failed: %s", exc)
@@ -688,6 +692,19 @@ class Command(BaseCommand):
 
     # ── Scan processing ───────────────────────────────────────────────────────
 
+    def _process_job(self, job):
+        """Ingest-worker entry point — same work as the inline path."""
+        self._process_scan(
+            job.nfc_uid, job.topic, job.raw_payload, job.telemetry, job.mac,
+            device_ts=job.device_ts, is_queued=job.is_queued,
+        )
+
+    def _resolve_worker(self, nfc_uid: str):
+        """UID → active AttendanceWorker from the in-process directory (raises DoesNotExist)."""
+        from apps.attendance.uid_directory import worker_directory
+
+        return worker_directory.by_nfc_uid(nfc_uid)
+
     def _process_scan(self, nfc_uid: str, topic: str, raw_payload: str,
                       telemetry: dict, mac: str,
                       device_ts=None, is_queued: bool = False):
@@ -706,10 +723,7 @@ class Command(BaseCommand):
         from apps.attendance.mqtt_models import NFCDevice
 
         try:
-            worker = AttendanceWorker.objects.select_related("project").get(
-                nfc_uid=nfc_uid,
-                is_active=True,
-            )
+            worker = self._resolve_worker(nfc_uid)
         except AttendanceWorker.DoesNotExist:
             msg = f"No active worker for NFC UID: {nfc_uid}"
             self.stdout.write(f"  {msg}")
@@ -772,7 +786,9 @@ class Command(BaseCommand):
         self._publish_feedback(mac, action, worker.name, result.get("success", False))
 
         # Bump scan counter on NFCDevice row (fire-and-forget)
-        if mac:
+        if mac and getattr(self, "_ingest", None):
+            self._ingest.count_scan(mac)
+        elif mac:
             try:
                 device = NFCDevice.objects.filter(mac__iexact=mac).first()
                 if device:
@@ -821,6 +837,7 @@ class Command(BaseCommand):
         """
         Persist an MQTTScanEvent row including v2 telemetry and offline-queue fields.
         Silently skips when running in env-var fallback mode (no DB pk).
+        In ingest mode the row is buffered and bulk-inserted by the pipeline.
         """
         from apps.attendance.mqtt_models import MQTTScanEvent
 
@@ -831,7 +848,7 @@ class Command(BaseCommand):
         tel = telemetry or {}
 
         try:
-            MQTTScanEvent.objects.create(
+            event = MQTTScanEvent(
                 config=cfg,
                 topic=topic,
                 raw_payload=raw_payload[:4096],
@@ -851,6 +868,10 @@ class Command(BaseCommand):
                 device_timestamp=device_ts,
                 is_queued=is_queued,
             )
+            if getattr(self, "_ingest", None):
+                self._ingest.add_event(event)
+            else:
+                event.save()
         except Exception as exc:
             logger.warning("Failed to write MQTTScanEvent: %s", exc)
 
@@ -0,0 +1,20 @@
+"""
+Rebuild DailyAttendanceRollup from DailyAttendance.
+
+Rollups are maintained by signals, but rows written outside the ORM (SQL
+import, raw updates) bypass them — run this afterwards, or nightly from cron.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.attendance.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute DailyAttendanceRollup rows from DailyAttendance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, help="Only rebuild this project id")
+
+    def handle(self, *args, **opts):
+        count = rebuild_rollups(project_id=opts.get("project"))
+        self.stdout.write(self.style.SUCCESS(f"OK — rollups={count}"))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-18 02:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_project_role_view_permissions'),
+        ('attendance', '0019_switch_contractor_fk_to_resource_worker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('marked_count', models.PositiveIntegerField(default=0, help_text='Workers with any record that day')),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('half_day_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('leave_count', models.PositiveIntegerField(default=0)),
+                ('holiday_count', models.PositiveIntegerField(default=0)),
+                ('on_site_count', models.PositiveIntegerField(default=0, help_text='Present/half-day, checked in, not out')),
+                ('checked_out_count', models.PositiveIntegerField(default=0, help_text='Present/half-day, checked out')),
+                ('effective_days', models.DecimalField(decimal_places=1, default=0, max_digits=8)),
+                ('wage_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='core.houseproject')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('project', 'date')},
+            },
+        ),
+    ]
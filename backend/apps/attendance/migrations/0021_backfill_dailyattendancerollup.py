@@ -0,0 +1,68 @@
+"""
+Backfill DailyAttendanceRollup from existing DailyAttendance rows so the
+dashboard shows history immediately after deploy.  One GROUP BY query; the
+expressions mirror apps/attendance/rollups.py at the time of writing.
+"""
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+
+
+def backfill_rollups(apps, schema_editor):
+    DailyAttendance = apps.get_model("attendance", "DailyAttendance")
+    DailyAttendanceRollup = apps.get_model("attendance", "DailyAttendanceRollup")
+
+    money = DecimalField(max_digits=14, decimal_places=2)
+    base_wage = Case(
+        When(status="PRESENT", then=F("daily_rate_snapshot")),
+        When(status="HALF_DAY", then=F("daily_rate_snapshot") / Value(Decimal("2"))),
+        default=Value(Decimal("0")),
+        output_field=money,
+    )
+    effective_days = Case(
+        When(status="PRESENT", then=Value(Decimal("1"))),
+        When(status="HALF_DAY", then=Value(Decimal("0.5"))),
+        default=Value(Decimal("0")),
+        output_field=DecimalField(max_digits=8, decimal_places=1),
+    )
+    attended = Q(status__in=("PRESENT", "HALF_DAY"))
+
+    grouped = (
+        DailyAttendance.objects.order_by()
+        .values("project_id", "date")
+        .annotate(
+            marked_count=Count("id"),
+            present_count=Count("id", filter=Q(status="PRESENT")),
+            half_day_count=Count("id", filter=Q(status="HALF_DAY")),
+            absent_count=Count("id", filter=Q(status="ABSENT")),
+            leave_count=Count("id", filter=Q(status="LEAVE")),
+            holiday_count=Count("id", filter=Q(status="HOLIDAY")),
+            on_site_count=Count("id", filter=attended & Q(check_in__isnull=False, check_out__isnull=True)),
+            checked_out_count=Count("id", filter=attended & Q(check_out__isnull=False)),
+            effective_days=Sum(effective_days),
+            wage_total=Sum(base_wage + F("overtime_hours") * F("overtime_rate_snapshot"), output_field=money),
+            overtime_hours=Sum("overtime_hours"),
+        )
+    )
+    rows = [
+        DailyAttendanceRollup(**{k: (v if v is not None else 0) for k, v in g.items()})
+        for g in grouped
+    ]
+    DailyAttendanceRollup.objects.bulk_create(rows, batch_size=500)
+    print(f"  → backfilled {len(rows)} attendance rollup row(s)")
+
+
+def reverse_backfill(apps, schema_editor):
+    apps.get_model("attendance", "DailyAttendanceRollup").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0020_dailyattendancerollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, reverse_code=reverse_backfill),
+    ]
@@ -3,12 +3,14 @@ Attendance Module Models
 ─────────────────────────
 AttendanceWorker  — a person (labour or staff) tracked per project
 DailyAttendance   — one attendance record per worker per day
+DailyAttendanceRollup — per-project, per-day aggregate of DailyAttendance
 QRScanLog         — immutable log of every QR scan event
 """
 from decimal import Decimal
 import uuid
 from django.conf import settings
 from django.db import models
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
 from django.utils import timezone
 
 
@@ -125,6 +127,88 @@ class AttendanceWorker(models.Model):
         return Decimal("0")
 
 
+ATTENDED_STATUSES = ("PRESENT", "HALF_DAY")
+
+_MONEY = DecimalField(max_digits=14, decimal_places=2)
+_DAYS  = DecimalField(max_digits=8, decimal_places=1)
+
+
+def _effective_days_expr():
+    """SQL twin of DailyAttendance.effective_days: Present=1, Half Day=0.5, else 0."""
+    return Case(
+        When(status="PRESENT", then=Value(Decimal("1"))),
+        When(status="HALF_DAY", then=Value(Decimal("0.5"))),
+        default=Value(Decimal("0")),
+        output_field=_DAYS,
+    )
+
+
+def _base_wage_expr():
+    """Daily-rate share of DailyAttendance.wage_earned."""
+    return Case(
+        When(status="PRESENT", then=F("daily_rate_snapshot")),
+        When(status="HALF_DAY", then=F("daily_rate_snapshot") / Value(Decimal("2"))),
+        default=Value(Decimal("0")),
+        output_field=_MONEY,
+    )
+
+
+def _overtime_pay_expr():
+    """Overtime share of DailyAttendance.wage_earned."""
+    return models.ExpressionWrapper(
+        F("overtime_hours") * F("overtime_rate_snapshot"), output_field=_MONEY,
+    )
+
+
+def attendance_aggregates():
+    """
+    Aggregate expressions over DailyAttendance rows, keyed by output name.
+
+    Usable with both `.aggregate(**…)` and `.values(…).annotate(**…)`;
+    the wage sums match summing `wage_earned` / `effective_days` in Python.
+    """
+    return {
+        "marked_count":   Count("id"),
+        "present_count":  Count("id", filter=Q(status="PRESENT")),
+        "half_day_count": Count("id", filter=Q(status="HALF_DAY")),
+        "absent_count":   Count("id", filter=Q(status="ABSENT")),
+        "leave_count":    Count("id", filter=Q(status="LEAVE")),
+        "holiday_count":  Count("id", filter=Q(status="HOLIDAY")),
+        "effective_days": Sum(_effective_days_expr()),
+        "base_wage":      Sum(_base_wage_expr()),
+        "overtime_pay":   Sum(_overtime_pay_expr()),
+        "wage_total":     Sum(_base_wage_expr() + _overtime_pay_expr(), output_field=_MONEY),
+        "overtime_hours": Sum("overtime_hours"),
+    }
+
+
+class DailyAttendanceQuerySet(models.QuerySet):
+    """Database-side wage maths so summaries never materialize rows."""
+
+    def with_wages(self):
+        """
+        Annotate each row with `effective_days_value`, `base_wage`,
+        `overtime_pay` and `wage_total` (= the `wage_earned` property).
+        """
+        return self.annotate(
+            effective_days_value=_effective_days_expr(),
+            base_wage=_base_wage_expr(),
+            overtime_pay=_overtime_pay_expr(),
+            wage_total=models.ExpressionWrapper(
+                _base_wage_expr() + _overtime_pay_expr(), output_field=_MONEY,
+            ),
+        )
+
+    def wage_summary(self):
+        """One aggregate query → dict of attendance_aggregates(); empty sums are 0, not None."""
+        totals = self.aggregate(**attendance_aggregates())
+        return {k: (v if v is not None else Decimal("0")) for k, v in totals.items()}
+
+    def wage_summary_by(self, *fields):
+        """GROUP BY `fields` → one row of attendance_aggregates() per group."""
+        return self.order_by().values(*fields).annotate(**attendance_aggregates())
+
+
 class DailyAttendance(models.Model):
     STATUS_CHOICES = [
         ("PRESENT",  "Present"),
@@ -158,6 +242,8 @@ class DailyAttendance(models.Model):
     created_at      = models.DateTimeField(auto_now_add=True)
     updated_at      = models.DateTimeField(auto_now=True)
 
+    objects = DailyAttendanceQuerySet.as_manager()
+
     class Meta:
         ordering = ["-date", "worker__name"]
         unique_together = [("worker", "date")]
@@ -165,6 +251,16 @@ class DailyAttendance(models.Model):
     def __str__(self):
         return f"{self.worker.name} — {self.date} — {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the (project, date) bucket the row was loaded from so the
+        # rollup signal can also refresh the old bucket if either is edited.
+        instance._loaded_rollup_key = (
+            instance.__dict__.get("project_id"), instance.__dict__.get("date"),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
         # Snapshot rates on first save
         if not self.pk:
@@ -174,7 +270,7 @@ class DailyAttendance(models.Model):
 
     @property
     def wage_earned(self):
-        """Calculate wage for this record."""
+        """Calculate wage for this record (SQL twin: `objects.with_wages()`)."""
         rate = self.daily_rate_snapshot
         if self.status == "PRESENT":
             base = rate
@@ -195,6 +291,48 @@ class DailyAttendance(models.Model):
         return Decimal("0")
 
 
+class DailyAttendanceRollup(models.Model):
+    """
+    Materialized per-project, per-day totals of DailyAttendance.
+
+    One row per (project, date) that has at least one attendance record.
+    Kept current by the DailyAttendance post_save / post_delete signals
+    (see rollups.py) so dashboards read one row per day instead of one row
+    per worker per day.  Rebuild with `manage.py rebuild_attendance_rollups`.
+    """
+    project         = models.ForeignKey(
+        "core.HouseProject", on_delete=models.CASCADE, related_name="attendance_rollups",
+    )
+    date            = models.DateField()
+
+    marked_count    = models.PositiveIntegerField(default=0, help_text="Workers with any record that day")
+    present_count   = models.PositiveIntegerField(default=0)
+    half_day_count  = models.PositiveIntegerField(default=0)
+    absent_count    = models.PositiveIntegerField(default=0)
+    leave_count     = models.PositiveIntegerField(default=0)
+    holiday_count   = models.PositiveIntegerField(default=0)
+    on_site_count   = models.PositiveIntegerField(default=0, help_text="Present/half-day, checked in, not out")
+    checked_out_count = models.PositiveIntegerField(default=0, help_text="Present/half-day, checked out")
+
+    effective_days  = models.DecimalField(max_digits=8, decimal_places=1, default=0)
+    wage_total      = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    overtime_hours  = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    updated_at      = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        unique_together = [("project", "date")]
+
+    def __str__(self):
+        return f"{self.project_id} — {self.date} — {self.marked_count} marked"
+
+    @property
+    def attended_count(self):
+        """Workers counted as on-site that day (present or half day)."""
+        return self.present_count + self.half_day_count
+
+
 class ScanTimeWindow(models.Model):
     """
     Admin-configurable per-project time windows for check-in / check-out.
@@ -0,0 +1,167 @@
+"""
+mqtt_ingest.py — pipelined NFC scan ingest for the MQTT listener
+═══════════════════════════════════════════════════════════════
+In the default (inline) mode the listener does all scan work on Paho's
+single network thread: worker lookup, attendance write, MQTTScanEvent
+insert, feedback publish and NFCDevice counter bump.  During the morning
+gate rush that serializes every reader behind the database and the broker
+backs up.
+
+`ScanIngestPipeline` moves that work off the network thread:
+
+  Paho thread      → parses the payload and calls submit() — nothing else
+  N shard workers  → resolve UID via worker_directory, record attendance,
+                     publish feedback, buffer the MQTTScanEvent row
+  1 flusher        → bulk_create()s buffered events and applies NFCDevice
+                     scan counters as one UPDATE per device, every
+                     `flush_interval` seconds or `batch_size` events
+
+Scans are sharded by NFC UID, so every scan of one card is handled by the
+same worker in arrival order — a worker's check-in can never race their
+own check-out.  Shard queues are bounded; when full, submit() blocks and
+the broker holds the backlog (QoS 1) instead of the process growing.
+
+Enable with:  python manage.py mqtt_listener --ingest-workers 4
+"""
+import logging
+import queue
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import close_old_connections, connection
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class ScanJob:
+    """One parsed nfc/<mac>/state message waiting to be processed."""
+    nfc_uid:     str
+    topic:       str
+    raw_payload: str
+    telemetry:   dict
+    mac:         str
+    device_ts:   object = None
+    is_queued:   bool = False
+    received_at: float = field(default_factory=time.monotonic)
+
+
+class ScanIngestPipeline:
+    """
+    Bounded, sharded worker pool for NFC scans.
+
+    `handle_scan(job)` does the per-scan work on a shard thread; it reports
+    back through add_event() / count_scan() so rows are written in batches.
+    """
+
+    def __init__(self, handle_scan, workers=4, queue_size=500,
+                 batch_size=50, flush_interval=1.0):
+        self.handle_scan    = handle_scan
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval
+
+        self._queues   = [queue.Queue(maxsize=queue_size) for _ in range(max(1, workers))]
+        self._events   = []
+        self._scans    = Counter()
+        self._buf_lock = threading.Lock()
+        self._flush_now = threading.Event()
+        self._stopping  = threading.Event()
+        self._threads   = []
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def start(self):
+        for i, q in enumerate(self._queues):
+            t = threading.Thread(target=self._work, args=(q,), name=f"nfc-ingest-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        self._flusher = threading.Thread(target=self._flush_loop, name="nfc-ingest-flush", daemon=True)
+        self._flusher.start()
+
+    def stop(self, timeout=10):
+        """Drain every shard queue, then write whatever is still buffered."""
+        for q in self._queues:
+            q.put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+        self._stopping.set()
+        self._flush_now.set()
+        self._flusher.join(timeout)
+
+    # ── Producer side (Paho network thread) ───────────────────────────────────
+
+    def submit(self, job: ScanJob):
+        """Enqueue a scan on the shard that owns its UID (blocks when full)."""
+        shard = zlib.crc32(job.nfc_uid.encode()) % len(self._queues)
+        self._queues[shard].put(job)
+
+    def backlog(self):
+        return sum(q.qsize() for q in self._queues)
+
+    # ── Sinks used by handle_scan ─────────────────────────────────────────────
+
+    def add_event(self, event):
+        """Buffer an unsaved MQTTScanEvent for the next bulk insert."""
+        with self._buf_lock:
+            self._events.append(event)
+            if len(self._events) >= self.batch_size:
+                self._flush_now.set()
+
+    def count_scan(self, mac):
+        """Buffer a +1 for the NFCDevice scan counter of `mac`."""
+        if mac:
+            with self._buf_lock:
+                self._scans[mac.upper()] += 1
+
+    # ── Threads ───────────────────────────────────────────────────────────────
+
+    def _work(self, q):
+        try:
+            while True:
+                job = q.get()
+                if job is _STOP:
+                    return
+                close_old_connections()
+                try:
+                    self.handle_scan(job)
+                except Exception as exc:
+                    logger.exception("NFC scan %s failed: %s", job.nfc_uid, exc)
+        finally:
+            connection.close()
+
+    def _flush_loop(self):
+        try:
+            while True:
+                self._flush_now.wait(self.flush_interval)
+                self._flush_now.clear()
+                close_old_connections()
+                self.flush()
+                if self._stopping.is_set():
+                    return
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write buffered scan events and device counters."""
+        from apps.attendance.mqtt_models import MQTTScanEvent, NFCDevice
+
+        with self._buf_lock:
+            events, self._events = self._events, []
+            scans, self._scans   = self._scans, Counter()
+
+        if events:
+            try:
+                MQTTScanEvent.objects.bulk_create(events, batch_size=self.batch_size)
+            except Exception as exc:
+                logger.warning("Failed to write %d MQTTScanEvent rows: %s", len(events), exc)
+        for mac, n in scans.items():
+            try:
+                NFCDevice.objects.filter(mac__iexact=mac).update(total_scans=F("total_scans") + n)
+            except Exception as exc:
+                logger.warning("Failed to bump scan counter for %s: %s", mac, exc)
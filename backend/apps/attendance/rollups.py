@@ -0,0 +1,154 @@
+"""
+attendance/rollups.py
+─────────────────────────────────────────────────────────────────────────────
+Maintenance of DailyAttendanceRollup — the per-project, per-day aggregate
+of DailyAttendance that the dashboard reads instead of raw records.
+
+Every DailyAttendance save / delete marks its (project, date) bucket dirty
+(see signals.py).  Outside a batch the bucket is recomputed once the
+surrounding transaction commits.  Inside `rollup_batch()` dirty buckets are
+collected and each is recomputed once when the outermost batch exits, so a
+300-worker sheet save or holiday apply costs one aggregate query per day
+instead of one per row.
+
+A bucket refresh is a single indexed aggregate over that project-day, so it
+is always exact — there are no +1/-1 deltas that can drift.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def _rollup_aggregates():
+    """Aggregate expressions over DailyAttendance rows → rollup columns."""
+    from .models import ATTENDED_STATUSES, attendance_aggregates
+
+    aggregates = attendance_aggregates()
+    del aggregates["base_wage"], aggregates["overtime_pay"]  # only the total is stored
+    attended = Q(status__in=ATTENDED_STATUSES)
+    aggregates["on_site_count"] = Count(
+        "id", filter=attended & Q(check_in__isnull=False, check_out__isnull=True),
+    )
+    aggregates["checked_out_count"] = Count("id", filter=attended & Q(check_out__isnull=False))
+    return aggregates
+
+
+def _clean(totals):
+    """Replace NULL sums (no rows) with zero."""
+    return {k: (v if v is not None else 0) for k, v in totals.items()}
+
+
+def _locked_rollup(project_id, day):
+    """The project-day rollup row, created if missing, locked until commit."""
+    from .models import DailyAttendanceRollup
+
+    rows = DailyAttendanceRollup.objects.select_for_update()
+    rollup = rows.filter(project_id=project_id, date=day).first()
+    if rollup is None:
+        try:
+            with transaction.atomic():
+                rollup = DailyAttendanceRollup.objects.create(project_id=project_id, date=day)
+        except IntegrityError:  # a concurrent refresh inserted it first
+            rollup = rows.get(project_id=project_id, date=day)
+    return rollup
+
+
+def refresh_rollup(project_id, day):
+    """
+    Recompute the rollup row for one project-day from DailyAttendance.
+
+    Concurrent refreshes of the same bucket (two scans committing together)
+    are serialised on the rollup row lock, and the aggregate runs after the
+    lock is taken, so the last writer always saw every committed record.
+    """
+    from .models import DailyAttendance
+
+    with transaction.atomic():
+        rollup = _locked_rollup(project_id, day)
+        totals = DailyAttendance.objects.filter(
+            project_id=project_id, date=day,
+        ).aggregate(**_rollup_aggregates())
+
+        if not totals["marked_count"]:
+            rollup.delete()
+            return None
+
+        for field, value in _clean(totals).items():
+            setattr(rollup, field, value)
+        rollup.save()
+    return rollup
+
+
+def rebuild_rollups(project_id=None):
+    """
+    Rebuild every rollup row (optionally for one project) with one GROUP BY
+    query.  Returns the number of rollup rows written.
+    """
+    from .models import DailyAttendance, DailyAttendanceRollup
+
+    records = DailyAttendance.objects.all()
+    rollups = DailyAttendanceRollup.objects.all()
+    if project_id:
+        records = records.filter(project_id=project_id)
+        rollups = rollups.filter(project_id=project_id)
+
+    grouped = (
+        records.order_by()
+        .values("project_id", "date")
+        .annotate(**_rollup_aggregates())
+    )
+    rows = [DailyAttendanceRollup(**_clean(g)) for g in grouped]
+
+    with transaction.atomic():
+        rollups.delete()
+        DailyAttendanceRollup.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def mark_dirty(project_id, day):
+    """Schedule a refresh of one project-day bucket."""
+    if not project_id or not day:
+        return
+    key = (project_id, str(day))
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending.add(key)
+        return
+    transaction.on_commit(lambda: _safe_refresh(*key))
+
+
+def _safe_refresh(project_id, day):
+    # A stale rollup is recoverable (rebuild command); a failed scan is not.
+    try:
+        refresh_rollup(project_id, day)
+    except Exception as exc:
+        logger.error("Rollup refresh failed for project %s on %s — %s", project_id, day, exc)
+
+
+@contextmanager
+def rollup_batch():
+    """
+    Defer rollup refreshes until the outermost batch exits, then refresh
+    each touched project-day once.
+
+        with rollup_batch():
+            for w in workers:
+                DailyAttendance.objects.update_or_create(...)
+    """
+    if getattr(_state, "pending", None) is not None:
+        yield  # nested — the outer batch flushes
+        return
+    _state.pending = set()
+    try:
+        yield
+    finally:
+        pending, _state.pending = _state.pending, None
+        for key in sorted(pending):
+            transaction.on_commit(lambda key=key: _safe_refresh(*key))
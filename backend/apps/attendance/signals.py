@@ -8,13 +8,21 @@ Rule:
   The reverse (worker → contractor) is handled explicitly via person_add API
   rather than a signal, to avoid circular post_save loops.
 
+  DailyAttendance saved/deleted → refresh that project-day's
+  DailyAttendanceRollup (see rollups.py).
+  AttendanceWorker saved/deleted → invalidate the NFC/QR worker directory
+  (see uid_directory.py).
+
 Role → Trade mapping
   Maps resource.Worker.Role choices → attendance.AttendanceWorker.trade choices.
 """
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from apps.attendance.rollups import mark_dirty
+from apps.attendance.uid_directory import worker_directory
+
 logger = logging.getLogger(__name__)
 
 # resource.Worker.Role → AttendanceWorker.trade
@@ -132,6 +140,25 @@ def worker_post_save(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender="attendance.DailyAttendance")
+@receiver(post_delete, sender="attendance.DailyAttendance")
+def daily_attendance_changed(sender, instance, **kwargs):
+    """Keep DailyAttendanceRollup in step with the record just written/removed."""
+    current = (instance.project_id, instance.date)
+    mark_dirty(*current)
+    loaded = getattr(instance, "_loaded_rollup_key", None)
+    if loaded and (loaded[0], str(loaded[1])) != (current[0], str(current[1])):
+        mark_dirty(*loaded)  # project/date edited — the old bucket lost a row
+    instance._loaded_rollup_key = current
+
+
+@receiver(post_save, sender="attendance.AttendanceWorker")
+@receiver(post_delete, sender="attendance.AttendanceWorker")
+def attendance_worker_changed(sender, instance, **kwargs):
+    """Card, badge, name, schedule or active flag may have changed."""
+    worker_directory.invalidate()
+
+
 # Aliases kept for backward compatibility
 contractor_post_save    = worker_post_save
 CONTRACTOR_ROLE_TO_TRADE = WORKER_ROLE_TO_TRADE
@@ -1,11 +1,23 @@
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from apps.attendance.models import ProjectAttendanceSettings
+from apps.attendance.models import (
+    AttendanceWorker,
+    DailyAttendance,
+    DailyAttendanceRollup,
+    ProjectAttendanceSettings,
+)
+from apps.attendance.mqtt_ingest import ScanIngestPipeline, ScanJob
+from apps.attendance.mqtt_models import NFCDevice
+from apps.attendance.rollups import rebuild_rollups
+from apps.attendance import uid_directory
+from apps.attendance.uid_directory import WorkerDirectory, worker_directory
 from apps.core.models import HouseProject
 
 
@@ -51,3 +63,234 @@ class AttendanceSettingsTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["project"], project.id)
         self.assertTrue(ProjectAttendanceSettings.objects.filter(project=project).exists())
+
+
+class DailyAttendanceRollupTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="rollup-user",
+            email="rollup@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.project = HouseProject.objects.create(
+            name="Rollup Project",
+            owner_name="Owner",
+            address="Site",
+            total_budget=100000,
+            start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31),
+            area_sqft=1200,
+        )
+        self.mason = AttendanceWorker.objects.create(
+            project=self.project, name="Ram", daily_rate=Decimal("1000"),
+            overtime_rate_per_hour=Decimal("200"),
+        )
+        self.helper = AttendanceWorker.objects.create(
+            project=self.project, name="Shyam", daily_rate=Decimal("800"),
+        )
+
+    def _mark(self, worker, day, status, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return DailyAttendance.objects.create(
+                worker=worker, project=self.project, date=day, status=status, **extra
+            )
+
+    def test_save_and_delete_keep_rollup_in_step(self):
+        today = date.today()
+        self._mark(self.mason, today, "PRESENT", overtime_hours=Decimal("2"), check_in="08:00")
+        half = self._mark(self.helper, today, "HALF_DAY")
+
+        rollup = DailyAttendanceRollup.objects.get(project=self.project, date=today)
+        self.assertEqual(rollup.marked_count, 2)
+        self.assertEqual(rollup.attended_count, 2)
+        self.assertEqual(rollup.on_site_count, 1)
+        self.assertEqual(rollup.wage_total, Decimal("1800.00"))  # 1000 + 2×200 + 800/2
+        self.assertEqual(rollup.effective_days, Decimal("1.5"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            half.delete()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.marked_count, 1)
+        self.assertEqual(rollup.wage_total, Decimal("1400.00"))
+
+    def test_editing_date_moves_record_between_buckets(self):
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        self._mark(self.mason, today, "PRESENT")
+
+        record = DailyAttendance.objects.get(worker=self.mason, date=today)
+        record.date = yesterday
+        with self.captureOnCommitCallbacks(execute=True):
+            record.save()
+
+        self.assertFalse(DailyAttendanceRollup.objects.filter(date=today).exists())
+        self.assertEqual(DailyAttendanceRollup.objects.get(date=yesterday).present_count, 1)
+
+    def test_dashboard_reads_rollups(self):
+        today = date.today()
+        self._mark(self.mason, today, "PRESENT", check_in="08:00", check_out="17:00")
+        self._mark(self.helper, today - timedelta(days=1), "ABSENT")
+
+        response = self.client.get(f"/api/v1/attendance/dashboard/?project={self.project.id}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["today"]["present"], 1)
+        self.assertEqual(response.data["today"]["checked_out"], 1)
+        self.assertEqual(response.data["today"]["unmarked"], 1)
+        self.assertEqual(response.data["today"]["wage_today"], 1000.0)
+        self.assertEqual(response.data["trend"][-1]["present"], 1)
+        self.assertEqual(response.data["trend"][-2]["present"], 0)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        today = date.today()
+        self._mark(self.mason, today, "PRESENT", overtime_hours=Decimal("1.5"))
+        self._mark(self.helper, today, "LEAVE")
+        expected = DailyAttendanceRollup.objects.get(date=today)
+
+        DailyAttendanceRollup.objects.all().delete()
+        self.assertEqual(rebuild_rollups(project_id=self.project.id), 1)
+
+        rebuilt = DailyAttendanceRollup.objects.get(date=today)
+        self.assertEqual(rebuilt.wage_total, expected.wage_total)
+        self.assertEqual(rebuilt.leave_count, 1)
+
+
+class DailyAttendanceWageQueryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="wage-user",
+            email="wage@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.project = HouseProject.objects.create(
+            name="Wage Project",
+            owner_name="Owner",
+            address="Site",
+            total_budget=100000,
+            start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31),
+            area_sqft=1200,
+        )
+        self.worker = AttendanceWorker.objects.create(
+            project=self.project, name="Hari", trade="MASON",
+            daily_rate=Decimal("1200"), overtime_rate_per_hour=Decimal("250"),
+        )
+        for day, status_, ot in [(1, "PRESENT", "2"), (2, "HALF_DAY", "0"), (3, "ABSENT", "0"), (4, "LEAVE", "0")]:
+            DailyAttendance.objects.create(
+                worker=self.worker, project=self.project, date=date(2026, 3, day),
+                status=status_, overtime_hours=Decimal(ot),
+            )
+
+    def test_with_wages_matches_python_properties(self):
+        for record in DailyAttendance.objects.with_wages():
+            self.assertEqual(record.wage_total, record.wage_earned)
+            self.assertEqual(record.effective_days_value, record.effective_days)
+
+    def test_summary_is_grouped_in_sql(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f"/api/v1/attendance/records/summary/?project={self.project.id}&month=2026-03"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data["workers"][0]
+        self.assertEqual(row["trade"], "Mason (Dakarmi)")
+        self.assertEqual((row["days_present"], row["days_half"], row["days_absent"]), (1, 1, 1))
+        self.assertEqual(row["effective_days"], 1.5)
+        self.assertEqual(row["total_wage"], 1800.0)
+        self.assertEqual(row["total_overtime_pay"], 500.0)
+        self.assertEqual(response.data["totals"]["total_wage_bill"], 2300.0)
+
+
+class ScanIngestPipelineTestCase(TestCase):
+    def test_scans_for_one_card_stay_in_arrival_order(self):
+        seen = []
+        pipeline = ScanIngestPipeline(lambda job: seen.append((job.nfc_uid, job.raw_payload)), workers=3)
+        pipeline.start()
+        for n in range(20):
+            for uid in ("AA01", "BB02", "CC03"):
+                pipeline.submit(ScanJob(uid, "nfc/x/state", str(n), {}, "aabbccddeeff"))
+        pipeline.stop()
+
+        for uid in ("AA01", "BB02", "CC03"):
+            self.assertEqual([p for u, p in seen if u == uid], [str(n) for n in range(20)])
+
+    def test_flush_batches_device_scan_counters(self):
+        device = NFCDevice.objects.create(mac="AA:BB:CC:DD:EE:FF")
+        pipeline = ScanIngestPipeline(lambda job: None)
+        for _ in range(3):
+            pipeline.count_scan("aa:bb:cc:dd:ee:ff")
+
+        with self.assertNumQueries(1):
+            pipeline.flush()
+
+        device.refresh_from_db()
+        self.assertEqual(device.total_scans, 3)
+
+
+class WorkerDirectoryTestCase(TestCase):
+    def setUp(self):
+        self.project = HouseProject.objects.create(
+            name="Directory Project",
+            owner_name="Owner",
+            address="Site",
+            total_budget=100000,
+            start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31),
+            area_sqft=1200,
+        )
+        self.worker = AttendanceWorker.objects.create(
+            project=self.project, name="Gita", nfc_uid="04A1B2C3",
+        )
+
+    def test_known_card_resolves_without_queries(self):
+        self.assertEqual(worker_directory.by_nfc_uid("04A1B2C3"), self.worker)
+
+        with self.assertNumQueries(0):
+            worker = worker_directory.by_nfc_uid("04A1B2C3")
+            by_badge = worker_directory.by_qr_token(self.worker.qr_token, worker_id=self.worker.id)
+
+        self.assertEqual(worker.project, self.project)
+        self.assertEqual(by_badge, self.worker)
+
+    def test_worker_change_invalidates_directory(self):
+        worker_directory.by_nfc_uid("04A1B2C3")
+        self.worker.is_active = False
+        self.worker.save()
+
+        with self.assertRaises(AttendanceWorker.DoesNotExist):
+            worker_directory.by_nfc_uid("04A1B2C3")
+
+    def test_unreachable_cache_is_polled_outside_the_lock_with_backoff(self):
+        directory = WorkerDirectory()
+        clock = [1000.0]
+        reads = []
+
+        def cache_get(key):
+            reads.append(directory._lock.locked())
+            return None
+
+        with patch.object(uid_directory.time, "monotonic", side_effect=lambda: clock[0]), \
+                patch.object(uid_directory, "cache") as cache:
+            cache.get.side_effect = cache_get
+            cache.add.return_value = None
+            directory.by_nfc_uid("04A1B2C3")
+            for _ in range(10):
+                clock[0] += 2
+                self.assertEqual(directory.by_nfc_uid("04A1B2C3"), self.worker)
+            self.assertEqual(reads, [False])
+
+            clock[0] += uid_directory.CACHE_BACKOFF_SECS
+            directory.by_nfc_uid("04A1B2C3")
+
+        self.assertEqual(reads, [False, False])
+
+    def test_users_sync_payload_uses_firmware_uid_format(self):
+        payload, count = worker_directory.users_sync_payload(self.project.id)
+
+        self.assertEqual(count, 1)
+        self.assertIn('"uid": "04 A1 B2 C3"', payload)
@@ -0,0 +1,187 @@
+"""
+uid_directory.py — in-process card / badge → worker directory
+═════════════════════════════════════════════════════════════
+Every NFC tap and QR scan used to start with an AttendanceWorker query, and
+every reader reconnect rebuilt its users/sync table from the database.
+
+`worker_directory` keeps, per process:
+  • NFC UID  → active AttendanceWorker (project pre-joined)
+  • QR token → active AttendanceWorker
+  • project  → ready-to-publish users/sync JSON payload (built lazily)
+
+Invalidation
+  AttendanceWorker post_save / post_delete (signals.py) calls invalidate(),
+  which clears this process's copy and bumps a version counter in the
+  Django cache (Redis in production).  Other processes — gunicorn workers,
+  the MQTT listener — compare that version at most once per
+  VERSION_CHECK_SECS and reload when it moved.  The cache is asked outside
+  the lock, so a slow cache never stalls lookups on other threads.  If it is
+  unreachable, checks pause for CACHE_BACKOFF_SECS and the directory falls
+  back to reloading every FALLBACK_TTL_SECS.
+
+Known cards resolve with zero database queries.
+"""
+import json
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY        = "attendance:worker-directory:version"
+VERSION_CHECK_SECS = 1
+FALLBACK_TTL_SECS  = 60
+CACHE_BACKOFF_SECS = 30
+
+
+def firmware_uid(nfc_uid):
+    """
+    Normalise a stored UID to the space-separated uppercase format the
+    firmware stores (e.g. "ABCDEF12" → "AB CD EF 12").  Non-hex values are
+    just uppercased.
+    """
+    uid_clean = str(nfc_uid or "").strip()
+    raw = uid_clean.replace(" ", "").replace(":", "")
+    if len(raw) % 2 == 0 and all(c in "0123456789ABCDEFabcdef" for c in raw):
+        return " ".join(raw[i:i+2].upper() for i in range(0, len(raw), 2))
+    return uid_clean.upper()
+
+
+def _sync_entry(worker):
+    """users/sync array element (matches firmware handle_users_sync parser)."""
+    return {
+        "uid":        firmware_uid(worker.nfc_uid),
+        "username":   worker.name,
+        "status":     "Active",
+        "schedule":   bool(worker.use_custom_window),
+        "start_hour": worker.custom_checkin_start.hour if worker.custom_checkin_start else 0,
+        "end_hour":   worker.custom_checkout_end.hour  if worker.custom_checkout_end  else 23,
+        "days_mask":  int(worker.working_days_mask)     if worker.working_days_mask is not None else 127,
+    }
+
+
+class WorkerDirectory:
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self._by_uid     = {}
+        self._by_token   = {}
+        self._payloads   = {}
+        self._loaded     = False
+        self._version    = None
+        self._loaded_at  = 0.0
+        self._checked_at = 0.0
+        self._cache_down_until = 0.0
+
+    # ── Lookups ───────────────────────────────────────────────────────────────
+
+    def by_nfc_uid(self, nfc_uid):
+        """Active worker for a UID, or raise AttendanceWorker.DoesNotExist."""
+        from .models import AttendanceWorker
+
+        worker = self._snapshot()[0].get(nfc_uid)
+        if worker is None:
+            raise AttendanceWorker.DoesNotExist(f"No active worker for NFC UID {nfc_uid}")
+        return worker
+
+    def by_qr_token(self, token, worker_id=None):
+        """Active worker for a badge token (and id, for signed badges)."""
+        from .models import AttendanceWorker
+
+        worker = self._snapshot()[1].get(str(token).lower())
+        if worker is None or (worker_id is not None and str(worker.pk) != str(worker_id)):
+            raise AttendanceWorker.DoesNotExist("Invalid QR code.")
+        return worker
+
+    def users_sync_payload(self, project_id):
+        """(json_payload, count) for nfc/<mac>/users/sync — built once per version."""
+        by_uid = self._snapshot()[0]
+        with self._lock:
+            cached = self._payloads.get(project_id)
+            if cached is None:
+                entries = [
+                    _sync_entry(w) for w in by_uid.values()
+                    if w.project_id == project_id and str(w.nfc_uid).strip()
+                ]
+                entries.sort(key=lambda e: e["username"])
+                cached = (json.dumps(entries), len(entries))
+                self._payloads[project_id] = cached
+        return cached
+
+    # ── Invalidation ──────────────────────────────────────────────────────────
+
+    def invalidate(self):
+        """
+        Drop this process's copy now and, once the current transaction
+        commits, tell every other process to reload.
+        """
+        with self._lock:
+            self._loaded = False
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        with self._lock:
+            self._loaded = False  # a reload may have raced the commit
+        try:
+            if cache.add(VERSION_KEY, 1, timeout=None) is False:
+                cache.incr(VERSION_KEY)
+        except Exception as exc:
+            logger.warning("Worker directory version bump failed: %s", exc)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _remote_version(self, now):
+        """Shared version, or None while the cache is unreachable (then back off)."""
+        if now < self._cache_down_until:
+            return None
+        try:
+            version = cache.get(VERSION_KEY)
+            if version is None:
+                # First process since a flush: start the counter, so that
+                # None from here on means the cache is unreachable.
+                added = cache.add(VERSION_KEY, 0, timeout=None)
+                if added:
+                    version = 0
+                elif added is False:  # another process got there first
+                    version = cache.get(VERSION_KEY)
+        except Exception:
+            version = None
+        if version is None:
+            self._cache_down_until = now + CACHE_BACKOFF_SECS
+        return version
+
+    def _snapshot(self):
+        now = time.monotonic()
+        version = None
+        check = not self._loaded or now - self._checked_at >= VERSION_CHECK_SECS
+        if check:
+            self._checked_at = now
+            version = self._remote_version(now)  # no lock held while the cache answers
+        with self._lock:
+            if check and self._loaded:
+                if version is None:
+                    stale = now - self._loaded_at >= FALLBACK_TTL_SECS
+                else:
+                    stale = version != self._version
+                if stale:
+                    self._loaded = False
+            if not self._loaded:
+                self._load(now, version)
+            return self._by_uid, self._by_token
+
+    def _load(self, now, version):
+        from .models import AttendanceWorker
+
+        workers = list(AttendanceWorker.objects.select_related("project").filter(is_active=True))
+        self._by_uid   = {w.nfc_uid: w for w in workers if w.nfc_uid}
+        self._by_token = {str(w.qr_token).lower(): w for w in workers}
+        self._payloads = {}
+        self._version    = version
+        self._loaded     = True
+        self._loaded_at  = now
+        self._checked_at = now
+
+
+worker_directory = WorkerDirectory()
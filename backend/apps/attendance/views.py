@@ -7,6 +7,7 @@ import uuid
 from datetime import date as date_type, datetime
 from decimal import Decimal
 
+from django.db.models import Sum
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
@@ -14,7 +15,12 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
 from apps.core.models import HouseProject
-from .models import AttendanceWorker, DailyAttendance, QRScanLog, ScanTimeWindow, ProjectHoliday, ProjectAttendanceSettings
+from .models import (
+    AttendanceWorker, DailyAttendance, DailyAttendanceRollup, QRScanLog,
+    ScanTimeWindow, ProjectHoliday, ProjectAttendanceSettings,
+)
+from .rollups import rollup_batch
+from .uid_directory import worker_directory
 from .serializers import (
     AttendanceWorkerSerializer,
     DailyAttendanceSerializer,
@@ -76,11 +82,7 @@ def _resolve_worker_from_qr_data(raw_data):
             raise ValueError("Invalid QR format.")
 
         try:
-            return AttendanceWorker.objects.select_related("project").get(
-                pk=worker_id,
-                qr_token=token,
-                is_active=True,
-            )
+            return worker_directory.by_qr_token(token, worker_id=worker_id)
         except AttendanceWorker.DoesNotExist as exc:
             raise LookupError("Invalid QR code.") from exc
 
@@ -91,10 +93,7 @@ def _resolve_worker_from_qr_data(raw_data):
             raise ValueError("Invalid QR format.") from exc
 
         try:
-            return AttendanceWorker.objects.select_related("project").get(
-                qr_token=payload,
-                is_active=True,
-            )
+            return worker_directory.by_qr_token(payload)
         except AttendanceWorker.DoesNotExist as exc:
             raise LookupError("Invalid QR code.") from exc
 
@@ -482,7 +481,7 @@ def nfc_attendance_scan(request):
     uid = request.data.get("uid", "").replace(" ", "").upper()
     if not uid: return Response({"error": "uid is required."}, status=400)
     try:
-        worker = AttendanceWorker.objects.select_related("project").get(nfc_uid=uid, is_active=True)
+        worker = worker_directory.by_nfc_uid(uid)
     except AttendanceWorker.DoesNotExist:
         return Response({"error": f"Card {uid} not assigned to any active worker."}, status=404)
 
@@ -1130,27 +1129,22 @@ def dashboard(request):
         return Response({"error": "project is required."}, status=400)
 
     today  = date_type.today()
-    workers = AttendanceWorker.objects.filter(project_id=project_id, is_active=True)
-    total_workers = workers.count()
-
-    # ── Today ────────────────────────────────────────────────────────────────
-    today_records = list(DailyAttendance.objects.filter(
-        project_id=project_id, date=today
-    ).select_related("worker"))
+    total_workers = AttendanceWorker.objects.filter(project_id=project_id, is_active=True).count()
 
-    present    = [r for r in today_records if r.status == "PRESENT"]
-    half_day   = [r for r in today_records if r.status == "HALF_DAY"]
-    absent     = [r for r in today_records if r.status == "ABSENT"]
-    on_leave   = [r for r in today_records if r.status in ("LEAVE", "HOLIDAY")]
-
-    marked_ids = {r.worker_id for r in today_records}
-    unmarked   = total_workers - len(marked_ids)
-
-    on_site    = [r for r in present + half_day if r.check_in and not r.check_out]
-    checked_out= [r for r in present + half_day if r.check_out]
+    # All day-level numbers come from DailyAttendanceRollup (one row per day)
+    # instead of scanning every worker's record — see rollups.py.
+    rollups = {
+        r.date: r
+        for r in DailyAttendanceRollup.objects.filter(
+            project_id=project_id,
+            date__gte=today - timedelta(days=6),
+            date__lte=today,
+        )
+    }
+    today_rollup = rollups.get(today) or DailyAttendanceRollup(project_id=project_id, date=today)
 
-    today_wage = sum(float(r.wage_earned) for r in today_records)
-    today_ot   = sum(float(r.overtime_hours) for r in today_records)
+    # ── Today ────────────────────────────────────────────────────────────────
+    unmarked = total_workers - today_rollup.marked_count
 
     # Workers late (from QR logs today)
     start_of_today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -1165,8 +1159,8 @@ def dashboard(request):
     trend = []
     for i in range(6, -1, -1):
         day = today - timedelta(days=i)
-        recs = DailyAttendance.objects.filter(project_id=project_id, date=day)
-        present_count = recs.filter(status__in=("PRESENT", "HALF_DAY")).count()
+        rollup = rollups.get(day)
+        present_count = rollup.attended_count if rollup else 0
         trend.append({
             "date":          str(day),
             "day":           day.strftime("%a"),
@@ -1176,32 +1170,31 @@ def dashboard(request):
         })
 
     # ── This month ────────────────────────────────────────────────────────────
-    month_records = DailyAttendance.objects.filter(
+    month_wage = DailyAttendanceRollup.objects.filter(
         project_id=project_id,
         date__year=today.year,
         date__month=today.month,
-    )
-    month_wage = sum(float(r.wage_earned) for r in month_records)
+    ).aggregate(total=Sum("wage_total"))["total"] or 0
     month_days = today.day  # days elapsed this month
 
     return Response({
         "today": {
             "date":        str(today),
             "total":       total_workers,
-            "present":     len(present),
-            "half_day":    len(half_day),
-            "absent":      len(absent),
-            "on_leave":    len(on_leave),
+            "present":     today_rollup.present_count,
+            "half_day":    today_rollup.half_day_count,
+            "absent":      today_rollup.absent_count,
+            "on_leave":    today_rollup.leave_count + today_rollup.holiday_count,
             "unmarked":    max(unmarked, 0),
-            "on_site":     len(on_site),
-            "checked_out": len(checked_out),
+            "on_site":     today_rollup.on_site_count,
+            "checked_out": today_rollup.checked_out_count,
             "late":        late_count,
-            "wage_today":  round(today_wage, 2),
-            "ot_hours":    round(today_ot, 2),
+            "wage_today":  round(float(today_rollup.wage_total), 2),
+            "ot_hours":    round(float(today_rollup.overtime_hours), 2),
         },
         "trend":  trend,
         "month": {
-            "wage_bill":    round(month_wage, 2),
+            "wage_bill":    round(float(month_wage), 2),
             "days_elapsed": month_days,
             "month_label":  today.strftime("%B %Y"),
         },
@@ -1230,25 +1223,26 @@ def worker_stats(request, worker_id):
     today = date_type.today()
     year, month = today.year, today.month
 
-    # This month records
-    month_records = list(DailyAttendance.objects.filter(
+    # This month totals — one aggregate query
+    month_totals = DailyAttendance.objects.filter(
         worker=worker, date__year=year, date__month=month
-    ).order_by("date"))
+    ).wage_summary()
 
-    present_days  = sum(1 for r in month_records if r.status in ("PRESENT", "HALF_DAY"))
+    present_days  = month_totals["present_count"] + month_totals["half_day_count"]
     working_days  = today.day
     attendance_pct = round(present_days / working_days * 100) if working_days else 0
-    month_wage    = sum(float(r.wage_earned) for r in month_records)
-    month_ot      = sum(float(r.overtime_hours) for r in month_records)
+    month_wage    = float(month_totals["wage_total"])
+    month_ot      = float(month_totals["overtime_hours"])
 
     # Consecutive streak (going backwards from today)
     streak = 0
     check_day = today
-    # 90 days ≈ 15 weeks — enough for any realistic streak
-    all_records = {
-        r.date: r.status
-        for r in DailyAttendance.objects.filter(worker=worker).order_by("-date")[:90]
-    }
+    # 90 days ≈ 15 weeks — enough for any realistic streak.  The same slice
+    # also feeds the "recent" list below, so it is fetched only once.
+    latest_records = list(
+        DailyAttendance.objects.filter(worker=worker).with_wages().order_by("-date")[:90]
+    )
+    all_records = {r.date: r.status for r in latest_records}
     while True:
         status = all_records.get(check_day)
         if status in ("PRESENT", "HALF_DAY"):
@@ -1265,9 +1259,9 @@ def worker_stats(request, worker_id):
             "date":   str(r.date),
             "status": r.status,
             "ot":     float(r.overtime_hours),
-            "wage":   float(r.wage_earned),
+            "wage":   float(r.wage_total),
         }
-        for r in DailyAttendance.objects.filter(worker=worker).order_by("-date")[:30]
+        for r in latest_records[:30]
     ]
 
     return Response({
@@ -2113,49 +2107,50 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
         records    = ser.validated_data["records"]
         created_count = updated_count = 0
         errors = []
-        for rec in records:
-            try:
-                worker = AttendanceWorker.objects.get(pk=rec.get("worker"), project_id=project_id)
-            except AttendanceWorker.DoesNotExist:
-                errors.append(f"Worker {rec.get('worker')} not found.")
-                continue
-            # Build defaults — never overwrite check_in/check_out with None
-            # (QR-scanned times must be preserved when the sheet saves over them)
-            status   = rec.get("status")
-            check_in = rec.get("check_in")
-            check_out= rec.get("check_out")
-
-            # If status is cleared AND no times are present, delete the record for this day
-            if not status and not check_in and not check_out:
-                DailyAttendance.objects.filter(worker=worker, date=day).delete()
-                continue
-
-            bulk_defaults = {
-                "project_id":     project_id,
-                "status":         status or "PRESENT",
-                "overtime_hours": Decimal(str(rec.get("overtime_hours", 0))),
-                "notes":          rec.get("notes", ""),
-                "recorded_by":    request.user,
-            }
-            if "check_in" in rec:
-                val = rec.get("check_in")
-                bulk_defaults["check_in"] = None if val in ("", None) else val
-            if "check_out" in rec:
-                val = rec.get("check_out")
-                bulk_defaults["check_out"] = None if val in ("", None) else val
-            # NOTE: daily_rate_snapshot / overtime_rate_snapshot are handled by
-            # DailyAttendance.save() on first creation (if not self.pk).
-            # Do NOT include them here — that would cause an UnboundLocalError
-            # (`created` is only defined AFTER update_or_create returns) and would
-            # wrongly overwrite historical snapshots on updates.
-            obj, is_created = DailyAttendance.objects.update_or_create(
-                worker=worker, date=day,
-                defaults=bulk_defaults,
-            )
-            if is_created:
-                created_count += 1
-            else:
-                updated_count += 1
+        with rollup_batch():
+            for rec in records:
+                try:
+                    worker = AttendanceWorker.objects.get(pk=rec.get("worker"), project_id=project_id)
+                except AttendanceWorker.DoesNotExist:
+                    errors.append(f"Worker {rec.get('worker')} not found.")
+                    continue
+                # Build defaults — never overwrite check_in/check_out with None
+                # (QR-scanned times must be preserved when the sheet saves over them)
+                status   = rec.get("status")
+                check_in = rec.get("check_in")
+                check_out= rec.get("check_out")
+
+                # If status is cleared AND no times are present, delete the record for this day
+                if not status and not check_in and not check_out:
+                    DailyAttendance.objects.filter(worker=worker, date=day).delete()
+                    continue
+
+                bulk_defaults = {
+                    "project_id":     project_id,
+                    "status":         status or "PRESENT",
+                    "overtime_hours": Decimal(str(rec.get("overtime_hours", 0))),
+                    "notes":          rec.get("notes", ""),
+                    "recorded_by":    request.user,
+                }
+                if "check_in" in rec:
+                    val = rec.get("check_in")
+                    bulk_defaults["check_in"] = None if val in ("", None) else val
+                if "check_out" in rec:
+                    val = rec.get("check_out")
+                    bulk_defaults["check_out"] = None if val in ("", None) else val
+                # NOTE: daily_rate_snapshot / overtime_rate_snapshot are handled by
+                # DailyAttendance.save() on first creation (if not self.pk).
+                # Do NOT include them here — that would cause an UnboundLocalError
+                # (`created` is only defined AFTER update_or_create returns) and would
+                # wrongly overwrite historical snapshots on updates.
+                obj, is_created = DailyAttendance.objects.update_or_create(
+                    worker=worker, date=day,
+                    defaults=bulk_defaults,
+                )
+                if is_created:
+                    created_count += 1
+                else:
+                    updated_count += 1
 
         return Response({"created": created_count, "updated": updated_count, "errors": errors})
 
@@ -2182,19 +2177,20 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
         # 2. Bulk update/create DailyAttendance
         active_workers = AttendanceWorker.objects.filter(project_id=project_id, is_active=True)
         count = 0
-        for w in active_workers:
-            _, created = DailyAttendance.objects.update_or_create(
-                worker=w, date=day,
-                defaults={
-                    "project_id": project_id,
-                    "status": "HOLIDAY",
-                    "notes": name,
-                    "recorded_by": request.user,
-                    "daily_rate_snapshot": w.daily_rate,
-                    "overtime_rate_snapshot": w.effective_overtime_rate()
-                }
-            )
-            count += 1
+        with rollup_batch():
+            for w in active_workers:
+                _, created = DailyAttendance.objects.update_or_create(
+                    worker=w, date=day,
+                    defaults={
+                        "project_id": project_id,
+                        "status": "HOLIDAY",
+                        "notes": name,
+                        "recorded_by": request.user,
+                        "daily_rate_snapshot": w.daily_rate,
+                        "overtime_rate_snapshot": w.effective_overtime_rate()
+                    }
+                )
+                count += 1
             
         return Response({
             "status": "success",
@@ -2257,35 +2253,31 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
         except ValueError:
             return Response({"error": "month must be YYYY-MM"}, status=400)
         _, days_in_month = calendar.monthrange(year, mon)
-        records = DailyAttendance.objects.filter(
+        # One GROUP BY query — wages are computed in SQL (see with_wages()).
+        grouped = DailyAttendance.objects.filter(
             project_id=project, date__year=year, date__month=mon
-        ).select_related("worker")
-        worker_map = {}
-        for rec in records:
-            wid = rec.worker_id
-            if wid not in worker_map:
-                worker_map[wid] = {
-                    "worker_id": wid, "worker_name": rec.worker.name,
-                    "trade": rec.worker.get_trade_display(), "worker_type": rec.worker.worker_type,
-                    "daily_rate": float(rec.worker.daily_rate),
-                    "days_present": 0, "days_absent": 0, "days_half": 0,
-                    "days_leave": 0, "days_holiday": 0,
-                    "effective_days": 0.0, "total_overtime_hours": 0.0,
-                    "total_wage": 0.0, "total_overtime_pay": 0.0, "grand_total": 0.0,
-                }
-            w = worker_map[wid]
-            STATUS_KEY = {"PRESENT": "days_present", "ABSENT": "days_absent",
-                          "HALF_DAY": "days_half", "LEAVE": "days_leave", "HOLIDAY": "days_holiday"}
-            if rec.status in STATUS_KEY:
-                w[STATUS_KEY[rec.status]] += 1
-            base = float(rec.daily_rate_snapshot * rec.effective_days)
-            ot   = float(rec.overtime_hours * rec.overtime_rate_snapshot)
-            w["effective_days"]       += float(rec.effective_days)
-            w["total_overtime_hours"] += float(rec.overtime_hours)
-            w["total_wage"]           += base
-            w["total_overtime_pay"]   += ot
-            w["grand_total"]          += base + ot
-        workers_summary = list(worker_map.values())
+        ).wage_summary_by(
+            "worker_id", "worker__name", "worker__trade",
+            "worker__worker_type", "worker__daily_rate",
+        ).order_by("worker__name")
+        trades = dict(AttendanceWorker.TRADE_CHOICES)
+        workers_summary = [
+            {
+                "worker_id": g["worker_id"], "worker_name": g["worker__name"],
+                "trade": trades.get(g["worker__trade"], g["worker__trade"]),
+                "worker_type": g["worker__worker_type"],
+                "daily_rate": float(g["worker__daily_rate"]),
+                "days_present": g["present_count"], "days_absent": g["absent_count"],
+                "days_half": g["half_day_count"], "days_leave": g["leave_count"],
+                "days_holiday": g["holiday_count"],
+                "effective_days":       float(g["effective_days"] or 0),
+                "total_overtime_hours": float(g["overtime_hours"] or 0),
+                "total_wage":           float(g["base_wage"] or 0),
+                "total_overtime_pay":   float(g["overtime_pay"] or 0),
+                "grand_total":          float(g["wage_total"] or 0),
+            }
+            for g in grouped
+        ]
         return Response({
             "workers": workers_summary,
             "totals": {
@@ -2436,19 +2428,20 @@ def holidays_list(request):
     workers_marked = 0
     if auto_apply:
         active_workers = AttendanceWorker.objects.filter(project_id=project_id, is_active=True)
-        for w in active_workers:
-            DailyAttendance.objects.update_or_create(
-                worker=w, date=date_str,
-                defaults={
-                    "project_id":             project_id,
-                    "status":                 "HOLIDAY",
-                    "notes":                  name,
-                    "recorded_by":            request.user,
-                    "daily_rate_snapshot":    w.daily_rate,
-                    "overtime_rate_snapshot": w.effective_overtime_rate(),
-                },
-            )
-            workers_marked += 1
+        with rollup_batch():
+            for w in active_workers:
+                DailyAttendance.objects.update_or_create(
+                    worker=w, date=date_str,
+                    defaults={
+                        "project_id":             project_id,
+                        "status":                 "HOLIDAY",
+                        "notes":                  name,
+                        "recorded_by":            request.user,
+                        "daily_rate_snapshot":    w.daily_rate,
+                        "overtime_rate_snapshot": w.effective_overtime_rate(),
+                    },
+                )
+                workers_marked += 1
         holiday.applied = True
         holiday.save(update_fields=["applied"])
 
@@ -2495,19 +2488,20 @@ def holiday_apply(request, holiday_id):
         project_id=holiday.project_id, is_active=True
     )
     count = 0
-    for w in active_workers:
-        DailyAttendance.objects.update_or_create(
-            worker=w, date=holiday.date,
-            defaults={
-                "project_id":             holiday.project_id,
-                "status":                 "HOLIDAY",
-                "notes":                  holiday.name,
-                "recorded_by":            request.user,
-                "daily_rate_snapshot":    w.daily_rate,
-                "overtime_rate_snapshot": w.effective_overtime_rate(),
-            },
-        )
-        count += 1
+    with rollup_batch():
+        for w in active_workers:
+            DailyAttendance.objects.update_or_create(
+                worker=w, date=holiday.date,
+                defaults={
+                    "project_id":             holiday.project_id,
+                    "status":                 "HOLIDAY",
+                    "notes":                  holiday.name,
+                    "recorded_by":            request.user,
+                    "daily_rate_snapshot":    w.daily_rate,
+                    "overtime_rate_snapshot": w.effective_overtime_rate(),
+                },
+            )
+            count += 1
 
     holiday.applied = True
     holiday.save(update_fields=["applied"])
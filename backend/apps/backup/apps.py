@@ -3,3 +3,31 @@ from django.apps import AppConfig
 class BackupConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.backup'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from .signals import connect_media_inventory
+
+        connect_media_inventory()
+        post_migrate.connect(setup_periodic_tasks, sender=self)
+
+def setup_periodic_tasks(sender, **kwargs):
+    try:
+        from django_celery_beat.models import PeriodicTask, CrontabSchedule
+
+        # Re-scan MEDIA_ROOT every 6 hours for files written outside the ORM
+        schedule, created = CrontabSchedule.objects.get_or_create(
+            minute='15',
+            hour='*/6',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=schedule,
+            name='Reconcile Media Inventory',
+            task='apps.backup.tasks.reconcile_media_inventory_task',
+        )
+    except Exception as e:
+        print("Failed to setup periodic tasks for backup:", str(e))
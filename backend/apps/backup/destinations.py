@@ -0,0 +1,244 @@
+"""
+Backup destinations — where packs, archives and manifests are written.
+
+`destination.open(name)` returns a ChunkedUpload: a write-only stream that
+buffers CHUNK_SIZE bytes and commits each chunk through a resumable-upload
+session.  Nothing is assembled on local disk first, and a failed chunk is
+retried from the offset the destination reports as committed, so a dropped
+connection costs at most one chunk rather than the whole upload.
+
+    LocalDirectoryDestination   BACKUP_LOCAL_DIR/<project>/<name>
+    DriveDestination            Google Drive resumable upload sessions
+"""
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 8 * 1024 * 1024   # Drive wants multiples of 256 KiB
+MAX_RETRIES = 5
+
+DRIVE_UPLOAD_URL = 'https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&fields=id'
+
+
+class ChunkedUpload:
+    """
+    File-like writer over a resumable upload session.  The session must
+    implement committed() → bytes the destination already has, and
+    put(offset, data, total) → the object id once `total` is given.
+    """
+
+    def __init__(self, session, chunk_size=CHUNK_SIZE, retries=MAX_RETRIES):
+        self.session = session
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.offset = 0          # bytes committed by the destination
+        self.result = None
+        self._buf = bytearray()
+
+    @property
+    def size(self):
+        return self.offset + len(self._buf)
+
+    def write(self, data):
+        self._buf += data
+        while len(self._buf) >= self.chunk_size:
+            self._send(bytes(self._buf[:self.chunk_size]), final=False)
+            del self._buf[:self.chunk_size]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Commit the tail and finish the upload.  Returns the object id."""
+        if self.result is None:
+            self.result = self._send(bytes(self._buf), final=True)
+            self._buf.clear()
+        return self.result
+
+    def abort(self):
+        abort = getattr(self.session, 'abort', None)
+        if abort:
+            abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _send(self, chunk, final):
+        start = self.offset
+        total = start + len(chunk) if final else None
+        attempt = 0
+        while True:
+            try:
+                committed = self.session.committed() if attempt else start
+                result = self.session.put(committed, chunk[committed - start:], total)
+                self.offset = start + len(chunk)
+                return result
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                logger.warning(f"Backup chunk at byte {start} failed ({e}); retry {attempt}/{self.retries}")
+                time.sleep(min(30, 2 ** attempt))
+
+
+# ── Local directory ───────────────────────────────────────────────────────────
+
+class _LocalSession:
+    """Writes to <path>.part and renames it into place when complete."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.part = path.with_name(path.name + '.part')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.part.write_bytes(b'')
+
+    def committed(self):
+        return self.part.stat().st_size
+
+    def put(self, offset, data, total=None):
+        with open(self.part, 'r+b') as fh:
+            fh.seek(offset)
+            fh.write(data)
+            fh.truncate()
+            fh.flush()
+            os.fsync(fh.fileno())
+        if total is not None:
+            os.replace(self.part, self.path)
+            return str(self.path)
+        return None
+
+    def abort(self):
+        self.part.unlink(missing_ok=True)
+
+
+class LocalDirectoryDestination:
+    name = 'local'
+
+    def __init__(self, root, folder_name):
+        self.root = Path(root) / folder_name
+        self.key = f"local:{self.root}"
+
+    def open(self, name, mimetype='application/octet-stream'):
+        return ChunkedUpload(_LocalSession(self.root / name))
+
+
+# ── Google Drive ──────────────────────────────────────────────────────────────
+
+def drive_credentials(backup_settings):
+    from google.oauth2.credentials import Credentials
+
+    return Credentials(
+        token=None,
+        refresh_token=backup_settings.gdrive_refresh_token,
+        token_uri='https://oauth2.googleapis.com/token',
+        client_id=backup_settings.gdrive_client_id,
+        client_secret=backup_settings.gdrive_client_secret,
+    )
+
+
+def drive_project_folder(creds, parent_folder_id, project_name):
+    """Get or create the project's folder under the main backup folder."""
+    from googleapiclient.discovery import build
+
+    service = build('drive', 'v3', credentials=creds)
+    folder_name = project_name.strip()
+    # Escape single quotes in folder name just in case
+    escaped_folder_name = folder_name.replace("'", "\\'")
+    query = f"name = '{escaped_folder_name}' and '{parent_folder_id}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
+
+    files = service.files().list(q=query, fields="files(id)").execute().get('files', [])
+    if files:
+        return files[0]['id']
+
+    folder_metadata = {
+        'name': folder_name,
+        'mimeType': 'application/vnd.google-apps.folder',
+        'parents': [parent_folder_id]
+    }
+    return service.files().create(body=folder_metadata, fields='id').execute().get('id')
+
+
+class _DriveSession:
+    def __init__(self, http, folder_id, name, mimetype):
+        self.http = http
+        self.result = None
+        resp = http.post(
+            DRIVE_UPLOAD_URL,
+            json={'name': name, 'parents': [folder_id]},
+            headers={'X-Upload-Content-Type': mimetype},
+            timeout=60,
+        )
+        resp.raise_for_status()
+        self.url = resp.headers['Location']
+
+    def _committed_from(self, resp):
+        if resp.status_code in (200, 201):
+            self.result = resp.json()['id']
+            return None
+        if resp.status_code != 308:
+            resp.raise_for_status()
+            raise IOError(f"Unexpected Drive upload status {resp.status_code}")
+        rng = resp.headers.get('Range')
+        return int(rng.rsplit('-', 1)[1]) + 1 if rng else 0
+
+    def committed(self):
+        resp = self.http.put(self.url, headers={'Content-Range': 'bytes */*'}, timeout=60)
+        committed = self._committed_from(resp)
+        return committed if committed is not None else 0
+
+    def put(self, offset, data, total=None):
+        if self.result:
+            return self.result
+        if data:
+            span = f"bytes {offset}-{offset + len(data) - 1}/{total if total is not None else '*'}"
+        else:
+            span = f"bytes */{total}"
+        resp = self.http.put(self.url, data=data, headers={'Content-Range': span}, timeout=300)
+        committed = self._committed_from(resp)
+        if total is not None:
+            if not self.result:
+                raise IOError("Drive did not finalize the upload")
+            return self.result
+        if committed != offset + len(data):
+            raise IOError(f"Drive committed {committed} of {offset + len(data)} bytes")
+        return None
+
+
+class DriveDestination:
+    name = 'gdrive'
+
+    def __init__(self, backup_settings, project_name):
+        from google.auth.transport.requests import AuthorizedSession
+
+        creds = drive_credentials(backup_settings)
+        self.folder_id = drive_project_folder(creds, backup_settings.gdrive_folder_id, project_name)
+        self.key = f"gdrive:{self.folder_id}"
+        self.http = AuthorizedSession(creds)
+
+    def open(self, name, mimetype='application/octet-stream'):
+        return ChunkedUpload(_DriveSession(self.http, self.folder_id, name, mimetype))
+
+
+def get_destination(project_name, project_slug):
+    """The configured destination (settings.BACKUP_DESTINATION)."""
+    if getattr(settings, 'BACKUP_DESTINATION', 'gdrive') == 'local':
+        return LocalDirectoryDestination(settings.BACKUP_LOCAL_DIR, project_slug)
+
+    from .models import BackupSettings
+    backup_settings = BackupSettings.get_settings()
+    if not all([backup_settings.gdrive_client_id, backup_settings.gdrive_client_secret,
+                backup_settings.gdrive_refresh_token, backup_settings.gdrive_folder_id]):
+        raise Exception("Missing OAuth2 credentials or Folder ID in Backup Settings.")
+    return DriveDestination(backup_settings, project_name)
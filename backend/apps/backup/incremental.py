@@ -0,0 +1,212 @@
+"""
+Incremental, content-addressed backups
+══════════════════════════════════════
+Each successful BackupLog keeps a manifest of MEDIA_ROOT:
+
+    {
+      "version":  1,
+      "base":     <BackupLog id this run was diffed against, or null>,
+      "destination": "<destination.key the objects were shipped to>",
+      "database": {"pack": "<pack name>", "entry": "database/<dump name>"},
+      "files":    {"<path under MEDIA_ROOT>": [size, mtime_ns, sha256], ...},
+      "objects":  {"<sha256>": "<pack name>", ...},
+      "packs":    [<packs written by this run>],
+    }
+
+A run walks MEDIA_ROOT and compares every file's (size, mtime) with the
+previous manifest.  Unchanged files keep their hash without being read;
+the rest are hashed, and only hashes the destination has never received
+are shipped.  New content goes into ZIP "packs" of at most
+BACKUP_PACK_SIZE_MB, one entry per object named `objects/<sha256>` —
+renamed or re-uploaded duplicates cost nothing.  Already-compressed
+formats (JPEG, MP4, PDF, ...) are written with ZIP_STORED instead of
+being deflated a second time.
+
+Packs are streamed straight into the destination's resumable upload
+(destinations.py); nothing is built on local disk except the database
+dump.  The manifest is uploaded next to the packs as
+`manifest-<log id>.json` so a restore does not need this database: for
+every path, fetch `objects[sha256]` and extract `objects/<sha256>`.
+"""
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+READ_BLOCK = 1024 * 1024
+
+STORED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif',
+    '.mp4', '.mov', '.m4v', '.webm', '.mkv', '.3gp',
+    '.mp3', '.m4a', '.aac', '.ogg', '.opus',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar',
+    '.pdf', '.docx', '.xlsx', '.pptx',
+}
+
+
+def compress_type(name):
+    """ZIP_STORED for formats that are already compressed."""
+    return zipfile.ZIP_STORED if Path(name).suffix.lower() in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(READ_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def walk_media(media_root):
+    """Yield (relative posix path, absolute path, stat) for every media file."""
+    media_root = Path(media_root)
+    if not media_root.is_dir():
+        return
+    for root, dirs, files in os.walk(media_root):
+        dirs.sort()
+        for name in sorted(files):
+            path = Path(root) / name
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            yield path.relative_to(media_root).as_posix(), path, st
+
+
+def scan_media(media_root, base_manifest=None):
+    """
+    Diff MEDIA_ROOT against `base_manifest`.  Returns (files, changed)
+    where `files` is the new manifest's file table and `changed` maps each
+    sha256 the destination does not have yet to a path holding it.
+    """
+    base_files = (base_manifest or {}).get('files', {})
+    base_objects = (base_manifest or {}).get('objects', {})
+
+    files, changed = {}, {}
+    for rel, path, st in walk_media(media_root):
+        prev = base_files.get(rel)
+        if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns and prev[2] in base_objects:
+            digest = prev[2]
+        else:
+            try:
+                digest = file_digest(path)
+            except OSError:
+                continue
+            if digest not in base_objects:
+                changed.setdefault(digest, path)
+        files[rel] = [st.st_size, st.st_mtime_ns, digest]
+    return files, changed
+
+
+class PackWriter:
+    """Streams entries into size-capped ZIP packs on a destination."""
+
+    def __init__(self, destination, prefix, limit_bytes):
+        self.destination = destination
+        self.prefix = prefix
+        self.limit_bytes = limit_bytes
+        self.packs = []          # [(name, destination id, bytes)]
+        self.bytes_written = 0
+        self._name = self._upload = self._zip = None
+
+    @property
+    def current(self):
+        return self._name
+
+    def _roll(self):
+        self._finish()
+        self._name = f"{self.prefix}-{len(self.packs) + 1:03d}.zip"
+        self._upload = self.destination.open(self._name, 'application/zip')
+        self._zip = zipfile.ZipFile(self._upload, 'w', allowZip64=True)
+
+    def _finish(self):
+        if self._zip is None:
+            return
+        self._zip.close()
+        size = self._upload.size
+        self.packs.append((self._name, self._upload.close(), size))
+        self.bytes_written += size
+        self._name = self._upload = self._zip = None
+
+    def add(self, path, arcname, ctype):
+        """Write one file; returns the sha256 of the bytes actually written."""
+        if self._zip is None or self._upload.size >= self.limit_bytes:
+            self._roll()
+        zinfo = zipfile.ZipInfo.from_file(path, arcname)
+        zinfo.compress_type = ctype
+        digest = hashlib.sha256()
+        with open(path, 'rb') as src, self._zip.open(zinfo, 'w') as dst:
+            for block in iter(lambda: src.read(READ_BLOCK), b''):
+                digest.update(block)
+                dst.write(block)
+        return digest.hexdigest()
+
+    def close(self):
+        self._finish()
+        return self.packs
+
+    def abort(self):
+        if self._upload is not None:
+            self._upload.abort()
+
+
+def run_incremental_backup(log, destination, sql_path, base_log=None, on_progress=None):
+    """
+    Ship the database dump and changed media for `log`.  Returns
+    (manifest, manifest id at the destination, bytes uploaded).
+    `on_progress(done, total)` is called after each object.
+    """
+    base_manifest = base_log.manifest if base_log else None
+    files, changed = scan_media(settings.MEDIA_ROOT, base_manifest)
+    objects = dict((base_manifest or {}).get('objects', {}))
+
+    limit = max(1, settings.BACKUP_PACK_SIZE_MB) * 1024 * 1024
+    writer = PackWriter(destination, f"pack-{log.id}", limit)
+    try:
+        database = None
+        if sql_path.exists():
+            db_ctype = zipfile.ZIP_DEFLATED if 'sqlite' in settings.DATABASES['default'].get('ENGINE', '') else zipfile.ZIP_STORED
+            entry = f"database/{sql_path.name}"
+            writer.add(sql_path, entry, db_ctype)
+            database = {'pack': writer.current, 'entry': entry}
+
+        for done, (digest, path) in enumerate(changed.items(), start=1):
+            try:
+                written = writer.add(path, f"objects/{digest}", compress_type(path))
+            except FileNotFoundError:
+                written = None
+            if written == digest:
+                objects[digest] = writer.current
+            else:
+                # Modified or removed mid-run: leave it out so the next run
+                # sees a change and ships it again.
+                logger.warning(f"Backup: {path} changed during backup, deferred to the next run")
+                files = {rel: row for rel, row in files.items() if row[2] != digest}
+            if on_progress:
+                on_progress(done, len(changed))
+
+        packs = writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    referenced = {row[2] for row in files.values()}
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'base': base_log.id if base_log else None,
+        'destination': destination.key,
+        'database': database,
+        'files': files,
+        'objects': {digest: objects[digest] for digest in referenced if digest in objects},
+        'packs': [name for name, _, _ in packs],
+    }
+    with destination.open(f"manifest-{log.id}.json", 'application/json') as upload:
+        upload.write(json.dumps(manifest, separators=(',', ':')).encode())
+    return manifest, upload.result, writer.bytes_written + upload.size
@@ -0,0 +1,155 @@
+"""
+Media inventory — MediaFile rows mirroring MEDIA_ROOT.
+
+BackupAnalyticsView used to walk and stat the whole media tree on every
+load.  The inventory answers "what is not backed up yet" with one
+aggregate query instead:
+
+  • record_files()         post_save on any model with a FileField
+                           (signals.py) upserts the saved file's row
+  • reconcile_media_inventory()
+                           periodic os.scandir pass ("Reconcile Media
+                           Inventory", apps.py) that picks up files written
+                           outside the ORM and drops deleted ones
+  • mark_backed_up(log)    after a successful backup
+
+Until the first reconcile pass stamps
+BackupSettings.media_inventory_reconciled_at the table only holds files
+the hooks happened to see, so callers must not trust it (is_seeded()).
+
+A row counts as backed up when it matches the last successful backup:
+same size and mtime as its manifest entry for incremental runs, or
+modified before the run started for full archives.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import BackupLog, BackupSettings, MediaFile
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def scan_tree(root):
+    """Yield (relative posix path, size, mtime_ns) for every file under root."""
+    stack = [(str(root), '')]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                rel = f"{prefix}{entry.name}"
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{rel}/"))
+                    elif entry.is_file():
+                        st = entry.stat()
+                        yield rel, st.st_size, st.st_mtime_ns
+                except OSError:
+                    continue
+
+
+def _backed_up_check():
+    """Predicate (path, size, mtime_ns) → covered by the last successful backup?"""
+    last = BackupLog.objects.filter(status='success').first()
+    if last is None:
+        return lambda rel, size, mtime_ns: False
+    if last.mode == 'incremental':
+        files = (last.manifest or {}).get('files', {})
+
+        def check(rel, size, mtime_ns):
+            prev = files.get(rel)
+            return bool(prev) and prev[0] == size and prev[1] == mtime_ns
+        return check
+    cutoff = int(last.created_at.timestamp() * 1e9)
+    return lambda rel, size, mtime_ns: mtime_ns < cutoff
+
+
+def reconcile_media_inventory():
+    """Bring MediaFile in line with MEDIA_ROOT.  Returns (added, updated, removed)."""
+    existing = {
+        path: (pk, size, mtime_ns)
+        for pk, path, size, mtime_ns in MediaFile.objects.values_list('id', 'path', 'size', 'mtime_ns')
+    }
+    is_backed_up = _backed_up_check()
+
+    new, changed = [], []
+    for rel, size, mtime_ns in scan_tree(settings.MEDIA_ROOT):
+        row = existing.pop(rel, None)
+        if row is None:
+            new.append(MediaFile(path=rel, size=size, mtime_ns=mtime_ns,
+                                 backed_up=is_backed_up(rel, size, mtime_ns)))
+        elif row[1:] != (size, mtime_ns):
+            changed.append(MediaFile(id=row[0], path=rel, size=size, mtime_ns=mtime_ns,
+                                     backed_up=is_backed_up(rel, size, mtime_ns)))
+
+    MediaFile.objects.bulk_create(new, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    MediaFile.objects.bulk_update(changed, ['size', 'mtime_ns', 'backed_up'], batch_size=BATCH_SIZE)
+    gone = [pk for pk, _, _ in existing.values()]
+    for i in range(0, len(gone), BATCH_SIZE):
+        MediaFile.objects.filter(id__in=gone[i:i + BATCH_SIZE]).delete()
+
+    BackupSettings.get_settings()
+    BackupSettings.objects.filter(id=1).update(media_inventory_reconciled_at=timezone.now())
+    return len(new), len(changed), len(gone)
+
+
+def is_seeded():
+    """True once a full reconcile pass has filled the inventory."""
+    return BackupSettings.objects.filter(id=1, media_inventory_reconciled_at__isnull=False).exists()
+
+
+def record_files(names):
+    """Upsert rows for files just saved through the ORM (relative names)."""
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    for name in names:
+        path = os.path.abspath(os.path.join(media_root, name))
+        if not path.startswith(media_root + os.sep):
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        rel = os.path.relpath(path, media_root).replace(os.sep, '/')
+        current = MediaFile.objects.filter(path=rel).values_list('size', 'mtime_ns').first()
+        if current == (st.st_size, st.st_mtime_ns):
+            continue
+        MediaFile.objects.bulk_create(
+            [MediaFile(path=rel, size=st.st_size, mtime_ns=st.st_mtime_ns, backed_up=False)],
+            update_conflicts=True,
+            unique_fields=['path'],
+            update_fields=['size', 'mtime_ns', 'backed_up', 'updated_at'],
+        )
+
+
+def mark_backed_up(log):
+    """Flag the rows a successful backup covered."""
+    if log.mode == 'incremental':
+        files = (log.manifest or {}).get('files', {})
+        covered = []
+        for pk, rel, size, mtime_ns in MediaFile.objects.filter(backed_up=False).values_list('id', 'path', 'size', 'mtime_ns'):
+            prev = files.get(rel)
+            if prev and prev[0] == size and prev[1] == mtime_ns:
+                covered.append(pk)
+        for i in range(0, len(covered), BATCH_SIZE):
+            MediaFile.objects.filter(id__in=covered[i:i + BATCH_SIZE]).update(backed_up=True)
+        return len(covered)
+
+    cutoff = int(log.created_at.timestamp() * 1e9)
+    return MediaFile.objects.filter(backed_up=False, mtime_ns__lt=cutoff).update(backed_up=True)
+
+
+def pending_summary():
+    totals = MediaFile.objects.filter(backed_up=False).aggregate(count=Count('id'), size=Sum('size'))
+    return {
+        'count': totals['count'],
+        'size_mb': round((totals['size'] or 0) / (1024 * 1024), 2),
+    }
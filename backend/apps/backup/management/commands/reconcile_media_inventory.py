@@ -0,0 +1,24 @@
+"""
+Re-scan MEDIA_ROOT into the MediaFile inventory.
+
+Runs every 6 hours via Celery beat ("Reconcile Media Inventory"); deploys
+run it with --if-unseeded to seed the inventory once, and it can be run by
+hand after copying files into MEDIA_ROOT.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.backup.inventory import is_seeded, reconcile_media_inventory
+
+
+class Command(BaseCommand):
+    help = "Sync the backup media inventory with the files under MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-unseeded', action='store_true', help="Do nothing once a full reconcile has run")
+
+    def handle(self, *args, **opts):
+        if opts['if_unseeded'] and is_seeded():
+            self.stdout.write("Media inventory already seeded — skipped")
+            return
+        added, updated, removed = reconcile_media_inventory()
+        self.stdout.write(self.style.SUCCESS(f"OK — added={added} updated={updated} removed={removed}"))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backup', '0004_add_progress_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backuplog',
+            name='manifest',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='backuplog',
+            name='mode',
+            field=models.CharField(choices=[('full', 'Full archive'), ('incremental', 'Incremental')], default='full', max_length=20),
+        ),
+    ]
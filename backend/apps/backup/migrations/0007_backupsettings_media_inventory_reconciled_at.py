@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backup', '0006_mediafile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backupsettings',
+            name='media_inventory_reconciled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -8,6 +8,10 @@ class BackupLog(models.Model):
         ('success', 'Success'),
         ('failed', 'Failed'),
     )
+    MODE_CHOICES = (
+        ('full', 'Full archive'),
+        ('incremental', 'Incremental'),
+    )
 
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -18,6 +22,10 @@ class BackupLog(models.Model):
     celery_task_id = models.CharField(max_length=255, null=True, blank=True)
     progress_percent = models.IntegerField(default=0)
     current_stage = models.CharField(max_length=100, default='', blank=True)
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='full')
+    # Media manifest of an incremental run — the next run diffs against it
+    # (see incremental.py).  Can be large: defer() it when listing logs.
+    manifest = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(blank=True, null=True)
@@ -37,14 +45,15 @@ class BackupLog(models.Model):
         self.completed_at = timezone.now()
         self.save(update_fields=['status', 'error_message', 'completed_at'])
 
-    def mark_success(self, file_name: str, size_mb: float, gdrive_id: str):
+    def mark_success(self, file_name: str, size_mb: float, gdrive_id: str, manifest=None):
         from django.utils import timezone
         self.status = 'success'
         self.file_name = file_name
         self.file_size_mb = size_mb
         self.google_drive_file_id = gdrive_id
+        self.manifest = manifest
         self.completed_at = timezone.now()
-        self.save(update_fields=['status', 'file_name', 'file_size_mb', 'google_drive_file_id', 'completed_at'])
+        self.save(update_fields=['status', 'file_name', 'file_size_mb', 'google_drive_file_id', 'manifest', 'completed_at'])
 
     def __str__(self):
         return f"Backup {self.id} - {self.status}"
@@ -58,6 +67,10 @@ class BackupSettings(models.Model):
     gdrive_client_secret = models.CharField(max_length=255, blank=True, null=True)
     gdrive_refresh_token = models.TextField(blank=True, null=True)
     gdrive_folder_id = models.CharField(max_length=255, blank=True, null=True)
+
+    # Set by the first full reconcile_media_inventory() pass; until then the
+    # MediaFile inventory only holds what post_save hooks have seen.
+    media_inventory_reconciled_at = models.DateTimeField(null=True, blank=True)
     
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -68,3 +81,23 @@ class BackupSettings(models.Model):
     def get_settings(cls):
         obj, created = cls.objects.get_or_create(id=1)
         return obj
+
+
+class MediaFile(models.Model):
+    """
+    Inventory of files under MEDIA_ROOT (see inventory.py) so backup
+    analytics can aggregate pending counts/sizes instead of walking the
+    tree.  Kept current by post_save hooks on file-bearing models and
+    reconciled by a periodic scan.
+    """
+    path = models.CharField(max_length=500, unique=True, help_text="Relative to MEDIA_ROOT")
+    size = models.BigIntegerField()
+    mtime_ns = models.BigIntegerField()
+    backed_up = models.BooleanField(default=False, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['path']
+
+    def __str__(self):
+        return self.path
@@ -1,16 +1,41 @@
 import os
 from pathlib import Path
 from django.conf import settings
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from .models import BackupLog, BackupSettings
 
 def get_unbacked_up_data_metrics():
+    from .inventory import is_seeded, pending_summary
+
+    # Inventory seeded by a full reconcile → one aggregate query.  Rows from
+    # record_files() alone don't count: the first upload after deploy would
+    # otherwise hide every file already on disk.
+    if is_seeded():
+        return pending_summary()
+
     last_success = BackupLog.objects.filter(status='success').first()
     media_root = Path(settings.MEDIA_ROOT)
     
     new_files_count = 0
     new_files_size_bytes = 0
+
+    # Incremental backups know exactly what they shipped — compare size and
+    # mtime with the manifest, the same test the next run will make.
+    manifest_files = None
+    if last_success and last_success.mode == 'incremental':
+        manifest_files = (last_success.manifest or {}).get('files')
+
+    if manifest_files is not None:
+        from .incremental import walk_media
+
+        for rel, _, stat in walk_media(media_root):
+            prev = manifest_files.get(rel)
+            if not prev or prev[0] != stat.st_size or prev[1] != stat.st_mtime_ns:
+                new_files_count += 1
+                new_files_size_bytes += stat.st_size
+        return {
+            'count': new_files_count,
+            'size_mb': round(new_files_size_bytes / (1024 * 1024), 2)
+        }
     
     if media_root.exists() and media_root.is_dir():
         for root, dirs, files in os.walk(media_root):
@@ -45,13 +70,10 @@ def get_drive_quota():
         return {'error': 'Missing OAuth credentials in Backup Settings'}
         
     try:
-        creds = Credentials(
-            token=None,
-            refresh_token=refresh_token,
-            token_uri='https://oauth2.googleapis.com/token',
-            client_id=client_id,
-            client_secret=client_secret
-        )
+        from googleapiclient.discovery import build
+        from .destinations import drive_credentials
+
+        creds = drive_credentials(backup_settings)
         service = build('drive', 'v3', credentials=creds)
         about = service.about().get(fields="storageQuota").execute()
         quota = about.get('storageQuota', {})
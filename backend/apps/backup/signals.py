@@ -0,0 +1,41 @@
+"""
+Keep the media inventory current as files are saved through the ORM.
+
+Every model with a FileField/ImageField gets a post_save receiver; the
+file names are handed to inventory.record_files() once the transaction
+commits (the file is on disk by then).
+"""
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models.signals import post_save
+
+
+def _file_fields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+
+
+def _record_media_files(sender, instance, **kwargs):
+    names = [
+        getattr(instance, field.attname).name
+        for field in _file_fields(sender)
+        if getattr(instance, field.attname)
+    ]
+    if not names:
+        return
+
+    def _record():
+        from .inventory import record_files
+
+        record_files(names)
+
+    transaction.on_commit(_record)
+
+
+def connect_media_inventory():
+    for model in apps.get_models():
+        if _file_fields(model):
+            post_save.connect(
+                _record_media_files,
+                sender=model,
+                dispatch_uid=f"backup-media-inventory-{model._meta.label_lower}",
+            )
@@ -14,3 +14,12 @@ def run_automated_backup_task(self, user_id=None):
             logger.error(f"Automated backup failed. Log ID: {log.id if log else 'None'}")
     except Exception as e:
         logger.exception("Failed to run automated backup task")
+
+
+@shared_task
+def reconcile_media_inventory_task():
+    from .inventory import reconcile_media_inventory
+
+    added, updated, removed = reconcile_media_inventory()
+    logger.info(f"Media inventory reconciled: +{added} ~{updated} -{removed}")
+    return f"added={added} updated={updated} removed={removed}"
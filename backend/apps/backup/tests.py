@@ -0,0 +1,204 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.backup.destinations import ChunkedUpload, LocalDirectoryDestination
+from apps.backup.engine import run_backup
+from apps.backup.inventory import reconcile_media_inventory
+from apps.backup.models import BackupLog, BackupSettings, MediaFile
+from apps.backup.services import get_unbacked_up_data_metrics
+from apps.tasks.models import TaskMedia
+
+
+class _FlakySession:
+    """In-memory upload session that drops every other chunk."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.calls = 0
+
+    def committed(self):
+        return len(self.data)
+
+    def put(self, offset, data, total=None):
+        self.calls += 1
+        if self.calls % 2:
+            # Half the chunk lands, then the connection drops.
+            self.data[offset:] = data[:len(data) // 2]
+            raise ConnectionError("reset")
+        self.data[offset:] = data
+        return "done" if total is not None else None
+
+
+class ChunkedUploadTestCase(TestCase):
+    def test_resumes_from_committed_offset(self):
+        session = _FlakySession()
+        upload = ChunkedUpload(session, chunk_size=10, retries=3)
+        payload = bytes(range(95))
+        with mock.patch("apps.backup.destinations.time.sleep"):
+            for i in range(0, len(payload), 7):
+                upload.write(payload[i:i + 7])
+            self.assertEqual(upload.close(), "done")
+        self.assertEqual(bytes(session.data), payload)
+
+
+class IncrementalBackupTestCase(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.media = self.tmp / "media"
+        self.dest = self.tmp / "backups"
+        (self.media / "photos").mkdir(parents=True)
+        (self.media / "photos" / "a.jpg").write_bytes(b"\xff\xd8jpeg-a" * 100)
+        (self.media / "photos" / "b.jpg").write_bytes(b"\xff\xd8jpeg-b" * 100)
+        (self.media / "notes.txt").write_text("site notes " * 100)
+        self.override = override_settings(
+            MEDIA_ROOT=self.media,
+            BACKUP_INCREMENTAL=True,
+            BACKUP_DESTINATION="local",
+            BACKUP_LOCAL_DIR=str(self.dest),
+        )
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _folder(self):
+        return next(self.dest.iterdir())
+
+    def _entries(self, log):
+        names = set()
+        for pack in log.manifest["packs"]:
+            with zipfile.ZipFile(self._folder() / pack) as zf:
+                names.update(i.filename for i in zf.infolist() if i.filename.startswith("objects/"))
+        return names
+
+    def test_first_run_ships_everything_with_stored_jpegs(self):
+        log = run_backup()
+        self.assertEqual(log.status, "success", log.error_message)
+        self.assertEqual(set(log.manifest["files"]), {"photos/a.jpg", "photos/b.jpg", "notes.txt"})
+        self.assertEqual(len(self._entries(log)), 3)
+
+        with zipfile.ZipFile(self._folder() / log.manifest["packs"][0]) as zf:
+            for rel, (_, _, digest) in log.manifest["files"].items():
+                info = zf.getinfo(f"objects/{digest}")
+                expected = zipfile.ZIP_STORED if rel.endswith(".jpg") else zipfile.ZIP_DEFLATED
+                self.assertEqual(info.compress_type, expected)
+                self.assertEqual(zf.read(info), (self.media / rel).read_bytes())
+
+        uploaded = json.loads((self._folder() / f"manifest-{log.id}.json").read_text())
+        self.assertEqual(uploaded["files"], log.manifest["files"])
+
+    def test_second_run_ships_only_new_content(self):
+        first = run_backup()
+        (self.media / "photos" / "c.jpg").write_bytes(b"\xff\xd8jpeg-c" * 100)
+        shutil.copy(self.media / "photos" / "a.jpg", self.media / "photos" / "a-copy.jpg")
+        os.remove(self.media / "notes.txt")
+
+        second = run_backup()
+        self.assertEqual(second.status, "success", second.error_message)
+        self.assertEqual(second.manifest["base"], first.id)
+        c_digest = second.manifest["files"]["photos/c.jpg"][2]
+        self.assertEqual(self._entries(second), {f"objects/{c_digest}"})
+        self.assertNotIn("notes.txt", second.manifest["files"])
+
+        # The renamed duplicate points at the object from the first run.
+        a_digest = second.manifest["files"]["photos/a-copy.jpg"][2]
+        self.assertEqual(second.manifest["objects"][a_digest], first.manifest["objects"][a_digest])
+        self.assertEqual(
+            set(second.manifest["objects"]),
+            {row[2] for row in second.manifest["files"].values()},
+        )
+
+    def test_missing_drive_credentials_fail_the_run(self):
+        with self.settings(BACKUP_DESTINATION="gdrive"):
+            log = run_backup()
+        self.assertEqual(log.status, "failed")
+        self.assertFalse(BackupLog.objects.filter(status="success").exists())
+
+    def test_full_archive_mode_streams_one_zip(self):
+        with self.settings(BACKUP_INCREMENTAL=False):
+            log = run_backup()
+        self.assertEqual(log.status, "success", log.error_message)
+        self.assertEqual(log.mode, "full")
+        with zipfile.ZipFile(self._folder() / log.file_name) as zf:
+            self.assertEqual(zf.getinfo("media/photos/a.jpg").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.getinfo("media/notes.txt").compress_type, zipfile.ZIP_DEFLATED)
+        self.assertFalse(list(self._folder().glob("*.part")))
+
+
+class LocalDestinationTestCase(TestCase):
+    def test_part_file_renamed_on_close(self):
+        root = Path(tempfile.mkdtemp())
+        try:
+            upload = LocalDirectoryDestination(root, "proj").open("x.bin")
+            upload.write(b"abc")
+            self.assertTrue((root / "proj" / "x.bin.part").exists())
+            upload.close()
+            self.assertEqual((root / "proj" / "x.bin").read_bytes(), b"abc")
+            self.assertFalse((root / "proj" / "x.bin.part").exists())
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+class MediaInventoryTestCase(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.media = self.tmp / "media"
+        (self.media / "docs").mkdir(parents=True)
+        (self.media / "docs" / "plan.pdf").write_bytes(b"%PDF" * 256)
+        (self.media / "site.jpg").write_bytes(b"\xff\xd8" * 512)
+        self.override = override_settings(
+            MEDIA_ROOT=self.media,
+            BACKUP_INCREMENTAL=True,
+            BACKUP_DESTINATION="local",
+            BACKUP_LOCAL_DIR=str(self.tmp / "backups"),
+        )
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_reconcile_then_backup_clears_pending(self):
+        self.assertEqual(reconcile_media_inventory(), (2, 0, 0))
+        self.assertEqual(get_unbacked_up_data_metrics()["count"], 2)
+
+        run_backup()
+        with self.assertNumQueries(2):
+            self.assertEqual(get_unbacked_up_data_metrics(), {"count": 0, "size_mb": 0.0})
+
+        (self.media / "site.jpg").write_bytes(b"\xff\xd8" * 1024)
+        os.remove(self.media / "docs" / "plan.pdf")
+        self.assertEqual(reconcile_media_inventory(), (0, 1, 1))
+        self.assertEqual(list(MediaFile.objects.filter(backed_up=False).values_list("path", flat=True)), ["site.jpg"])
+
+    def test_hook_rows_alone_do_not_count_as_seeded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskMedia.objects.create(file=ContentFile(b"\xff\xd8new", name="new.jpg"))
+        self.assertEqual(MediaFile.objects.count(), 1)
+        self.assertEqual(get_unbacked_up_data_metrics()["count"], 3)   # still walks the tree
+
+        call_command("reconcile_media_inventory", "--if-unseeded", stdout=io.StringIO())
+        self.assertIsNotNone(BackupSettings.get_settings().media_inventory_reconciled_at)
+        self.assertEqual(get_unbacked_up_data_metrics()["count"], 3)
+        with mock.patch("apps.backup.management.commands.reconcile_media_inventory.reconcile_media_inventory") as reconcile:
+            call_command("reconcile_media_inventory", "--if-unseeded", stdout=io.StringIO())
+        reconcile.assert_not_called()
+
+    def test_orm_saves_are_recorded(self):
+        reconcile_media_inventory()
+        with self.captureOnCommitCallbacks(execute=True):
+            media = TaskMedia.objects.create(file=ContentFile(b"\xff\xd8new", name="new.jpg"))
+        row = MediaFile.objects.get(path=media.file.name)
+        self.assertFalse(row.backed_up)
+        self.assertEqual(row.size, len(b"\xff\xd8new"))
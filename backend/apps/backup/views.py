@@ -18,7 +18,7 @@ class BackupLogListView(APIView):
         if not _is_admin(request.user):
             return Response({'error': 'Admin access required.'}, status=status.HTTP_403_FORBIDDEN)
             
-        logs = BackupLog.objects.all().order_by('-created_at')[:50]
+        logs = BackupLog.objects.defer('manifest').order_by('-created_at')[:50]
         data = [
             {
                 'id': log.id,
@@ -30,6 +30,7 @@ class BackupLogListView(APIView):
                 'celery_task_id': log.celery_task_id,
                 'progress_percent': log.progress_percent,
                 'current_stage': log.current_stage,
+                'mode': log.mode,
                 'created_by': log.created_by.get_full_name() if log.created_by else 'System',
                 'created_at': log.created_at.isoformat(),
                 'completed_at': log.completed_at.isoformat() if log.completed_at else None,
@@ -223,9 +224,9 @@ class BackupProgressView(APIView):
             return Response({'error': 'Admin access required.'}, status=status.HTTP_403_FORBIDDEN)
 
         # Active backup first
-        log = BackupLog.objects.filter(status='in_progress').order_by('-created_at').first()
+        log = BackupLog.objects.filter(status='in_progress').defer('manifest').order_by('-created_at').first()
         if not log:
-            log = BackupLog.objects.order_by('-created_at').first()
+            log = BackupLog.objects.defer('manifest').order_by('-created_at').first()
 
         if not log:
             return Response({'active': False})
@@ -4,3 +4,15 @@ class BiometricsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.biometrics'
     verbose_name = 'Biometric Authentication'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from apps.attendance.models import AttendanceWorker
+
+        from .face_index import signature_changed, worker_changed
+        from .models import UserFaceSignature
+
+        for signal in (post_save, post_delete):
+            signal.connect(signature_changed, sender=UserFaceSignature, dispatch_uid=f'face_index_signature_{signal is post_save}')
+            signal.connect(worker_changed, sender=AttendanceWorker, dispatch_uid=f'face_index_worker_{signal is post_save}')
@@ -0,0 +1,218 @@
+"""
+In-process face-embedding index for biometric login and kiosk check-in.
+
+Each scope keeps one float32 matrix of enrolled embeddings plus their
+squared norms, so a lookup is a single matrix-vector product and a top-k
+partition instead of a JSON parse and a Python loop per enrolled face:
+
+    'users'          every UserFaceSignature, keyed by user id
+                     (face login, worker face login, duplicate check on training)
+    'project:<id>'   active AttendanceWorkers of a project whose linked user
+                     has a signature, keyed by worker id (kiosk check-in)
+
+Invalidation
+    UserFaceSignature writes bump 'users' and the projects the user works
+    on; AttendanceWorker writes bump their project.  A version is a
+    process-local counter (so the writing process sees its own change at
+    once) plus a token in the shared cache (so every other process does
+    once the write commits).  A scope is rebuilt the next time it is
+    searched under a different version.  When the cache is unreachable
+    other processes' writes can't be seen, so the index is rebuilt on every
+    lookup — the old cost, never a stale match.
+"""
+import logging
+import math
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 128
+MATCH_THRESHOLD = 0.55      # distance at or above this is never a match
+MAX_SCOPES = 64             # project indexes kept per process
+VERSION_KEY = 'biometrics:faces:{}'
+USERS = 'users'
+
+_generation = defaultdict(int)
+_indexes = OrderedDict()    # scope -> (version, FaceIndex)
+_lock = threading.Lock()
+
+
+def project_scope(project_id):
+    return f'project:{int(project_id)}'
+
+
+# ── Vectors ───────────────────────────────────────────────────────────────────
+
+def to_vector(values):
+    """A (128,) float32 array from a list, array or stored bytes; None if malformed."""
+    try:
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            vector = np.frombuffer(values, dtype='<f4')
+        else:
+            vector = np.asarray(values, dtype=np.float32).reshape(-1)
+    except (TypeError, ValueError):
+        return None
+    if vector.shape != (DIMENSIONS,) or not np.isfinite(vector).all():
+        return None
+    return vector
+
+
+def to_bytes(values):
+    """Storage form of an embedding: 128 little-endian float32 (512 bytes)."""
+    vector = to_vector(values)
+    if vector is None:
+        raise ValueError(f"Face descriptor must have exactly {DIMENSIONS} finite values.")
+    return vector.astype('<f4').tobytes()
+
+
+def distance(v1, v2):
+    """Euclidean distance between two embeddings; inf if either is malformed."""
+    a, b = to_vector(v1), to_vector(v2)
+    if a is None or b is None:
+        return math.inf
+    return float(np.linalg.norm(a - b))
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+class FaceIndex:
+    def __init__(self, keys, vectors):
+        self.keys = list(keys)
+        self._key_array = np.asarray(self.keys)
+        self.matrix = np.vstack(vectors).astype(np.float32) if vectors else np.empty((0, DIMENSIONS), np.float32)
+        self.norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, vector, k=1, threshold=MATCH_THRESHOLD, exclude=()):
+        """Up to `k` (key, distance) pairs under `threshold`, nearest first."""
+        query = to_vector(vector)
+        if query is None or not len(self):
+            return []
+        # |m - q|² = |m|² - 2·m·q + |q|², clipped against float rounding
+        squared = self.norms - 2.0 * (self.matrix @ query) + float(query @ query)
+        distances = np.sqrt(np.maximum(squared, 0.0))
+        if exclude:
+            distances[np.isin(self._key_array, list(exclude))] = np.inf
+
+        candidates = np.flatnonzero(distances < threshold) if threshold is not None else np.arange(len(self))
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(distances[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(distances[candidates], kind='stable')]
+        return [(self.keys[i], float(distances[i])) for i in candidates]
+
+    def best(self, vector, threshold=MATCH_THRESHOLD, exclude=()):
+        """(key, distance) of the nearest match, or (None, inf)."""
+        hits = self.search(vector, k=1, threshold=threshold, exclude=exclude)
+        return hits[0] if hits else (None, math.inf)
+
+
+def _from_rows(rows):
+    keys, vectors = [], []
+    for key, stored in rows:
+        vector = to_vector(stored) if stored is not None else None
+        if vector is None:
+            logger.warning("Skipping malformed face embedding for %s", key)
+            continue
+        keys.append(key)
+        vectors.append(vector)
+    return FaceIndex(keys, vectors)
+
+
+def _build(scope):
+    from apps.attendance.models import AttendanceWorker
+
+    from .models import UserFaceSignature
+
+    if scope == USERS:
+        rows = UserFaceSignature.objects.exclude(embedding=None).values_list('user_id', 'embedding')
+    else:
+        rows = AttendanceWorker.objects.filter(
+            project_id=int(scope.split(':', 1)[1]),
+            is_active=True,
+            linked_user__face_signature__embedding__isnull=False,
+        ).values_list('pk', 'linked_user__face_signature__embedding')
+    return _from_rows(rows.order_by('pk'))
+
+
+# ── Versions ──────────────────────────────────────────────────────────────────
+
+def _shared_version(scope):
+    key = VERSION_KEY.format(scope)
+    try:
+        token = cache.get(key)
+        if token is None:
+            cache.add(key, uuid.uuid4().hex, None)
+            token = cache.get(key)
+        return token
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def _bump(scope):
+    _generation[scope] += 1
+    try:
+        cache.set(VERSION_KEY.format(scope), uuid.uuid4().hex, None)
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def invalidate(*scopes):
+    """Mark `scopes` stale now in this process, and everywhere once committed."""
+    for scope in scopes:
+        _generation[scope] += 1
+    transaction.on_commit(lambda: [_bump(scope) for scope in scopes])
+
+
+def get_index(scope):
+    shared = _shared_version(scope)
+    version = (_generation[scope], shared)
+    if shared is not None:
+        with _lock:
+            entry = _indexes.get(scope)
+            if entry is not None and entry[0] == version:
+                _indexes.move_to_end(scope)
+                return entry[1]
+
+    index = _build(scope)
+    if shared is not None:
+        with _lock:
+            _indexes[scope] = (version, index)
+            _indexes.move_to_end(scope)
+            while len(_indexes) > MAX_SCOPES:
+                _indexes.popitem(last=False)
+    return index
+
+
+def users_index():
+    return get_index(USERS)
+
+
+def project_index(project_id):
+    return get_index(project_scope(project_id))
+
+
+def reset():
+    """Drop every cached index in this process (tests)."""
+    with _lock:
+        _indexes.clear()
+
+
+# ── Signal handlers (connected in apps.py) ────────────────────────────────────
+
+def signature_changed(sender, instance, **kwargs):
+    from apps.attendance.models import AttendanceWorker
+
+    projects = AttendanceWorker.objects.filter(linked_user_id=instance.user_id).values_list('project_id', flat=True)
+    invalidate(USERS, *{project_scope(pid) for pid in projects})
+
+
+def worker_changed(sender, instance, **kwargs):
+    invalidate(project_scope(instance.project_id))
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:02
+
+import json
+import struct
+
+from django.db import migrations, models
+
+PACKED = struct.Struct('<128f')
+
+
+def pack_encodings(apps, schema_editor):
+    """JSON text → packed float32; malformed rows are left empty (re-enrol)."""
+    UserFaceSignature = apps.get_model('biometrics', 'UserFaceSignature')
+    for sig in UserFaceSignature.objects.all().only('pk', 'encoding'):
+        try:
+            sig.embedding = PACKED.pack(*[float(x) for x in json.loads(sig.encoding)])
+        except (TypeError, ValueError, struct.error):
+            continue
+        sig.save(update_fields=['embedding'])
+
+
+def unpack_encodings(apps, schema_editor):
+    UserFaceSignature = apps.get_model('biometrics', 'UserFaceSignature')
+    for sig in UserFaceSignature.objects.exclude(embedding=None).only('pk', 'embedding'):
+        sig.encoding = json.dumps(list(PACKED.unpack(bytes(sig.embedding))))
+        sig.save(update_fields=['encoding'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biometrics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userfacesignature',
+            name='embedding',
+            field=models.BinaryField(help_text='128-dimensional face embedding vector, packed float32.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='userfacesignature',
+            name='encoding',
+            field=models.TextField(default='', help_text='JSON serialized 128-dimensional face embedding vector.'),
+        ),
+        migrations.RunPython(pack_encodings, unpack_encodings),
+        migrations.RemoveField(
+            model_name='userfacesignature',
+            name='encoding',
+        ),
+    ]
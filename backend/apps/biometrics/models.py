@@ -1,20 +1,23 @@
 from django.db import models
 from django.conf import settings
-import json
+
+from apps.biometrics.face_index import to_bytes, to_vector
 
 class UserFaceSignature(models.Model):
     """
     Stores 128-dimensional biometric face descriptors for users.
-    Used by browser-accelerated face-api.js to perform fast, matrix-based similarity comparison.
+    Descriptors come from face-api.js in the browser; matching runs against
+    the in-process matrix in face_index.py.
     """
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='face_signature'
     )
-    # Stored as serialized JSON array of 128 floats
-    encoding = models.TextField(
-        help_text="JSON serialized 128-dimensional face embedding vector."
+    # 128 little-endian float32 values (512 bytes)
+    embedding = models.BinaryField(
+        null=True,
+        help_text="128-dimensional face embedding vector, packed float32."
     )
     training_samples_count = models.IntegerField(
         default=1,
@@ -28,17 +31,19 @@ class UserFaceSignature(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def set_encoding(self, vector_list):
-        """Serializes and stores python list/ndarray of floats."""
-        self.encoding = json.dumps([float(x) for x in vector_list])
+        """Packs and stores a python list/ndarray of 128 floats."""
+        self.embedding = to_bytes(vector_list)
 
-    def get_encoding(self):
-        """Deserializes and returns the 128-dimensional float list."""
-        if not self.encoding:
-            return None
-        try:
-            return json.loads(self.encoding)
-        except Exception:
+    def get_vector(self):
+        """The embedding as a float32 ndarray, or None."""
+        if self.embedding is None:
             return None
+        return to_vector(self.embedding)
+
+    def get_encoding(self):
+        """Returns the 128-dimensional float list."""
+        vector = self.get_vector()
+        return None if vector is None else vector.tolist()
 
     class Meta:
         db_table = 'biometrics_user_face_signature'
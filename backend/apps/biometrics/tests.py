@@ -0,0 +1,96 @@
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.attendance.models import AttendanceWorker
+from apps.biometrics import face_index
+from apps.biometrics.models import UserFaceSignature
+from apps.core.models import HouseProject
+
+User = get_user_model()
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'faces'}}
+
+
+def _face(seed):
+    rng = np.random.default_rng(seed)
+    vector = rng.normal(size=face_index.DIMENSIONS).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@override_settings(CACHES=LOCMEM)
+class FaceIndexTestCase(TestCase):
+    def setUp(self):
+        face_index.reset()
+        self.project = HouseProject.objects.create(
+            name='Kiosk Site', owner_name='Owner', address='Site',
+            total_budget='100000.00', start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31), area_sqft=1200,
+        )
+        self.users = []
+        for i in range(5):
+            user = User.objects.create_user(username=f'face{i}', email=f'face{i}@example.com', password='pass12345')
+            sig = UserFaceSignature(user=user)
+            sig.set_encoding(_face(i))
+            sig.save()
+            self.users.append(user)
+
+    def test_search_matches_brute_force(self):
+        index = face_index.users_index()
+        query = _face(3) + 0.01
+
+        hits = index.search(query, k=3, threshold=None)
+
+        expected = sorted(
+            (float(np.linalg.norm(_face(i) - query)), u.id) for i, u in enumerate(self.users)
+        )[:3]
+        self.assertEqual([key for key, _ in hits], [key for _, key in expected])
+        self.assertAlmostEqual(hits[0][1], expected[0][0], places=4)
+        self.assertEqual(index.best(query, exclude={self.users[3].id}), (None, float('inf')))
+
+    def test_embedding_stored_as_packed_float32(self):
+        sig = UserFaceSignature.objects.get(user=self.users[0])
+        self.assertEqual(len(bytes(sig.embedding)), 512)
+        np.testing.assert_allclose(sig.get_encoding(), _face(0), rtol=1e-6)
+
+    def test_index_cached_until_signature_changes(self):
+        face_index.users_index()
+        with self.assertNumQueries(0):
+            face_index.users_index()
+
+        sig = UserFaceSignature.objects.get(user=self.users[1])
+        sig.set_encoding(_face(99))
+        sig.save()
+
+        index = face_index.users_index()
+        self.assertEqual(index.best(_face(99))[0], self.users[1].id)
+        self.assertIsNone(index.best(_face(1))[0])
+
+    def test_project_index_follows_workers(self):
+        worker = AttendanceWorker.objects.create(project=self.project, name='Ram', linked_user=self.users[2])
+        AttendanceWorker.objects.create(project=self.project, name='Unlinked')
+
+        index = face_index.project_index(self.project.id)
+        self.assertEqual(index.keys, [worker.id])
+        self.assertEqual(index.best(_face(2))[0], worker.id)
+
+        worker.is_active = False
+        worker.save()
+        self.assertEqual(len(face_index.project_index(self.project.id)), 0)
+
+    def test_face_login_uses_index(self):
+        client = APIClient()
+        with patch('apps.biometrics.views.log_activity'):
+            response = client.post(
+                '/api/v1/biometrics/login/', {'encoding': (_face(4) + 0.01).tolist()}, format='json',
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['username'], 'face4')
+
+        response = client.post('/api/v1/biometrics/login/', {'encoding': _face(42).tolist()}, format='json')
+        self.assertEqual(response.status_code, 401)
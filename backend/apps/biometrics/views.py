@@ -1,5 +1,6 @@
 import logging
-import math
+
+import numpy as np
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -8,6 +9,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from django.contrib.auth import get_user_model
 from django.db.models import Q
+from apps.biometrics import face_index
+from apps.biometrics.face_index import MATCH_THRESHOLD
 from apps.biometrics.models import UserFaceSignature
 from apps.biometrics.serializers import FaceTrainingSerializer, FaceLoginSerializer
 from apps.accounts.serializers import UserSerializer
@@ -21,6 +24,7 @@ def euclidean_distance(v1, v2):
     Computes standard Euclidean distance between two 128-dimensional vectors.
     A distance of 0.0 means identical signatures. A lower distance indicates high similarity.
     Typically, a distance <= 0.55 guarantees an extremely secure match.
+    1:N searches should use face_index instead of calling this in a loop.
     """
     import json
     if isinstance(v1, str):
@@ -29,12 +33,7 @@ def euclidean_distance(v1, v2):
     if isinstance(v2, str):
         try: v2 = json.loads(v2)
         except: pass
-    try:
-        v1_floats = [float(x) for x in v1]
-        v2_floats = [float(x) for x in v2]
-        return math.sqrt(sum((x - y) ** 2 for x, y in zip(v1_floats, v2_floats)))
-    except Exception:
-        return float('inf')
+    return face_index.distance(v1, v2)
 
 
 class FaceTrainingView(APIView):
@@ -67,34 +66,24 @@ class FaceTrainingView(APIView):
                     "error": f"Target user with ID {target_user_id} does not exist."
                 }, status=status.HTTP_404_NOT_FOUND)
 
-        consolidated_vector = None
         samples_count = 1
 
         if encodings:
             samples_count = len(encodings)
-            # Mathematically compute the average/centroid of all coordinate vectors
-            consolidated_vector = [0.0] * 128
-            for vec in encodings:
-                for idx in range(128):
-                    consolidated_vector[idx] += vec[idx]
-            for idx in range(128):
-                consolidated_vector[idx] /= samples_count
+            # Centroid of all captured vectors
+            consolidated_vector = np.asarray(encodings, dtype=np.float32).mean(axis=0)
         else:
-            consolidated_vector = encoding
+            consolidated_vector = np.asarray(encoding, dtype=np.float32)
 
         # Check if this face encoding matches another registered user's face encoding in the database (within similarity threshold)
-        SIMILARITY_THRESHOLD = 0.55
         try:
-            signatures = UserFaceSignature.objects.exclude(user=target_user).select_related('user')
-            for sig in signatures:
-                db_vector = sig.get_encoding()
-                if db_vector:
-                    distance = euclidean_distance(consolidated_vector, db_vector)
-                    if distance < SIMILARITY_THRESHOLD:
-                        clashing_name = sig.user.first_name or sig.user.username
-                        return Response({
-                            "error": f"This face is already registered to another user ({clashing_name}). Each user must have a unique face ID."
-                        }, status=status.HTTP_400_BAD_REQUEST)
+            clashing_id, _ = face_index.users_index().best(consolidated_vector, exclude={target_user.id})
+            if clashing_id is not None:
+                clashing = User.objects.get(pk=clashing_id)
+                clashing_name = clashing.first_name or clashing.username
+                return Response({
+                    "error": f"This face is already registered to another user ({clashing_name}). Each user must have a unique face ID."
+                }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error("Failed to perform duplicate face signature validation: %s", e)
 
@@ -196,8 +185,7 @@ class FaceLoginView(APIView):
         username_helper = serializer.validated_data.get('username')
 
         # Threshold rules: Extremely strict verification to prevent photo spoofing or false positives
-        SIMILARITY_THRESHOLD = 0.55
-
+        # (face_index.MATCH_THRESHOLD)
         matched_user = None
         min_distance = float('inf')
 
@@ -212,26 +200,20 @@ class FaceLoginView(APIView):
                 ).first()
 
                 if user and hasattr(user, 'face_signature') and user.face_signature:
-                    db_vector = user.face_signature.get_encoding()
-                    if db_vector:
-                        distance = euclidean_distance(query_vector, db_vector)
-                        if distance < SIMILARITY_THRESHOLD:
-                            matched_user = user
-                            min_distance = distance
+                    distance = face_index.distance(query_vector, user.face_signature.get_vector())
+                    if distance < MATCH_THRESHOLD:
+                        matched_user = user
+                        min_distance = distance
             except Exception as e:
                 logger.error("Error during 1:1 biometric lookup for %s: %s", username_helper, e)
 
         # Flow B: No username provided, or 1:1 lookup failed -> Perform 1:N database-wide identification
         if not matched_user:
             try:
-                signatures = UserFaceSignature.objects.select_related('user').all()
-                for sig in signatures:
-                    db_vector = sig.get_encoding()
-                    if db_vector:
-                        distance = euclidean_distance(query_vector, db_vector)
-                        if distance < min_distance and distance < SIMILARITY_THRESHOLD:
-                            min_distance = distance
-                            matched_user = sig.user
+                user_id, distance = face_index.users_index().best(query_vector)
+                if user_id is not None:
+                    matched_user = User.objects.filter(pk=user_id).first()
+                    min_distance = distance
             except Exception as e:
                 logger.error("Error during 1:N biometric identification: %s", e)
 
@@ -302,29 +284,25 @@ class BiometricKioskCheckInView(APIView):
         if not project_id:
             return Response({"error": "Project ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        query_vector = serializer.validated_data['encoding']
-        SIMILARITY_THRESHOLD = 0.55
+        try:
+            project_id = int(project_id)
+        except (TypeError, ValueError):
+            return Response({"error": "Project ID must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
 
+        query_vector = serializer.validated_data['encoding']
         matched_worker = None
-        min_distance = float('inf')
 
         try:
-            # Retrieve all active workers in this project who have a linked user account
-            workers = AttendanceWorker.objects.filter(
-                project_id=project_id,
-                is_active=True,
-                linked_user__isnull=False
-            ).select_related('linked_user__face_signature')
-
-            for worker in workers:
-                user = worker.linked_user
-                if hasattr(user, 'face_signature') and user.face_signature:
-                    db_vector = user.face_signature.get_encoding()
-                    if db_vector:
-                        distance = euclidean_distance(query_vector, db_vector)
-                        if distance < min_distance and distance < SIMILARITY_THRESHOLD:
-                            min_distance = distance
-                            matched_worker = worker
+            # Nearest active worker of this project whose linked user has a signature
+            worker_id, min_distance = face_index.project_index(project_id).best(query_vector)
+            if worker_id is not None:
+                # Re-checked against the row, not just the cached index
+                matched_worker = AttendanceWorker.objects.filter(
+                    pk=worker_id,
+                    project_id=project_id,
+                    is_active=True,
+                    linked_user__isnull=False
+                ).select_related('linked_user').first()
         except Exception as e:
             logger.error("Error during 1:N biometric kiosk lookup: %s", e)
             return Response({"error": "Database lookup failed during face match."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
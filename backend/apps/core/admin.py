@@ -62,6 +62,7 @@ class UserGuideProgressAdmin(admin.ModelAdmin):
 
 @admin.register(EmailLog)
 class EmailLogAdmin(admin.ModelAdmin):
-    list_display = ('recipient_email', 'email_type', 'status', 'created_at', 'sent_by')
+    list_display = ('recipient_email', 'email_type', 'status', 'attempts', 'created_at', 'sent_at', 'sent_by')
     list_filter = ('status', 'email_type', 'created_at')
     search_fields = ('recipient_email', 'subject')
+    exclude = ('payload',)
@@ -7,3 +7,57 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import apps.core.signals
+        from django.db.models.signals import post_migrate
+        from apps.core import media_index
+        from apps.core.sync import connect_signals
+
+        connect_signals()
+        media_index.connect_signals()
+
+        post_migrate.connect(setup_periodic_tasks, sender=self)
+
+
+def setup_periodic_tasks(sender, **kwargs):
+    try:
+        from django_celery_beat.models import PeriodicTask, CrontabSchedule
+
+        # Safety net for emails whose send task was lost (worker restart,
+        # local pool killed) — see apps.core.email_queue.flush_pending
+        schedule, created = CrontabSchedule.objects.get_or_create(
+            minute='*/5',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=schedule,
+            name='Flush Email Queue',
+            task='apps.core.tasks.flush_email_queue',
+        )
+
+        # Dashboard delta-sync log; cursors older than the retention window
+        # get a full reload (apps.core.sync.prune)
+        nightly, created = CrontabSchedule.objects.get_or_create(
+            minute='30',
+            hour='3',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=nightly,
+            name='Prune Dashboard Sync Log',
+            task='apps.core.tasks.prune_sync_changes',
+        )
+
+        # Gallery thumbnails whose render task was lost (apps.core.thumbnails)
+        PeriodicTask.objects.get_or_create(
+            crontab=schedule,
+            name='Render Pending Thumbnails',
+            task='apps.core.tasks.render_pending_thumbnails',
+        )
+    except Exception as e:
+        print("Failed to setup periodic tasks for core:", str(e))
@@ -0,0 +1,319 @@
+"""
+Outbound email queue.
+
+The send_* helpers in email_utils.py render the HTML body, write an EmailLog
+row in QUEUED state with everything the worker needs in `payload`, and call
+`enqueue_email(log)`.  Nothing touches SMTP or ReportLab inside the request.
+
+Delivery
+--------
+    `deliver(log_ids)` first claims the rows (QUEUED/RETRYING → SENDING,
+    one conditional UPDATE each), so the beat flush, a Celery retry and the
+    local pool can never send the same row twice; a row stuck in SENDING
+    longer than EMAIL_SENDING_LEASE seconds (crashed sender) can be claimed
+    again.  It then renders PDF attachments
+    (payload['attachment'] names one of ATTACHMENT_RENDERERS), and sends
+    them all over one SMTP connection.  The connection is kept open between
+    batches in the same process and re-opened after EMAIL_CONNECTION_IDLE
+    seconds of inactivity or when the server drops it.
+
+Dispatch
+--------
+    Once the transaction that created the row commits, the ids go to the
+    `send_queued_emails` Celery task.  If the broker is unreachable they are
+    sent from a small local pool instead of being lost.  EMAIL_QUEUE_SYNC=True
+    sends inline (tests).  The "Flush Email Queue" beat task picks up
+    anything still QUEUED/RETRYING, or SENDING past its lease, after a
+    restart.
+
+Failures
+--------
+    A failed send leaves the row RETRYING and is retried with exponential
+    backoff (Celery `retry`, or a sleep in the local pool) until
+    EMAIL_MAX_ATTEMPTS, after which it is FAILED.  The payload is dropped
+    once a row reaches SENT or FAILED, so credentials in the body are not
+    kept around.
+"""
+from __future__ import annotations
+
+import logging
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BROKER_BACKOFF_SECS = 60
+PENDING_STATUSES = ('QUEUED', 'RETRYING')
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_broker_down_until = 0.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def max_attempts() -> int:
+    return max(1, int(_setting('EMAIL_MAX_ATTEMPTS', 4)))
+
+
+def backoff(attempt: int) -> int:
+    """Seconds to wait before retry number `attempt` (1-based)."""
+    return min(600, 30 * 2 ** max(0, attempt - 1))
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Attachments (rendered in the worker)
+# ─────────────────────────────────────────────────────────────────────
+def _material_order_pdf(spec):
+    from apps.resource.models import Material, Supplier
+
+    from .pdf_utils import generate_purchase_order_pdf
+
+    material = Material.objects.get(pk=spec['material_id'])
+    supplier = Supplier.objects.get(pk=spec['supplier_id'])
+    return generate_purchase_order_pdf(material, Decimal(spec['quantity']), supplier)
+
+
+def _purchase_order_pdf(spec):
+    from apps.resource.models import PurchaseOrder
+
+    from .pdf_utils import generate_full_purchase_order_pdf
+
+    order = PurchaseOrder.objects.select_related('supplier').get(pk=spec['order_id'])
+    return generate_full_purchase_order_pdf(order)
+
+
+def _payment_receipt_pdf(spec):
+    from apps.finance.models import Payment
+
+    from .pdf_utils import generate_payment_receipt_pdf
+
+    payment = Payment.objects.select_related('expense').get(pk=spec['payment_id'])
+    return generate_payment_receipt_pdf(payment)
+
+
+ATTACHMENT_RENDERERS = {
+    'material_order': _material_order_pdf,
+    'purchase_order': _purchase_order_pdf,
+    'payment_receipt': _payment_receipt_pdf,
+}
+
+
+def _render_attachment(log):
+    spec = (log.payload or {}).get('attachment')
+    if not spec:
+        return None
+    try:
+        content = ATTACHMENT_RENDERERS[spec['kind']](spec)
+    except Exception as e:  # noqa: BLE001
+        # Same as before the queue: a broken PDF doesn't hold the email back.
+        logger.error("Failed to generate %s PDF for email %s: %s", spec.get('kind'), log.pk, e)
+        return None
+    return (spec['filename'], content, 'application/pdf') if content else None
+
+
+def build_message(log) -> EmailMultiAlternatives:
+    payload = log.payload or {}
+    message = EmailMultiAlternatives(
+        subject=log.subject,
+        body=payload.get('text', ''),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=payload.get('to') or [log.recipient_email],
+        reply_to=payload.get('reply_to') or None,
+    )
+    if payload.get('html'):
+        message.attach_alternative(payload['html'], 'text/html')
+    attachment = _render_attachment(log)
+    if attachment:
+        message.attach(*attachment)
+    return message
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Pooled SMTP connection
+# ─────────────────────────────────────────────────────────────────────
+class _ConnectionPool:
+    """One open backend connection per process, shared by every batch."""
+
+    def __init__(self):
+        self._conn = None
+        self._last_used = 0.0
+        self.lock = threading.Lock()
+
+    def get(self):
+        idle = _setting('EMAIL_CONNECTION_IDLE', 60)
+        if self._conn is not None and time.monotonic() - self._last_used > idle:
+            self.reset()
+        if self._conn is None:
+            self._conn = get_connection(fail_silently=False)
+            self._conn.open()
+        self._last_used = time.monotonic()
+        return self._conn
+
+    def reset(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:  # noqa: BLE001
+                pass
+
+
+_connections = _ConnectionPool()
+
+
+def _send(message):
+    """Send over the pooled connection, reconnecting once if it went stale."""
+    try:
+        message.connection = _connections.get()
+        return message.send()
+    except (smtplib.SMTPServerDisconnected, ConnectionError):
+        _connections.reset()
+        message.connection = _connections.get()
+        return message.send()
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Delivering a batch (shared by Celery, the local pool and the sweep)
+# ─────────────────────────────────────────────────────────────────────
+def _claimable():
+    return Q(status__in=PENDING_STATUSES) | Q(
+        status='SENDING', claimed_at__lt=timezone.now() - timedelta(seconds=_setting('EMAIL_SENDING_LEASE', 900)),
+    )
+
+
+def _claim(log_ids: Iterable[int]) -> list:
+    """Flip claimable rows to SENDING; returns the rows this caller won."""
+    from .models import EmailLog
+
+    now = timezone.now()
+    claimed = [
+        pk for pk in sorted(set(log_ids))
+        if EmailLog.objects.filter(_claimable(), pk=pk).update(status='SENDING', claimed_at=now)
+    ]
+    return list(EmailLog.objects.filter(pk__in=claimed).order_by('pk'))
+
+
+def deliver(log_ids: Iterable[int]) -> List[int]:
+    """
+    Claim the QUEUED/RETRYING EmailLog rows in `log_ids` and send them over
+    one connection.  Returns the ids that failed but still have attempts left.
+    """
+    logs = _claim(log_ids)
+    retry = []
+    if not logs:
+        return retry
+
+    with _connections.lock:
+        try:
+            for log in logs:
+                log.attempts += 1
+                try:
+                    if not _send(build_message(log)):
+                        raise smtplib.SMTPException('Backend accepted no messages')
+                except Exception as e:  # noqa: BLE001
+                    logger.error("Error sending email %s to %s: %s", log.pk, log.recipient_email, e)
+                    log.error_message = str(e)
+                    if log.attempts < max_attempts():
+                        log.status = 'RETRYING'
+                        retry.append(log.pk)
+                    else:
+                        log.status = 'FAILED'
+                        log.payload = {}
+                else:
+                    log.status = 'SENT'
+                    log.sent_at = timezone.now()
+                    log.error_message = ''
+                    log.payload = {}
+                log.claimed_at = None
+                log.save(update_fields=['status', 'attempts', 'claimed_at', 'sent_at', 'error_message', 'payload'])
+        finally:
+            # Inline sends (tests) follow EMAIL_BACKEND overrides per call.
+            if _setting('EMAIL_QUEUE_SYNC', False):
+                _connections.reset()
+    return retry
+
+
+def flush_pending(older_than_secs: int = 120, limit: int = 500) -> int:
+    """
+    Deliver rows left QUEUED/RETRYING (or SENDING past the lease) — a worker
+    restart or a crashed local pool — in one batch.  Rows newer than
+    `older_than_secs` are left to the task that queued them.
+    """
+    from .models import EmailLog
+
+    cutoff = timezone.now() - timedelta(seconds=older_than_secs)
+    ids = list(
+        EmailLog.objects
+        .filter(_claimable(), created_at__lt=cutoff)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if ids:
+        deliver(ids)
+    return len(ids)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Enqueueing
+# ─────────────────────────────────────────────────────────────────────
+def enqueue_email(log) -> None:
+    """Send EmailLog `log` once the transaction that created it commits."""
+    transaction.on_commit(lambda: dispatch([log.pk]))
+
+
+def dispatch(log_ids: List[int]) -> None:
+    global _broker_down_until
+    if _setting('EMAIL_QUEUE_SYNC', False):
+        deliver(log_ids)
+        return
+
+    # A failed publish can take seconds; don't pay that on every login.
+    if time.monotonic() >= _broker_down_until:
+        try:
+            from .tasks import send_queued_emails
+            send_queued_emails.apply_async(args=[log_ids], retry=False)
+            return
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Celery unavailable for email (%s); using local pool.", e)
+            _broker_down_until = time.monotonic() + BROKER_BACKOFF_SECS
+    _local_pool().submit(_run_local, log_ids)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Local pool
+# ─────────────────────────────────────────────────────────────────────
+def _local_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email')
+        return _pool
+
+
+def _run_local(log_ids: List[int]):
+    attempt = 0
+    try:
+        while log_ids:
+            close_old_connections()
+            log_ids = deliver(log_ids)
+            if log_ids:
+                attempt += 1
+                time.sleep(min(60, backoff(attempt)))
+    except Exception:  # noqa: BLE001
+        logger.exception("Local email batch crashed for logs=%s", log_ids)
+    finally:
+        connection.close()
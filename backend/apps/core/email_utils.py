@@ -1,25 +1,46 @@
 """
 Email utility functions for sending notifications to contractors and suppliers.
+
+Each helper renders the HTML body and queues an EmailLog row; SMTP delivery
+and PDF attachments happen in the worker (see email_queue.py).  A True
+return means the email was queued, not that it was delivered.
 """
 import logging
 from urllib.parse import quote_plus
 
 logger = logging.getLogger(__name__)
 
-from django.core.mail import EmailMultiAlternatives, send_mail
 from django.utils.html import strip_tags
 from django.template.loader import render_to_string
-from django.conf import settings
 from django.utils import timezone
 from datetime import datetime
 
-from .pdf_utils import generate_purchase_order_pdf, generate_full_purchase_order_pdf
+from .email_queue import enqueue_email
+
+
+def _queue_email(to, html_content=None, text_content=None, reply_to=None, attachment=None, **log_fields):
+    """Create a QUEUED EmailLog carrying the message and hand it to the queue."""
+    from .models import EmailLog
+
+    log_entry = EmailLog.objects.create(
+        status='QUEUED',
+        payload={
+            'to': to,
+            'reply_to': reply_to or [],
+            'html': html_content or '',
+            'text': text_content if text_content is not None else strip_tags(html_content or ''),
+            'attachment': attachment,
+        },
+        **log_fields,
+    )
+    enqueue_email(log_entry)
+    return log_entry
+
 
 def send_material_order_email(material, quantity, user=None, custom_subject=None, custom_body=None):
     """
     Send an enhanced HTML email with PDF PO to a supplier to order material.
     """
-    from .models import EmailLog
     recipient = material.supplier
     
     if not recipient:
@@ -42,15 +63,19 @@ def send_material_order_email(material, quantity, user=None, custom_subject=None
     }
     
     html_content = render_to_string('emails/order_email.html', context)
-    text_content = strip_tags(html_content)
-    
-    try:
-        pdf_content = generate_purchase_order_pdf(material, quantity, recipient)
-    except Exception as pdf_err:
-        logger.error("Failed to generate PDF: %s", pdf_err)
-        pdf_content = None
-
-    log_entry = EmailLog.objects.create(
+    po_filename = f"PurchaseOrder_{material.name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+    _queue_email(
+        [recipient.email],
+        html_content=html_content,
+        reply_to=[user_email] if user_email else None,
+        attachment={
+            'kind': 'material_order',
+            'material_id': str(material.pk),
+            'supplier_id': str(recipient.pk),
+            'quantity': str(quantity),
+            'filename': po_filename,
+        },
         email_type='PURCHASE_ORDER',
         recipient_name=recipient.name,
         recipient_email=recipient.email,
@@ -58,32 +83,7 @@ def send_material_order_email(material, quantity, user=None, custom_subject=None
         material=material,
         sent_by=user if user and user.is_authenticated else None
     )
-
-    try:
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient.email],
-            reply_to=[user_email] if user_email else None
-        )
-        email.attach_alternative(html_content, "text/html")
-        
-        if pdf_content:
-            po_filename = f"PurchaseOrder_{material.name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-            email.attach(po_filename, pdf_content, 'application/pdf')
-            
-        email.send()
-        log_entry.status = 'SENT'
-        log_entry.save()
-        return True
-    except Exception as e:
-        error_msg = str(e)
-        logger.error("Error sending email: %s", error_msg)
-        log_entry.status = 'FAILED'
-        log_entry.error_message = error_msg
-        log_entry.save()
-        return False
+    return True
 
 
 def send_purchase_order_email(order, user=None):
@@ -136,47 +136,24 @@ def send_purchase_order_email(order, user=None):
     }
     
     html_content = render_to_string('emails/purchase_order_email.html', context)
-    text_content = strip_tags(html_content)
-    
-    try:
-        pdf_content = generate_full_purchase_order_pdf(order)
-    except Exception as pdf_err:
-        logger.error("Failed to generate PDF for full PO: %s", pdf_err)
-        pdf_content = None
-
-    log_entry = EmailLog.objects.create(
+    po_filename = f"PurchaseOrder_{order.order_number or str(order.id)[:8]}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+    _queue_email(
+        [recipient.email],
+        html_content=html_content,
+        reply_to=[user_email] if user_email else None,
+        attachment={
+            'kind': 'purchase_order',
+            'order_id': str(order.pk),
+            'filename': po_filename,
+        },
         email_type='PURCHASE_ORDER',
         recipient_name=recipient.name,
         recipient_email=recipient.email,
         subject=subject,
         sent_by=user if user and getattr(user, 'is_authenticated', False) else None
     )
-
-    try:
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient.email],
-            reply_to=[user_email] if user_email else None
-        )
-        email.attach_alternative(html_content, "text/html")
-        
-        if pdf_content:
-            po_filename = f"PurchaseOrder_{order.order_number or str(order.id)[:8]}_{datetime.now().strftime('%Y%m%d')}.pdf"
-            email.attach(po_filename, pdf_content, 'application/pdf')
-            
-        email.send()
-        log_entry.status = 'SENT'
-        log_entry.save()
-        return True
-    except Exception as e:
-        error_msg = str(e)
-        logger.error("Error sending PO email: %s", error_msg)
-        log_entry.status = 'FAILED'
-        log_entry.error_message = error_msg
-        log_entry.save()
-        return False
+    return True
 
 
 def send_purchase_order_received_email(order, user=None):
@@ -219,76 +196,42 @@ def send_purchase_order_received_email(order, user=None):
     }
     
     html_content = render_to_string('emails/purchase_order_received_email.html', context)
-    text_content = strip_tags(html_content)
-    
-    log_entry = EmailLog.objects.create(
+
+    _queue_email(
+        [recipient.email],
+        html_content=html_content,
+        reply_to=[user_email] if user_email else None,
         email_type='PURCHASE_RECEIVED',
         recipient_name=recipient.name,
         recipient_email=recipient.email,
         subject=subject,
         sent_by=user if user and getattr(user, 'is_authenticated', False) else None
     )
-
-    try:
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient.email],
-            reply_to=[user_email] if user_email else None
-        )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
-        log_entry.status = 'SENT'
-        log_entry.save()
-        return True
-    except Exception as e:
-        log_entry.status = 'FAILED'
-        log_entry.error_message = str(e)
-        log_entry.save()
-        return False
+    return True
 
 def send_contractor_notification(contractor, subject, message, user=None):
     """
     Send a notification email to a contractor.
     """
-    from .models import EmailLog
     if not contractor.email:
         raise ValueError(f"Contractor '{contractor.name}' has no email address")
-    
-    log_entry = EmailLog.objects.create(
+
+    _queue_email(
+        [contractor.email],
+        text_content=message,
         email_type='CONTRACTOR_NOTIFICATION',
         recipient_name=contractor.name,
         recipient_email=contractor.email,
         subject=subject,
         sent_by=user if user and user.is_authenticated else None
     )
-
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[contractor.email],
-            fail_silently=False,
-        )
-        log_entry.status = 'SENT'
-        log_entry.save()
-        return True
-    except Exception as e:
-        error_msg = str(e)
-        logger.error("Error sending email: %s", error_msg)
-        log_entry.status = 'FAILED'
-        log_entry.error_message = error_msg
-        log_entry.save()
-        return False
+    return True
 
 def send_payment_receipt_email(payment, user=None, custom_subject=None, custom_message=None):
     """
     Send an HTML email with PDF Payment Receipt to supplier or contractor.
     """
     from .models import EmailLog
-    from .models import EmailLog
     recipient = payment.expense.supplier or payment.expense.contractor
     if not recipient:
         logger.info("Skipping email for payment %s: no associated supplier or contractor", payment.id)
@@ -310,8 +253,6 @@ def send_payment_receipt_email(payment, user=None, custom_subject=None, custom_m
         )
         return False
     
-    from .pdf_utils import generate_payment_receipt_pdf
-    
     subject = custom_subject or f"Payment Receipt: REC-{payment.id} - Dream Home Construction"
     user_email = user.email if user and hasattr(user, 'email') else None
     
@@ -328,16 +269,17 @@ def send_payment_receipt_email(payment, user=None, custom_subject=None, custom_m
     }
     
     html_content = render_to_string('emails/payment_receipt_email.html', context)
-    text_content = strip_tags(html_content)
-    
-    try:
-        pdf_content = generate_payment_receipt_pdf(payment)
-    except Exception as pdf_err:
-        logger.error("Failed to generate PDF: %s", pdf_err)
-        pdf_content = None
-
-    logger.debug("Attempting to create EmailLog for payment %s", payment.id)
-    log_entry = EmailLog.objects.create(
+    receipt_filename = f"PaymentReceipt_REC-{payment.id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+    _queue_email(
+        [recipient.email],
+        html_content=html_content,
+        reply_to=[user_email] if user_email else None,
+        attachment={
+            'kind': 'payment_receipt',
+            'payment_id': payment.pk,
+            'filename': receipt_filename,
+        },
         email_type='PAYMENT_RECEIPT',
         recipient_name=recipient.name,
         recipient_email=recipient.email,
@@ -346,32 +288,7 @@ def send_payment_receipt_email(payment, user=None, custom_subject=None, custom_m
         expense=payment.expense,
         sent_by=user if user and user.is_authenticated else None
     )
-
-    try:
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient.email],
-            reply_to=[user_email] if user_email else None
-        )
-        email.attach_alternative(html_content, "text/html")
-        
-        if pdf_content:
-            receipt_filename = f"PaymentReceipt_REC-{payment.id}_{datetime.now().strftime('%Y%m%d')}.pdf"
-            email.attach(receipt_filename, pdf_content, 'application/pdf')
-            
-        email.send()
-        log_entry.status = 'SENT'
-        log_entry.save()
-        return True
-    except Exception as e:
-        error_msg = str(e)
-        logger.error("Error sending email: %s", error_msg)
-        log_entry.status = 'FAILED'
-        log_entry.error_message = error_msg
-        log_entry.save()
-        return False
+    return True
 
 
 def send_worker_portal_credentials(
@@ -395,11 +312,9 @@ def send_worker_portal_credentials(
     Called right after create_account (PIN is only available at creation time)
     or when resending with a freshly generated PIN.
 
-    Returns True on success, False on failure.
-    Logs to EmailLog regardless of outcome.
+    Returns True once queued; the EmailLog row records the delivery outcome
+    and drops the rendered body (which holds the PIN) when done.
     """
-    from .models import EmailLog
-
     subject = f"Your Worker Portal Access — {project_name}"
 
     context = {
@@ -418,38 +333,18 @@ def send_worker_portal_credentials(
     }
 
     html_content = render_to_string('emails/worker_portal_credentials.html', context)
-    text_content = strip_tags(html_content)
 
-    log_entry = EmailLog.objects.create(
+    _queue_email(
+        [recipient_email],
+        html_content    = html_content,
         email_type      = 'OTHER',
         recipient_name  = worker_name,
         recipient_email = recipient_email,
         subject         = subject,
         sent_by         = user if user and getattr(user, 'is_authenticated', False) else None,
     )
-
-    try:
-        email = EmailMultiAlternatives(
-            subject    = subject,
-            body       = text_content,
-            from_email = settings.DEFAULT_FROM_EMAIL,
-            to         = [recipient_email],
-        )
-        email.attach_alternative(html_content, 'text/html')
-        email.send()
-
-        log_entry.status = 'SENT'
-        log_entry.save()
-        logger.info("Portal credentials sent to %s for %s", recipient_email, worker_name)
-        return True
-
-    except Exception as e:
-        error_msg = str(e)
-        logger.error("Failed to send portal credentials to %s: %s", recipient_email, error_msg)
-        log_entry.status        = 'FAILED'
-        log_entry.error_message = error_msg
-        log_entry.save()
-        return False
+    logger.info("Portal credentials queued to %s for %s", recipient_email, worker_name)
+    return True
 
 
 def send_login_alert_email(user, login_details, user_agent=''):
@@ -460,8 +355,6 @@ def send_login_alert_email(user, login_details, user_agent=''):
     if not getattr(user, 'email', None):
         return False
 
-    from .models import EmailLog
-
     subject = "New login to your ConstructPro account"
 
     latitude = login_details.get('latitude')
@@ -502,32 +395,14 @@ def send_login_alert_email(user, login_details, user_agent=''):
     }
 
     html_content = render_to_string('emails/login_alert.html', context)
-    text_content = strip_tags(html_content)
 
-    log_entry = EmailLog.objects.create(
+    _queue_email(
+        [user.email],
+        html_content=html_content,
         email_type='OTHER',
         recipient_name=context['user_name'],
         recipient_email=user.email,
         subject=subject,
         sent_by=user if getattr(user, 'is_authenticated', False) else None,
     )
-
-    try:
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email],
-        )
-        email.attach_alternative(html_content, 'text/html')
-        email.send()
-
-        log_entry.status = 'SENT'
-        log_entry.save(update_fields=['status'])
-        return True
-    except Exception as exc:
-        logger.error("Failed to send login alert to %s: %s", user.email, exc)
-        log_entry.status = 'FAILED'
-        log_entry.error_message = str(exc)
-        log_entry.save(update_fields=['status', 'error_message'])
-        return False
+    return True
@@ -0,0 +1,44 @@
+"""
+Rebuild the gallery media index (apps.core.media_index) from its sources and
+render any thumbnails still missing.
+
+The index follows every save/delete through signals; rows written outside
+the ORM (SQL import, QuerySet.update, restores) bypass that — run this
+afterwards.  --thumbnails re-renders every image, e.g. after changing
+MEDIA_THUMBNAIL_FORMAT.
+
+The deploy scripts run it with --if-empty --no-render after migrate, which
+backfills the index once (the first deploy after 0010_media_index) and is a
+no-op from then on; the render_pending_thumbnails sweep picks up the images.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core import media_index, thumbnails
+from apps.core.models import MediaItem
+
+
+class Command(BaseCommand):
+    help = "Re-sync gallery MediaItem rows with their source files and render pending thumbnails."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--thumbnails", action="store_true", help="Re-render thumbnails for every image")
+        parser.add_argument("--if-empty", action="store_true", help="Do nothing if the index already has rows")
+        parser.add_argument("--no-render", action="store_true", help="Leave pending thumbnails to the periodic sweep")
+
+    def handle(self, *args, **opts):
+        if opts["if_empty"] and MediaItem.objects.exists():
+            self.stdout.write("Media index already populated — skipped")
+            return
+
+        total = media_index.rebuild()
+        self.stdout.write(f"{total} media item(s) indexed")
+
+        if opts["thumbnails"]:
+            MediaItem.objects.filter(media_type="IMAGE").update(thumb_status="PENDING")
+        rendered = 0
+        while not opts["no_render"]:
+            batch = thumbnails.render_pending()
+            if not batch:
+                break
+            rendered += batch
+        self.stdout.write(self.style.SUCCESS(f"OK — {total} item(s), {rendered} file(s) rendered"))
@@ -0,0 +1,517 @@
+"""
+Unified media index behind the gallery (/api/v1/gallery/).
+
+The gallery shows files from five places — PermitDocument (via the permit
+steps of a project), TaskMedia, the three file fields of ConstructionPhase,
+PhaseDocument and Floor.image.  Instead of walking all of them per request,
+each file is mirrored into one MediaItem row per project it belongs to,
+with everything a tile needs (title, subtitle, category, phase, thumbnails)
+already resolved.  A gallery page is then one query on
+(project, -uploaded_at, -id).
+
+Sources
+-------
+    SOURCES lists, per model, the source types it produces and a function
+    returning the rows an instance should have.  `sync(source, instance)`
+    upserts those rows and deletes the ones it no longer produces (a file
+    cleared, a document detached from a project's permit steps, a permit
+    document re-typed from LEGAL_DOC to DOCUMENT).
+
+    Rows also depend on a few other models — a Task's title, a phase's
+    name/order, a project's name, PermitStep membership.  Their handlers
+    below re-sync the affected sources.  Writes that skip signals
+    (QuerySet.update, bulk_create, SQL imports) need `rebuild_media_index`.
+
+Thumbnails
+----------
+    A new or changed IMAGE row starts PENDING and is handed to
+    core/thumbnails.py, unless another row already has READY derivatives
+    for the same file.  Derivatives no row references any more are deleted
+    once the transaction commits.
+"""
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.utils import timezone
+
+from . import thumbnails
+
+logger = logging.getLogger(__name__)
+
+LEGAL_DOC_TYPES = ('NAKSHA', 'LALPURJA', 'NAGRIKTA', 'TIRO', 'CHARKILLA', 'PERMIT')
+PHASE_DOCUMENT_CATEGORY = {
+    'NAKSA': 'Blueprint',
+    'STRUCTURE': 'Design',
+    '3D_MODEL': '3D Model',
+    'OTHER': 'Document',
+}
+# Public gallery ids ("task_12"); the frontend parses TASK_MEDIA ones
+ID_PREFIXES = {
+    'LEGAL_DOC': 'doc',
+    'DOCUMENT': 'doc',
+    'TASK_MEDIA': 'task',
+    'PHASE_NAKSA': 'phase_naksa',
+    'PHASE_DESIGN': 'phase_struct',
+    'PHASE_PHOTO': 'phase_photo',
+    'PHASE_DOCUMENT': 'phase_doc',
+    'FLOOR_PLAN': 'floor',
+}
+
+VISUAL = ('IMAGE', 'VIDEO')
+VIEW_FILTERS = {
+    # "Google Photos" style: every image/video, newest first
+    'timeline': Q(media_type__in=VISUAL),
+    # Progress photos: task media + phase completion photos
+    'phases': Q(media_type__in=VISUAL, source_type__in=('TASK_MEDIA', 'PHASE_PHOTO')),
+    # Naksa, structure, 3D models, floor plans
+    'blueprints': (
+        Q(source_type__in=('PHASE_NAKSA', 'PHASE_DESIGN', 'PHASE_DOCUMENT', 'FLOOR_PLAN'))
+        | Q(category__in=('Blueprint', 'Design', '3D Model'))
+    ),
+    # Legal documents
+    'permits': Q(source_type__in=('LEGAL_DOC', 'DOCUMENT'), media_type='PDF') | Q(category='Permit'),
+}
+
+
+def file_type(name):
+    ext = name.rsplit('.', 1)[-1].lower() if name and '.' in name else ''
+    if ext in ('jpg', 'jpeg', 'png', 'gif', 'webp'):
+        return 'IMAGE'
+    if ext == 'pdf':
+        return 'PDF'
+    if ext in ('mp4', 'mov', 'avi'):
+        return 'VIDEO'
+    return 'FILE'
+
+
+def _start_of(day):
+    """Phase dates are plain dates; index them at local midnight."""
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+# ── Row builders ──────────────────────────────────────────────────────────────
+# Each returns a list of MediaItem field dicts; `uploaded_at` None keeps the
+# row's existing timestamp (or "now" for a new row).
+
+def _permit_document_rows(doc):
+    if not doc.file:
+        return []
+    legal = doc.document_type in LEGAL_DOC_TYPES
+    row = {
+        'source_type': 'LEGAL_DOC' if legal else 'DOCUMENT',
+        'file': doc.file.name,
+        'media_type': file_type(doc.file.name),
+        'category': 'Permit' if legal else 'Document',
+        'title': doc.title,
+        'subtitle': doc.get_document_type_display(),
+        'uploaded_at': doc.uploaded_at,
+        'meta': {'doc_id': doc.pk},
+    }
+    projects = doc.permit_steps.exclude(project_id=None).values_list('project_id', flat=True).distinct()
+    return [dict(row, project_id=project_id) for project_id in projects]
+
+
+def _task_media_rows(tm):
+    task = tm.task
+    phase = task.phase if task else None
+    project_id = tm.project_id or (phase.project_id if phase else None)
+    if not tm.file or project_id is None:
+        return []
+
+    if task:
+        title, status, category = task.title, task.status, 'Task Update'
+        subtitle = f"Phase {phase.order}: {phase.name}" if phase else "Phase 99: Unassigned"
+    else:
+        title, status, category = "Unassigned Upload", "N/A", 'Site Photo'
+        subtitle = tm.project.name if tm.project_id else "Needs assignment"
+
+    return [{
+        'project_id': project_id,
+        'source_type': 'TASK_MEDIA',
+        'file': tm.file.name,
+        'media_type': tm.media_type,
+        'category': category,
+        'title': title,
+        'subtitle': subtitle,
+        'description': tm.description or '',
+        'phase_id': phase.pk if phase else None,
+        'uploaded_at': tm.created_at,
+        'meta': {
+            'task_id': task.pk if task else None,
+            'phase_id': phase.pk if phase else 0,
+            'project_id': project_id,
+            'task_status': status,
+            'telegram_uploader_name': tm.telegram_uploader_name,
+        },
+    }]
+
+
+def _phase_rows(phase):
+    if phase.project_id is None:
+        return []
+    base = {'project_id': phase.project_id, 'phase_id': phase.pk, 'meta': {'phase_id': phase.pk}}
+    rows = []
+    if phase.naksa_file:
+        rows.append(dict(
+            base, source_type='PHASE_NAKSA', file=phase.naksa_file.name,
+            media_type=file_type(phase.naksa_file.name), category='Blueprint',
+            title=f"{phase.name} - Blueprint", subtitle="Approved Layout",
+            uploaded_at=_start_of(phase.start_date),
+        ))
+    if phase.structure_design:
+        rows.append(dict(
+            base, source_type='PHASE_DESIGN', file=phase.structure_design.name,
+            media_type=file_type(phase.structure_design.name), category='Design',
+            title=f"{phase.name} - Structure", subtitle="Structural Design",
+            uploaded_at=_start_of(phase.start_date),
+        ))
+    if phase.completion_photo:
+        rows.append(dict(
+            base, source_type='PHASE_PHOTO', file=phase.completion_photo.name,
+            media_type='IMAGE', category='Site Photo',
+            title=f"{phase.name} - Completion", subtitle="Phase Completed",
+            uploaded_at=_start_of(phase.end_date),
+        ))
+    return rows
+
+
+def _phase_document_rows(doc):
+    if not doc.file or doc.phase.project_id is None:
+        return []
+    phase = doc.phase
+    display_type = doc.get_document_type_display()
+    return [{
+        'project_id': phase.project_id,
+        'source_type': 'PHASE_DOCUMENT',
+        'file': doc.file.name,
+        'media_type': file_type(doc.file.name),
+        'category': PHASE_DOCUMENT_CATEGORY.get(doc.document_type, 'Document'),
+        'title': doc.name or f"{phase.name} - {display_type}",
+        'subtitle': f"{phase.name} • {display_type}",
+        'phase_id': phase.pk,
+        'uploaded_at': doc.uploaded_at,
+        'meta': {'phase_id': phase.pk, 'phase_document_id': doc.pk, 'document_type': doc.document_type},
+    }]
+
+
+def _floor_rows(floor):
+    if not floor.image or floor.project_id is None:
+        return []
+    return [{
+        'project_id': floor.project_id,
+        'source_type': 'FLOOR_PLAN',
+        'file': floor.image.name,
+        'media_type': 'IMAGE',
+        'category': 'Floor Plan',
+        'title': f"{floor.name} Plan",
+        'subtitle': "Architectural Plan",
+        'uploaded_at': floor.created_at,
+        'meta': {'floor_id': floor.pk},
+    }]
+
+
+@dataclass(frozen=True)
+class Source:
+    label: str
+    types: Tuple[str, ...]
+    rows: Callable
+
+
+SOURCES = [
+    Source('permits.PermitDocument', ('LEGAL_DOC', 'DOCUMENT'), _permit_document_rows),
+    Source('tasks.TaskMedia', ('TASK_MEDIA',), _task_media_rows),
+    Source('core.ConstructionPhase', ('PHASE_NAKSA', 'PHASE_DESIGN', 'PHASE_PHOTO'), _phase_rows),
+    Source('core.PhaseDocument', ('PHASE_DOCUMENT',), _phase_document_rows),
+    Source('core.Floor', ('FLOOR_PLAN',), _floor_rows),
+]
+_by_label = {source.label: source for source in SOURCES}
+
+
+def source_for(label):
+    return _by_label[label]
+
+
+# ── Sync ──────────────────────────────────────────────────────────────────────
+
+def sync(source, instance):
+    """Bring `instance`'s MediaItem rows in line with the source object."""
+    from .models import MediaItem
+
+    desired = {(row['source_type'], row['project_id']): row for row in source.rows(instance)}
+    existing = {
+        (item.source_type, item.project_id): item
+        for item in MediaItem.objects.filter(source_type__in=source.types, object_id=instance.pk)
+    }
+
+    stale = [item for key, item in existing.items() if key not in desired]
+    for item in stale:
+        item.delete()
+
+    pending, released = [], []
+    for key, row in desired.items():
+        item = existing.get(key) or MediaItem(object_id=instance.pk)
+        previous = (item.file, dict(item.thumbnails)) if item.pk else None
+        row = dict(row)
+        uploaded_at = row.pop('uploaded_at') or item.uploaded_at or timezone.now()
+        row.setdefault('description', '')
+        row.setdefault('phase_id', None)
+        for field, value in row.items():
+            setattr(item, field, value)
+        item.uploaded_at = uploaded_at
+
+        render = _prepare_thumbnails(item, previous)
+        item.save()
+        if render:
+            pending.append(item.pk)
+        if previous and previous[0] != item.file:
+            released.append(previous)
+
+    thumbnails.enqueue(pending)
+    _release(released)
+
+
+def remove(source, pk):
+    from .models import MediaItem
+
+    for item in MediaItem.objects.filter(source_type__in=source.types, object_id=pk):
+        item.delete()
+
+
+def _prepare_thumbnails(item, previous):
+    """Set the row's thumbnail state; True when derivatives must be rendered."""
+    from .models import MediaItem
+
+    if item.media_type != 'IMAGE':
+        item.thumbnails, item.thumb_status = {}, 'NONE'
+        return False
+    if previous and previous[0] == item.file and item.thumb_status != 'NONE':
+        return False
+
+    twin = (
+        MediaItem.objects.filter(file=item.file, thumb_status='READY')
+        .exclude(pk=item.pk).values_list('thumbnails', flat=True).first()
+    )
+    if twin:
+        item.thumbnails, item.thumb_status = twin, 'READY'
+        return False
+    item.thumbnails, item.thumb_status = {}, 'PENDING'
+    return True
+
+
+def _release(released):
+    """Delete derivatives of files (file, thumbnails) no row refers to any more."""
+    from .models import MediaItem
+
+    released = [(name, thumbs) for name, thumbs in released if thumbs]
+    if not released:
+        return
+    in_use = set(
+        MediaItem.objects.filter(file__in={name for name, _ in released}).values_list('file', flat=True)
+    )
+    names = [thumb for name, thumbs in released if name not in in_use for thumb in thumbs.values()]
+    if names:
+        transaction.on_commit(lambda: thumbnails.delete_files(names))
+
+
+def rebuild():
+    """Re-sync every source object and drop rows whose object is gone; returns the row count."""
+    from .models import MediaItem
+
+    for source in SOURCES:
+        model = apps.get_model(source.label)
+        ids = set()
+        for instance in model.objects.iterator(chunk_size=500):
+            with transaction.atomic():
+                sync(source, instance)
+            ids.add(instance.pk)
+        orphans = MediaItem.objects.filter(source_type__in=source.types).exclude(object_id__in=ids)
+        for item in orphans.iterator():
+            item.delete()
+    return MediaItem.objects.count()
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+def visible_items(project_ids, view_mode='timeline'):
+    """MediaItems of `project_ids` shown in `view_mode`, each file once, newest first."""
+    from .models import MediaItem
+
+    qs = MediaItem.objects.filter(project_id__in=project_ids)
+    qs = qs.filter(VIEW_FILTERS.get(view_mode, VIEW_FILTERS['timeline']))
+    if len(project_ids) > 1:
+        # A permit document attached to several projects' steps: keep the lowest project's row
+        shadowing = MediaItem.objects.filter(
+            source_type=OuterRef('source_type'), object_id=OuterRef('object_id'),
+            project_id__in=project_ids, project_id__lt=OuterRef('project_id'),
+        )
+        qs = qs.exclude(Exists(shadowing))
+    return qs.select_related('phase').order_by('-uploaded_at', '-id')
+
+
+def group_label(item, view_mode):
+    if view_mode == 'phases':
+        return f"{item.phase.order}. {item.phase.name}" if item.phase else 'Unassigned Album'
+    if view_mode in ('blueprints', 'permits'):
+        return item.category
+    return timezone.localtime(item.uploaded_at).strftime('%Y-%m-%d')
+
+
+def _url(name):
+    try:
+        return default_storage.url(name)
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def payload(item):
+    """The gallery JSON for one row (same keys as before the index, plus thumbnails)."""
+    thumbs = {size: _url(name) for size, name in (item.thumbnails or {}).items()}
+    data = {
+        'id': f"{ID_PREFIXES[item.source_type]}_{item.object_id}",
+        'url': _url(item.file),
+        'thumbnail': thumbs.get('md'),
+        'thumbnails': thumbs,
+        'title': item.title,
+        'subtitle': item.subtitle,
+        'category': item.category,
+        'uploaded_at': item.uploaded_at,
+        'source_type': item.source_type,
+        'media_type': item.media_type,
+        'meta': item.meta,
+    }
+    if item.source_type == 'TASK_MEDIA':
+        data['description'] = item.description or None
+        data['telegram_uploader_name'] = item.meta.get('telegram_uploader_name')
+    return data
+
+
+# ── Signal handlers (connected from CoreConfig.ready) ────────────────────────
+
+def _source_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync(source_for(sender._meta.label), instance)
+
+
+def _source_deleted(sender, instance, **kwargs):
+    remove(source_for(sender._meta.label), instance.pk)
+
+
+def _item_deleted(sender, instance, **kwargs):
+    _release([(instance.file, instance.thumbnails)])
+
+
+def _sync_all(label, queryset):
+    source = source_for(label)
+    for instance in queryset:
+        sync(source, instance)
+
+
+def _phase_saved(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    # Task media subtitles and phase document titles carry the phase name/order
+    _sync_all('core.PhaseDocument', instance.documents.select_related('phase'))
+    TaskMedia = apps.get_model('tasks', 'TaskMedia')
+    _sync_all('tasks.TaskMedia', TaskMedia.objects.filter(task__phase=instance).select_related('task__phase', 'project'))
+
+
+def _task_saved(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        _sync_all('tasks.TaskMedia', instance.media.select_related('task__phase', 'project'))
+
+
+def _task_deleting(sender, instance, **kwargs):
+    instance._media_ids = list(instance.media.values_list('pk', flat=True))
+
+
+def _task_deleted(sender, instance, **kwargs):
+    # Its media survive with task=NULL and become "Unassigned Upload"s
+    TaskMedia = apps.get_model('tasks', 'TaskMedia')
+    ids = getattr(instance, '_media_ids', [])
+    _sync_all('tasks.TaskMedia', TaskMedia.objects.filter(pk__in=ids).select_related('task__phase', 'project'))
+
+
+def _project_saved(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        _sync_all('tasks.TaskMedia', instance.task_media.filter(task=None).select_related('project'))
+
+
+def _step_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _sync_all('permits.PermitDocument', instance.documents.all())
+
+
+def _step_deleting(sender, instance, **kwargs):
+    instance._media_documents = list(instance.documents.values_list('pk', flat=True))
+
+
+def _step_deleted(sender, instance, **kwargs):
+    # Only ever remove here: during a project cascade a re-sync could insert
+    # rows for the project that is about to go
+    from .models import MediaItem
+
+    if instance.project_id is None:
+        return
+    PermitDocument = apps.get_model('permits', 'PermitDocument')
+    still_attached = PermitDocument.objects.filter(
+        pk__in=getattr(instance, '_media_documents', []), permit_steps__project_id=instance.project_id,
+    ).values_list('pk', flat=True)
+    orphaned = MediaItem.objects.filter(
+        source_type__in=source_for('permits.PermitDocument').types,
+        object_id__in=getattr(instance, '_media_documents', []),
+        project_id=instance.project_id,
+    ).exclude(object_id__in=list(still_attached))
+    for item in orphaned:
+        item.delete()
+
+
+def _step_documents_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    PermitDocument = apps.get_model('permits', 'PermitDocument')
+    if action == 'pre_clear' and not reverse:
+        instance._media_documents = list(instance.documents.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        documents = [instance]
+    else:
+        ids = getattr(instance, '_media_documents', []) if action == 'post_clear' else pk_set
+        documents = PermitDocument.objects.filter(pk__in=ids or [])
+    _sync_all('permits.PermitDocument', documents)
+
+
+def connect_signals():
+    for source in SOURCES:
+        model = apps.get_model(source.label)
+        uid = f'core.media_index:{source.label}'
+        post_save.connect(_source_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_source_deleted, sender=model, dispatch_uid=uid)
+
+    MediaItem = apps.get_model('core', 'MediaItem')
+    post_delete.connect(_item_deleted, sender=MediaItem, dispatch_uid='core.media_index:item')
+
+    Phase = apps.get_model('core', 'ConstructionPhase')
+    post_save.connect(_phase_saved, sender=Phase, dispatch_uid='core.media_index:phase-dependents')
+
+    Task = apps.get_model('tasks', 'Task')
+    post_save.connect(_task_saved, sender=Task, dispatch_uid='core.media_index:task')
+    pre_delete.connect(_task_deleting, sender=Task, dispatch_uid='core.media_index:task')
+    post_delete.connect(_task_deleted, sender=Task, dispatch_uid='core.media_index:task')
+
+    Project = apps.get_model('core', 'HouseProject')
+    post_save.connect(_project_saved, sender=Project, dispatch_uid='core.media_index:project')
+
+    Step = apps.get_model('permits', 'PermitStep')
+    post_save.connect(_step_saved, sender=Step, dispatch_uid='core.media_index:step')
+    pre_delete.connect(_step_deleting, sender=Step, dispatch_uid='core.media_index:step')
+    post_delete.connect(_step_deleted, sender=Step, dispatch_uid='core.media_index:step')
+    m2m_changed.connect(_step_documents_changed, sender=Step.documents.through, dispatch_uid='core.media_index:step')
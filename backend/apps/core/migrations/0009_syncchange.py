@@ -0,0 +1,26 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_emaillog_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=40)),
+                ('lookup', models.CharField(blank=True, default='', max_length=80)),
+                ('value', models.CharField(blank=True, default='', max_length=64)),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['section', 'changed_at'], name='syncchange_section_time')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_syncchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(choices=[('LEGAL_DOC', 'Legal Document'), ('DOCUMENT', 'Permit Document'), ('TASK_MEDIA', 'Task Media'), ('PHASE_NAKSA', 'Phase Blueprint'), ('PHASE_DESIGN', 'Phase Structure Design'), ('PHASE_PHOTO', 'Phase Completion Photo'), ('PHASE_DOCUMENT', 'Phase Document'), ('FLOOR_PLAN', 'Floor Plan')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('file', models.CharField(help_text='Storage name of the original file', max_length=500)),
+                ('media_type', models.CharField(choices=[('IMAGE', 'Image'), ('VIDEO', 'Video'), ('PDF', 'PDF'), ('DOCUMENT', 'Document'), ('FILE', 'File')], default='FILE', max_length=10)),
+                ('category', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, default='', max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('uploaded_at', models.DateTimeField()),
+                ('thumbnails', models.JSONField(blank=True, default=dict)),
+                ('thumb_status', models.CharField(choices=[('NONE', 'Not applicable'), ('PENDING', 'Pending'), ('READY', 'Ready'), ('FAILED', 'Failed')], default='NONE', max_length=10)),
+                ('phase', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='media_items', to='core.constructionphase')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_items', to='core.houseproject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', '-uploaded_at', '-id'], name='mediaitem_project_time'), models.Index(fields=['file'], name='mediaitem_file'), models.Index(fields=['thumb_status'], name='mediaitem_thumb_status')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mediaitem',
+            constraint=models.UniqueConstraint(fields=('source_type', 'object_id', 'project'), name='mediaitem_source_project'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_media_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emaillog',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='emaillog',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('RETRYING', 'Retrying'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='SENT', max_length=10),
+        ),
+    ]
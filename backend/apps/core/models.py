@@ -511,6 +511,9 @@ class EmailLog(models.Model):
         ('OTHER', 'Other'),
     ]
     STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RETRYING', 'Retrying'),
+        ('SENDING', 'Sending'),
         ('SENT', 'Sent'),
         ('FAILED', 'Failed'),
     ]
@@ -530,8 +533,18 @@ class EmailLog(models.Model):
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Delivery queue (core/email_queue.py): rendered body, recipients and
+    # attachment spec until the row is SENT or FAILED.
+    payload = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='emaillog_status_created'),
+        ]
         verbose_name = "Email Log"
         verbose_name_plural = "Email Logs"
 
@@ -817,3 +830,90 @@ class ProjectMember(models.Model):
             'can_manage_workforce', 'can_view_workforce',
             'can_approve_purchases',
         ]
+
+
+class SyncChange(models.Model):
+    """
+    Change log behind the dashboard's delta sync (core/sync.py).
+
+    One row per (section, affected rows) whenever a model the section
+    renders is saved or deleted: `lookup`/`value` select the section's root
+    rows to resend (e.g. 'pk' = 42, or 'phase_id' = 7 when a phase's name
+    changes under its tasks).  An empty lookup means the whole section, and
+    section '*' invalidates every section (bulk imports).
+    """
+    section = models.CharField(max_length=40)
+    lookup = models.CharField(max_length=80, blank=True, default='')
+    value = models.CharField(max_length=64, blank=True, default='')
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['section', 'changed_at'], name='syncchange_section_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.section} {self.lookup}={self.value} @ {self.changed_at}"
+
+
+class MediaItem(models.Model):
+    """
+    Unified gallery index (core/media_index.py) — one row per file shown in
+    /api/v1/gallery/, denormalized from PermitDocument, TaskMedia, phase
+    files, PhaseDocument and Floor so a gallery page is a single indexed,
+    pre-sorted query.  `thumbnails` maps size → storage name of the
+    derivatives written by core/thumbnails.py.
+    """
+    SOURCE_TYPES = [
+        ('LEGAL_DOC', 'Legal Document'),
+        ('DOCUMENT', 'Permit Document'),
+        ('TASK_MEDIA', 'Task Media'),
+        ('PHASE_NAKSA', 'Phase Blueprint'),
+        ('PHASE_DESIGN', 'Phase Structure Design'),
+        ('PHASE_PHOTO', 'Phase Completion Photo'),
+        ('PHASE_DOCUMENT', 'Phase Document'),
+        ('FLOOR_PLAN', 'Floor Plan'),
+    ]
+    MEDIA_TYPES = [
+        ('IMAGE', 'Image'),
+        ('VIDEO', 'Video'),
+        ('PDF', 'PDF'),
+        ('DOCUMENT', 'Document'),
+        ('FILE', 'File'),
+    ]
+    THUMB_STATUS = [
+        ('NONE', 'Not applicable'),
+        ('PENDING', 'Pending'),
+        ('READY', 'Ready'),
+        ('FAILED', 'Failed'),
+    ]
+
+    project = models.ForeignKey(HouseProject, on_delete=models.CASCADE, related_name='media_items')
+    source_type = models.CharField(max_length=20, choices=SOURCE_TYPES)
+    object_id = models.PositiveBigIntegerField()
+    file = models.CharField(max_length=500, help_text="Storage name of the original file")
+    media_type = models.CharField(max_length=10, choices=MEDIA_TYPES, default='FILE')
+    category = models.CharField(max_length=50)
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True, default='')
+    description = models.TextField(blank=True, default='')
+    phase = models.ForeignKey(
+        ConstructionPhase, on_delete=models.SET_NULL, null=True, blank=True, related_name='media_items'
+    )
+    meta = models.JSONField(default=dict, blank=True)
+    uploaded_at = models.DateTimeField()
+    thumbnails = models.JSONField(default=dict, blank=True)
+    thumb_status = models.CharField(max_length=10, choices=THUMB_STATUS, default='NONE')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source_type', 'object_id', 'project'], name='mediaitem_source_project'),
+        ]
+        indexes = [
+            models.Index(fields=['project', '-uploaded_at', '-id'], name='mediaitem_project_time'),
+            models.Index(fields=['file'], name='mediaitem_file'),
+            models.Index(fields=['thumb_status'], name='mediaitem_thumb_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.source_type}:{self.object_id} {self.title}"
@@ -314,7 +314,7 @@ class UserGuideSerializer(serializers.ModelSerializer):
 class UserGuideProgressSerializer(serializers.ModelSerializer):
     class Meta:
         model  = UserGuideProgress
-        fields = ['guide', 'is_completed', 'last_step_seen', 'updated_at']
+        fields = ['id', 'guide', 'is_completed', 'last_step_seen', 'updated_at']
 
 # ── Email Log ──────────────────────────────────────────────────────────────────
 class EmailLogSerializer(serializers.ModelSerializer):
@@ -327,5 +327,6 @@ class EmailLogSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'email_type', 'status', 'recipient_name', 'recipient_email',
             'subject', 'sent_by', 'sent_by_username', 'payment', 'payment_amount',
-            'expense', 'expense_title', 'material', 'error_message', 'created_at'
+            'expense', 'expense_title', 'material', 'error_message', 'attempts',
+            'sent_at', 'created_at'
         ]
@@ -0,0 +1,349 @@
+"""
+Delta sync for the unified dashboard payload (DashboardDataView).
+
+Every section of the payload is described by SECTIONS: the model whose rows
+it lists (the root) and, for each model the section renders, how a change to
+one of its rows maps back to root rows:
+
+    ('pk', 'pk')                → the root row itself
+    ('pk', 'task_id')           → a child row (TaskUpdate → its Task)
+    ('phase_id', 'pk')          → a nested object (Phase → every Task in it)
+    ALL                         → aggregates; resend the whole section
+
+post_save / post_delete on those models write SyncChange rows, in the same
+transaction as the change.  `?since=<cursor>` then resends only the root rows
+the log names; root ids the log names that are no longer in scope (deleted,
+moved to another project, deactivated) come back as tombstones.
+
+Each section also gets an ETag from its latest SyncChange, so clients can
+skip sections they already hold.  QuerySet.update() callers log their rows
+with `record_changes()`; writes that bypass signals wholesale (bulk imports,
+raw SQL) call `invalidate_all()`, which forces a full reload.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Max, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ALL = None
+EVERYTHING = '*'
+
+SECTIONS = {
+    'project': {
+        'core.HouseProject': ALL,
+        'core.ConstructionPhase': ALL,
+        'core.Floor': ALL,
+        'core.Room': ALL,
+        'core.ProjectMember': ALL,
+        'finance.Expense': ALL,
+    },
+    'phases': {
+        'core.ConstructionPhase': [('pk', 'pk')],
+        'core.PhaseDocument': [('pk', 'phase_id')],
+        'finance.Expense': [('pk', 'phase_id')],
+    },
+    'rooms': {
+        'core.Room': [('pk', 'pk')],
+    },
+    'tasks': {
+        'tasks.Task': [('pk', 'pk')],
+        'tasks.TaskUpdate': [('pk', 'task_id')],
+        'tasks.TaskMedia': [('pk', 'task_id')],
+        'core.ConstructionPhase': [('phase_id', 'pk')],
+        'core.PhaseDocument': [('phase_id', 'phase_id')],
+        'finance.Expense': [('phase_id', 'phase_id')],
+        'core.Room': [('room_id', 'pk')],
+        'finance.BudgetCategory': [('category_id', 'pk')],
+        'workforce.WorkforceMember': [('assigned_to_id', 'pk')],
+        'workforce.Team': [('assigned_team_id', 'pk')],
+    },
+    'expenses': {
+        'finance.Expense': [('pk', 'pk')],
+        'finance.Payment': [('pk', 'expense_id')],
+        'finance.BudgetCategory': [('category_id', 'pk')],
+        'finance.FundingSource': [('funding_source_id', 'pk')],
+        'core.ConstructionPhase': [('phase_id', 'pk')],
+        'resource.Supplier': [('supplier_id', 'pk')],
+        'resource.Worker': [('contractor_id', 'pk')],
+        'resource.Material': [('material_id', 'pk')],
+        'tasks.Task': [('task_id', 'pk')],
+    },
+    'floors': {
+        'core.Floor': [('pk', 'pk')],
+        'core.Room': [('pk', 'floor_id')],
+    },
+    'materials': {
+        'resource.Material': [('pk', 'pk')],
+    },
+    'contractors': {
+        'workforce.WorkforceMember': [('pk', 'pk')],
+    },
+    'budgetCategories': {
+        'financials.BudgetCategory': [('pk', 'pk')],
+        'financials.BudgetAllocation': [('pk', 'category_id')],
+        'financials.Expense': [('pk', 'budget_category_id')],
+        'financials.BillItem': [('pk', 'budget_category_id')],
+        'finance.Expense': [('pk', 'fin_budget_category_id')],
+        'finance.Account': [('gl_account_id', 'pk')],
+        'core.ConstructionPhase': [('fin_allocations__phase_id', 'pk')],
+    },
+    'suppliers': {
+        'resource.Supplier': [('pk', 'pk')],
+    },
+    'transactions': {
+        'resource.StockMovement': [('pk', 'pk')],
+        'resource.Material': [('material_id', 'pk')],
+        'resource.Supplier': [('supplier_id', 'pk')],
+        'resource.PurchaseOrder': [('purchase_order_id', 'pk')],
+        'core.ConstructionPhase': [('phase_id', 'pk')],
+    },
+    'permits': {
+        'permits.PermitStep': [('pk', 'pk')],
+        'permits.PermitDocument': ALL,
+    },
+    'funding': {
+        'finance.FundingSource': [('pk', 'pk')],
+        'finance.FundingTransaction': [('pk', 'funding_source_id')],
+        'finance.Account': [('associated_account_id', 'pk')],
+        'finance.JournalLine': [('associated_account_id', 'account_id')],
+    },
+    'phaseBudgetAllocations': {
+        'financials.BudgetAllocation': [('pk', 'pk')],
+        'financials.BudgetCategory': [('category_id', 'pk')],
+        'core.ConstructionPhase': [('phase_id', 'pk')],
+    },
+    'userGuides': {
+        'core.UserGuide': [('pk', 'pk')],
+        'core.UserGuideStep': [('pk', 'guide_id')],
+        'core.UserGuideFAQ': [('pk', 'guide_id')],
+        'core.UserGuideSection': [('pk', 'guide_id')],
+    },
+    'userGuideProgress': {
+        'core.UserGuideProgress': [('pk', 'pk')],
+    },
+    'accounts': {
+        'finance.Account': [('pk', 'pk')],
+        'finance.JournalLine': [('pk', 'account_id')],
+        'finance.FundingSource': [('pk', 'associated_account_id')],
+    },
+}
+
+# Derived from another section's rows; versioned with it.
+DERIVED = {'finance_summary': 'accounts'}
+
+_dependents = {}        # model label → [(section, lookup, attr) | (section, ALL, ALL)]
+
+
+def section_names():
+    return list(SECTIONS) + list(DERIVED)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Recording
+# ─────────────────────────────────────────────────────────────────────
+def _entries(label, instance, previous=None):
+    from .models import SyncChange
+
+    seen = set()
+    for section, lookup, attr in _dependents.get(label, ()):
+        if attr is ALL:
+            keys = [(section, '', '')]
+        else:
+            values = {getattr(instance, attr, None)}
+            if previous and attr in previous:
+                values.add(previous[attr])
+            keys = [(section, lookup, str(v)) for v in values if v is not None]
+        for key in keys:
+            if key not in seen:
+                seen.add(key)
+                yield SyncChange(section=key[0], lookup=key[1], value=key[2])
+
+
+def _foreign_attrs(label):
+    return sorted({attr for _, _, attr in _dependents.get(label, ()) if attr not in (ALL, 'pk')})
+
+
+def _remember_previous(sender, instance, raw=False, **kwargs):
+    """Keep the old FK values so a row moving parents refreshes both."""
+    attrs = _foreign_attrs(sender._meta.label)
+    if raw or not attrs or instance.pk is None or instance._state.adding:
+        return
+    instance._sync_previous = sender._base_manager.filter(pk=instance.pk).values(*attrs).first()
+
+
+def _record_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .models import SyncChange
+
+    previous = getattr(instance, '_sync_previous', None)
+    SyncChange.objects.bulk_create(list(_entries(sender._meta.label, instance, previous)))
+
+
+def _record_delete(sender, instance, **kwargs):
+    from .models import SyncChange
+
+    SyncChange.objects.bulk_create(list(_entries(sender._meta.label, instance)))
+
+
+def connect_signals():
+    """Hook every model SECTIONS depends on (called from CoreConfig.ready)."""
+    _dependents.clear()
+    for section, models in SECTIONS.items():
+        for label, mappings in models.items():
+            if mappings is ALL:
+                _dependents.setdefault(label, []).append((section, ALL, ALL))
+            else:
+                for lookup, attr in mappings:
+                    _dependents.setdefault(label, []).append((section, lookup, attr))
+
+    for label in _dependents:
+        model = apps.get_model(label)
+        uid = f'core.sync:{label}'
+        if _foreign_attrs(label):
+            pre_save.connect(_remember_previous, sender=model, dispatch_uid=uid)
+        post_save.connect(_record_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_record_delete, sender=model, dispatch_uid=uid)
+
+
+def record_changes(model, ids):
+    """
+    Log changes to `model` rows `ids` for writes that skip signals
+    (QuerySet.update, bulk_create).  Mappings keyed on another column can't
+    be resolved from ids alone, so those sections are resent whole.
+    """
+    from .models import SyncChange
+
+    keys = set()
+    for section, lookup, attr in _dependents.get(model._meta.label, ()):
+        if attr == 'pk':
+            keys.update((section, lookup, str(i)) for i in ids)
+        elif ids:
+            keys.add((section, '', ''))
+    SyncChange.objects.bulk_create([SyncChange(section=s, lookup=l, value=v) for s, l, v in sorted(keys)])
+
+
+def invalidate_all():
+    """Make every client reload every section on its next sync."""
+    from .models import SyncChange
+
+    SyncChange.objects.create(section=EVERYTHING)
+
+
+def prune(days=None):
+    """Drop log rows older than SYNC_CHANGE_RETENTION_DAYS; older cursors get a full reload."""
+    from .models import SyncChange
+
+    days = days if days is not None else _setting('SYNC_CHANGE_RETENTION_DAYS', 30)
+    deleted, _ = SyncChange.objects.filter(changed_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Cursors and ETags
+# ─────────────────────────────────────────────────────────────────────
+def make_cursor(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def parse_cursor(cursor):
+    """datetime for a cursor, or None when it is malformed or past retention."""
+    try:
+        moment = datetime.fromtimestamp(int(cursor) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+    oldest = timezone.now() - timedelta(days=_setting('SYNC_CHANGE_RETENTION_DAYS', 30))
+    return moment if moment >= oldest else None
+
+
+def section_etags(sections, user, project):
+    """{section: etag} from each section's latest change (one query)."""
+    from .models import SyncChange
+
+    tracked = {DERIVED.get(s, s) for s in sections}
+    latest = dict(
+        SyncChange.objects
+        .filter(section__in=tracked | {EVERYTHING})
+        .values('section')
+        .annotate(last=Max('changed_at'))
+        .values_list('section', 'last')
+    )
+    everything = latest.get(EVERYTHING)
+    project_id = project.pk if project else ''
+    tags = {}
+    for section in sections:
+        source = f'{user.pk}:{project_id}:{section}:{latest.get(DERIVED.get(section, section))}:{everything}'
+        tags[section] = f'"{section}:{hashlib.sha1(source.encode()).hexdigest()[:16]}"'
+    return tags
+
+
+def parse_if_none_match(header):
+    return {tag.strip().removeprefix('W/') for tag in (header or '').split(',') if tag.strip()}
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Reading
+# ─────────────────────────────────────────────────────────────────────
+class Changes:
+    """What changed since a cursor, per section."""
+
+    def __init__(self, full, lookups):
+        self.full = full            # sections to resend whole
+        self.lookups = lookups      # {section: {lookup: {values}}}
+
+    def changed(self, section):
+        section = DERIVED.get(section, section)
+        return section in self.full or section in self.lookups
+
+    def filter(self, section, queryset):
+        """Narrow `queryset` to the root rows to resend; None = whole section."""
+        if section in self.full or section not in self.lookups:
+            return None
+        condition = Q()
+        for lookup, values in self.lookups[section].items():
+            condition |= Q(**{f'{lookup}__in': list(values)})
+        queryset = queryset.filter(condition)
+        if any('__' in lookup for lookup in self.lookups[section]):
+            queryset = queryset.distinct()
+        return queryset
+
+    def tombstones(self, section, sent_ids):
+        """Root ids named by the log that were not sent back."""
+        if section in self.full:
+            return []
+        sent = {str(i) for i in sent_ids}
+        return sorted(v for v in self.lookups.get(section, {}).get('pk', ()) if v not in sent)
+
+
+def changes_since(since, sections, overlap=None):
+    """Changes logged at or after `since` (minus SYNC_CURSOR_OVERLAP seconds)."""
+    from .models import SyncChange
+
+    overlap = overlap if overlap is not None else _setting('SYNC_CURSOR_OVERLAP', 30)
+    tracked = {DERIVED.get(s, s) for s in sections}
+    rows = (
+        SyncChange.objects
+        .filter(section__in=tracked | {EVERYTHING}, changed_at__gte=since - timedelta(seconds=overlap))
+        .values_list('section', 'lookup', 'value')
+        .distinct()
+    )
+    full, lookups = set(), {}
+    for section, lookup, value in rows:
+        if section == EVERYTHING:
+            return Changes(set(tracked), {})
+        if not lookup:
+            full.add(section)
+        else:
+            lookups.setdefault(section, {}).setdefault(lookup, set()).add(value)
+    return Changes(full, lookups)
@@ -0,0 +1,54 @@
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, acks_late=True)
+def send_queued_emails(self, log_ids):
+    """Send queued EmailLog rows over one connection; retry the failures."""
+    from .email_queue import backoff, deliver, max_attempts
+
+    retry = deliver(log_ids)
+    if retry:
+        if self.request.retries + 1 < max_attempts():
+            raise self.retry(
+                args=[retry],
+                countdown=backoff(self.request.retries + 1),
+                max_retries=max_attempts(),
+            )
+        logger.error("Email delivery gave up on logs=%s after %d retries", retry, self.request.retries)
+    return {'batch': len(log_ids), 'retrying': len(retry)}
+
+
+@shared_task
+def flush_email_queue():
+    """Deliver EmailLog rows still QUEUED/RETRYING (lost tasks, restarts)."""
+    from .email_queue import flush_pending
+
+    return flush_pending()
+
+
+@shared_task
+def prune_sync_changes():
+    """Drop dashboard sync-log rows past SYNC_CHANGE_RETENTION_DAYS."""
+    from .sync import prune
+
+    return prune()
+
+
+@shared_task
+def generate_thumbnails(item_ids):
+    """Render gallery thumbnails for MediaItem rows (see core/thumbnails.py)."""
+    from .thumbnails import generate
+
+    return generate(item_ids)
+
+
+@shared_task
+def render_pending_thumbnails():
+    """Render thumbnails still PENDING (lost tasks, restarts)."""
+    from .thumbnails import render_pending
+
+    return render_pending()
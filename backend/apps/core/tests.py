@@ -0,0 +1,438 @@
+import io
+import shutil
+import smtplib
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from PIL import Image
+
+from apps.core import email_queue, sync, thumbnails
+from apps.core.email_utils import send_contractor_notification, send_login_alert_email
+from apps.core.models import (
+    ConstructionPhase, EmailLog, Floor, HouseProject, MediaItem, ProjectMember, Room, SyncChange,
+)
+from apps.permits.models import PermitDocument, PermitStep
+from apps.tasks.models import Task, TaskMedia
+from apps.workforce.models import WorkforceMember
+
+User = get_user_model()
+
+
+class _Contractor:
+    def __init__(self, name, email):
+        self.name = name
+        self.email = email
+
+
+@override_settings(EMAIL_QUEUE_SYNC=True, EMAIL_MAX_ATTEMPTS=2)
+class EmailQueueTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='mailer', email='mailer@example.com', password='pass12345',
+        )
+
+    def test_send_helper_queues_until_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(send_login_alert_email(self.user, {'browser': 'Firefox'}))
+
+        log = EmailLog.objects.get()
+        self.assertEqual(log.status, 'QUEUED')
+        self.assertIn('Firefox', log.payload['html'])
+        self.assertEqual(mail.outbox, [])
+
+        for callback in callbacks:
+            callback()
+
+        log.refresh_from_db()
+        self.assertEqual(log.status, 'SENT')
+        self.assertEqual(log.attempts, 1)
+        self.assertIsNotNone(log.sent_at)
+        self.assertEqual(log.payload, {})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Firefox', mail.outbox[0].alternatives[0][0])
+
+    def test_plain_text_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            send_contractor_notification(_Contractor('Ram', 'ram@example.com'), 'Site visit', 'Tomorrow 9am', user=self.user)
+
+        self.assertEqual(mail.outbox[0].body, 'Tomorrow 9am')
+        self.assertEqual(mail.outbox[0].alternatives, [])
+        self.assertEqual(EmailLog.objects.get().status, 'SENT')
+
+    def test_batch_shares_one_connection(self):
+        ids = [
+            EmailLog.objects.create(
+                email_type='OTHER', status='QUEUED', recipient_name=f'R{i}',
+                recipient_email=f'r{i}@example.com', subject=f'Hello {i}',
+                payload={'to': [f'r{i}@example.com'], 'text': 'hi'},
+            ).pk
+            for i in range(3)
+        ]
+        with patch('apps.core.email_queue.get_connection', wraps=email_queue.get_connection) as get_connection:
+            self.assertEqual(email_queue.deliver(ids), [])
+
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(set(EmailLog.objects.values_list('status', flat=True)), {'SENT'})
+
+    def test_attachment_rendered_at_delivery(self):
+        log = EmailLog.objects.create(
+            email_type='PURCHASE_ORDER', status='QUEUED', recipient_name='Supplier',
+            recipient_email='s@example.com', subject='PO',
+            payload={
+                'to': ['s@example.com'], 'html': '<p>PO</p>', 'text': 'PO',
+                'attachment': {'kind': 'purchase_order', 'order_id': 'x', 'filename': 'PO.pdf'},
+            },
+        )
+        with patch.dict(email_queue.ATTACHMENT_RENDERERS, {'purchase_order': lambda spec: b'%PDF-1.4'}):
+            email_queue.deliver([log.pk])
+
+        self.assertEqual(mail.outbox[0].attachments, [('PO.pdf', b'%PDF-1.4', 'application/pdf')])
+
+    def test_failures_retry_then_fail(self):
+        log = EmailLog.objects.create(
+            email_type='OTHER', status='QUEUED', recipient_name='R',
+            recipient_email='r@example.com', subject='Hi', payload={'text': 'hi'},
+        )
+        with patch('apps.core.email_queue._send', side_effect=smtplib.SMTPException('relay denied')):
+            self.assertEqual(email_queue.deliver([log.pk]), [log.pk])
+            log.refresh_from_db()
+            self.assertEqual((log.status, log.attempts), ('RETRYING', 1))
+            self.assertEqual(log.error_message, 'relay denied')
+
+            self.assertEqual(email_queue.deliver([log.pk]), [])
+
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts), ('FAILED', 2))
+        self.assertEqual(log.payload, {})
+
+    @override_settings(EMAIL_SENDING_LEASE=600)
+    def test_claimed_rows_are_sent_once(self):
+        log = EmailLog.objects.create(
+            email_type='OTHER', status='QUEUED', recipient_name='R',
+            recipient_email='r@example.com', subject='Hi', payload={'text': 'hi'},
+        )
+        EmailLog.objects.filter(pk=log.pk).update(status='SENDING', claimed_at=timezone.now())
+
+        self.assertEqual(email_queue.deliver([log.pk]), [])    # another sender holds it
+        self.assertEqual(email_queue.flush_pending(older_than_secs=0), 0)
+        self.assertEqual(mail.outbox, [])
+
+        EmailLog.objects.filter(pk=log.pk).update(claimed_at=timezone.now() - timedelta(minutes=11))
+        self.assertEqual(email_queue.flush_pending(older_than_secs=0), 1)   # that sender died
+
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts, log.claimed_at), ('SENT', 1, None))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_tasks_route_to_queues_the_worker_consumes(self):
+        from config.celery import app
+
+        app.loader.import_default_modules()
+        worker_queues = {'default', 'emails', 'reports'}   # docker-compose.prod.yml `-Q`
+        for name in app.tasks:
+            if name.startswith('apps.'):
+                self.assertIn(app.amqp.router.route({}, name)['queue'].name, worker_queues, name)
+        self.assertEqual(app.amqp.router.route({}, 'apps.core.tasks.send_queued_emails')['queue'].name, 'emails')
+        self.assertEqual(app.amqp.router.route({}, 'apps.core.tasks.flush_email_queue')['queue'].name, 'emails')
+
+    @override_settings(EMAIL_QUEUE_SYNC=False)
+    def test_dispatch_falls_back_to_local_pool(self):
+        with patch('apps.core.tasks.send_queued_emails.apply_async', side_effect=OSError('no broker')), \
+                patch.object(email_queue, '_broker_down_until', 0.0), \
+                patch('apps.core.email_queue._local_pool') as pool:
+            email_queue.dispatch([7])
+
+        pool.return_value.submit.assert_called_once_with(email_queue._run_local, [7])
+
+
+@override_settings(SYNC_CURSOR_OVERLAP=0)
+class DashboardSyncTestCase(TestCase):
+    url = '/api/v1/dashboard/combined/'
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass12345',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = HouseProject.objects.create(
+            name='Sync Project', owner_name='Owner', address='Site',
+            total_budget='100000.00', start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31), area_sqft=1200,
+        )
+        self.floor = Floor.objects.create(project=self.project, name='Ground', level=0)
+        self.kitchen = Room.objects.create(floor=self.floor, name='Kitchen')
+        self.bedroom = Room.objects.create(floor=self.floor, name='Bedroom')
+
+    def _get(self, **params):
+        return self.client.get(self.url, {'project_id': self.project.pk, **params})
+
+    def test_full_load_carries_cursor_and_etags(self):
+        response = self._get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['rooms']), 2)
+        self.assertTrue(response.data['sync']['cursor'])
+        self.assertEqual(set(response.data['sync']['etags']), set(sync.section_names()))
+
+    def test_since_returns_only_changed_rows(self):
+        cursor = self._get().data['sync']['cursor']
+        self.kitchen.name = 'Kitchen & Dining'
+        self.kitchen.save()
+
+        data = self._get(since=cursor).data
+
+        self.assertEqual([r['name'] for r in data['rooms']], ['Kitchen & Dining'])
+        self.assertEqual([f['id'] for f in data['floors']], [self.floor.pk])
+        self.assertIn('project', data['sync']['full'])
+        self.assertEqual(data['tasks'], [])     # tasks nest their room
+        self.assertNotIn('materials', data)
+        self.assertNotIn('userGuides', data)
+
+    def test_deleted_rows_become_tombstones(self):
+        cursor = self._get().data['sync']['cursor']
+        bedroom_id = self.bedroom.pk
+        self.bedroom.delete()
+
+        data = self._get(since=cursor).data
+
+        self.assertEqual(data['rooms'], [])
+        self.assertEqual(data['sync']['deleted']['rooms'], [str(bedroom_id)])
+
+    def test_moved_row_refreshes_old_parent(self):
+        upper = Floor.objects.create(project=self.project, name='First', level=1)
+        cursor = self._get().data['sync']['cursor']
+        self.kitchen.floor = upper
+        self.kitchen.save()
+
+        data = self._get(since=cursor, sections='floors').data
+
+        self.assertEqual({f['id'] for f in data['floors']}, {self.floor.pk, upper.pk})
+
+    def test_phase_reorder_is_logged(self):
+        first = ConstructionPhase.objects.create(project=self.project, name='Foundation', order=1)
+        second = ConstructionPhase.objects.create(project=self.project, name='Framing', order=2)
+        cursor = self._get().data['sync']['cursor']
+
+        response = self.client.post('/api/v1/phases/reorder/', {
+            'order': [{'id': first.pk, 'order': 2}, {'id': second.pk, 'order': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        data = self._get(since=cursor, sections='phases,project').data
+        self.assertEqual([(p['id'], p['order']) for p in data['phases']], [(second.pk, 1), (first.pk, 2)])
+        self.assertIn('project', data['sync']['full'])
+
+    def test_worker_assignment_syncs_its_task(self):
+        phase = ConstructionPhase.objects.create(project=self.project, name='Foundation', order=1)
+        task = Task.objects.create(title='Pour footing', phase=phase, room=self.kitchen)
+        worker = WorkforceMember.objects.create(
+            current_project=self.project, _first_name='Ali', _last_name='Raza', join_date=date(2026, 1, 1),
+        )
+        cursor = self._get().data['sync']['cursor']
+
+        response = self.client.post('/api/v1/workforce/assignments/', {
+            'worker': str(worker.pk), 'project': self.project.pk, 'task': task.pk, 'start_date': '2026-03-01',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+        data = self._get(since=cursor, sections='tasks').data
+        self.assertEqual([(t['id'], t['assigned_to']) for t in data['tasks']], [(task.pk, worker.pk)])
+
+        # Unassign before teardown: on SQLite tasks 0002 leaves assigned_to pointing at resource_worker.
+        cursor = data['sync']['cursor']
+        self.client.delete(f"/api/v1/workforce/assignments/{response.data['id']}/")
+        data = self._get(since=cursor, sections='tasks').data
+        self.assertEqual([(t['id'], t['assigned_to']) for t in data['tasks']], [(task.pk, None)])
+
+    def test_sections_filter_and_validation(self):
+        data = self._get(sections='rooms,floors').data
+        self.assertEqual(set(data) - {'sync'}, {'rooms', 'floors'})
+
+        response = self._get(sections='rooms,bogus')
+        self.assertEqual(response.status_code, 400)
+
+    def test_if_none_match_skips_unchanged_sections(self):
+        etags = self._get().data['sync']['etags']
+
+        response = self.client.get(
+            self.url, {'project_id': self.project.pk, 'sections': 'rooms'},
+            HTTP_IF_NONE_MATCH=etags['rooms'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            self.url, {'project_id': self.project.pk},
+            HTTP_IF_NONE_MATCH=', '.join([etags['rooms'], etags['tasks']]),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('rooms', response.data)
+        self.assertIn('floors', response.data)
+
+        Room.objects.create(floor=self.floor, name='Store')
+        response = self.client.get(
+            self.url, {'project_id': self.project.pk, 'sections': 'rooms'},
+            HTTP_IF_NONE_MATCH=etags['rooms'],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['rooms']), 3)
+
+    def test_invalidate_all_and_stale_cursor_force_full_reload(self):
+        cursor = self._get().data['sync']['cursor']
+        sync.invalidate_all()
+
+        data = self._get(since=cursor).data
+        self.assertEqual(len(data['rooms']), 2)
+        self.assertIn('rooms', data['sync']['full'])
+
+        data = self._get(since='12345').data
+        self.assertTrue(data['sync']['reset'])
+        self.assertEqual(len(data['rooms']), 2)
+
+    def test_prune_drops_old_changes(self):
+        SyncChange.objects.update(changed_at=date(2020, 1, 1))
+        self.assertGreater(sync.prune(), 0)
+        self.assertFalse(SyncChange.objects.exists())
+
+
+def _jpeg(name='site.jpg', size=(2000, 1500)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, (200, 120, 40)).save(buf, 'JPEG')
+    return SimpleUploadedFile(name, buf.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_THUMBNAILS_SYNC=True)
+class GalleryTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage_override = override_settings(MEDIA_ROOT=self.media_root)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = HouseProject.objects.create(
+            name='Gallery Project', owner_name='Owner', address='Site',
+            total_budget='100000.00', start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31), area_sqft=1200,
+        )
+        ProjectMember.objects.create(project=self.project, user=self.user)
+        self.phase = ConstructionPhase.objects.create(project=self.project, name='Foundation', order=1)
+        self.task = Task.objects.create(title='Pour footing', phase=self.phase)
+
+    def _upload(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TaskMedia.objects.create(file=_jpeg(), **kwargs)
+
+    def test_upload_is_indexed_with_thumbnails(self):
+        media = self._upload(task=self.task, description='Rebar check')
+
+        item = MediaItem.objects.get(source_type='TASK_MEDIA', object_id=media.pk)
+        self.assertEqual((item.project, item.phase, item.title), (self.project, self.phase, 'Pour footing'))
+        self.assertEqual(item.thumb_status, 'READY')
+        self.assertEqual(set(item.thumbnails), set(thumbnails.SIZES))
+        with default_storage.open(item.thumbnails['md']) as fh:
+            thumb = Image.open(fh)
+            self.assertEqual((thumb.format, max(thumb.size)), ('WEBP', 480))
+
+        data = self.client.get('/api/v1/gallery/', {'group_by': 'phases'}).data
+        self.assertEqual(data[0]['groupName'], '1. Foundation')
+        tile = data[0]['items'][0]
+        self.assertEqual(tile['id'], f'task_{media.pk}')
+        self.assertEqual(tile['description'], 'Rebar check')
+        self.assertTrue(tile['thumbnail'].endswith('_md.webp'))
+
+    def test_dependents_and_deletes_keep_index_in_step(self):
+        media = self._upload(task=self.task)
+        self.task.title = 'Pour footing (east)'
+        self.task.save()
+        self.phase.name = 'Substructure'
+        self.phase.save()
+        item = MediaItem.objects.get(object_id=media.pk)
+        self.assertEqual((item.title, item.subtitle), ('Pour footing (east)', 'Phase 1: Substructure'))
+
+        thumb = item.thumbnails['sm']
+        with self.captureOnCommitCallbacks(execute=True):
+            media.delete()
+        self.assertFalse(MediaItem.objects.exists())
+        self.assertFalse(default_storage.exists(thumb))
+
+    def test_permit_documents_follow_step_membership(self):
+        doc = PermitDocument.objects.create(
+            title='Lalpurja', document_type='LALPURJA',
+            file=SimpleUploadedFile('lalpurja.pdf', b'%PDF-1.4', content_type='application/pdf'),
+        )
+        step = PermitStep.objects.create(title='Darta', project=self.project)
+        step.documents.add(doc)
+
+        data = self.client.get('/api/v1/gallery/', {'group_by': 'permits'}).data
+        self.assertEqual([i['id'] for i in data[0]['items']], [f'doc_{doc.pk}'])
+
+        step.documents.remove(doc)
+        self.assertFalse(MediaItem.objects.filter(source_type='LEGAL_DOC').exists())
+
+    def test_feed_is_cursor_paginated_newest_first(self):
+        ids = [self._upload(task=self.task).pk for _ in range(5)]
+
+        page = self.client.get('/api/v1/gallery/feed/', {'page_size': 2}).data
+        self.assertEqual([i['id'] for i in page['results']], [f'task_{pk}' for pk in ids[:-3:-1]])
+        self.assertIn('group', page['results'][0])
+
+        seen = [i['id'] for i in page['results']]
+        while page['next']:
+            page = self.client.get(page['next']).data
+            seen += [i['id'] for i in page['results']]
+        self.assertEqual(seen, [f'task_{pk}' for pk in reversed(ids)])
+
+    def test_feed_query_count_is_flat(self):
+        for _ in range(3):
+            self._upload(task=self.task)
+        # project scope, page
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/gallery/feed/', {'project': self.project.pk})
+
+    def test_rebuild_command_restores_index(self):
+        media = self._upload(project=self.project)
+        MediaItem.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('rebuild_media_index', stdout=out)
+
+        item = MediaItem.objects.get(object_id=media.pk)
+        self.assertEqual((item.title, item.subtitle, item.thumb_status), ('Unassigned Upload', 'Gallery Project', 'READY'))
+        self.assertIn('OK', out.getvalue())
+
+    def test_rebuild_command_backfills_only_an_empty_index(self):
+        media = self._upload(project=self.project)
+        item = MediaItem.objects.get(object_id=media.pk)
+        MediaItem.objects.filter(pk=item.pk).update(title='Edited elsewhere')
+
+        call_command('rebuild_media_index', '--if-empty', '--no-render', stdout=io.StringIO())
+        self.assertEqual(MediaItem.objects.get().title, 'Edited elsewhere')
+
+        MediaItem.objects.all().delete()
+        call_command('rebuild_media_index', '--if-empty', '--no-render', stdout=io.StringIO())
+        item = MediaItem.objects.get(object_id=media.pk)
+        self.assertEqual((item.title, item.thumb_status), ('Unassigned Upload', 'PENDING'))
+
+    @override_settings(MEDIA_THUMBNAILS_SYNC=False)
+    def test_dispatch_falls_back_to_local_pool(self):
+        with patch('apps.core.tasks.generate_thumbnails.apply_async', side_effect=ConnectionError), \
+                patch.object(thumbnails, '_local_pool') as pool, \
+                patch.object(thumbnails, '_broker_down_until', 0.0):
+            thumbnails.dispatch([3])
+
+        pool.return_value.submit.assert_called_once_with(thumbnails._run_local, [3])
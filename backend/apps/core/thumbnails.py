@@ -0,0 +1,180 @@
+"""
+Gallery thumbnail derivatives.
+
+Every IMAGE row of the media index (core/media_index.py) gets a few
+downscaled copies so gallery grids never download the original:
+
+    sm   160 px on the long edge    dense grids, list avatars
+    md   480 px                     default gallery tile
+    lg  1280 px                     lightbox preview before the original loads
+
+They are WebP (MEDIA_THUMBNAIL_FORMAT='JPEG' for old clients), EXIF-rotated,
+and stored under thumbs/<original path>_<size>.<ext>.
+Derivatives are keyed by file, not row: the same photo indexed under two
+projects is rendered once.
+
+Dispatch
+--------
+    The index marks new/changed images PENDING and calls `enqueue(ids)`;
+    once the transaction commits the ids go to the `generate_thumbnails`
+    Celery task, or to a small local pool while the broker is unreachable.
+    MEDIA_THUMBNAILS_SYNC=True renders inline (tests).  The "Render Pending
+    Thumbnails" beat task sweeps rows left PENDING by a lost task.  A file
+    Pillow can't open is marked FAILED and the gallery falls back to the
+    original URL.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SIZES = {'sm': 160, 'md': 480, 'lg': 1280}
+BROKER_BACKOFF_SECS = 60
+SWEEP_BATCH = 200
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_broker_down_until = 0.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _format():
+    fmt = str(_setting('MEDIA_THUMBNAIL_FORMAT', 'WEBP')).upper()
+    return ('JPEG', 'jpg') if fmt in ('JPG', 'JPEG') else ('WEBP', 'webp')
+
+
+def thumbnail_name(name: str, size: str) -> str:
+    stem, _ = os.path.splitext(name)
+    return f"thumbs/{stem}_{size}.{_format()[1]}"
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Rendering
+# ─────────────────────────────────────────────────────────────────────
+def render(name: str) -> Dict[str, str]:
+    """Write every size for storage file `name`; returns size → storage name."""
+    from PIL import Image, ImageOps
+
+    fmt, _ = _format()
+    quality = _setting('MEDIA_THUMBNAIL_QUALITY', 80)
+    with default_storage.open(name, 'rb') as fh:
+        image = Image.open(fh)
+        # JPEG can decode straight at a reduced scale — far cheaper on phone photos
+        image.draft('RGB', (max(SIZES.values()) * 2,) * 2)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    if fmt == 'JPEG' and image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+
+    written = {}
+    # Largest first, each size resampled from the previous one
+    for size, edge in sorted(SIZES.items(), key=lambda kv: -kv[1]):
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        buf = io.BytesIO()
+        if fmt == 'WEBP':
+            image.save(buf, fmt, quality=quality, method=4)
+        else:
+            image.save(buf, fmt, quality=quality, optimize=True, progressive=True)
+        target = thumbnail_name(name, size)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        written[size] = default_storage.save(target, ContentFile(buf.getvalue()))
+    return written
+
+
+def generate(item_ids: Iterable[int]) -> int:
+    """Render PENDING rows among `item_ids`; returns the number of files rendered."""
+    from .models import MediaItem
+
+    names = set(
+        MediaItem.objects.filter(pk__in=list(item_ids), thumb_status='PENDING').values_list('file', flat=True)
+    )
+    for name in names:
+        try:
+            thumbs, status = render(name), 'READY'
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Thumbnail render failed for %s: %s", name, e)
+            thumbs, status = {}, 'FAILED'
+        MediaItem.objects.filter(file=name, media_type='IMAGE').exclude(thumb_status='NONE').update(
+            thumbnails=thumbs, thumb_status=status,
+        )
+    return len(names)
+
+
+def render_pending(limit: int = SWEEP_BATCH) -> int:
+    from .models import MediaItem
+
+    ids = list(MediaItem.objects.filter(thumb_status='PENDING').values_list('pk', flat=True)[:limit])
+    return generate(ids) if ids else 0
+
+
+def delete_files(names: Iterable[str]) -> None:
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Could not delete thumbnail %s: %s", name, e)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Dispatch
+# ─────────────────────────────────────────────────────────────────────
+def enqueue(item_ids: List[int]) -> None:
+    """Render thumbnails for MediaItem `item_ids` once the current transaction commits."""
+    if item_ids:
+        transaction.on_commit(lambda: dispatch(list(item_ids)))
+
+
+def dispatch(item_ids: List[int]) -> None:
+    global _broker_down_until
+    if _setting('MEDIA_THUMBNAILS_SYNC', False):
+        generate(item_ids)
+        return
+
+    if time.monotonic() >= _broker_down_until:
+        try:
+            from .tasks import generate_thumbnails
+            generate_thumbnails.apply_async(args=[item_ids], retry=False)
+            return
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Celery unavailable for thumbnails (%s); using local pool.", e)
+            _broker_down_until = time.monotonic() + BROKER_BACKOFF_SECS
+    _local_pool().submit(_run_local, item_ids)
+
+
+def _local_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbs')
+        return _pool
+
+
+def _run_local(item_ids: List[int]):
+    try:
+        close_old_connections()
+        generate(item_ids)
+    except Exception:  # noqa: BLE001
+        logger.exception("Local thumbnail batch crashed for items=%s", item_ids)
+    finally:
+        connection.close()
@@ -1,3 +1,6 @@
+import hashlib
+
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -7,6 +10,7 @@ from .models import HouseProject, ConstructionPhase, PhaseDocument, Room, Floor,
 from .serializers import HouseProjectSerializer, ConstructionPhaseSerializer, PhaseDocumentSerializer, RoomSerializer, FloorSerializer, UserGuideSerializer, UserGuideStepSerializer, UserGuideFAQSerializer, UserGuideSectionSerializer, UserGuideProgressSerializer, EmailLogSerializer, ProjectMemberSerializer, ProjectRoleSerializer
 from apps.accounts.permissions import IsSystemAdmin, CanManagePhases, CanManageStructure
 from apps.core.mixins import ProjectScopedMixin
+from apps.core import sync
 
 from apps.tasks.models import Task
 from apps.tasks.serializers import TaskSerializer
@@ -331,10 +335,13 @@ class ConstructionPhaseViewSet(ProjectScopedMixin, viewsets.ModelViewSet):
             return Response({'error': 'No order list provided'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
+            moved = []
             for item in order_list:
                 phase_id = item.get('id')
                 new_order = item.get('order')
-                ConstructionPhase.objects.filter(id=phase_id).update(order=new_order)
+                if ConstructionPhase.objects.filter(id=phase_id).update(order=new_order):
+                    moved.append(phase_id)
+            sync.record_changes(ConstructionPhase, moved)
             return Response({'status': 'success'}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -359,7 +366,29 @@ class DashboardDataView(APIView):
         Unified endpoint to fetch all dashboard data in a single request.
         Accepts optional ?project_id=<id> to load a specific project.
         Non-admins are restricted to their assigned projects only.
+
+        Delta sync (see core/sync.py):
+          ?sections=tasks,expenses  only these sections
+          ?since=<cursor>           only rows changed since `sync.cursor` of
+                                    an earlier response, plus tombstones in
+                                    `sync.deleted`; sections listed in
+                                    `sync.full` are complete replacements
+          If-None-Match             section ETags from `sync.etags`; matching
+                                    sections are skipped, 304 if all match
         """
+        requested = request.query_params.get('sections')
+        sections = sync.section_names()
+        if requested:
+            wanted = [s.strip() for s in requested.split(',') if s.strip()]
+            unknown = [s for s in wanted if s not in sections]
+            if unknown:
+                return Response(
+                    {'error': f"Unknown sections: {', '.join(unknown)}", 'sections': sections},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            sections = [s for s in sections if s in wanted]
+        started = timezone.now()
+
         user = request.user
         is_admin = getattr(user, 'is_system_admin', False)
 
@@ -439,54 +468,95 @@ class DashboardDataView(APIView):
             user_guides = UserGuide.objects.filter(is_active=True).prefetch_related('steps', 'faqs', 'sections')
         user_guide_progress = UserGuideProgress.objects.filter(user=request.user)
 
+        etags = sync.section_etags(sections, user, project)
+        combined = '"dash:{}"'.format(hashlib.sha1(''.join(etags.values()).encode()).hexdigest()[:16])
+        known = sync.parse_if_none_match(request.headers.get('If-None-Match'))
+        unchanged = [s for s in sections if etags[s] in known]
+        if combined in known or len(unchanged) == len(sections):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = combined
+            return response
+
+        since = None
+        cursor = request.query_params.get('since')
+        if cursor:
+            since = sync.parse_cursor(cursor)
+        changes = sync.changes_since(since, sections) if since else None
+
+        ctx = {'request': request, 'project': project}
+        listed = {
+            'phases': (phases, ConstructionPhaseSerializer),
+            'rooms': (rooms, RoomSerializer),
+            'tasks': (tasks, TaskSerializer),
+            'expenses': (expenses, ExpenseSerializer),
+            'floors': (floors, FloorSerializer),
+            'materials': (materials, MaterialSerializer),
+            'contractors': (contractors, WorkforceMemberBriefSerializer),
+            'budgetCategories': (budget_categories, BudgetCategorySerializer),
+            'suppliers': (suppliers, SupplierSerializer),
+            'transactions': (transactions, MaterialTransactionSerializer),
+            'permits': (permits, PermitStepSerializer),
+            'funding': (funding, FundingSourceSerializer),
+            'phaseBudgetAllocations': (phase_allocations, PhaseBudgetAllocationSerializer),
+            'userGuides': (user_guides, UserGuideSerializer),
+            'userGuideProgress': (user_guide_progress, UserGuideProgressSerializer),
+            'accounts': (accounts, AccountSerializer),
+        }
+
+        payload, full, deleted = {}, [], {}
+        for section in sections:
+            if section in unchanged or (changes and not changes.changed(section)):
+                continue
+            if section == 'project':
+                payload['project'] = HouseProjectSerializer(project).data if project else None
+            elif section == 'finance_summary':
+                payload['finance_summary'] = self._finance_summary(accounts)
+            else:
+                queryset, serializer_class = listed[section]
+                subset = changes.filter(section, queryset) if changes else None
+                if subset is None:
+                    payload[section] = serializer_class(queryset, many=True, context=ctx).data
+                else:
+                    rows = list(subset)
+                    payload[section] = serializer_class(rows, many=True, context=ctx).data
+                    removed = changes.tombstones(section, [row.pk for row in rows])
+                    if removed:
+                        deleted[section] = removed
+                    continue
+            if changes:
+                full.append(section)
+
+        payload['sync'] = {
+            'cursor': sync.make_cursor(started),
+            'since': cursor if since else None,
+            'reset': bool(cursor) and since is None,
+            'etags': etags,
+            'unchanged': unchanged,
+            'full': full if changes else [s for s in sections if s not in unchanged],
+            'deleted': deleted,
+        }
+        response = Response(payload)
+        response['ETag'] = etags[sections[0]] if len(sections) == 1 else combined
+        return response
+
+    @staticmethod
+    def _finance_summary(accounts):
         # -----------------------------------------------------
         # Finance Summary (Double-Entry Aggregation)
         # -----------------------------------------------------
-        # Evaluate balances in memory to avoid N+1 queries if we already fetched them, or just use properties
-        # For efficiency, computing in Python since Account count is very low.
-        total_assets = sum(acc.balance for acc in accounts if acc.account_type == 'ASSET')
-        total_liabilities = sum(acc.balance for acc in accounts if acc.account_type == 'LIABILITY')
-        total_equity = sum(acc.balance for acc in accounts if acc.account_type == 'EQUITY')
-        total_expenses = sum(acc.balance for acc in accounts if acc.account_type == 'EXPENSE')
-        total_revenue = sum(acc.balance for acc in accounts if acc.account_type == 'REVENUE')
-
-
-        finance_summary = {
-            'total_assets': total_assets,
-            'total_liabilities': total_liabilities,
-            'total_equity': total_equity,
-            'total_expenses': total_expenses,
-            'total_revenue': total_revenue,
+        # Computing in Python since Account count is very low.
+        totals = {t: 0 for t in ('ASSET', 'LIABILITY', 'EQUITY', 'EXPENSE', 'REVENUE')}
+        for acc in accounts:
+            if acc.account_type in totals:
+                totals[acc.account_type] += acc.balance
+        return {
+            'total_assets': totals['ASSET'],
+            'total_liabilities': totals['LIABILITY'],
+            'total_equity': totals['EQUITY'],
+            'total_expenses': totals['EXPENSE'],
+            'total_revenue': totals['REVENUE'],
         }
 
-        # We also pass all accounts back to easily map for forms on the dashboard if needed
-        # Or bills/purchases to keep the main view fully loaded (if performance is okay, we keep it simple for now).
-        # To avoid explosive payload size, we don't send *all* bills and Journal entries through DashboardDataView,
-        # but we send Accounts so the UI has them cached.
-        
-        ctx = {'request': request, 'project': project}
-
-        return Response({
-            'project': HouseProjectSerializer(project).data if project else None,
-            'phases': ConstructionPhaseSerializer(phases, many=True, context=ctx).data,
-            'rooms': RoomSerializer(rooms, many=True, context=ctx).data,
-            'tasks': TaskSerializer(tasks, many=True, context=ctx).data,
-            'expenses': ExpenseSerializer(expenses, many=True, context=ctx).data,
-            'floors': FloorSerializer(floors, many=True, context=ctx).data,
-            'materials': MaterialSerializer(materials, many=True, context=ctx).data,
-            'contractors': WorkforceMemberBriefSerializer(contractors, many=True, context=ctx).data,
-            'budgetCategories': BudgetCategorySerializer(budget_categories, many=True, context=ctx).data,
-            'suppliers': SupplierSerializer(suppliers, many=True, context=ctx).data,
-            'transactions': MaterialTransactionSerializer(transactions, many=True, context=ctx).data,
-            'permits': PermitStepSerializer(permits, many=True, context=ctx).data,
-            'funding': FundingSourceSerializer(funding, many=True, context=ctx).data,
-            'phaseBudgetAllocations': PhaseBudgetAllocationSerializer(phase_allocations, many=True, context=ctx).data,
-            'userGuides': UserGuideSerializer(user_guides, many=True, context=ctx).data,
-            'userGuideProgress': UserGuideProgressSerializer(user_guide_progress, many=True, context=ctx).data,
-            'accounts': AccountSerializer(accounts, many=True, context=ctx).data,
-            'finance_summary': finance_summary,
-        })
-
 class RoomViewSet(ProjectScopedMixin, viewsets.ModelViewSet):
     queryset = Room.objects.select_related('floor').order_by('floor__level', 'name')
     serializer_class = RoomSerializer
@@ -7,16 +7,28 @@ data types: workforce members, materials/inventory, and attendance records.
 Export functions return an HttpResponse (CSV or XLSX).
 Import functions return a (preview_rows, error_list) tuple for dry-run,
 or commit the rows and return (imported_count, skipped_count, error_list).
+
+Imports are set-based: the upload is streamed row by row, existing keys
+and lookups (roles, suppliers, employee ids) are resolved once up front,
+and rows are written with bulk_create in IMPORT_CHUNK_SIZE chunks — one
+transaction per chunk, so ImportJob progress is visible while the job
+runs (import_jobs.py).  A chunk that fails is retried row by row so one
+bad row is reported instead of losing its neighbours.
 """
 
+import codecs
 import csv
 import io
 import datetime
-from typing import Optional
+from decimal import Decimal, InvalidOperation
+from typing import Iterator, Optional
 
+from django.db import transaction
 from django.http import HttpResponse
 from django.utils import timezone
 
+IMPORT_CHUNK_SIZE = 500
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Shared helpers
@@ -75,10 +87,22 @@ def _xlsx_response(filename: str, headers: list[str], rows: list[list]) -> HttpR
     return response
 
 
-def _read_upload(file_obj) -> tuple[list[str], list[list]]:
+def _cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _iter_upload(file_obj) -> tuple[list[str], Iterator[list[str]]]:
     """
-    Read an uploaded CSV or XLSX file.
-    Returns (headers, rows) where rows is a list of lists.
+    Stream an uploaded CSV or XLSX file.
+    Returns (headers, rows) where rows is a lazy iterator of lists — XLSX is
+    read with openpyxl's read-only mode, CSV is decoded as it is read, so
+    neither is ever held in memory whole.  Blank rows are dropped.
     Raises ValueError on unsupported format or parse error.
     """
     name = getattr(file_obj, 'name', '').lower()
@@ -88,25 +112,88 @@ def _read_upload(file_obj) -> tuple[list[str], list[list]]:
         except ImportError:
             raise ValueError('openpyxl is required to read Excel files. Use CSV instead.')
         wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
-        ws = wb.active
-        all_rows = [[str(c.value or '').strip() for c in row] for row in ws.iter_rows()]
-        if not all_rows:
+        values = wb.active.iter_rows(values_only=True)
+        first = next(values, None)
+        if first is None:
+            wb.close()
             raise ValueError('Empty spreadsheet.')
-        headers = all_rows[0]
-        rows = all_rows[1:]
-    elif name.endswith('.csv') or True:   # default to CSV
+        headers = [_cell(v) for v in first]
+
+        def xlsx_rows():
+            try:
+                for row in values:
+                    cells = [_cell(v) for v in row]
+                    if any(cells):
+                        yield cells
+            finally:
+                wb.close()
+        return headers, xlsx_rows()
+
+    # default to CSV
+    raw = getattr(file_obj, 'file', file_obj)
+    raw.seek(0)
+    sample = raw.read(64 * 1024)
+    raw.seek(0)
+    try:
+        codecs.getincrementaldecoder('utf-8-sig')().decode(sample, final=False)
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'latin-1'
+    text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+    reader = csv.reader(text)
+    first = next(reader, None)
+    if first is None:
+        text.detach()
+        raise ValueError('Empty file.')
+    headers = [h.strip() for h in first]
+
+    def csv_rows():
+        try:
+            for r in reader:
+                if any(c.strip() for c in r):
+                    yield [c.strip() for c in r]
+        finally:
+            # Leave the caller's file open — it owns it.
+            text.detach()
+    return headers, csv_rows()
+
+
+def _read_upload(file_obj) -> tuple[list[str], list[list]]:
+    """
+    Read an uploaded CSV or XLSX file (dry runs).
+    Returns (headers, rows) where rows is a list of lists.
+    Raises ValueError on unsupported format or parse error.
+    """
+    headers, rows = _iter_upload(file_obj)
+    return headers, list(rows)
+
+
+def _bulk_insert(model, pending, job, skipped, errors) -> tuple[int, int]:
+    """
+    Write `pending` [(row number, unsaved instance)] with bulk_create in
+    IMPORT_CHUNK_SIZE chunks, one transaction each, updating `job` after
+    every chunk.  Returns (imported, skipped).
+    """
+    imported = 0
+    processed = job.rows_total - len(pending)     # errors / duplicates already settled
+    for start in range(0, len(pending), IMPORT_CHUNK_SIZE):
+        chunk = pending[start:start + IMPORT_CHUNK_SIZE]
         try:
-            content = file_obj.read().decode('utf-8-sig')
-        except UnicodeDecodeError:
-            file_obj.seek(0)
-            content = file_obj.read().decode('latin-1')
-        reader = csv.reader(io.StringIO(content))
-        all_rows = list(reader)
-        if not all_rows:
-            raise ValueError('Empty file.')
-        headers = [h.strip() for h in all_rows[0]]
-        rows = [[c.strip() for c in r] for r in all_rows[1:] if any(c.strip() for c in r)]
-    return headers, rows
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in chunk])
+            imported += len(chunk)
+        except Exception:
+            for idx, obj in chunk:
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([obj])
+                    imported += 1
+                except Exception as e:
+                    errors.append({'row': idx, 'message': f'Save failed: {e}'})
+                    skipped += 1
+        processed += len(chunk)
+        job.update_progress(processed, imported, skipped, len(errors))
+    return imported, skipped
 
 
 def _to_date(val: str) -> Optional[datetime.date]:
@@ -263,10 +350,12 @@ def import_workforce(file_obj, project_id: int, created_by, job) -> tuple[int, i
     """
     Commit workforce import. Returns (imported, skipped, errors).
     Skips rows whose (first_name, last_name) already exist in this project.
+    Employee ids for all new rows are reserved in one step and the members
+    are bulk-created — the per-row save() path is not used.
     """
     from apps.workforce.models import WorkforceMember, WorkforceRole
     try:
-        headers, rows = _read_upload(file_obj)
+        headers, rows = _iter_upload(file_obj)
     except ValueError as e:
         job.mark_failed(str(e))
         return 0, 0, [{'row': 0, 'message': str(e)}]
@@ -281,7 +370,7 @@ def import_workforce(file_obj, project_id: int, created_by, job) -> tuple[int, i
     # Build role lookup once (by title, case-insensitive)
     role_map = {r.title.lower(): r for r in WorkforceRole.objects.all()}
 
-    imported, skipped, errors = 0, 0, []
+    skipped, errors, pending = 0, [], []
 
     for idx, row in enumerate(rows, 2):
         data, err = _parse_workforce_row(idx, headers, row)
@@ -293,33 +382,34 @@ def import_workforce(file_obj, project_id: int, created_by, job) -> tuple[int, i
         if key in existing_keys:
             skipped += 1
             continue
+        existing_keys.add(key)
 
         role = role_map.get((data.pop('role_title') or '').lower())
-        try:
-            # Must call save() individually — bulk_create bypasses save() and
-            # therefore skips the auto employee_id generation logic.
-            member = WorkforceMember(
-                current_project_id = project_id,
-                _first_name        = data['first_name'],
-                _last_name         = data['last_name'],
-                worker_type        = data['worker_type'],
-                role               = role,
-                _phone             = data['phone'] or '',
-                _email             = data['email'] or '',
-                gender             = data['gender'],
-                nationality        = data['nationality'],
-                join_date          = data['join_date'],
-                end_date           = data['end_date'],
-                status             = 'ACTIVE',
-                created_by         = created_by,
-            )
-            member.save()
-            existing_keys.add(key)
-            imported += 1
-        except Exception as e:
-            errors.append({'row': idx, 'message': f'Save failed: {e}'})
-            skipped += 1
-
+        pending.append((idx, WorkforceMember(
+            current_project_id = project_id,
+            _first_name        = data['first_name'],
+            _last_name         = data['last_name'],
+            worker_type        = data['worker_type'],
+            role               = role,
+            _phone             = data['phone'] or '',
+            _email             = data['email'] or '',
+            gender             = data['gender'],
+            nationality        = data['nationality'],
+            join_date          = data['join_date'],
+            end_date           = data['end_date'],
+            status             = 'ACTIVE',
+            created_by         = created_by,
+        )))
+
+    job.rows_total = len(pending) + skipped
+    job.save(update_fields=['rows_total'])
+
+    if pending:
+        employee_ids = WorkforceMember.allocate_employee_ids(len(pending))
+        for (_, member), employee_id in zip(pending, employee_ids):
+            member.employee_id = employee_id
+
+    imported, skipped = _bulk_insert(WorkforceMember, pending, job, skipped, errors)
     job.mark_done(imported, skipped, len(errors), errors)
     return imported, skipped, errors
 
@@ -344,7 +434,6 @@ def export_materials(project_id: int, fmt: str = 'csv') -> HttpResponse:
     materials = (
         Material.objects
         .filter(project_id=project_id)
-        .select_related('supplier')
         .order_by('name')
     )
     rows = []
@@ -355,9 +444,9 @@ def export_materials(project_id: int, fmt: str = 'csv') -> HttpResponse:
             m.category or '',
             m.unit or '',
             str(m.unit_price or ''),
-            str(m.quantity_in_stock or 0),
+            str(m.stock_qty or 0),
             str(m.reorder_level or 0),
-            m.supplier.name if m.supplier else '',
+            '',     # Material has no supplier link; column kept for the template
         ])
 
     ts = datetime.datetime.utcnow().strftime('%Y%m%d')
@@ -366,6 +455,23 @@ def export_materials(project_id: int, fmt: str = 'csv') -> HttpResponse:
     return _csv_response(f'materials_{project_id}_{ts}.csv', MATERIAL_EXPORT_HEADERS, rows)
 
 
+MATERIAL_CATEGORIES = {'CEMENT', 'STEEL', 'SAND', 'AGGREGATE', 'BRICK', 'WOOD',
+                       'ELECTRICAL', 'PLUMBING', 'OTHER'}
+MATERIAL_UNITS = {'kg', 'ton', 'bag', 'pcs', 'ft', 'm', 'm2', 'm3', 'ltr', 'bundle', 'box', 'roll'}
+
+
+def _choice(val: str, choices: set, default: str) -> str:
+    return val if val in choices else default
+
+
+def _material_unit(val: str) -> str:
+    """'bags' → 'bag', 'PCS' → 'pcs'; unknown units fall back to pcs."""
+    val = val.lower()
+    if val not in MATERIAL_UNITS and val.endswith('s'):
+        val = val[:-1]
+    return _choice(val, MATERIAL_UNITS, 'pcs')
+
+
 def _parse_material_row(idx: int, headers: list[str], row: list[str]) -> tuple[dict, Optional[str]]:
     col = {h.lower().strip(): i for i, h in enumerate(headers)}
 
@@ -377,16 +483,16 @@ def _parse_material_row(idx: int, headers: list[str], row: list[str]) -> tuple[d
     if not name:
         return {}, f'Row {idx}: name is required'
 
-    def _float(val, default=0.0):
+    def _float(val, default=Decimal('0')):
         try:
-            return float(val) if val else default
-        except ValueError:
+            return Decimal(val) if val else default
+        except InvalidOperation:
             return default
 
     return {
         'name':               name,
-        'category':           get('category') or '',
-        'unit':               get('unit') or 'pcs',
+        'category':           _choice(get('category').upper(), MATERIAL_CATEGORIES, 'OTHER'),
+        'unit':               _material_unit(get('unit')),
         'unit_price':         _float(get('unit_price')),
         'quantity_in_stock':  _float(get('quantity_in_stock')),
         'reorder_level':      _float(get('reorder_level')),
@@ -423,26 +529,21 @@ def dry_run_materials(file_obj, project_id: int) -> tuple[list[dict], list[dict]
 
 
 def import_materials(file_obj, project_id: int, created_by, job) -> tuple[int, int, list[dict]]:
+    """
+    Commit materials import. Returns (imported, skipped, errors).
+    Skips names that already exist in this project.  Supplier names are
+    resolved in one query and the missing ones created in one bulk insert.
+    """
     from apps.resource.models import Material, Supplier
     try:
-        headers, rows = _read_upload(file_obj)
+        headers, rows = _iter_upload(file_obj)
     except ValueError as e:
         job.mark_failed(str(e))
         return 0, 0, [{'row': 0, 'message': str(e)}]
 
     existing = set(Material.objects.filter(project_id=project_id).values_list('name', flat=True))
-    supplier_cache = {}
 
-    def _get_supplier(name):
-        if not name:
-            return None
-        if name not in supplier_cache:
-            s, _ = Supplier.objects.get_or_create(project_id=project_id, name=name)
-            supplier_cache[name] = s
-        return supplier_cache[name]
-
-    imported, skipped, errors = 0, 0, []
-    to_create = []
+    skipped, errors, pending, supplier_names = 0, [], [], set()
 
     for idx, row in enumerate(rows, 2):
         data, err = _parse_material_row(idx, headers, row)
@@ -453,24 +554,36 @@ def import_materials(file_obj, project_id: int, created_by, job) -> tuple[int, i
         if data['name'] in existing:
             skipped += 1
             continue
-
-        supplier = _get_supplier(data.pop('supplier_name'))
-        to_create.append(Material(
-            project_id        = project_id,
-            name              = data['name'],
-            category          = data['category'],
-            unit              = data['unit'],
-            unit_price        = data['unit_price'],
-            quantity_in_stock = data['quantity_in_stock'],
-            reorder_level     = data['reorder_level'],
-            supplier          = supplier,
-        ))
         existing.add(data['name'])
 
-    if to_create:
-        Material.objects.bulk_create(to_create, ignore_conflicts=True)
-        imported = len(to_create)
+        if data['supplier_name']:
+            supplier_names.add(data['supplier_name'])
+        pending.append((idx, Material(
+            project_id    = project_id,
+            name          = data['name'],
+            category      = data['category'],
+            unit          = data['unit'],
+            unit_price    = data['unit_price'],
+            stock_qty     = data['quantity_in_stock'],
+            reorder_level = data['reorder_level'],
+        )))
+
+    job.rows_total = len(pending) + skipped
+    job.save(update_fields=['rows_total'])
+
+    # Material carries no supplier FK — the names populate the project's
+    # supplier directory, as the one-row-at-a-time importer did.
+    known = set(
+        Supplier.objects
+        .filter(project_id=project_id, name__in=supplier_names)
+        .values_list('name', flat=True)
+    )
+    Supplier.objects.bulk_create(
+        [Supplier(project_id=project_id, name=name) for name in sorted(supplier_names - known)],
+        batch_size=IMPORT_CHUNK_SIZE,
+    )
 
+    imported, skipped = _bulk_insert(Material, pending, job, skipped, errors)
     job.mark_done(imported, skipped, len(errors), errors)
     return imported, skipped, errors
 
@@ -2,14 +2,27 @@
 ConstructPro — Project SQL Exporter
 Generates a portable PostgreSQL SQL dump for a single project.
 The dump can be re-imported on any ConstructPro instance.
+
+The dump is produced as a stream: rows are read through server-side
+cursors, written as multi-row INSERTs and handed to the response chunk by
+chunk (optionally gzip-compressed), so memory stays flat regardless of
+project size.
 """
 import uuid
 import datetime
 import decimal
 import json
+import zlib
 from django.db import connection
 
 
+# Rows per multi-row INSERT, rows fetched per server-side cursor round trip,
+# and bytes buffered before a chunk is handed to the response.
+INSERT_BATCH_ROWS = 500
+ITERATOR_CHUNK_SIZE = 2000
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
 # ── Ordered export plan ───────────────────────────────────────
 # Each entry: (app_label, model_name, filter_kwargs_factory(project_id))
 # filter_kwargs_factory receives the project_id and returns ORM filter kwargs.
@@ -130,47 +143,85 @@ def _get_table_name(app_label, model_name):
     return model._meta.db_table
 
 
-def _rows_to_sql(app_label, model_name, filter_kwargs):
+def _table_sql(app_label, model_name, filter_kwargs, entry):
     """
-    Query rows matching filter_kwargs and return a list of INSERT SQL strings.
-    Returns (table_name, count, sql_lines).
+    Yield multi-row INSERT statements for rows matching filter_kwargs,
+    reading through a server-side cursor (`.iterator()`), so only one
+    chunk of rows is in memory at a time.  entry['table'] / entry['rows']
+    are filled in as rows stream past.
+
+    A row that can't be inserted on the target (typically an FK to a record
+    it doesn't have) only costs that row: sql_import bisects a failed
+    statement down to its VALUES tuples.
     """
     from django.apps import apps
     try:
         model = apps.get_model(app_label, model_name)
     except LookupError:
-        return model_name, 0, []
+        entry['table'] = model_name
+        return
+
+    table = model._meta.db_table
+    entry['table'] = table
+    columns = [f.attname for f in model._meta.concrete_fields]
+    col_list = ', '.join(f'"{c}"' for c in columns)
+    head = f'INSERT INTO "{table}" ({col_list}) VALUES\n'
+    tail = '\nON CONFLICT DO NOTHING;\n'
 
     try:
-        qs = model.objects.filter(**filter_kwargs).values()
+        rows = model.objects.filter(**filter_kwargs).order_by('pk').values_list(*columns).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
     except Exception:
-        return model._meta.db_table, 0, []
+        return
 
-    rows = list(qs)
-    if not rows:
-        return model._meta.db_table, 0, []
+    batch = []
+    for row in rows:
+        batch.append('(' + ', '.join(_pg_literal(v) for v in row) + ')')
+        entry['rows'] += 1
+        if len(batch) >= INSERT_BATCH_ROWS:
+            yield head + ',\n'.join(batch) + tail
+            batch = []
+    if batch:
+        yield head + ',\n'.join(batch) + tail
 
-    table = model._meta.db_table
-    columns = list(rows[0].keys())
-    col_list = ', '.join(f'"{c}"' for c in columns)
 
-    lines = []
-    for row in rows:
-        values = ', '.join(_pg_literal(row[c]) for c in columns)
-        lines.append(
-            f"INSERT INTO \"{table}\" ({col_list}) VALUES ({values}) "
-            f"ON CONFLICT DO NOTHING;"
-        )
+def _plan_sql(project_id, stats, comments=True):
+    """Yield the EXPORT_PLAN sections for one project, updating stats."""
+    for app_label, model_name, filter_factory in EXPORT_PLAN:
+        entry = {'model': f"{app_label}.{model_name}", 'table': model_name, 'rows': 0}
+        try:
+            filter_kwargs = filter_factory(project_id)
+            sections = _table_sql(app_label, model_name, filter_kwargs, entry)
+            first = next(sections, None)
+        except Exception as e:
+            yield f"-- SKIPPED {model_name}: {e}\n"
+            continue
 
-    return table, len(rows), lines
+        if comments:
+            yield f"-- ── {app_label}.{model_name} ──\n"
+        if first is not None:
+            yield first
+            yield from sections
+        if comments:
+            yield f"-- ({entry['rows']} rows)\n\n"
 
+        stats['tables'].append(entry)
+        stats['total_rows'] += entry['rows']
 
-# ── Main export function ──────────────────────────────────────
 
-def export_project_sql(project_id: int) -> tuple[str, dict]:
+def _summary(stats):
+    return (
+        f"-- Rows exported: {stats['total_rows']} "
+        f"from {len(stats['tables'])} table(s)\n"
+    )
+
+
+# ── Main export functions ─────────────────────────────────────
+
+def stream_project_sql(project_id: int):
     """
-    Generate a complete SQL dump for the given project.
-    Returns (sql_string, stats_dict).
+    SQL dump for one project as an iterator of text chunks.
+    Returns (chunks, stats); stats fills in while the iterator is consumed.
+    Raises ValueError up front if the project does not exist.
     """
     from django.apps import apps
 
@@ -180,68 +231,113 @@ def export_project_sql(project_id: int) -> tuple[str, dict]:
     except Exception:
         raise ValueError(f"Project with id={project_id} not found.")
 
-    now = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
-    lines = [
-        f"-- ============================================================",
-        f"-- ConstructPro SQL Export (Single Project)",
-        f"-- Project  : {project.name}",
-        f"-- Project ID: {project_id}",
-        f"-- Exported : {now}",
-        f"-- ============================================================",
-        f"BEGIN;",
-        f"",
-    ]
-
     stats = {'project': project.name, 'tables': [], 'total_rows': 0}
 
-    for app_label, model_name, filter_factory in EXPORT_PLAN:
-        try:
-            filter_kwargs = filter_factory(project_id)
-            table, count, sql_lines = _rows_to_sql(app_label, model_name, filter_kwargs)
-        except Exception as e:
-            lines.append(f"-- SKIPPED {model_name}: {e}")
-            continue
-
-        lines.append(f"-- ── {app_label}.{model_name} ({count} rows) ──")
-        if sql_lines:
-            lines.extend(sql_lines)
-        lines.append("")
+    def chunks():
+        now = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+        yield '\n'.join([
+            f"-- ============================================================",
+            f"-- ConstructPro SQL Export (Single Project)",
+            f"-- Project  : {project.name}",
+            f"-- Project ID: {project_id}",
+            f"-- Exported : {now}",
+            f"-- ============================================================",
+            f"BEGIN;",
+            f"",
+            f"",
+        ])
+        yield from _plan_sql(project_id, stats)
+        yield _summary(stats)
+        yield "COMMIT;\n"
+
+    return chunks(), stats
+
+
+def stream_all_projects_sql():
+    """SQL dump for EVERY project — (chunks, stats) like stream_project_sql."""
+    from django.apps import apps
+    projects = apps.get_model('core', 'HouseProject').objects.order_by('pk')
+    stats = {'project': 'FULL SYSTEM', 'tables': [], 'total_rows': 0}
+
+    def chunks():
+        yield '\n'.join([
+            f"-- ============================================================",
+            f"-- ConstructPro FULL SYSTEM EXPORT",
+            f"-- Projects Total: {projects.count()}",
+            f"-- Exported : {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}",
+            f"-- ============================================================",
+            f"BEGIN;",
+            f"",
+            f"",
+        ])
+        for project_id, name in projects.values_list('id', 'name'):
+            yield f"-- >>> START PROJECT: {name} (ID: {project_id}) <<<\n"
+            yield from _plan_sql(project_id, stats, comments=False)
+            yield f"-- <<< END PROJECT: {name} >>>\n\n"
+        yield _summary(stats)
+        yield "COMMIT;\n"
+
+    return chunks(), stats
 
-        stats['tables'].append({'model': f"{app_label}.{model_name}", 'table': table, 'rows': count})
-        stats['total_rows'] += count
 
-    lines.append("COMMIT;")
-    return '\n'.join(lines), stats
+def export_project_sql(project_id: int) -> tuple[str, dict]:
+    """
+    Generate a complete SQL dump for the given project.
+    Returns (sql_string, stats_dict).  Prefer stream_project_sql() for
+    anything sent over HTTP.
+    """
+    chunks, stats = stream_project_sql(project_id)
+    return ''.join(chunks), stats
 
 
 def export_all_projects_sql() -> tuple[str, dict]:
     """
     Generate a complete SQL dump for EVERY project in the system.
     """
+    chunks, stats = stream_all_projects_sql()
+    return ''.join(chunks), stats
+
+
+def project_export_stats(project_id: int) -> dict:
+    """Row counts per table without generating any SQL (export preview)."""
     from django.apps import apps
-    projects = apps.get_model('core', 'HouseProject').objects.all()
-    
-    all_lines = [
-        f"-- ============================================================",
-        f"-- ConstructPro FULL SYSTEM EXPORT",
-        f"-- Projects Total: {projects.count()}",
-        f"-- Exported : {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}",
-        f"-- ============================================================",
-        f"BEGIN;",
-        f"",
-    ]
-    
-    total_stats = {'project': 'FULL SYSTEM', 'tables': [], 'total_rows': 0}
-    
-    for project in projects:
-        all_lines.append(f"-- >>> START PROJECT: {project.name} (ID: {project.id}) <<<")
-        for app_label, model_name, filter_factory in EXPORT_PLAN:
-            filter_kwargs = filter_factory(project.id)
-            table, count, sql_lines = _rows_to_sql(app_label, model_name, filter_kwargs)
-            if sql_lines:
-                all_lines.extend(sql_lines)
-                total_stats['total_rows'] += count
-        all_lines.append(f"-- <<< END PROJECT: {project.name} >>>\n")
-
-    all_lines.append("COMMIT;")
-    return '\n'.join(all_lines), total_stats
+
+    try:
+        project = apps.get_model('core', 'HouseProject').objects.get(pk=project_id)
+    except Exception:
+        raise ValueError(f"Project with id={project_id} not found.")
+
+    stats = {'project': project.name, 'tables': [], 'total_rows': 0}
+    for app_label, model_name, filter_factory in EXPORT_PLAN:
+        try:
+            model = apps.get_model(app_label, model_name)
+            count = model.objects.filter(**filter_factory(project_id)).count()
+        except Exception:
+            continue
+        stats['tables'].append({'model': f"{app_label}.{model_name}", 'table': model._meta.db_table, 'rows': count})
+        stats['total_rows'] += count
+    return stats
+
+
+def encode_chunks(chunks, compress=False, buffer_size=STREAM_BUFFER_SIZE):
+    """
+    Text chunks → bytes for a StreamingHttpResponse.  Small chunks are
+    coalesced to ~buffer_size; with compress=True the output is a gzip
+    stream produced on the fly.
+    """
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending, size = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            data = ''.join(pending).encode('utf-8')
+            pending, size = [], 0
+            data = gz.compress(data) if gz else data
+            if data:
+                yield data
+    data = ''.join(pending).encode('utf-8')
+    if gz:
+        data = gz.compress(data) + gz.flush()
+    if data:
+        yield data
@@ -0,0 +1,84 @@
+"""
+data_transfer.import_jobs
+──────────────────────────
+CSV/Excel and SQL imports run outside the request.  The import views store
+the upload on ImportJob.source_file and call enqueue_import_job(); the job
+then runs as a Celery task (tasks.run_import_job_task), or in a daemon
+thread when the broker is unreachable.  Clients poll
+csv/jobs/<project_id>/<job_id>/ (CSV) or import/jobs/<job_id>/ (SQL) for
+rows_processed / progress_percent.
+
+DATA_IMPORT_SYNC=True runs the job inline (tests).
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connection, transaction
+
+from apps.core import media_index
+from apps.core.sync import invalidate_all
+from apps.financials.balances import reconcile_all
+
+logger = logging.getLogger(__name__)
+
+
+def run_import_job(job_id):
+    """Import the stored upload for ImportJob `job_id`."""
+    from .csv_io import import_materials, import_workforce
+    from .models import ImportJob
+    from .sql_import import run_sql_import
+
+    job = ImportJob.objects.select_related('created_by', 'project').filter(pk=job_id).first()
+    if job is None or job.status != 'pending':
+        return
+    job.status = 'importing'
+    job.save(update_fields=['status'])
+
+    importer = import_workforce if job.import_type == 'workforce' else import_materials
+    try:
+        with job.source_file.open('rb') as stored:
+            if job.import_type == 'sql':
+                run_sql_import(stored.file, job)
+            else:
+                # Format is picked by the original extension
+                importer(File(stored.file, name=job.file_name), job.project_id, job.created_by, job)
+    except Exception as e:
+        logger.exception('Import job %s failed', job_id)
+        job.mark_failed(str(e))
+    finally:
+        job.source_file.delete(save=False)
+        ImportJob.objects.filter(pk=job.pk).update(source_file='')
+        # Bulk inserts skip the signals behind the dashboard's delta sync
+        # and the gallery's media index
+        invalidate_all()
+        media_index.rebuild()
+        if job.import_type == 'sql':
+            # ...and raw SQL skips the materialized ledger balances
+            reconcile_all(fix=True, snapshots=True)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_import_job(job_id)
+    finally:
+        connection.close()
+
+
+def _dispatch(job_id):
+    if getattr(settings, 'DATA_IMPORT_SYNC', False):
+        run_import_job(job_id)
+        return
+    try:
+        from .tasks import run_import_job_task
+        run_import_job_task.apply_async(args=[job_id], retry=False)
+    except Exception as e:
+        logger.warning('Celery unavailable for import job (%s); running in a thread.', e)
+        threading.Thread(target=_run_in_thread, args=(job_id,), daemon=True).start()
+
+
+def enqueue_import_job(job):
+    """Start `job` once the transaction that created it has committed."""
+    transaction.on_commit(lambda: _dispatch(job.pk))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_transfer', '0001_initial_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='source_file',
+            field=models.FileField(blank=True, null=True, upload_to='data_transfer/imports/'),
+        ),
+    ]
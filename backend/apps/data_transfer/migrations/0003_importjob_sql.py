@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_project_role_view_permissions'),
+        ('data_transfer', '0002_importjob_background'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='importjob',
+            name='import_type',
+            field=models.CharField(choices=[('workforce', 'Workforce Members'), ('materials', 'Materials / Inventory'), ('attendance', 'Attendance Records'), ('suppliers', 'Suppliers'), ('sql', 'SQL Dump')], max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='importjob',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='core.houseproject'),
+        ),
+    ]
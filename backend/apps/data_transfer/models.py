@@ -1,8 +1,8 @@
 """
 data_transfer.models
 ────────────────────
-ImportJob — tracks every CSV/Excel bulk import attempt so admins can audit
-what was loaded, by whom, and whether rows were skipped.
+ImportJob — tracks every CSV/Excel and SQL bulk import attempt so admins
+can audit what was loaded, by whom, and whether rows were skipped.
 """
 
 from django.db import models
@@ -16,6 +16,7 @@ class ImportJob(models.Model):
         ('materials',   'Materials / Inventory'),
         ('attendance',  'Attendance Records'),
         ('suppliers',   'Suppliers'),
+        ('sql',         'SQL Dump'),
     ]
 
     STATUS_CHOICES = [
@@ -27,8 +28,10 @@ class ImportJob(models.Model):
     ]
 
     # ── Identity ──────────────────────────────────────────────────────────────
+    # Empty for full-system SQL imports
     project = models.ForeignKey(
         'core.HouseProject',
+        null=True, blank=True,
         on_delete=models.CASCADE,
         related_name='import_jobs',
     )
@@ -43,6 +46,8 @@ class ImportJob(models.Model):
     import_type  = models.CharField(max_length=32, choices=IMPORT_TYPE_CHOICES)
     file_name    = models.CharField(max_length=255)
     file_format  = models.CharField(max_length=8, default='csv')  # csv | xlsx
+    # Upload kept until the background job has read it (import_jobs.py)
+    source_file  = models.FileField(upload_to='data_transfer/imports/', null=True, blank=True)
 
     # ── Status ────────────────────────────────────────────────────────────────
     status       = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
@@ -52,9 +57,12 @@ class ImportJob(models.Model):
     rows_imported = models.PositiveIntegerField(default=0)
     rows_skipped  = models.PositiveIntegerField(default=0)
     rows_failed   = models.PositiveIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
 
     # ── Error / warning log stored as JSON list of {row, message} dicts ──────
     error_log = models.JSONField(default=list, blank=True)
+    # SQL imports: the result the import endpoints used to return inline
+    summary = models.JSONField(default=dict, blank=True)
 
     # ── Timestamps ────────────────────────────────────────────────────────────
     created_at   = models.DateTimeField(auto_now_add=True)
@@ -68,17 +76,33 @@ class ImportJob(models.Model):
     def __str__(self):
         return f"{self.import_type} import by {self.created_by} ({self.status})"
 
+    @property
+    def progress_percent(self):
+        if self.status in ('done', 'failed'):
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(99, int(100 * self.rows_processed / self.rows_total))
+
+    def update_progress(self, processed, imported, skipped, failed):
+        self.rows_processed = processed
+        self.rows_imported  = imported
+        self.rows_skipped   = skipped
+        self.rows_failed    = failed
+        self.save(update_fields=['rows_processed', 'rows_imported', 'rows_skipped', 'rows_failed'])
+
     def mark_done(self, imported, skipped, failed, errors):
         from django.utils import timezone
         self.status       = 'done' if failed == 0 else 'done'
         self.rows_imported = imported
         self.rows_skipped  = skipped
         self.rows_failed   = failed
+        self.rows_processed = self.rows_total
         self.error_log     = errors[:200]   # cap at 200 entries
         self.completed_at  = timezone.now()
         self.save(update_fields=[
             'status', 'rows_imported', 'rows_skipped',
-            'rows_failed', 'error_log', 'completed_at',
+            'rows_failed', 'rows_processed', 'error_log', 'completed_at',
         ])
 
     def mark_failed(self, reason):
@@ -0,0 +1,436 @@
+"""
+data_transfer.sql_import
+─────────────────────────
+SQL dump import engine behind ImportSqlView / ImportProjectDataView.
+
+The stored upload is streamed twice, never read into memory whole:
+
+  1. scan   — split into statements, reject blocked ones, count them
+  2. apply  — consecutive INSERTs into the same table with the same column
+              list are merged into one multi-row INSERT (up to
+              BATCH_STATEMENTS statements / BATCH_BYTES of SQL).  Each batch
+              runs in its own transaction.  When a batch of INSERTs fails
+              its rows (every VALUES tuple, including those of the exporter's
+              multi-row statements) are bisected, each half in its own
+              transaction, so only the offending rows are skipped; any other
+              failed statement is skipped whole.
+
+Progress (statements applied) is saved on the ImportJob after every batch,
+and the response-shaped result lands in ImportJob.summary.
+"""
+import io
+import logging
+import re
+from typing import Iterable, Iterator, Optional
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_STATEMENTS = 500
+BATCH_BYTES = 4 * 1024 * 1024
+
+BLOCKED_PATTERNS = [
+    r'\bDROP\s+DATABASE\b',
+    r'\bDROP\s+TABLE\b',
+    r'\bTRUNCATE\b',
+    r'\bALTER\s+TABLE\s+.*\bDROP\b',
+]
+
+# Transaction control keywords we must strip out — the importer manages its
+# own transactions so these would break batching.
+TX_CONTROL = re.compile(
+    r'^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE\s+SAVEPOINT|ROLLBACK\s+TO)\b',
+    re.IGNORECASE,
+)
+
+# Tables whose rows are user-account-specific and should be skipped when
+# importing into a different system (users live in accounts_user and may
+# have completely different IDs in the target environment).
+USER_SCOPED_TABLES = {
+    'accounts_user',
+    'accounts_userprofile',
+    'auth_user',
+    'core_projectmember',      # references user_id → skip if user missing
+    'authtoken_token',
+    'token_blacklist_outstandingtoken',
+    'token_blacklist_blacklistedtoken',
+}
+
+_TOKEN = re.compile(r"--|;|'|\"|`")
+_INSERT = re.compile(
+    r'INSERT\s+INTO\s+("[^"]+"|\w+)\s*(\([^)]*\))\s*VALUES\s*(\(.*\))\s*(ON\s+CONFLICT\s+DO\s+NOTHING)?\s*$',
+    re.IGNORECASE | re.DOTALL,
+)
+_LITERAL = re.compile(r"'[^']*'")
+_NOT_PLAIN = re.compile(r'\b(ON\s+CONFLICT|RETURNING|SELECT)\b', re.IGNORECASE)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Statement helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def is_unsafe(sql: str) -> list[str]:
+    found = []
+    upper = sql.upper()
+    for pat in BLOCKED_PATTERNS:
+        if re.search(pat, upper):
+            found.append(re.search(pat, upper).group(0))
+    if re.search(r'\bDELETE\b', upper) and not re.search(r'\bWHERE\b', upper):
+        found.append("DELETE without WHERE")
+    return found
+
+
+def iter_statements(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yield executable statements from SQL text, line by line.
+    - Strips comment lines, inline comments and blank lines.
+    - Ignores semicolons inside quoted strings and identifiers.
+    - Removes transaction control (BEGIN/COMMIT/ROLLBACK/SAVEPOINT).
+    """
+    parts, quote = [], None
+    for line in lines:
+        if quote is None:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('--'):
+                continue
+        start = pos = 0
+        end = len(line)
+        while True:
+            if quote is not None:
+                close = line.find(quote, pos)
+                if close < 0:
+                    break
+                pos, quote = close + 1, None
+                continue
+            m = _TOKEN.search(line, pos)
+            if m is None:
+                break
+            tok = m.group()
+            if tok == ';':
+                parts.append(line[start:m.start()])
+                stmt = ''.join(parts).strip()
+                parts = []
+                if stmt and not TX_CONTROL.match(stmt):
+                    yield stmt
+                start = pos = m.end()
+            elif tok == '--':
+                end = m.start()
+                break
+            else:
+                quote, pos = tok, m.end()
+        parts.append(line[start:end])
+        if end < len(line):
+            parts.append('\n')
+    stmt = ''.join(parts).strip()
+    if stmt and not TX_CONTROL.match(stmt):
+        yield stmt
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split SQL text into individual executable statements (see iter_statements)."""
+    return list(iter_statements(sql.splitlines(keepends=True)))
+
+
+def normalize_sql_for_connection(sql: str, vendor: Optional[str] = None) -> str:
+    """
+    Make our PostgreSQL-style exports executable on the current database.
+    Local development commonly runs SQLite, while production exports include
+    PostgreSQL casts like '2026-01-01'::date and ::timestamptz.
+    """
+    target_vendor = vendor or connection.vendor
+    if target_vendor != 'sqlite':
+        return sql
+
+    sql = re.sub(r"'([^']*)'::(?:timestamptz|timestamp|date|time)", r"'\1'", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"::(?:timestamptz|timestamp|jsonb?|numeric|decimal|varchar|date|time|uuid|text)", "", sql, flags=re.IGNORECASE)
+    return sql
+
+
+def detect_source_project_id(sql: str) -> Optional[str]:
+    """
+    Extract the source project's ID from a ConstructPro SQL export header.
+    Looks for the comment line:  -- Project ID: <value>
+    Returns the value as a string, or None if not found.
+    """
+    m = re.search(r'--\s*Project\s+ID\s*:\s*(\S+)', sql, re.IGNORECASE)
+    return m.group(1).rstrip(',;') if m else None
+
+
+def remap_sql(sql_content: str, source_id: str, target_id: str) -> str:
+    """
+    Replace every quoted occurrence of source_id with target_id throughout
+    the SQL text.  Works for both UUID and integer source IDs.
+    Handles:  'abc-uuid'  /  '123'  /  plain  123  next to a comma or paren.
+    """
+    if not source_id or not target_id or source_id == target_id:
+        return sql_content
+
+    result = sql_content
+
+    # Quoted string form: 'source_id'
+    result = result.replace(f"'{source_id}'", f"'{target_id}'")
+
+    # Bare integer next to SQL syntax boundaries (only when source is numeric)
+    if re.match(r'^\d+$', source_id):
+        result = re.sub(
+            r'(?<=[(\s,])' + re.escape(source_id) + r'(?=[,\s)])',
+            f"'{target_id}'",
+            result,
+        )
+
+    return result
+
+
+def targets_user_table(stmt: str) -> bool:
+    """Return True if the statement inserts into an accounts/auth user table."""
+    upper = stmt.upper()
+    if not re.search(r'\bINSERT\b', upper):
+        return False
+    for tbl in USER_SCOPED_TABLES:
+        if tbl.upper() in upper:
+            return True
+    return False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Batching
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _insert_parts(stmt: str):
+    """((table, columns, suffix), values) for a plain INSERT … VALUES, else None."""
+    m = _INSERT.match(stmt)
+    if m is None or _NOT_PLAIN.search(_LITERAL.sub("''", m.group(3))):
+        return None
+    key = (m.group(1), ' '.join(m.group(2).split()), ' '.join((m.group(4) or '').upper().split()))
+    return key, m.group(3)
+
+
+def split_values(values: str) -> list[str]:
+    """The top-level "(…)" tuples of a VALUES list, ignoring parentheses in literals."""
+    tuples, depth, start, quote = [], 0, 0, None
+    i, n = 0, len(values)
+    while i < n:
+        ch = values[i]
+        if quote is not None:
+            if ch == quote:
+                if i + 1 < n and values[i + 1] == quote:  # doubled quote inside the literal
+                    i += 1
+                else:
+                    quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == '(':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                tuples.append(values[start:i + 1])
+        i += 1
+    return tuples
+
+
+def _combine(key, values) -> str:
+    table, columns, suffix = key
+    sql = f"INSERT INTO {table} {columns} VALUES\n" + ',\n'.join(values)
+    return f"{sql}\n{suffix}" if suffix else sql
+
+
+def iter_batches(statements, max_statements=BATCH_STATEMENTS, max_bytes=BATCH_BYTES):
+    """
+    Group (index, statement) pairs into executable batches.  Yields
+    (sql, members) where members are the pairs the sql stands for.
+    """
+    key, values, members, size = None, [], [], 0
+    for item in statements:
+        parts = _insert_parts(item[1])
+        item_key = parts[0] if parts else None
+        if members and (item_key != key or len(members) >= max_statements or size >= max_bytes):
+            yield (members[0][1] if len(members) == 1 else _combine(key, values)), members
+            key, values, members, size = None, [], [], 0
+        if item_key is None:
+            yield item[1], [item]
+            continue
+        key = item_key
+        values.append(parts[1])
+        members.append(item)
+        size += len(item[1])
+    if members:
+        yield (members[0][1] if len(members) == 1 else _combine(key, values)), members
+
+
+def _execute(sql: str) -> Optional[Exception]:
+    """Run one statement in its own transaction; returns the error, if any."""
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    # FKs are DEFERRABLE INITIALLY DEFERRED; check them here so
+                    # a violation fails this statement instead of the commit.
+                    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+                cursor.execute(sql)
+    except Exception as exc:
+        return exc
+    return None
+
+
+def _apply(sql, members):
+    """
+    Run a batch; on failure bisect its rows to find the ones that fail.
+    Returns (applied members, [((index, row sql), error)]).
+    """
+    error = _execute(sql)
+    if error is None:
+        return members, []
+    parts = [_insert_parts(stmt) for _, stmt in members]
+    rows = [] if parts[0] is None else [
+        (member, row) for member, (_, values) in zip(members, parts) for row in split_values(values)
+    ]
+    if len(rows) <= 1:
+        return [], [(member, error) for member in members]
+
+    key = parts[0][0]
+    failed = []
+    _bisect(key, rows, failed)
+    skipped = {id(pair) for pair, _ in failed}
+    applied = {id(pair[0]) for pair in rows if id(pair) not in skipped}
+    ok = [member for member in members if id(member) in applied]
+    return ok, [((member[0], _combine(key, [row])), exc) for (member, row), exc in failed]
+
+
+def _bisect(key, rows, failed):
+    """Apply (member, row) pairs half by half; single failing rows go to `failed`."""
+    mid = len(rows) // 2
+    for half in (rows[:mid], rows[mid:]):
+        error = _execute(_combine(key, [row for _, row in half]))
+        if error is None:
+            continue
+        if len(half) == 1:
+            failed.append((half[0], error))
+        else:
+            _bisect(key, half, failed)
+
+
+def _preview(stmt: str) -> str:
+    return stmt[:120] + ('…' if len(stmt) > 120 else '')
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Jobs
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _text(raw, encoding):
+    raw.seek(0)
+    return io.TextIOWrapper(raw, encoding=encoding)
+
+
+def _scan(raw):
+    """First pass: (encoding, statement count, user-table count, blocked keywords)."""
+    for encoding in ('utf-8-sig', 'latin-1'):
+        text = _text(raw, encoding)
+        total = user = 0
+        unsafe = set()
+        try:
+            for stmt in iter_statements(text):
+                total += 1
+                user += targets_user_table(stmt)
+                unsafe.update(is_unsafe(stmt))
+        except UnicodeDecodeError:
+            continue
+        finally:
+            text.detach()
+        return encoding, total, user, unsafe
+    raise ValueError('File encoding not supported (use UTF-8).')
+
+
+def run_sql_import(raw, job) -> Optional[dict]:
+    """
+    Apply the SQL dump in binary file `raw` for `job`.  Project jobs
+    (job.project set) remap the source project id and skip user-scoped
+    tables.  Returns the summary, or None if the job failed.
+    """
+    encoding, total, user_count, unsafe = _scan(raw)
+    if not total:
+        job.mark_failed('No executable SQL statements found.')
+        return None
+    if unsafe:
+        job.mark_failed(f'Blocked: dangerous statements found: {", ".join(sorted(unsafe))}')
+        return None
+
+    project = job.project
+    source_project_id = target_project_id = None
+    if project is not None:
+        raw.seek(0)
+        source_project_id = detect_source_project_id(raw.read(64 * 1024).decode(encoding, errors='ignore'))
+        target_project_id = str(project.id)
+    else:
+        user_count = 0
+    remapped = bool(source_project_id) and source_project_id != target_project_id
+
+    job.rows_total = total
+    job.save(update_fields=['rows_total'])
+
+    def prepared(text):
+        for index, stmt in enumerate(iter_statements(text), start=1):
+            if project is not None and targets_user_table(stmt):
+                continue
+            if remapped:
+                stmt = remap_sql(stmt, source_project_id, target_project_id)
+            yield index, normalize_sql_for_connection(stmt)
+
+    executed, skipped, preview = 0, [], []
+    text = _text(raw, encoding)
+    try:
+        for sql, members in iter_batches(prepared(text)):
+            ok, failed = _apply(sql, members)
+            for (index, stmt), exc in failed:
+                err_msg = str(exc).split('\n')[0]  # first line only
+                skipped.append({'index': index, 'reason': err_msg, 'statement': _preview(stmt)})
+                logger.warning('Import skipped statement %d: %s', index, err_msg)
+            executed += len(ok)
+            preview.extend(_preview(stmt) for _, stmt in ok[:20 - len(preview)])
+            processed = members[-1][0]
+            job.update_progress(processed, executed, len(skipped) + user_count, len(skipped))
+    except Exception as exc:
+        logger.exception('SQL import job %s stopped', job.pk)
+        job.mark_failed(
+            f'Import stopped after {executed} statement(s); batches already applied were kept. Error: {exc}'
+        )
+        return None
+    finally:
+        text.detach()
+
+    msg = f'Imported {executed} of {total} statement(s)'
+    msg += f' into "{project.name}".' if project is not None else '.'
+    if user_count:
+        msg += f' {user_count} user/member row(s) skipped (cross-system user IDs).'
+    if skipped:
+        msg += (
+            f' {len(skipped)} row(s)/statement(s) skipped (FK / constraint violations — '
+            f'usually old integer IDs that have no matching UUID record).'
+        )
+
+    summary = {
+        'success': True,
+        'statements_executed': executed,
+        'statements_skipped': len(skipped),
+        'statements_skipped_user': user_count,
+        'total_statements': total,
+        'skipped': skipped[:20],   # first 20 skipped for UI display
+        'preview': preview,
+        'message': msg,
+    }
+    if project is not None:
+        summary.update({
+            'project': {'id': project.id, 'name': project.name},
+            'source_project_id': source_project_id,
+            'target_project_id': target_project_id,
+            'remapped': remapped,
+        })
+    job.summary = summary
+    job.save(update_fields=['summary'])
+    job.mark_done(executed, len(skipped) + user_count, len(skipped),
+                  [{'row': s['index'], 'message': s['reason']} for s in skipped])
+    return summary
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+
+@shared_task(acks_late=True)
+def run_import_job_task(job_id):
+    """Run a queued ImportJob (see import_jobs.py)."""
+    from .import_jobs import run_import_job
+
+    run_import_job(job_id)
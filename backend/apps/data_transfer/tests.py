@@ -1,18 +1,56 @@
+import gzip
+import shutil
+import tempfile
+from datetime import date
+
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from apps.core.models import HouseProject
-from apps.data_transfer.views import _normalize_sql_for_connection
+from apps.core.models import Floor, HouseProject
+from apps.data_transfer.models import ImportJob
+from apps.data_transfer.sql_import import iter_batches, normalize_sql_for_connection, split_statements, split_values
+from apps.resource.models import Material, Supplier
+from apps.workforce.models import WorkforceMember
 
 
 User = get_user_model()
 
 
-class DataTransferSqlImportTestCase(TestCase):
+class ImportJobTestMixin:
+    """Runs queued import jobs inline against a throwaway MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media, DATA_IMPORT_SYNC=True)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+        super().tearDown()
+
+    def _queue(self, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        return response.data["job_id"]
+
+    def _import_sql(self, sql, **data):
+        upload = SimpleUploadedFile("dump.sql", sql.encode("utf-8"), content_type="application/sql")
+        url = "/api/v1/data-transfer/import/project/" if "project_id" in data else "/api/v1/data-transfer/import/"
+        job_id = self._queue(url, {"sql_file": upload, **data})
+        response = self.client.get(f"/api/v1/data-transfer/import/jobs/{job_id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+
+class DataTransferSqlImportTestCase(ImportJobTestMixin, TestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username="sql-admin",
@@ -25,7 +63,7 @@ class DataTransferSqlImportTestCase(TestCase):
     def test_normalizes_postgres_casts_for_local_sqlite_import(self):
         sql = "INSERT INTO x VALUES ('2026-05-22'::date, '08:00:00'::time, '2026-05-22T01:02:03+00:00'::timestamptz);"
 
-        normalized = _normalize_sql_for_connection(sql, vendor="sqlite")
+        normalized = normalize_sql_for_connection(sql, vendor="sqlite")
 
         self.assertNotIn("::date", normalized)
         self.assertNotIn("::time", normalized)
@@ -42,11 +80,254 @@ class DataTransferSqlImportTestCase(TestCase):
         ON CONFLICT DO NOTHING;
         COMMIT;
         """
-        upload = SimpleUploadedFile("full_system_backup.sql", sql.encode("utf-8"), content_type="application/sql")
+        result = self._import_sql(sql)
 
-        response = self.client.post("/api/v1/data-transfer/import/", {"sql_file": upload}, format="multipart")
+        self.assertEqual(result["status"], "done", result)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["statements_executed"], 1)
+        self.assertEqual(result["progress_percent"], 100)
+        self.assertTrue(HouseProject.objects.filter(pk=901, name="Imported Project").exists())
 
+    def test_splitter_keeps_quoted_semicolons_and_drops_comments(self):
+        sql = (
+            "-- header\nBEGIN;\n"
+            "INSERT INTO t (a) VALUES ('x; -- not a comment');  -- trailing\n"
+            "INSERT INTO t (a) VALUES ('multi\n-- line');\nCOMMIT;\n"
+        )
+        self.assertEqual(split_statements(sql), [
+            "INSERT INTO t (a) VALUES ('x; -- not a comment')",
+            "INSERT INTO t (a) VALUES ('multi\n-- line')",
+        ])
+
+    def test_consecutive_inserts_merge_into_one_batch(self):
+        stmts = [
+            'INSERT INTO "t" ("a") VALUES (1) ON CONFLICT DO NOTHING',
+            'INSERT INTO "t" ("a") VALUES (2), (3)\nON CONFLICT DO NOTHING',
+            'INSERT INTO "u" ("a") VALUES (4)',
+            "UPDATE u SET a = 5 WHERE a = 4",
+            "INSERT INTO u (a) SELECT 1",
+        ]
+        batches = list(iter_batches(enumerate(stmts, start=1)))
+        self.assertEqual([[i for i, _ in members] for _, members in batches], [[1, 2], [3], [4], [5]])
+        self.assertEqual(batches[0][0], 'INSERT INTO "t" ("a") VALUES\n(1),\n(2), (3)\nON CONFLICT DO NOTHING')
+
+    def test_failed_batch_replays_statements_and_skips_only_bad_rows(self):
+        project = HouseProject.objects.create(
+            name="Target", owner_name="Owner", address="Site", total_budget=1,
+            start_date=date(2026, 1, 1), expected_completion_date=date(2026, 12, 31), area_sqft=1,
+        )
+        insert = 'INSERT INTO "core_floor" ("project_id", "name", "level", "created_at", "updated_at") VALUES '
+        stamp = "'2026-01-01T00:00:00+00:00'::timestamptz"
+        rows = [f"{insert}(7, 'F{i}', {i}, {stamp}, {stamp});" for i in range(1200)]
+        rows.insert(600, f"{insert}(7, NULL, 0, {stamp}, {stamp});")
+        rows.insert(0, "INSERT INTO \"accounts_user\" (\"id\") VALUES (99);")
+        result = self._import_sql("-- Project ID: 7\n" + "\n".join(rows), project_id=project.pk)
+
+        self.assertEqual(result["status"], "done", result)
+        self.assertTrue(result["remapped"])
+        self.assertEqual(
+            (result["statements_executed"], result["statements_skipped"], result["statements_skipped_user"]),
+            (1200, 1, 1),
+        )
+        self.assertEqual(result["skipped"][0]["index"], 602)
+        self.assertEqual(Floor.objects.filter(project=project).count(), 1200)
+        job = ImportJob.objects.get(pk=result["job_id"])
+        self.assertEqual((job.rows_total, job.rows_processed), (1202, 1202))
+        self.assertFalse(job.source_file)
+
+    def test_failed_multi_row_insert_skips_only_the_bad_row(self):
+        project = HouseProject.objects.create(
+            name="Target", owner_name="Owner", address="Site", total_budget=1,
+            start_date=date(2026, 1, 1), expected_completion_date=date(2026, 12, 31), area_sqft=1,
+        )
+        stamp = "'2026-01-01T00:00:00+00:00'::timestamptz"
+        rows = [f"({project.pk}, 'F (''{i}'')', {i}, {stamp}, {stamp})" for i in range(9)]
+        rows[4] = f"({project.pk}, NULL, 4, {stamp}, {stamp})"
+        sql = (
+            'INSERT INTO "core_floor" ("project_id", "name", "level", "created_at", "updated_at") VALUES\n'
+            + ",\n".join(rows) + "\nON CONFLICT DO NOTHING;"
+        )
+        result = self._import_sql(sql)
+
+        self.assertEqual(result["status"], "done", result)
+        self.assertEqual((result["statements_executed"], result["statements_skipped"]), (1, 1))
+        self.assertIn("NULL, 4", result["skipped"][0]["statement"])
+        self.assertEqual(sorted(Floor.objects.values_list("level", flat=True)), [0, 1, 2, 3, 5, 6, 7, 8])
+        self.assertTrue(Floor.objects.filter(name="F ('8')").exists())
+
+    def test_split_values_ignores_parentheses_in_literals(self):
+        self.assertEqual(
+            split_values("(1, 'a (b'), (2, 'it''s )'),\n(3, NULL)"),
+            ["(1, 'a (b')", "(2, 'it''s )')", "(3, NULL)"],
+        )
+
+    def test_blocked_statements_fail_the_job_before_running_anything(self):
+        result = self._import_sql(
+            "INSERT INTO \"core_houseproject\" (\"id\") VALUES (902);\nDROP TABLE core_floor;"
+        )
+        self.assertEqual(result["status"], "failed")
+        self.assertIn("DROP TABLE", result["error"])
+        self.assertFalse(HouseProject.objects.filter(pk=902).exists())
+
+
+class DataTransferSqlExportTestCase(ImportJobTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="sql-export",
+            email="sql-export@example.com",
+            password="testpass123",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.project = HouseProject.objects.create(
+            name="Export Project",
+            owner_name="Owner",
+            address="Site",
+            total_budget=100000,
+            start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31),
+            area_sqft=1200,
+        )
+        Floor.objects.bulk_create(
+            Floor(project=self.project, name=f"Floor '{i}'", level=i) for i in range(1203)
+        )
+
+    def _download(self, **params):
+        response = self.client.get(f"/api/v1/data-transfer/export/{self.project.pk}/", params)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data["success"])
-        self.assertEqual(response.data["statements_executed"], 1)
-        self.assertTrue(HouseProject.objects.filter(pk=901, name="Imported Project").exists())
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_export_streams_batched_inserts(self):
+        response, body = self._download()
+        sql = body.decode("utf-8")
+
+        self.assertEqual(sql.count('INSERT INTO "core_floor"'), 3)  # 500 + 500 + 203
+        stats = self.client.get(f"/api/v1/data-transfer/export/{self.project.pk}/stats/").data
+        self.assertIn(f"-- Rows exported: {stats['total_rows']} ", sql)
+        self.assertTrue(sql.rstrip().endswith("COMMIT;"))
+
+        _, gz = self._download(compress="gzip")
+        unzipped = gzip.decompress(gz).decode("utf-8")
+        strip = lambda text: [l for l in text.splitlines() if not l.startswith("-- Exported")]
+        self.assertEqual(strip(unzipped), strip(sql))
+
+    def test_exported_sql_reimports(self):
+        _, body = self._download()
+        Floor.objects.filter(project=self.project).delete()
+
+        result = self._import_sql(body.decode("utf-8"))
+
+        self.assertEqual(result["status"], "done", result)
+        self.assertEqual(Floor.objects.filter(project=self.project).count(), 1203)
+        self.assertTrue(Floor.objects.filter(name="Floor '7'").exists())
+
+    def test_bad_row_in_exported_sql_skips_only_that_row(self):
+        _, body = self._download()
+        Floor.objects.filter(project=self.project).delete()
+        sql = body.decode("utf-8")
+        bad_name = "'Floor ''7'''"
+        self.assertEqual(sql.count(bad_name), 1)
+
+        result = self._import_sql(sql.replace(bad_name, "NULL"))
+
+        self.assertEqual(result["status"], "done", result)
+        self.assertEqual(result["statements_skipped"], 1)
+        self.assertEqual(Floor.objects.filter(project=self.project).count(), 1202)
+        self.assertFalse(Floor.objects.filter(level=7).exists())
+
+
+class CsvBulkImportTestCase(ImportJobTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="csv-admin",
+            email="csv-admin@example.com",
+            password="testpass123",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.project = HouseProject.objects.create(
+            name="Import Project",
+            owner_name="Owner",
+            address="Site",
+            total_budget=100000,
+            start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31),
+            area_sqft=1200,
+        )
+
+    def _import(self, import_type, name, content):
+        upload = SimpleUploadedFile(name, content, content_type="text/csv")
+        job_id = self._queue(f"/api/v1/data-transfer/csv/import/{self.project.pk}/", {"file": upload, "type": import_type})
+        job = self.client.get(f"/api/v1/data-transfer/csv/jobs/{self.project.pk}/{job_id}/").data
+        self.assertEqual(job["status"], "done", job)
+        return job
+
+    def test_workforce_rows_bulk_created_with_sequential_ids(self):
+        existing = WorkforceMember.objects.create(
+            current_project=self.project, _first_name="Ali", _last_name="Raza", join_date=date(2026, 1, 1),
+        )
+        lines = ["first_name,last_name,worker_type,join_date", "Ali,Raza,LABOUR,2026-01-01", ",Nobody,LABOUR,"]
+        lines += [f"Worker{i},Test,STAFF,2026-02-01" for i in range(1200)]
+        job = self._import("workforce", "workers.csv", "\n".join(lines).encode())
+
+        self.assertEqual(
+            (job["rows_total"], job["rows_processed"], job["rows_imported"], job["rows_skipped"], job["rows_failed"]),
+            (1202, 1202, 1200, 2, 1),
+        )
+        self.assertEqual(job["errors"][0]["row"], 3)
+        self.assertEqual(job["progress_percent"], 100)
+
+        ids = list(
+            WorkforceMember.objects.exclude(pk=existing.pk)
+            .order_by("employee_id").values_list("employee_id", flat=True)
+        )
+        first = int(existing.employee_id.rsplit("-", 1)[1]) + 1
+        self.assertEqual([int(i.rsplit("-", 1)[1]) for i in ids], list(range(first, first + 1200)))
+
+        later = WorkforceMember.objects.create(
+            current_project=self.project, _first_name="Late", _last_name="Joiner", join_date=date(2026, 3, 1),
+        )
+        self.assertEqual(int(later.employee_id.rsplit("-", 1)[1]), first + 1200)
+        self.assertFalse(ImportJob.objects.get(pk=job["id"]).source_file)
+
+    def test_employee_ids_skip_past_rows_written_around_the_sequence(self):
+        first = WorkforceMember.objects.create(
+            current_project=self.project, _first_name="Ali", _last_name="Raza", join_date=date(2026, 1, 1),
+        )
+        prefix = first.employee_id.rsplit("-", 1)[0]
+        WorkforceMember.objects.filter(pk=first.pk).update(employee_id=f"{prefix}-9999")   # e.g. a restored row
+        WorkforceMember.objects.create(
+            current_project=self.project, _first_name="Restored", _last_name="Row", join_date=date(2026, 1, 1),
+            employee_id=f"{prefix}-10000",
+        )
+
+        job = self._import("workforce", "workers.csv", b"first_name,last_name,worker_type,join_date\nNew,Hire,LABOUR,2026-02-01")
+
+        self.assertEqual(job["rows_imported"], 1)
+        self.assertEqual(WorkforceMember.objects.get(_first_name="New").employee_id, f"{prefix}-10001")
+
+    def test_materials_resolve_suppliers_in_bulk(self):
+        Supplier.objects.create(project=self.project, name="Maple Traders")
+        Material.objects.create(project=self.project, name="Sand", unit_price=10)
+        content = (
+            "name,category,unit,unit_price,quantity_in_stock,reorder_level,supplier\n"
+            "Portland Cement,Cement,bags,950,500,50,Maple Traders\n"
+            "Sand,Sand,m3,40,10,1,Maple Traders\n"
+            "Rebar 12mm,Steel,kg,1.25,800,100,Acier S\xe9n\xe9gal\n"
+        ).encode("latin-1")
+        job = self._import("materials", "materials.csv", content)
+
+        self.assertEqual((job["rows_imported"], job["rows_skipped"]), (2, 1))
+        cement = Material.objects.get(name="Portland Cement")
+        self.assertEqual((cement.category, cement.unit, cement.stock_qty), ("CEMENT", "bag", 500))
+        self.assertEqual(
+            sorted(Supplier.objects.filter(project=self.project).values_list("name", flat=True)),
+            ["Acier S\xe9n\xe9gal", "Maple Traders"],
+        )
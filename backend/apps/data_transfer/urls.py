@@ -5,7 +5,8 @@ from .views import (
     ImportProjectDataView, GitHubActionsDeployView,
     # CSV/Excel (Phase 2)
     CsvExportView, CsvTemplateView, CsvDryRunView,
-    CsvImportView, ImportJobListView,
+    CsvImportView, ImportJobListView, ImportJobDetailView,
+    SqlImportJobView,
 )
 
 urlpatterns = [
@@ -23,6 +24,7 @@ urlpatterns = [
     # ── SQL import ────────────────────────────────────────────────────────────
     path('import/',                          ImportSqlView.as_view(),          name='dt-import'),
     path('import/project/',                  ImportProjectDataView.as_view(),  name='dt-import-project'),
+    path('import/jobs/<int:job_id>/',        SqlImportJobView.as_view(),       name='dt-import-job'),
 
     # ── SQL terminal ──────────────────────────────────────────────────────────
     path('sql/',                             SqlTerminalView.as_view(),        name='dt-sql-terminal'),
@@ -34,8 +36,10 @@ urlpatterns = [
     path('csv/template/',                    CsvTemplateView.as_view(),        name='dt-csv-template'),
     # POST (multipart: file + type)  — preview without writing
     path('csv/dry-run/<int:project_id>/',    CsvDryRunView.as_view(),          name='dt-csv-dry-run'),
-    # POST (multipart: file + type)  — commit import, creates ImportJob
+    # POST (multipart: file + type)  — queues a background ImportJob
     path('csv/import/<int:project_id>/',     CsvImportView.as_view(),          name='dt-csv-import'),
     # GET  — recent import history
     path('csv/jobs/<int:project_id>/',       ImportJobListView.as_view(),      name='dt-csv-jobs'),
+    # GET  — progress of one job (polled while it runs)
+    path('csv/jobs/<int:project_id>/<int:job_id>/', ImportJobDetailView.as_view(), name='dt-csv-job'),
 ]
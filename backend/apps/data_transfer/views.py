@@ -1,98 +1,35 @@
 """
 ConstructPro — Data Transfer API
-Export: GET  /api/v1/data-transfer/export/<project_id>/
-Import: POST /api/v1/data-transfer/import/
+Export: GET  /api/v1/data-transfer/export/<project_id>/   (streamed; ?compress=gzip for .sql.gz)
+Import: POST /api/v1/data-transfer/import/            (queued; 202 + job_id)
+        GET  /api/v1/data-transfer/import/jobs/<job_id>/  — progress / result
 List:   GET  /api/v1/data-transfer/projects/
 
 CSV/Excel endpoints (Phase 2):
   GET  csv/export/<project_id>/?type=workforce|materials|attendance&fmt=csv|xlsx
   GET  csv/template/?type=workforce|materials&fmt=csv|xlsx
   POST csv/dry-run/<project_id>/   — preview without writing (multipart: file + type)
-  POST csv/import/<project_id>/    — commit import (multipart: file + type)
+  POST csv/import/<project_id>/    — queue import (multipart: file + type) → 202 + job_id
   GET  csv/jobs/<project_id>/      — list ImportJob history for a project
+  GET  csv/jobs/<project_id>/<job_id>/ — progress of one import
 """
 import re
 import logging
-from typing import Optional
-from django.http import HttpResponse
-from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.db import connection
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser
 from rest_framework import status
 
-from .exporter import export_project_sql
+from .exporter import EXPORT_PLAN, encode_chunks, project_export_stats, stream_project_sql
 
 logger = logging.getLogger(__name__)
 
 # Maximum rows returned by the SQL terminal to prevent enormous payloads
 SQL_TERMINAL_ROW_LIMIT = 500
 
-BLOCKED_PATTERNS = [
-    r'\bDROP\s+DATABASE\b',
-    r'\bDROP\s+TABLE\b',
-    r'\bTRUNCATE\b',
-    r'\bALTER\s+TABLE\s+.*\bDROP\b',
-]
-
-
-def _is_unsafe(sql: str) -> list[str]:
-    found = []
-    upper = sql.upper()
-    for pat in BLOCKED_PATTERNS:
-        if re.search(pat, upper):
-            found.append(re.search(pat, upper).group(0))
-    if re.search(r'\bDELETE\b', upper) and not re.search(r'\bWHERE\b', upper):
-        found.append("DELETE without WHERE")
-    return found
-
-
-def _split_statements(sql: str) -> list[str]:
-    """
-    Split SQL into individual executable statements.
-    - Strips comment lines and blank lines.
-    - Ignores semicolons inside single-quoted strings.
-    - Removes transaction control (BEGIN/COMMIT/ROLLBACK/SAVEPOINT) — the
-      importer manages its own transaction so these would break atomicity.
-    """
-    # Transaction control keywords we must strip out
-    TX_CONTROL = re.compile(
-        r'^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE\s+SAVEPOINT|ROLLBACK\s+TO)\b',
-        re.IGNORECASE,
-    )
-
-    lines = []
-    for line in sql.splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith('--'):
-            continue
-        # Remove inline comments
-        lines.append(re.sub(r'--[^\'"]*$', '', line))
-
-    compact = '\n'.join(lines)
-    pattern = re.compile(r"((?:'[^']*'|\"[^\"]*\"|`[^`]*`|[^;])*)")
-    raw = [s.strip() for s in pattern.findall(compact) if s.strip()]
-
-    # Drop transaction control statements
-    stmts = [s for s in raw if not TX_CONTROL.match(s)]
-    return stmts
-
-
-def _normalize_sql_for_connection(sql: str, vendor: Optional[str] = None) -> str:
-    """
-    Make our PostgreSQL-style exports executable on the current database.
-    Local development commonly runs SQLite, while production exports include
-    PostgreSQL casts like '2026-01-01'::date and ::timestamptz.
-    """
-    target_vendor = vendor or connection.vendor
-    if target_vendor != 'sqlite':
-        return sql
-
-    sql = re.sub(r"'([^']*)'::(?:timestamptz|timestamp|date|time)", r"'\1'", sql, flags=re.IGNORECASE)
-    sql = re.sub(r"::(?:timestamptz|timestamp|jsonb?|numeric|decimal|varchar|date|time|uuid|text)", "", sql, flags=re.IGNORECASE)
-    return sql
-
 
 class ProjectListView(APIView):
     """GET /api/v1/data-transfer/projects/ — list all projects for export selector."""
@@ -141,7 +78,7 @@ class ExportProjectView(APIView):
                 )
 
         try:
-            sql_content, stats = export_project_sql(project_id)
+            chunks, stats = stream_project_sql(project_id)
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -151,13 +88,7 @@ class ExportProjectView(APIView):
         project_name = stats['project'].replace(' ', '_').lower()
         from datetime import datetime
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        filename = f"project_{project_id}_{project_name}_{timestamp}.sql"
-
-        response = HttpResponse(sql_content, content_type='application/sql')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['X-Export-Rows'] = stats['total_rows']
-        response['X-Export-Tables'] = len(stats['tables'])
-        return response
+        return _sql_download(request, chunks, stats, f"project_{project_id}_{project_name}_{timestamp}.sql")
 
 
 class ExportSystemView(APIView):
@@ -169,18 +100,34 @@ class ExportSystemView(APIView):
             return Response({'error': 'Admin access required.'}, status=403)
 
         try:
-            from .exporter import export_all_projects_sql
-            sql_content, stats = export_all_projects_sql()
+            from .exporter import stream_all_projects_sql
+            chunks, stats = stream_all_projects_sql()
         except Exception as e:
             return Response({'error': str(e)}, status=500)
 
         from datetime import datetime
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        filename = f"full_system_backup_{timestamp}.sql"
+        return _sql_download(request, chunks, stats, f"full_system_backup_{timestamp}.sql")
+
+
+def _sql_download(request, chunks, stats, filename):
+    """
+    Stream an export as an attachment.  ?compress=gzip sends a .sql.gz
+    compressed on the fly.  Row counts are only known once the stream is
+    done — they are written as a trailing SQL comment and logged.
+    """
+    compress = request.query_params.get('compress') == 'gzip'
+
+    def body():
+        yield from encode_chunks(chunks, compress=compress)
+        logger.info("Exported %s: %d rows from %d tables", filename, stats['total_rows'], len(stats['tables']))
 
-        response = HttpResponse(sql_content, content_type='application/sql')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+    if compress:
+        filename += '.gz'
+    response = StreamingHttpResponse(body(), content_type='application/gzip' if compress else 'application/sql')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Export-Tables'] = len(EXPORT_PLAN)
+    return response
 
 
 class ExportStatsView(APIView):
@@ -195,7 +142,7 @@ class ExportStatsView(APIView):
                 return Response({'error': 'Access denied.'}, status=status.HTTP_403_FORBIDDEN)
 
         try:
-            _, stats = export_project_sql(project_id)
+            stats = project_export_stats(project_id)
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -213,10 +160,36 @@ def _is_admin(user) -> bool:
     )
 
 
+def _queue_sql_import(request, sql_file, project=None):
+    """Store the upload on a pending ImportJob and queue it (sql_import.py)."""
+    from .import_jobs import enqueue_import_job
+    from .models import ImportJob
+
+    job = ImportJob.objects.create(
+        project     = project,
+        created_by  = request.user,
+        import_type = 'sql',
+        file_name   = sql_file.name,
+        file_format = 'sql',
+        source_file = sql_file,
+        status      = 'pending',
+    )
+    enqueue_import_job(job)
+    return Response({
+        'success': True,
+        'job_id':  job.id,
+        'status':  job.status,
+        'message': 'SQL import queued.',
+    }, status=status.HTTP_202_ACCEPTED)
+
+
 class ImportSqlView(APIView):
     """
     POST /api/v1/data-transfer/import/
-    Upload a .sql file and execute it atomically.
+    Upload a .sql file and queue it for import — responds 202 with a job id;
+    poll import/jobs/<job_id>/ for progress and the result.
+    Statements run in batches (sql_import.py); statements that violate a
+    constraint are skipped rather than aborting the import.
     Available to superusers, staff, and system-admins.
     """
     permission_classes = [IsAuthenticated]
@@ -235,210 +208,24 @@ class ImportSqlView(APIView):
         if not sql_file.name.lower().endswith('.sql'):
             return Response({'success': False, 'error': 'Only .sql files accepted.'}, status=400)
 
-        try:
-            sql_content = sql_file.read().decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                sql_file.seek(0)
-                sql_content = sql_file.read().decode('latin-1')
-            except Exception:
-                return Response({'success': False, 'error': 'File must be UTF-8 encoded.'}, status=400)
-
-        sql_content = _normalize_sql_for_connection(sql_content)
-        statements = _split_statements(sql_content)
-        if not statements:
-            return Response({'success': False, 'error': 'No executable SQL statements found.'}, status=400)
-
-        # Safety check
-        unsafe = []
-        for stmt in statements:
-            unsafe.extend(_is_unsafe(stmt))
-        if unsafe:
-            return Response({
-                'success': False,
-                'error': f'Blocked: dangerous statements found: {", ".join(set(unsafe))}'
-            }, status=400)
-
-        results = []
-        skipped = []
-
-        # FK_ERRORS: PostgreSQL error codes for foreign-key violations.
-        # These happen when importing old data whose integer IDs no longer
-        # exist in UUID-keyed tables.  We skip those rows instead of aborting
-        # the entire import so compatible data still gets through.
-        FK_ERROR_CODES = {'23503', '23502', '23505', '23000'}
-
-        def _is_fk_error(exc) -> bool:
-            code = getattr(getattr(exc, '__cause__', None), 'pgcode', None) \
-                   or getattr(exc, 'pgcode', None) \
-                   or ''
-            return code in FK_ERROR_CODES
-
-        try:
-            with transaction.atomic():
-                with connection.cursor() as cursor:
-                    # NOTE: We do NOT use SET CONSTRAINTS ALL DEFERRED here.
-                    # Deferring constraints moves FK checks to commit time, which
-                    # is AFTER savepoints are released — meaning violations can no
-                    # longer be caught per-statement and the entire transaction
-                    # rolls back. Immediate (non-deferred) checks let each
-                    # savepoint absorb its own FK/constraint failure gracefully.
-
-                    for i, stmt in enumerate(statements):
-                        preview = stmt[:120] + ('…' if len(stmt) > 120 else '')
-                        # Each statement runs inside its own savepoint.
-                        # Any constraint violation (FK, unique, not-null …) is
-                        # caught here, the savepoint is rolled back, and the
-                        # statement is recorded as skipped. The outer transaction
-                        # and all previously committed savepoints remain intact.
-                        try:
-                            cursor.execute('SAVEPOINT sp_%d;' % i)
-                            cursor.execute(stmt)
-                            cursor.execute('RELEASE SAVEPOINT sp_%d;' % i)
-                            results.append({'index': i + 1, 'status': 'ok', 'preview': preview})
-                        except Exception as exc:
-                            # Roll back only this statement's savepoint, then
-                            # release it so the savepoint stack stays clean.
-                            cursor.execute('ROLLBACK TO SAVEPOINT sp_%d;' % i)
-                            cursor.execute('RELEASE SAVEPOINT sp_%d;' % i)
-                            err_msg = str(exc).split('\n')[0]  # first line only
-                            skipped.append({
-                                'index': i + 1,
-                                'reason': err_msg,
-                                'statement': preview,
-                            })
-                            logger.warning('Import skipped statement %d: %s', i + 1, err_msg)
-
-        except Exception as exc:
-            return Response({
-                'success': False,
-                'statements_executed': 0,
-                'total_statements': len(statements),
-                'errors': [{'error': str(exc)}],
-                'message': f'Import failed and was fully rolled back. Error: {str(exc)}'
-            }, status=400)
-
-        ok_count = len(results)
-        sk_count = len(skipped)
-        msg = f'Imported {ok_count} of {len(statements)} statement(s).'
-        if sk_count:
-            msg += (
-                f' {sk_count} statement(s) skipped (FK / constraint violations — '
-                f'usually old integer IDs that have no matching UUID record).'
-            )
-
-        return Response({
-            'success': True,
-            'statements_executed': ok_count,
-            'statements_skipped': sk_count,
-            'total_statements': len(statements),
-            'skipped': skipped[:20],   # first 20 skipped for UI display
-            'preview': [r['preview'] for r in results[:20]],
-            'message': msg,
-        })
-
-
-# ── Project-import helpers ────────────────────────────────────────────────────
-
-# Tables whose rows are user-account-specific and should be skipped when
-# importing into a different system (users live in accounts_user and may
-# have completely different IDs in the target environment).
-_USER_SCOPED_TABLES = {
-    'accounts_user',
-    'accounts_userprofile',
-    'auth_user',
-    'core_projectmember',      # references user_id → skip if user missing
-    'authtoken_token',
-    'token_blacklist_outstandingtoken',
-    'token_blacklist_blacklistedtoken',
-}
-
-
-def _detect_source_project_id(sql: str) -> Optional[str]:
-    """
-    Extract the source project's ID from a ConstructPro SQL export header.
-    Looks for the comment line:  -- Project ID: <value>
-    Returns the value as a string, or None if not found.
-    """
-    m = re.search(r'--\s*Project\s+ID\s*:\s*(\S+)', sql, re.IGNORECASE)
-    return m.group(1).rstrip(',;') if m else None
-
-
-def _remap_sql(sql_content: str, source_id: str, target_id: str) -> str:
-    """
-    Replace every quoted occurrence of source_id with target_id throughout
-    the SQL text.  Works for both UUID and integer source IDs.
-    Handles:  'abc-uuid'  /  '123'  /  plain  123  next to a comma or paren.
-    """
-    if not source_id or not target_id or source_id == target_id:
-        return sql_content
-
-    result = sql_content
-
-    # Quoted string form: 'source_id'
-    result = result.replace(f"'{source_id}'", f"'{target_id}'")
-
-    # Bare integer next to SQL syntax boundaries (only when source is numeric)
-    if re.match(r'^\d+$', source_id):
-        result = re.sub(
-            r'(?<=[(\s,])' + re.escape(source_id) + r'(?=[,\s)])',
-            f"'{target_id}'",
-            result,
-        )
-
-    return result
-
-
-def _stmt_targets_user_table(stmt: str) -> bool:
-    """Return True if the statement inserts into an accounts/auth user table."""
-    upper = stmt.upper()
-    if not re.search(r'\bINSERT\b', upper):
-        return False
-    for tbl in _USER_SCOPED_TABLES:
-        if tbl.upper() in upper:
-            return True
-    return False
-
-
-def _run_savepoint_import(cursor, statements):
-    """
-    Execute each statement inside its own savepoint.
-    Returns (results_list, skipped_list).
-    """
-    results = []
-    skipped = []
-    for i, stmt in enumerate(statements):
-        preview = stmt[:120] + ('…' if len(stmt) > 120 else '')
-        try:
-            cursor.execute('SAVEPOINT sp_%d;' % i)
-            cursor.execute(stmt)
-            cursor.execute('RELEASE SAVEPOINT sp_%d;' % i)
-            results.append({'index': i + 1, 'status': 'ok', 'preview': preview})
-        except Exception as exc:
-            cursor.execute('ROLLBACK TO SAVEPOINT sp_%d;' % i)
-            cursor.execute('RELEASE SAVEPOINT sp_%d;' % i)
-            err_msg = str(exc).split('\n')[0]
-            skipped.append({'index': i + 1, 'reason': err_msg, 'statement': preview})
-            logger.warning('Import skipped statement %d: %s', i + 1, err_msg)
-    return results, skipped
+        return _queue_sql_import(request, sql_file)
 
 
 class ImportProjectDataView(APIView):
     """
     POST /api/v1/data-transfer/import/project/
 
-    Smart project-scoped import.
+    Smart project-scoped import, queued as a background job (202 + job id).
     ─ Accepts: project_id (form field) + sql_file (multipart)
     ─ Detects the source project ID from the SQL header comment.
     ─ Remaps source project ID → target project UUID in every statement.
     ─ Skips accounts_user / core_projectmember rows automatically
       (user IDs differ between systems; their FK violations are expected).
-    ─ Imports all other rows with per-savepoint protection so one bad row
-      never rolls back the rest.
+    ─ Imports all other rows in batches; a failing batch is replayed
+      statement by statement so one bad row never loses the rest.
     ─ Any member of the target project (or admin) can trigger this.
     """
     permission_classes = [IsAuthenticated]
-    permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser]
 
     def post(self, request):
@@ -467,86 +254,37 @@ class ImportProjectDataView(APIView):
         if not sql_file.name.lower().endswith('.sql'):
             return Response({'success': False, 'error': 'Only .sql files are accepted.'}, status=400)
 
-        try:
-            sql_content = sql_file.read().decode('utf-8')
-        except UnicodeDecodeError:
-            sql_file.seek(0)
-            try:
-                sql_content = sql_file.read().decode('latin-1')
-            except Exception:
-                return Response({'success': False, 'error': 'File encoding not supported (use UTF-8).'}, status=400)
-
-        # ── Detect & remap project ID ─────────────────────────────────────
-        source_project_id = _detect_source_project_id(sql_content)
-        target_project_id = str(project.id)
-
-        remapped = False
-        if source_project_id and source_project_id != target_project_id:
-            sql_content = _remap_sql(sql_content, source_project_id, target_project_id)
-            remapped = True
-
-        # ── Split & safety-check ───────────────────────────────────────────
-        sql_content = _normalize_sql_for_connection(sql_content)
-        statements = _split_statements(sql_content)
-        if not statements:
-            return Response({'success': False, 'error': 'No executable SQL statements found.'}, status=400)
-
-        unsafe = []
-        for stmt in statements:
-            unsafe.extend(_is_unsafe(stmt))
-        if unsafe:
-            return Response({
-                'success': False,
-                'error': f'Blocked: dangerous statements found: {", ".join(set(unsafe))}'
-            }, status=400)
+        return _queue_sql_import(request, sql_file, project)
 
-        # ── Separate user-scoped statements from importable ones ───────────
-        user_stmts   = [s for s in statements if _stmt_targets_user_table(s)]
-        import_stmts = [s for s in statements if not _stmt_targets_user_table(s)]
 
-        # ── Execute importable statements ──────────────────────────────────
-        results = []
-        skipped = []
-        try:
-            with transaction.atomic():
-                with connection.cursor() as cursor:
-                    results, skipped = _run_savepoint_import(cursor, import_stmts)
-        except Exception as exc:
-            return Response({
-                'success': False,
-                'statements_executed': 0,
-                'total_statements': len(statements),
-                'errors': [{'error': str(exc)}],
-                'message': f'Import failed and was fully rolled back. Error: {str(exc)}'
-            }, status=400)
-
-        ok_count = len(results)
-        sk_count = len(skipped)
-        total    = len(statements)
-        skipped_user = len(user_stmts)
-
-        msg = (
-            f'Imported {ok_count} of {total} statement(s) into "{project.name}".'
-        )
-        if skipped_user:
-            msg += f' {skipped_user} user/member row(s) skipped (cross-system user IDs).'
-        if sk_count:
-            msg += f' {sk_count} other row(s) skipped (constraint violations).'
+class SqlImportJobView(APIView):
+    """
+    GET /api/v1/data-transfer/import/jobs/<job_id>/
+    Progress of a queued SQL import.  Once done, the import result
+    (statements_executed, skipped, …) is merged into the response.
+    """
+    permission_classes = [IsAuthenticated]
 
-        return Response({
-            'success': True,
-            'project': {'id': project.id, 'name': project.name},
-            'source_project_id': source_project_id,
-            'target_project_id': target_project_id,
-            'remapped': remapped,
-            'statements_executed': ok_count,
-            'statements_skipped': sk_count,
-            'statements_skipped_user': skipped_user,
-            'total_statements': total,
-            'skipped': skipped[:20],
-            'preview': [r['preview'] for r in results[:10]],
-            'message': msg,
-        })
+    def get(self, request, job_id):
+        from .models import ImportJob
+
+        job = ImportJob.objects.filter(pk=job_id, import_type='sql').first()
+        if job is None or not (_is_admin(request.user) or job.created_by_id == request.user.id):
+            return Response({'success': False, 'error': 'Import job not found.'}, status=404)
+
+        data = {
+            'job_id':           job.id,
+            'status':           job.status,
+            'rows_total':       job.rows_total,
+            'rows_processed':   job.rows_processed,
+            'progress_percent': job.progress_percent,
+        }
+        if job.status == 'done':
+            data.update(job.summary)
+        elif job.status == 'failed':
+            reason = job.error_log[0]['message'] if job.error_log else 'Import failed.'
+            data.update({'success': False, 'error': reason, 'message': reason})
+        return Response(data)
 
 
 class SqlTerminalView(APIView):
@@ -832,7 +570,8 @@ class CsvImportView(APIView):
     """
     POST /api/v1/data-transfer/csv/import/<project_id>/
     Body (multipart):  file=<upload>  type=workforce|materials
-    Commits the import, creates an ImportJob record.
+    Stores the upload on a pending ImportJob and queues it (import_jobs.py).
+    Responds 202 with the job id — poll csv/jobs/<project_id>/<job_id>/.
     """
     permission_classes = [IsAuthenticated]
     parser_classes     = [MultiPartParser]
@@ -840,7 +579,7 @@ class CsvImportView(APIView):
     def post(self, request, project_id):
         from apps.core.models import HouseProject, ProjectMember
         from .models import ImportJob
-        from .csv_io import import_workforce, import_materials
+        from .import_jobs import enqueue_import_job
 
         user = request.user
         if not (_is_admin(user) or ProjectMember.objects.filter(user=user, project_id=project_id).exists()):
@@ -869,27 +608,36 @@ class CsvImportView(APIView):
             import_type   = import_type,
             file_name     = file_name,
             file_format   = file_format,
-            status        = 'importing',
+            source_file   = upload,
+            status        = 'pending',
         )
-
-        try:
-            if import_type == 'workforce':
-                imported, skipped, errors = import_workforce(upload, project_id, user, job)
-            else:
-                imported, skipped, errors = import_materials(upload, project_id, user, job)
-        except Exception as e:
-            job.mark_failed(str(e))
-            logger.exception('CSV import failed for project %s type %s', project_id, import_type)
-            return Response({'error': str(e), 'job_id': job.id}, status=500)
+        enqueue_import_job(job)
 
         return Response({
             'success':   True,
             'job_id':    job.id,
-            'imported':  imported,
-            'skipped':   skipped,
-            'errors':    errors[:50],
-            'message':   f'Imported {imported} {import_type} record(s). {skipped} skipped.',
-        })
+            'status':    job.status,
+            'message':   f'{import_type.title()} import queued.',
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+def _job_data(j) -> dict:
+    return {
+        'id':               j.id,
+        'import_type':      j.import_type,
+        'file_name':        j.file_name,
+        'file_format':      j.file_format,
+        'status':           j.status,
+        'rows_total':       j.rows_total,
+        'rows_processed':   j.rows_processed,
+        'progress_percent': j.progress_percent,
+        'rows_imported':    j.rows_imported,
+        'rows_skipped':     j.rows_skipped,
+        'rows_failed':      j.rows_failed,
+        'created_by':       j.created_by.get_full_name() if j.created_by else '—',
+        'created_at':       j.created_at,
+        'completed_at':     j.completed_at,
+    }
 
 
 class ImportJobListView(APIView):
@@ -907,27 +655,45 @@ class ImportJobListView(APIView):
         if not (_is_admin(user) or ProjectMember.objects.filter(user=user, project_id=project_id).exists()):
             return Response({'error': 'Access denied.'}, status=403)
 
-        jobs = ImportJob.objects.filter(project_id=project_id).select_related('created_by')[:50]
-        data = [
-            {
-                'id':            j.id,
-                'import_type':   j.import_type,
-                'file_name':     j.file_name,
-                'file_format':   j.file_format,
-                'status':        j.status,
-                'rows_total':    j.rows_total,
-                'rows_imported': j.rows_imported,
-                'rows_skipped':  j.rows_skipped,
-                'rows_failed':   j.rows_failed,
-                'created_by':    j.created_by.get_full_name() if j.created_by else '—',
-                'created_at':    j.created_at,
-                'completed_at':  j.completed_at,
-            }
-            for j in jobs
-        ]
+        jobs = (
+            ImportJob.objects.filter(project_id=project_id)
+            .select_related('created_by')
+            .defer('error_log')[:50]
+        )
+        data = [_job_data(j) for j in jobs]
         return Response({'jobs': data, 'count': len(data)})
 
 
+class ImportJobDetailView(APIView):
+    """
+    GET /api/v1/data-transfer/csv/jobs/<project_id>/<job_id>/
+    Progress of one import — polled while the job runs.  Includes the
+    first 50 row errors once it has finished.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, project_id, job_id):
+        from apps.core.models import ProjectMember
+        from .models import ImportJob
+
+        user = request.user
+        if not (_is_admin(user) or ProjectMember.objects.filter(user=user, project_id=project_id).exists()):
+            return Response({'error': 'Access denied.'}, status=403)
+
+        job = ImportJob.objects.select_related('created_by').filter(project_id=project_id, pk=job_id).first()
+        if job is None:
+            return Response({'error': 'Import job not found.'}, status=404)
+
+        data = _job_data(job)
+        if job.status in ('done', 'failed'):
+            data['errors']  = job.error_log[:50]
+            data['message'] = (
+                f'Imported {job.rows_imported} {job.import_type} record(s). {job.rows_skipped} skipped.'
+                if job.status == 'done' else (job.error_log[0]['message'] if job.error_log else 'Import failed')
+            )
+        return Response(data)
+
+
 class GitHubActionsDeployView(APIView):
     """
     POST /api/v1/data-transfer/deploy/
@@ -18,3 +18,7 @@ class FinanceConfig(AppConfig):
             stacklevel=2,
         )
         import apps.finance.signals
+        from apps.financials.balances import register
+        from .models import AccountBalanceSnapshot, JournalLine
+
+        register(JournalLine, AccountBalanceSnapshot)
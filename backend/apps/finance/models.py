@@ -13,9 +13,10 @@ flow can be invoked from signals, management commands, or tests.
 
 from decimal import Decimal
 from django.db import models
-from django.db.models import Sum, Q
+from django.db.models import Sum
 
 from apps.core.models import ConstructionPhase
+from apps.financials.balances import BalanceTotalsMixin, JournalLineQuerySet, signed_balance
 from apps.resource.models import Material, Worker, Supplier
 from simple_history.models import HistoricalRecords
 
@@ -50,7 +51,7 @@ class ExpenseDocument(models.Model):
 # GL: Chart of Accounts + Journal
 # -----------------------------------------------------------------------------
 
-class Account(models.Model):
+class Account(BalanceTotalsMixin, models.Model):
     """Chart-of-accounts node."""
 
     ACCOUNT_TYPE_CHOICES = [
@@ -74,6 +75,10 @@ class Account(models.Model):
         null=True, blank=True, help_text="Scope this account to a specific project"
     )
 
+    # Running sums of journal_lines, maintained by apps.financials.balances
+    debit_total = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO, editable=False)
+    credit_total = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -88,15 +93,7 @@ class Account(models.Model):
     @property
     def balance(self):
         """Signed balance using the accounting convention for the type."""
-        agg = self.journal_lines.aggregate(
-            debit=Sum("amount", filter=Q(entry_type="DEBIT")),
-            credit=Sum("amount", filter=Q(entry_type="CREDIT")),
-        )
-        debit = agg["debit"] or ZERO
-        credit = agg["credit"] or ZERO
-        if self.account_type in ("ASSET", "EXPENSE"):
-            return debit - credit
-        return credit - debit
+        return signed_balance(self.account_type, self.debit_total, self.credit_total)
 
     # ---- helpers used by services -----------------------------------------
 
@@ -182,10 +179,33 @@ class JournalLine(models.Model):
     entry_type = models.CharField(max_length=10, choices=ENTRY_TYPE_CHOICES)
     description = models.CharField(max_length=255, blank=True)
 
+    objects = JournalLineQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.entry_type} Rs.{self.amount} — {self.account.name}"
 
 
+class AccountBalanceSnapshot(models.Model):
+    """Cumulative totals of an account at the end of `date` (see financials.balances)."""
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="balance_snapshots")
+    date = models.DateField()
+    debit_total = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO)
+    credit_total = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["account", "date"], name="finance_balance_snapshot_account_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="finance_balance_snapshot_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.account.code} @ {self.date}"
+
+
 # -----------------------------------------------------------------------------
 # Budget planning
 # -----------------------------------------------------------------------------
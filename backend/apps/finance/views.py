@@ -547,7 +547,7 @@ class PaymentViewSet(ProjectScopedMixin, viewsets.ModelViewSet):
             custom_message=request.data.get("message"),
         )
         if success:
-            return Response({"status": "Email sent successfully."})
+            return Response({"status": "Email queued for delivery."})
         return Response({"error": "Failed to send email. Check SMTP settings."}, status=500)
 
 
@@ -6,3 +6,34 @@ class FinancialsConfig(AppConfig):
     name = "apps.financials"
     label = 'financials'
     verbose_name = "Finance Module"
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from .balances import register
+        from .models import AccountBalanceSnapshot, JournalLine
+
+        register(JournalLine, AccountBalanceSnapshot)
+        post_migrate.connect(setup_periodic_tasks, sender=self)
+
+
+def setup_periodic_tasks(sender, **kwargs):
+    try:
+        from django_celery_beat.models import PeriodicTask, CrontabSchedule
+
+        # Yesterday's balance snapshot for both ledgers, shortly after midnight
+        schedule, created = CrontabSchedule.objects.get_or_create(
+            minute='15',
+            hour='0',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=schedule,
+            name='Snapshot Account Balances',
+            task='apps.financials.tasks.snapshot_account_balances',
+        )
+    except Exception as e:
+        print("Failed to setup periodic tasks for financials:", str(e))
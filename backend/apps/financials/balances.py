@@ -0,0 +1,376 @@
+"""
+financials/balances.py
+─────────────────────────────────────────────────────────────────────────────
+Materialized account balances for both general ledgers — apps.financials
+and the legacy apps.finance.
+
+Running totals
+    Every Account row carries `debit_total` / `credit_total`, the sums of
+    its JournalLines, so `Account.balance` is a column read instead of an
+    aggregate over every line.  They move in the same transaction as the
+    line write:
+
+      * JournalLine.objects.bulk_create (LedgerService.post_entry, loans)
+      * single line saves — new lines and edits of amount/side/account
+      * line deletes, including queryset deletes and the cascade from a
+        reversed JournalEntry
+      * JournalLine queryset .update() of a booked column
+
+    Deltas are applied with F() updates, account rows in pk order, so two
+    concurrent posts never lose each other's amounts.  Account.save() leaves
+    the totals alone (see BalanceTotalsMixin).
+
+Snapshots
+    AccountBalanceSnapshot rows hold cumulative totals at the end of a day.
+    The nightly "Snapshot Account Balances" task writes yesterday's from the
+    previous snapshot plus the lines in between.  A line booked on or before
+    an existing snapshot (or a JournalEntry whose date moves) adjusts the
+    later snapshots too, so `Ledger.totals_as_of(day)` is always the latest
+    snapshot on or before `day` plus the lines after it.
+
+Rows written outside the ORM (SQL import, raw SQL) bypass all of this —
+`manage.py reconcile_account_balances --fix` recomputes totals and
+snapshots from the lines.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Max, Q, Sum
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+ZERO = Decimal("0.00")
+DEBIT_NORMAL = ("ASSET", "EXPENSE")
+BOOKED_FIELDS = {"amount", "entry_type", "account", "account_id", "journal_entry", "journal_entry_id"}
+
+_ledgers = {}
+
+
+def signed_balance(account_type, debit, credit):
+    """Balance in the account's natural direction."""
+    if account_type in DEBIT_NORMAL:
+        return debit - credit
+    return credit - debit
+
+
+class BalanceTotalsMixin:
+    """
+    For Account models with `debit_total` / `credit_total` columns.
+
+    A plain save() would write back whatever totals the instance was loaded
+    with and silently undo postings made since — so updates skip them.
+    """
+    BALANCE_FIELDS = ("debit_total", "credit_total")
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.BALANCE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class JournalLineQuerySet(models.QuerySet):
+    """Keeps account totals in step with bulk line writes."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        ledger = _ledgers.get(self.model)
+        if ledger is not None:
+            ledger.book(ledger.line_rows(objs), +1)
+        return objs
+
+    def update(self, **kwargs):
+        ledger = _ledgers.get(self.model)
+        if ledger is None or not BOOKED_FIELDS & set(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list("pk", flat=True))
+            ledger.book(ledger.stored_rows(pks), -1)
+            count = super().update(**kwargs)
+            ledger.book(ledger.stored_rows(pks), +1)
+        return count
+
+
+class Ledger:
+    """Balance maintenance for one (Account, JournalEntry, JournalLine) set."""
+
+    def __init__(self, line_model, snapshot_model):
+        self.line_model = line_model
+        self.snapshot_model = snapshot_model
+        self.account_model = line_model._meta.get_field("account").related_model
+        self.entry_model = line_model._meta.get_field("journal_entry").related_model
+        self.label = line_model._meta.app_label
+
+    def __repr__(self):
+        return f"<Ledger {self.label}>"
+
+    # ── Line rows → deltas ───────────────────────────────────────────────────
+    def line_rows(self, lines):
+        """
+        (account_id, entry date, entry_type, amount) for line instances.
+        The date is read from the database: that is what snapshots were
+        booked against, whatever an in-memory entry has been changed to.
+        """
+        lines = list(lines)
+        dates = dict(
+            self.entry_model.objects.filter(pk__in={l.journal_entry_id for l in lines})
+            .values_list("pk", "date")
+        )
+        return [
+            (l.account_id, dates.get(l.journal_entry_id), l.entry_type, Decimal(str(l.amount)))
+            for l in lines
+        ]
+
+    def stored_rows(self, pks):
+        """Same as line_rows(), read from the database."""
+        return list(
+            self.line_model.objects.filter(pk__in=pks)
+            .values_list("account_id", "journal_entry__date", "entry_type", "amount")
+        )
+
+    def book(self, rows, sign, totals=True):
+        """
+        Add (sign=+1) or remove (sign=-1) `rows` from the account totals and
+        from every snapshot dated on or after each row's entry date.
+        """
+        accounts = defaultdict(lambda: [ZERO, ZERO])
+        snapshots = defaultdict(lambda: [ZERO, ZERO])
+        for account_id, day, entry_type, amount in rows:
+            side = 0 if entry_type == "DEBIT" else 1
+            accounts[account_id][side] += sign * amount
+            if day is not None:
+                snapshots[(account_id, day)][side] += sign * amount
+
+        # Account rows first and in pk order, the order take_snapshot() locks
+        # them in, so posts and snapshots touching the same accounts can't deadlock.
+        if totals:
+            for account_id in sorted(accounts):
+                debit, credit = accounts[account_id]
+                if debit or credit:
+                    self.account_model.objects.filter(pk=account_id).update(
+                        debit_total=F("debit_total") + debit,
+                        credit_total=F("credit_total") + credit,
+                    )
+        for (account_id, day), (debit, credit) in snapshots.items():
+            if debit or credit:
+                self.snapshot_model.objects.filter(account_id=account_id, date__gte=day).update(
+                    debit_total=F("debit_total") + debit,
+                    credit_total=F("credit_total") + credit,
+                )
+
+    # ── Signal handlers ──────────────────────────────────────────────────────
+    def _line_pre_save(self, sender, instance, raw=False, **kwargs):
+        instance._booked_rows = (
+            None if raw or instance._state.adding else self.stored_rows([instance.pk])
+        )
+
+    def _line_post_save(self, sender, instance, created, raw=False, **kwargs):
+        # Fixture loads carry their accounts' totals with them.
+        if raw:
+            return
+        old = getattr(instance, "_booked_rows", None)
+        new = self.line_rows([instance])
+        if created:
+            self.book(new, +1)
+        elif old is not None and old != new:
+            self.book(old, -1)
+            self.book(new, +1)
+        instance._booked_rows = None
+
+    def _line_pre_delete(self, sender, instance, **kwargs):
+        self.book(self.stored_rows([instance.pk]), -1)
+
+    def _entry_pre_save(self, sender, instance, raw=False, **kwargs):
+        instance._booked_date = None
+        if not raw and not instance._state.adding:
+            instance._booked_date = (
+                self.entry_model.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+            )
+
+    def _entry_post_save(self, sender, instance, created, raw=False, **kwargs):
+        old = getattr(instance, "_booked_date", None)
+        new = self.entry_model._meta.get_field("date").to_python(instance.date)
+        instance._booked_date = None
+        if created or raw or old is None or old == new:
+            return
+        lines = list(
+            self.line_model.objects.filter(journal_entry_id=instance.pk)
+            .values_list("account_id", "entry_type", "amount")
+        )
+        # Totals don't change — only which snapshots include these lines.
+        self.book([(a, old, t, amt) for a, t, amt in lines], -1, totals=False)
+        self.book([(a, new, t, amt) for a, t, amt in lines], +1, totals=False)
+
+    def connect(self):
+        uid = f"ledger_balances:{self.label}"
+        pre_save.connect(self._line_pre_save, sender=self.line_model, dispatch_uid=f"{uid}:line_pre_save", weak=False)
+        post_save.connect(self._line_post_save, sender=self.line_model, dispatch_uid=f"{uid}:line_post_save", weak=False)
+        pre_delete.connect(self._line_pre_delete, sender=self.line_model, dispatch_uid=f"{uid}:line_pre_delete", weak=False)
+        pre_save.connect(self._entry_pre_save, sender=self.entry_model, dispatch_uid=f"{uid}:entry_pre_save", weak=False)
+        post_save.connect(self._entry_post_save, sender=self.entry_model, dispatch_uid=f"{uid}:entry_post_save", weak=False)
+
+    # ── Aggregates from the lines ────────────────────────────────────────────
+    def _line_totals(self, **filters):
+        """{account_id: (debit, credit)} over the lines matching `filters`."""
+        rows = (
+            self.line_model.objects.filter(**filters)
+            .values("account_id")
+            .annotate(
+                debit=Sum("amount", filter=Q(entry_type="DEBIT")),
+                credit=Sum("amount", filter=Q(entry_type="CREDIT")),
+            )
+            .order_by()
+        )
+        return {r["account_id"]: (r["debit"] or ZERO, r["credit"] or ZERO) for r in rows}
+
+    def totals_as_of(self, day, account_ids=None, before=False):
+        """
+        {account_id: (debit, credit)} cumulative to the end of `day`.
+
+        Starts from each account's latest snapshot on or before `day`
+        (strictly before with before=True) and adds the lines after it;
+        accounts without one are aggregated from the start.
+        """
+        accounts = self.account_model.objects.all()
+        if account_ids is not None:
+            accounts = accounts.filter(pk__in=list(account_ids))
+        ids = list(accounts.values_list("pk", flat=True))
+
+        snaps = self.snapshot_model.objects.filter(
+            account_id__in=ids, **{"date__lt" if before else "date__lte": day}
+        )
+        latest = defaultdict(list)
+        per_account = snaps.values("account_id").annotate(d=Max("date")).order_by()
+        for account_id, snap_day in per_account.values_list("account_id", "d"):
+            latest[snap_day].append(account_id)
+
+        totals = {pk: (ZERO, ZERO) for pk in ids}
+        seen = set()
+        for snap_day, group in latest.items():
+            seen.update(group)
+            for account_id, debit, credit in self.snapshot_model.objects.filter(
+                account_id__in=group, date=snap_day,
+            ).values_list("account_id", "debit_total", "credit_total"):
+                totals[account_id] = (debit, credit)
+            later = self._line_totals(
+                account_id__in=group, journal_entry__date__gt=snap_day, journal_entry__date__lte=day,
+            )
+            for account_id, (debit, credit) in later.items():
+                base = totals[account_id]
+                totals[account_id] = (base[0] + debit, base[1] + credit)
+
+        rest = [pk for pk in ids if pk not in seen]
+        if rest:
+            totals.update(self._line_totals(account_id__in=rest, journal_entry__date__lte=day))
+        return totals
+
+    def balances_as_of(self, day, accounts):
+        """{account_id: signed balance} for Account instances `accounts`."""
+        accounts = list(accounts)
+        totals = self.totals_as_of(day, [a.pk for a in accounts])
+        return {
+            a.pk: signed_balance(a.account_type, *totals.get(a.pk, (ZERO, ZERO)))
+            for a in accounts
+        }
+
+    # ── Snapshots ────────────────────────────────────────────────────────────
+    @transaction.atomic
+    def take_snapshot(self, day):
+        """Write (or rewrite) every account's snapshot for `day`."""
+        # Lock the accounts so a post can't land between reading the lines
+        # and inserting the row its snapshot update would have to find.
+        list(self.account_model.objects.select_for_update().order_by("pk").values_list("pk", flat=True))
+        totals = self.totals_as_of(day, before=True)
+        self.snapshot_model.objects.bulk_create(
+            [
+                self.snapshot_model(account_id=pk, date=day, debit_total=d, credit_total=c)
+                for pk, (d, c) in totals.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["account", "date"],
+            update_fields=["debit_total", "credit_total"],
+        )
+        return len(totals)
+
+    # ── Reconciliation ───────────────────────────────────────────────────────
+    def reconcile(self, fix=False, snapshots=False):
+        """
+        Compare stored totals (and, with snapshots=True, every snapshot)
+        against the lines.  Returns a list of drift records; with fix=True
+        the stored values are overwritten with the recomputed ones.
+        """
+        drift = []
+        with transaction.atomic():
+            actual = self._line_totals()
+            stored = self.account_model.objects.select_for_update().values_list("pk", "debit_total", "credit_total")
+            for pk, debit, credit in stored:
+                expected = actual.get(pk, (ZERO, ZERO))
+                if (debit, credit) != expected:
+                    drift.append({"ledger": self.label, "account": pk, "date": None,
+                                  "stored": (debit, credit), "expected": expected})
+                    if fix:
+                        self.account_model.objects.filter(pk=pk).update(
+                            debit_total=expected[0], credit_total=expected[1],
+                        )
+
+            if snapshots:
+                drift.extend(self._reconcile_snapshots(fix))
+        return drift
+
+    def _reconcile_snapshots(self, fix):
+        drift = []
+        running = defaultdict(lambda: (ZERO, ZERO))
+        previous = None
+        days = self.snapshot_model.objects.values_list("date", flat=True).distinct().order_by("date")
+        for day in list(days):
+            window = {"journal_entry__date__lte": day}
+            if previous is not None:
+                window["journal_entry__date__gt"] = previous
+            for account_id, (debit, credit) in self._line_totals(**window).items():
+                base = running[account_id]
+                running[account_id] = (base[0] + debit, base[1] + credit)
+            previous = day
+
+            for snap in self.snapshot_model.objects.filter(date=day):
+                expected = running[snap.account_id]
+                if (snap.debit_total, snap.credit_total) != expected:
+                    drift.append({"ledger": self.label, "account": snap.account_id, "date": day,
+                                  "stored": (snap.debit_total, snap.credit_total), "expected": expected})
+                    if fix:
+                        snap.debit_total, snap.credit_total = expected
+                        snap.save(update_fields=["debit_total", "credit_total"])
+        return drift
+
+
+def register(line_model, snapshot_model):
+    """Maintain balances for `line_model`'s ledger.  Call from AppConfig.ready()."""
+    ledger = Ledger(line_model, snapshot_model)
+    _ledgers[line_model] = ledger
+    ledger.connect()
+    return ledger
+
+
+def ledger_for(model):
+    """The registered Ledger for a line, entry or account model."""
+    for ledger in _ledgers.values():
+        if model in (ledger.line_model, ledger.entry_model, ledger.account_model):
+            return ledger
+    return None
+
+
+def ledgers():
+    return list(_ledgers.values())
+
+
+def snapshot_all(day):
+    """Snapshot every registered ledger for `day`.  Returns rows written."""
+    return sum(ledger.take_snapshot(day) for ledger in ledgers())
+
+
+def reconcile_all(fix=False, snapshots=False):
+    drift = []
+    for ledger in ledgers():
+        drift.extend(ledger.reconcile(fix=fix, snapshots=snapshots))
+    return drift
@@ -0,0 +1,49 @@
+"""
+Verify (and with --fix, rebuild) the materialized account balances of both
+ledgers against their journal lines.
+
+Totals are maintained on every posting (see apps.financials.balances), but
+rows written outside the ORM (SQL import, raw updates) bypass that — run
+this afterwards.  Exits non-zero when drift is found and not fixed.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.financials.balances import ledgers
+
+
+class Command(BaseCommand):
+    help = "Check Account debit/credit totals and balance snapshots against the journal lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Overwrite drifted totals with the recomputed ones")
+        parser.add_argument("--snapshots", action="store_true", help="Also check every balance snapshot")
+        parser.add_argument(
+            "--snapshot-date", type=datetime.date.fromisoformat,
+            help="Afterwards (re)write the snapshot for this date (YYYY-MM-DD)",
+        )
+        parser.add_argument("--ledger", choices=["finance", "financials"], help="Only this ledger")
+
+    def handle(self, *args, **opts):
+        selected = [l for l in ledgers() if not opts["ledger"] or l.label == opts["ledger"]]
+        unfixed = 0
+        for ledger in selected:
+            drift = ledger.reconcile(fix=opts["fix"], snapshots=opts["snapshots"])
+            for d in drift:
+                where = f" @ {d['date']}" if d["date"] else ""
+                self.stdout.write(
+                    f"  {ledger.label} account={d['account']}{where}: "
+                    f"stored Dr {d['stored'][0]} / Cr {d['stored'][1]}, "
+                    f"lines Dr {d['expected'][0]} / Cr {d['expected'][1]}"
+                )
+            if opts["snapshot_date"]:
+                ledger.take_snapshot(opts["snapshot_date"])
+            status = "fixed" if opts["fix"] else "found"
+            self.stdout.write(f"{ledger.label}: {len(drift)} drifted row(s) {status}")
+            if not opts["fix"]:
+                unfixed += len(drift)
+
+        if unfixed:
+            raise CommandError(f"{unfixed} balance row(s) out of step — re-run with --fix")
+        self.stdout.write(self.style.SUCCESS("OK — balances match the journal lines"))
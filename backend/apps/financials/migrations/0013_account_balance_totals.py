@@ -0,0 +1,65 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:13
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Q, Sum
+
+
+def backfill_totals(apps, schema_editor):
+    """Seed the running totals from the journal lines posted so far."""
+    Account = apps.get_model("financials", "Account")
+    JournalLine = apps.get_model("financials", "JournalLine")
+    rows = (
+        JournalLine.objects.values("account_id")
+        .annotate(
+            debit=Sum("amount", filter=Q(entry_type="DEBIT")),
+            credit=Sum("amount", filter=Q(entry_type="CREDIT")),
+        )
+        .order_by()
+    )
+    for row in rows:
+        Account.objects.filter(pk=row["account_id"]).update(
+            debit_total=row["debit"] or Decimal("0.00"),
+            credit_total=row["credit"] or Decimal("0.00"),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financials', '0012_migrate_finance_budget_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='credit_total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=18),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='debit_total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=18),
+        ),
+        migrations.CreateModel(
+            name='AccountBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('debit_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('credit_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fin_balance_snapshots', to='financials.account')),
+            ],
+            options={
+                'db_table': 'fin_accountbalancesnapshot',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='fin_balance_snapshot_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='accountbalancesnapshot',
+            constraint=models.UniqueConstraint(fields=('account', 'date'), name='fin_balance_snapshot_account_date'),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from .account              import Account, AccountType
+from .account              import Account, AccountType, AccountBalanceSnapshot
 from .journal              import JournalEntry, JournalLine, EntryType
 from .transfer             import CashTransfer
 from .loan                 import LoanDisbursement, LoanEMIPayment
@@ -10,7 +10,7 @@ from .phase_budget         import PhaseBudgetLine, BudgetRevision
 from .expense              import Expense
 
 __all__ = [
-    "Account", "AccountType",
+    "Account", "AccountType", "AccountBalanceSnapshot",
     "JournalEntry", "JournalLine", "EntryType",
     "CashTransfer",
     "LoanDisbursement", "LoanEMIPayment",
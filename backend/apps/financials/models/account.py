@@ -5,7 +5,8 @@ Every financial transaction posts to at least two accounts (double-entry).
 import uuid
 from decimal import Decimal
 from django.db import models
-from django.db.models import Sum, Q
+
+from ..balances import BalanceTotalsMixin, signed_balance
 
 
 ZERO = Decimal("0.00")
@@ -19,7 +20,7 @@ class AccountType(models.TextChoices):
     EXPENSE   = "EXPENSE",   "Expense"     # Costs
 
 
-class Account(models.Model):
+class Account(BalanceTotalsMixin, models.Model):
     """
     A single row in the Chart of Accounts.
 
@@ -29,6 +30,8 @@ class Account(models.Model):
     - LIABILITY / EQUITY / REVENUE: balance = total_credits - total_debits
     - is_bank=True  → shown in Banking section
     - is_loan=True  → shown in Loans section (must be LIABILITY type)
+    - debit_total / credit_total are running sums of the journal lines,
+      maintained by financials.balances — never set them by hand
     """
 
     id   = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -59,6 +62,10 @@ class Account(models.Model):
     loan_tenure_months  = models.IntegerField(null=True, blank=True)
     emi_amount          = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
 
+    # ── Running totals (financials.balances) ─────────────────────────────────
+    debit_total  = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO, editable=False)
+    credit_total = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO, editable=False)
+
     is_active   = models.BooleanField(default=True)
     created_at  = models.DateTimeField(auto_now_add=True)
     updated_at  = models.DateTimeField(auto_now=True)
@@ -73,20 +80,40 @@ class Account(models.Model):
     def __str__(self):
         return f"{self.code} – {self.name}"
 
-    # ── Computed balance ─────────────────────────────────────────────────────
+    # ── Balance ──────────────────────────────────────────────────────────────
     @property
     def balance(self) -> Decimal:
         """
-        Calculates live balance from journal lines.
-        Calls no external services — pure DB aggregation.
+        Balance from the materialized debit/credit totals.
+        For a past date use financials.balances (AccountBalanceSnapshot).
         """
-        agg = self.fin_journal_lines.aggregate(
-            debit=Sum("amount", filter=Q(entry_type="DEBIT")),
-            credit=Sum("amount", filter=Q(entry_type="CREDIT")),
-        )
-        debit  = agg["debit"]  or ZERO
-        credit = agg["credit"] or ZERO
-
-        if self.account_type in (AccountType.ASSET, AccountType.EXPENSE):
-            return debit - credit
-        return credit - debit
+        return signed_balance(self.account_type, self.debit_total, self.credit_total)
+
+
+class AccountBalanceSnapshot(models.Model):
+    """
+    Cumulative debit/credit totals of one account at the end of `date`.
+    Written nightly; later postings dated on or before `date` adjust it.
+    """
+    account      = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="fin_balance_snapshots")
+    date         = models.DateField()
+    debit_total  = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO)
+    credit_total = models.DecimalField(max_digits=18, decimal_places=2, default=ZERO)
+
+    class Meta:
+        app_label = "financials"
+        db_table  = "fin_accountbalancesnapshot"
+        ordering  = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["account", "date"], name="fin_balance_snapshot_account_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="fin_balance_snapshot_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.account.code} @ {self.date}"
+
+    @property
+    def balance(self) -> Decimal:
+        return signed_balance(self.account.account_type, self.debit_total, self.credit_total)
@@ -9,6 +9,8 @@ import uuid
 from django.db import models
 from django.conf import settings
 
+from ..balances import JournalLineQuerySet
+
 
 class EntryType(models.TextChoices):
     DEBIT  = "DEBIT",  "Debit"
@@ -82,6 +84,8 @@ class JournalLine(models.Model):
     amount        = models.DecimalField(max_digits=15, decimal_places=2)
     note          = models.CharField(max_length=255, blank=True, default="")
 
+    objects = JournalLineQuerySet.as_manager()
+
     class Meta:
         app_label = "financials"
         db_table  = "fin_journalline"
@@ -0,0 +1,13 @@
+import datetime
+
+from celery import shared_task
+from django.utils import timezone
+
+
+@shared_task
+def snapshot_account_balances(day=None):
+    """Write the end-of-day balance snapshot (default: yesterday) for both ledgers."""
+    from .balances import snapshot_all
+
+    day = datetime.date.fromisoformat(day) if day else timezone.localdate() - datetime.timedelta(days=1)
+    return {'date': day.isoformat(), 'snapshots': snapshot_all(day)}
@@ -0,0 +1,153 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.finance import models as legacy
+from apps.finance.services import LedgerService as LegacyLedgerService
+from apps.financials.balances import ledger_for
+from apps.financials.models import Account, AccountBalanceSnapshot, JournalEntry, JournalLine
+from apps.financials.services.ledger import LedgerService
+from apps.financials.tasks import snapshot_account_balances
+
+User = get_user_model()
+
+D = Decimal
+JAN_1 = datetime.date(2026, 1, 1)
+JAN_10 = datetime.date(2026, 1, 10)
+JAN_20 = datetime.date(2026, 1, 20)
+
+
+class MaterializedBalanceTestCase(TestCase):
+    def setUp(self):
+        self.bank = Account.objects.create(code="1010", name="Bank", account_type="ASSET", is_bank=True)
+        self.equity = Account.objects.create(code="3000", name="Capital", account_type="EQUITY")
+        self.ledger = ledger_for(Account)
+
+    def _deposit(self, amount, day=JAN_10):
+        return LedgerService.post_entry(
+            date=day, description="Deposit",
+            lines=[
+                {"account_id": self.bank.id, "entry_type": "DEBIT", "amount": amount},
+                {"account_id": self.equity.id, "entry_type": "CREDIT", "amount": amount},
+            ],
+        )
+
+    def _refresh(self):
+        self.bank.refresh_from_db()
+        self.equity.refresh_from_db()
+
+    def test_post_entry_maintains_totals(self):
+        self._deposit(D("500.00"))
+        self._deposit(D("250.00"))
+        self._refresh()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.bank.balance, D("750.00"))
+            self.assertEqual(self.equity.balance, D("750.00"))
+        self.assertEqual((self.bank.debit_total, self.bank.credit_total), (D("750.00"), D("0.00")))
+
+    def test_deleting_entry_and_editing_lines(self):
+        je = self._deposit(D("500.00"))
+        self._deposit(D("100.00"))
+
+        line = je.fin_lines.get(account=self.bank)
+        line.amount = D("400.00")
+        line.save()
+        JournalLine.objects.filter(pk=je.fin_lines.get(account=self.equity).pk).update(amount=D("400.00"))
+        self._refresh()
+        self.assertEqual((self.bank.balance, self.equity.balance), (D("500.00"), D("500.00")))
+
+        je.delete()
+        self._refresh()
+        self.assertEqual((self.bank.balance, self.equity.balance), (D("100.00"), D("100.00")))
+
+    def test_account_save_keeps_totals(self):
+        stale = Account.objects.get(pk=self.bank.pk)
+        self._deposit(D("500.00"))
+
+        stale.name = "Main Bank"
+        stale.save()
+
+        self._refresh()
+        self.assertEqual(self.bank.name, "Main Bank")
+        self.assertEqual(self.bank.balance, D("500.00"))
+
+    def test_as_of_uses_snapshots_and_backdated_postings(self):
+        self._deposit(D("500.00"), day=JAN_1)
+        self._deposit(D("200.00"), day=JAN_20)
+        snapshot_account_balances(JAN_10.isoformat())
+        snap = AccountBalanceSnapshot.objects.get(account=self.bank, date=JAN_10)
+        self.assertEqual(snap.balance, D("500.00"))
+
+        self._deposit(D("50.00"), day=datetime.date(2026, 1, 5))
+        snap.refresh_from_db()
+        self.assertEqual(snap.balance, D("550.00"))
+
+        je = JournalEntry.objects.get(date=JAN_20)
+        je.date = datetime.date(2026, 1, 8)
+        je.save()
+        snap.refresh_from_db()
+        self.assertEqual(snap.balance, D("750.00"))
+
+        balances = self.ledger.balances_as_of(datetime.date(2026, 1, 7), [self.bank])
+        self.assertEqual(balances[self.bank.id], D("550.00"))
+        balances = self.ledger.balances_as_of(JAN_20, [self.bank, self.equity])
+        self.assertEqual(balances, {self.bank.id: D("750.00"), self.equity.id: D("750.00")})
+
+    def test_reconcile_command_reports_and_fixes_drift(self):
+        self._deposit(D("500.00"))
+        snapshot_account_balances(JAN_20.isoformat())
+        Account.objects.filter(pk=self.bank.pk).update(debit_total=D("1.00"))
+        AccountBalanceSnapshot.objects.filter(account=self.equity).update(credit_total=D("9.00"))
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_account_balances", "--snapshots", stdout=StringIO())
+
+        out = StringIO()
+        call_command("reconcile_account_balances", "--snapshots", "--fix", stdout=out)
+        self.assertIn("financials: 2 drifted row(s) fixed", out.getvalue())
+        self._refresh()
+        self.assertEqual(self.bank.balance, D("500.00"))
+        self.assertEqual(AccountBalanceSnapshot.objects.get(account=self.equity).balance, D("500.00"))
+
+        call_command("reconcile_account_balances", "--snapshots", stdout=StringIO())
+
+    def test_cash_flow_report_as_of(self):
+        user = User.objects.create_user(username="fin", password="pass12345")
+        client = APIClient()
+        client.force_authenticate(user)
+        self._deposit(D("500.00"), day=JAN_1)
+        self._deposit(D("200.00"), day=JAN_20)
+
+        data = client.get("/api/v1/financials/reports/", {"type": "cash_flow"}).data
+        self.assertEqual(data["total_bank_balance"], 700.0)
+        data = client.get("/api/v1/financials/reports/", {"type": "cash_flow", "as_of": "2026-01-10"}).data
+        self.assertEqual(data["total_bank_balance"], 500.0)
+
+        data = client.get("/api/v1/financials/accounts/balances/", {"as_of": "2026-01-10"}).data
+        self.assertEqual({a["code"]: a["balance"] for a in data["accounts"]}, {"1010": 500.0, "3000": 500.0})
+
+
+class LegacyLedgerBalanceTestCase(TestCase):
+    def test_post_and_reverse(self):
+        cash = legacy.Account.default_cash()
+        equity = legacy.Account.default_equity()
+        je = LegacyLedgerService.post(
+            date=JAN_10, description="Funding", source="FUNDING",
+            lines=[
+                {"account": cash, "amount": D("300.00"), "entry_type": "DEBIT"},
+                {"account": equity, "amount": D("300.00"), "entry_type": "CREDIT"},
+            ],
+        )
+        cash.refresh_from_db()
+        self.assertEqual(cash.balance, D("300.00"))
+
+        LegacyLedgerService.reverse(je)
+        cash.refresh_from_db()
+        equity.refresh_from_db()
+        self.assertEqual((cash.balance, equity.balance), (D("0.00"), D("0.00")))
@@ -5,6 +5,7 @@ Base prefix: /api/v1/financials/
 All endpoints
 ─────────────
 GET/POST        /financials/accounts/
+GET             /financials/accounts/balances/?as_of=YYYY-MM-DD
 GET/PATCH/DEL   /financials/accounts/{id}/
 POST            /financials/accounts/{id}/deposit/
 POST            /financials/accounts/{id}/pay-emi/
@@ -5,6 +5,7 @@ Extra actions
 -------------
 POST /accounts/{id}/deposit/   — add a deposit / opening balance
 POST /accounts/{id}/pay-emi/   — pay one monthly EMI for a loan account
+GET  /accounts/balances/?as_of=YYYY-MM-DD — every listed account's balance at a date
 """
 import datetime
 from decimal import Decimal
@@ -15,6 +16,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from ..balances import ledger_for
 from ..models.account import Account, AccountType
 from ..models.loan import LoanEMIPayment
 from ..serializers.account import AccountSerializer
@@ -65,6 +67,32 @@ class AccountViewSet(viewsets.ModelViewSet):
         pid = _pid(self.request)
         serializer.save(project_id=pid)
 
+    # ── GET /accounts/balances/?as_of= ───────────────────────────────────────
+    @action(detail=False, methods=["get"], url_path="balances")
+    def balances(self, request):
+        """Balances at the end of `as_of` (default today), from the balance snapshots."""
+        raw = request.query_params.get("as_of")
+        try:
+            as_of = datetime.date.fromisoformat(raw) if raw else datetime.date.today()
+        except ValueError:
+            return Response({"error": "as_of must be YYYY-MM-DD."}, status=400)
+
+        accounts = list(self.get_queryset())
+        balances = ledger_for(Account).balances_as_of(as_of, accounts)
+        return Response({
+            "as_of": as_of.isoformat(),
+            "accounts": [
+                {
+                    "id":           str(acc.id),
+                    "code":         acc.code,
+                    "name":         acc.name,
+                    "account_type": acc.account_type,
+                    "balance":      float(balances[acc.id]),
+                }
+                for acc in accounts
+            ],
+        })
+
     # ── POST /accounts/{id}/deposit/ ─────────────────────────────────────────
     @action(detail=True, methods=["post"], url_path="deposit")
     def deposit(self, request, pk=None):
@@ -2,9 +2,10 @@
 Finance Reports View — generates summary reports.
 
 GET /financials/reports/?type=<type>&project=<id>&months=<n>
+GET /financials/reports/?type=cash_flow&as_of=YYYY-MM-DD   — bank balance at a past date
 """
 from decimal import Decimal
-from datetime import timedelta
+from datetime import date, timedelta
 from django.utils import timezone
 from django.db.models import Sum
 from rest_framework.views import APIView
@@ -13,6 +14,7 @@ from rest_framework.response import Response
 
 from ..models.expense import Expense
 from ..models.bill import Bill
+from ..balances import ledger_for
 from ..models.account import Account
 
 
@@ -34,7 +36,12 @@ class FinanceReportsView(APIView):
         if report_type == "expense_summary":
             return self._expense_summary(pid, since)
         elif report_type == "cash_flow":
-            return self._cash_flow(pid, since)
+            as_of = request.query_params.get("as_of")
+            try:
+                as_of = date.fromisoformat(as_of) if as_of else None
+            except ValueError:
+                return Response({"error": "as_of must be YYYY-MM-DD."}, status=400)
+            return self._cash_flow(pid, since, as_of)
         else:
             return self._summary(pid, since)
 
@@ -78,15 +85,21 @@ class FinanceReportsView(APIView):
             ],
         })
 
-    def _cash_flow(self, pid, since):
+    def _cash_flow(self, pid, since, as_of=None):
         bank_qs = Account.objects.filter(is_bank=True, is_active=True)
         if pid:
             bank_qs = bank_qs.filter(project_id=pid)
+        banks = list(bank_qs)
 
-        total_balance = sum((a.balance for a in bank_qs), Decimal("0"))
+        if as_of:
+            balances = ledger_for(Account).balances_as_of(as_of, banks).values()
+        else:
+            balances = (a.balance for a in banks)
+        total_balance = sum(balances, Decimal("0"))
 
         return Response({
             "type": "cash_flow",
+            "as_of": as_of.isoformat() if as_of else None,
             "total_bank_balance": float(total_balance),
-            "bank_count": bank_qs.count(),
+            "bank_count": len(banks),
         })
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import ProjectGeofence, StaffLocationLog, StaffPresenceSession
+from .models import (
+    ProjectGeofence, StaffLastPosition, StaffLocationLog, StaffLocationTrack, StaffPresenceSession,
+)
 
 
 @admin.register(ProjectGeofence)
@@ -17,6 +19,20 @@ class StaffLocationLogAdmin(admin.ModelAdmin):
     readonly_fields = ('timestamp',)
 
 
+@admin.register(StaffLocationTrack)
+class StaffLocationTrackAdmin(admin.ModelAdmin):
+    list_display    = ('user', 'date', 'started_at', 'ended_at', 'raw_count', 'point_count')
+    search_fields   = ('user__username', 'user__email')
+    readonly_fields = ('encoded', 'created_at')
+
+
+@admin.register(StaffLastPosition)
+class StaffLastPositionAdmin(admin.ModelAdmin):
+    list_display  = ('user', 'project', 'is_on_site', 'accuracy', 'timestamp')
+    list_filter   = ('is_on_site', 'project')
+    search_fields = ('user__username', 'user__email')
+
+
 @admin.register(StaffPresenceSession)
 class StaffPresenceSessionAdmin(admin.ModelAdmin):
     list_display  = ('user', 'project', 'entry_at', 'exit_at', 'duration_minutes', 'last_ping_at', 'is_active')
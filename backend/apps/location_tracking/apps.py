@@ -4,3 +4,32 @@ class LocationTrackingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.location_tracking'
     verbose_name = 'Location Tracking'
+
+    def ready(self):
+        import apps.location_tracking.signals  # noqa: F401 — registers all signals
+        from django.db.models.signals import post_migrate
+        post_migrate.connect(setup_periodic_tasks, sender=self)
+
+def setup_periodic_tasks(sender, **kwargs):
+    try:
+        from django_celery_beat.models import PeriodicTask, CrontabSchedule
+
+        from django.conf import settings
+
+        # Compact raw GPS pings every night at 02:30 site time
+        schedule, created = CrontabSchedule.objects.get_or_create(
+            minute='30',
+            hour='2',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone=settings.TIME_ZONE,
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=schedule,
+            name='Compact Location Logs',
+            task='apps.location_tracking.tasks.compact_location_logs_task',
+        )
+    except Exception as e:
+        print("Failed to setup periodic tasks for location tracking:", str(e))
@@ -0,0 +1,166 @@
+"""
+geofence_index.py — grid-bucketed, cached geofence matching
+═══════════════════════════════════════════════════════════
+LocationPingView used to load every active ProjectGeofence on every ping
+and run haversine against each one in Python.
+
+`geofence_index` keeps every active fence in process memory, bucketed into
+a lat/lon grid of CELL_DEG cells.  Each fence is registered in every cell
+its radius touches, so a ping only needs the handful of fences in its own
+cell; those candidates are checked with one vectorized haversine call.
+
+The index is shared by all users.  A user's project set is applied as a
+filter on the candidates, so one cached index serves every project set
+instead of one index per combination.
+
+Invalidation mirrors the attendance worker directory: ProjectGeofence
+post_save / post_delete (signals.py) clears this process's copy and bumps
+a version counter in the Django cache so other processes reload.  As there,
+the version is read outside the lock and, when the cache is unreachable,
+checks pause for CACHE_BACKOFF_SECS (FALLBACK_TTL_SECS reloads meanwhile).
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .utils import haversine_many
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY        = "location:geofence-index:version"
+VERSION_CHECK_SECS = 5
+FALLBACK_TTL_SECS  = 300
+CACHE_BACKOFF_SECS = 30
+
+CELL_DEG = 0.01           # ≈ 1.1 km of latitude per cell
+METERS_PER_DEG = 111320.0
+
+
+def _cell(lat, lon):
+    return (math.floor(lat / CELL_DEG), math.floor(lon / CELL_DEG))
+
+
+class GeofenceIndex:
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self._fences     = []                  # in ProjectGeofence.Meta.ordering
+        self._cells      = defaultdict(list)   # cell → [fence position, …]
+        self._loaded     = False
+        self._version    = None
+        self._loaded_at  = 0.0
+        self._checked_at = 0.0
+        self._cache_down_until = 0.0
+
+    # ── Lookups ───────────────────────────────────────────────────────────────
+
+    def candidates(self, lat, lon, project_ids=None):
+        """Active fences whose radius may cover (lat, lon), in model ordering."""
+        fences, cells = self._snapshot()
+        positions = cells.get(_cell(lat, lon), ())
+        found = [fences[i] for i in sorted(positions)]
+        if project_ids:
+            found = [f for f in found if f.project_id in project_ids]
+        return found
+
+    def match(self, lat, lon, project_ids=None):
+        """First active fence (model ordering) containing the point, or None."""
+        found = self.candidates(lat, lon, project_ids)
+        if not found:
+            return None
+        distances = haversine_many(
+            lat, lon,
+            [float(f.latitude) for f in found],
+            [float(f.longitude) for f in found],
+        )
+        for fence, distance in zip(found, distances):
+            if distance <= fence.radius_meters:
+                return fence
+        return None
+
+    # ── Invalidation ──────────────────────────────────────────────────────────
+
+    def invalidate(self):
+        """Drop this process's copy now; after commit, tell other processes."""
+        with self._lock:
+            self._loaded = False
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        with self._lock:
+            self._loaded = False
+        try:
+            if cache.add(VERSION_KEY, 1, timeout=None) is False:
+                cache.incr(VERSION_KEY)
+        except Exception as exc:
+            logger.warning("Geofence index version bump failed: %s", exc)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _remote_version(self, now):
+        """Shared version, or None while the cache is unreachable (then back off)."""
+        if now < self._cache_down_until:
+            return None
+        try:
+            version = cache.get(VERSION_KEY)
+            if version is None:
+                # First process since a flush: start the counter, so that
+                # None from here on means the cache is unreachable.
+                added = cache.add(VERSION_KEY, 0, timeout=None)
+                if added:
+                    version = 0
+                elif added is False:  # another process got there first
+                    version = cache.get(VERSION_KEY)
+        except Exception:
+            version = None
+        if version is None:
+            self._cache_down_until = now + CACHE_BACKOFF_SECS
+        return version
+
+    def _snapshot(self):
+        now = time.monotonic()
+        version = None
+        check = not self._loaded or now - self._checked_at >= VERSION_CHECK_SECS
+        if check:
+            self._checked_at = now
+            version = self._remote_version(now)  # no lock held while the cache answers
+        with self._lock:
+            if check and self._loaded:
+                if version is None:
+                    stale = now - self._loaded_at >= FALLBACK_TTL_SECS
+                else:
+                    stale = version != self._version
+                if stale:
+                    self._loaded = False
+            if not self._loaded:
+                self._load(now, version)
+            return self._fences, self._cells
+
+    def _load(self, now, version):
+        from .models import ProjectGeofence
+
+        fences = list(ProjectGeofence.objects.filter(is_active=True).select_related("project"))
+        cells = defaultdict(list)
+        for pos, fence in enumerate(fences):
+            lat, lon = float(fence.latitude), float(fence.longitude)
+            dlat = fence.radius_meters / METERS_PER_DEG
+            dlon = fence.radius_meters / (METERS_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+            lat_lo, lon_lo = _cell(lat - dlat, lon - dlon)
+            lat_hi, lon_hi = _cell(lat + dlat, lon + dlon)
+            for i in range(lat_lo, lat_hi + 1):
+                for j in range(lon_lo, lon_hi + 1):
+                    cells[(i, j)].append(pos)
+
+        self._fences     = fences
+        self._cells      = cells
+        self._version    = version
+        self._loaded     = True
+        self._loaded_at  = now
+        self._checked_at = now
+
+
+geofence_index = GeofenceIndex()
@@ -0,0 +1,24 @@
+"""
+Compact raw StaffLocationLog rows into simplified StaffLocationTrack rows.
+
+Runs nightly via Celery beat ("Compact Location Logs"); use this for a
+first large backlog or to apply a different retention window by hand.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.location_tracking.tracks import compact_location_logs
+
+
+class Command(BaseCommand):
+    help = "Fold raw GPS pings older than the retention window into daily tracks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Retention in days (default LOCATION_LOG_RETENTION_DAYS)")
+        parser.add_argument("--user", type=int, help="Only compact this user id")
+        parser.add_argument("--tolerance", type=float, help="Simplification tolerance in meters")
+
+    def handle(self, *args, **opts):
+        tracks, removed = compact_location_logs(
+            days=opts.get("days"), user_id=opts.get("user"), tolerance_m=opts.get("tolerance"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"OK — tracks={tracks} raw_removed={removed}"))
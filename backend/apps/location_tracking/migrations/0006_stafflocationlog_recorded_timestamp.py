@@ -0,0 +1,19 @@
+# Generated by Django 4.2.9 on 2026-10-18 02:58
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location_tracking', '0005_rename_loc_pin_project_active_idx_location_tr_project_3061e5_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stafflocationlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the ping was recorded (device time for offline batch uploads)'),
+        ),
+    ]
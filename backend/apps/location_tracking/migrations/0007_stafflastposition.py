@@ -0,0 +1,34 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_role_can_manage_admin_config_role_can_view_profile'),
+        ('core', '0007_project_role_view_permissions'),
+        ('location_tracking', '0006_stafflocationlog_recorded_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffLastPosition',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='last_position', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('latitude', models.DecimalField(decimal_places=16, max_digits=22)),
+                ('longitude', models.DecimalField(decimal_places=16, max_digits=22)),
+                ('accuracy', models.FloatField(help_text='Accuracy in meters')),
+                ('timestamp', models.DateTimeField()),
+                ('is_on_site', models.BooleanField(default=False)),
+                ('log', models.ForeignKey(blank=True, help_text='The StaffLocationLog row this position was copied from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='location_tracking.stafflocationlog')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.houseproject')),
+            ],
+            options={
+                'verbose_name': 'Staff Last Position',
+                'indexes': [models.Index(fields=['-timestamp'], name='location_tr_timesta_5d9d4a_idx')],
+            },
+        ),
+    ]
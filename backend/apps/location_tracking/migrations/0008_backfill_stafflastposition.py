@@ -0,0 +1,52 @@
+"""
+Backfill StaffLastPosition from each user's newest StaffLocationLog row so
+the live map keeps showing staff right after deploy.
+"""
+from django.db import migrations
+from django.db.models import Max
+
+
+def backfill_last_positions(apps, schema_editor):
+    StaffLocationLog = apps.get_model("location_tracking", "StaffLocationLog")
+    StaffLastPosition = apps.get_model("location_tracking", "StaffLastPosition")
+
+    latest = (
+        StaffLocationLog.objects.order_by()
+        .values("user_id")
+        .annotate(latest=Max("timestamp"))
+    )
+    rows = []
+    for item in latest:
+        log = (
+            StaffLocationLog.objects
+            .filter(user_id=item["user_id"], timestamp=item["latest"])
+            .order_by("-id")
+            .first()
+        )
+        rows.append(StaffLastPosition(
+            user_id=log.user_id,
+            log_id=log.id,
+            latitude=log.latitude,
+            longitude=log.longitude,
+            accuracy=log.accuracy,
+            timestamp=log.timestamp,
+            is_on_site=log.is_on_site,
+            project_id=log.project_id,
+        ))
+    StaffLastPosition.objects.bulk_create(rows, batch_size=500)
+    print(f"  → backfilled {len(rows)} staff last position row(s)")
+
+
+def reverse_backfill(apps, schema_editor):
+    apps.get_model("location_tracking", "StaffLastPosition").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("location_tracking", "0007_stafflastposition"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_last_positions, reverse_code=reverse_backfill),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('location_tracking', '0008_backfill_stafflastposition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffLocationTrack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('raw_count', models.PositiveIntegerField(help_text='Raw pings compacted into this track')),
+                ('point_count', models.PositiveIntegerField(help_text='Points kept after simplification')),
+                ('encoded', models.TextField(help_text='Encoded (lat, lon, time, geofence, project) points')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_tracks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['started_at'],
+                'indexes': [models.Index(fields=['user', 'started_at'], name='location_tr_user_id_161334_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.conf import settings
 from apps.core.models import HouseProject
 
@@ -102,7 +103,10 @@ class StaffLocationLog(models.Model):
         null=True, blank=True,
         help_text="Direction of travel in degrees (0=North)"
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(
+        default=timezone.now,
+        help_text="When the ping was recorded (device time for offline batch uploads)"
+    )
 
     # Contextual info calculated during save
     is_on_site = models.BooleanField(default=False)
@@ -133,6 +137,76 @@ class StaffLocationLog(models.Model):
         return f"{self.user.username} at {self.timestamp}"
 
 
+class StaffLocationTrack(models.Model):
+    """
+    Compacted GPS history for one user-day, written by the retention job
+    (tracks.py) when raw StaffLocationLog rows age out.  The track is
+    Douglas–Peucker simplified — geofence entry/exit points are always kept
+    — and stored as a delta/varint encoded string (see tracks.encode_track).
+    Accuracy, speed and heading are not retained.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="location_tracks"
+    )
+    date = models.DateField()
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    raw_count = models.PositiveIntegerField(help_text="Raw pings compacted into this track")
+    point_count = models.PositiveIntegerField(help_text="Points kept after simplification")
+    encoded = models.TextField(help_text="Encoded (lat, lon, time, geofence, project) points")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["started_at"]
+        indexes = [models.Index(fields=["user", "started_at"])]
+
+    def __str__(self):
+        return f"{self.user.username} track {self.date} ({self.point_count}/{self.raw_count})"
+
+
+class StaffLastPosition(models.Model):
+    """
+    Each user's most recent accepted ping — one row per user, upserted by
+    the ping path (presence.PingReplay).  The live map reads this instead of
+    scanning hours of StaffLocationLog rows.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="last_position"
+    )
+    log = models.ForeignKey(
+        StaffLocationLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="The StaffLocationLog row this position was copied from"
+    )
+    latitude = models.DecimalField(max_digits=22, decimal_places=16)
+    longitude = models.DecimalField(max_digits=22, decimal_places=16)
+    accuracy = models.FloatField(help_text="Accuracy in meters")
+    timestamp = models.DateTimeField()
+    is_on_site = models.BooleanField(default=False)
+    project = models.ForeignKey(
+        HouseProject,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+
+    class Meta:
+        verbose_name = "Staff Last Position"
+        indexes = [models.Index(fields=["-timestamp"])]
+
+    def __str__(self):
+        return f"{self.user.username} last seen {self.timestamp}"
+
+
 class StaffPresenceSession(models.Model):
     """
     Aggregated presence sessions (when a user was on-site).
@@ -0,0 +1,181 @@
+"""
+presence.py — ping → log + presence-session state machine
+═════════════════════════════════════════════════════════
+Shared by the single ping endpoint and the offline batch upload.
+
+`PingReplay` loads a user's previous ping and active presence sessions
+once, then applies pings in order entirely in memory:
+
+  • speed from the previous ping (stored or earlier in the same batch)
+  • geofence match via the cached grid index
+  • session open / extend / close, with the 10-minute grace period measured
+    against each ping's own timestamp
+
+save() then writes everything at once — one bulk_create of
+StaffLocationLog rows, one upsert of the user's StaffLastPosition, one
+bulk_create for newly opened sessions and one bulk_update for touched
+sessions — so a batch of 200 queued pings costs a handful of queries
+instead of ~6 per ping.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .geofence_index import geofence_index
+from .models import StaffLastPosition, StaffLocationLog, StaffPresenceSession
+from .utils import haversine_distance
+
+MAX_ACCURACY_M = 50
+GRACE_PERIOD   = timedelta(minutes=10)
+
+POSITION_FIELDS = ["log", "latitude", "longitude", "accuracy", "timestamp", "is_on_site", "project"]
+
+SESSION_FIELDS = [
+    "exit_at", "last_known_lat", "last_known_lon",
+    "last_ping_at", "duration_minutes", "is_active",
+]
+
+
+class PingReplay:
+    def __init__(self, user, allowed_project_ids=None):
+        self.user = user
+        self.allowed_project_ids = allowed_project_ids
+        self.logs = []
+        self.latest = None  # newest applied log → StaffLastPosition
+
+        prev = (
+            StaffLocationLog.objects
+            .filter(user=user)
+            .order_by("-timestamp")
+            .only("latitude", "longitude", "timestamp")
+            .first()
+        )
+        self._prev = (
+            (float(prev.latitude), float(prev.longitude), prev.timestamp) if prev else None
+        )
+
+        self._active = {}   # project_id → active session
+        for s in StaffPresenceSession.objects.filter(user=user, is_active=True).order_by("-entry_at"):
+            self._active.setdefault(s.project_id, s)
+        self._new   = []
+        self._dirty = {}    # pk → session
+
+    # ── Replay ────────────────────────────────────────────────────────────────
+
+    def apply(self, lat, lon, accuracy, heading=None, at=None):
+        """
+        Apply one accepted ping.  Returns (log, status) where status is
+        "on_site", "off_site" or "exited_site".  The log is unsaved until
+        save() runs.
+        """
+        at = at or timezone.now()
+
+        speed = None
+        late = False
+        if self._prev:
+            prev_lat, prev_lon, prev_at = self._prev
+            time_delta = (at - prev_at).total_seconds()
+            if time_delta > 0:
+                speed = haversine_distance(lat, lon, prev_lat, prev_lon) / time_delta  # m/s
+            late = time_delta < 0
+
+        fence = geofence_index.match(lat, lon, self.allowed_project_ids)
+        project = fence.project if fence else None
+
+        log = StaffLocationLog(
+            user=self.user,
+            latitude=lat,
+            longitude=lon,
+            accuracy=accuracy,
+            speed=speed,
+            heading=heading,
+            timestamp=at,
+            is_on_site=project is not None,
+            project=project,
+            geofence=fence,
+        )
+        self.logs.append(log)
+
+        if late:
+            # Older than a ping we already applied — keep it for history but
+            # don't rewind session state.
+            return log, ("on_site" if project else "off_site")
+
+        self._prev = (lat, lon, at)
+        self.latest = log
+        if project:
+            self._enter(project, lat, lon, at)
+            return log, "on_site"
+        return log, self._leave(at)
+
+    def _enter(self, project, lat, lon, at):
+        session = self._active.get(project.id)
+        if session is None:
+            session = StaffPresenceSession(
+                user=self.user,
+                project=project,
+                entry_at=at,
+                exit_at=at,
+                last_known_lat=lat,
+                last_known_lon=lon,
+                last_ping_at=at,
+                is_active=True,
+            )
+            self._active[project.id] = session
+            self._new.append(session)
+        else:
+            session.exit_at = at
+            session.last_known_lat = lat
+            session.last_known_lon = lon
+            session.last_ping_at = at
+            session.duration_minutes = max(0, int((at - session.entry_at).total_seconds() / 60))
+            self._touch(session)
+
+        # Close sessions for OTHER projects
+        for project_id in [pid for pid in self._active if pid != project.id]:
+            self._close(self._active.pop(project_id))
+
+    def _leave(self, at):
+        """Outside all geofences — apply the grace period."""
+        status = "off_site"
+        for project_id, session in list(self._active.items()):
+            if session.last_ping_at and (at - session.last_ping_at) > GRACE_PERIOD:
+                expired = True
+            else:
+                expired = bool(session.exit_at and (at - session.exit_at) > GRACE_PERIOD)
+            if expired:
+                self._close(self._active.pop(project_id))
+                status = "exited_site"
+        return status
+
+    def _close(self, session):
+        session.is_active = False
+        self._touch(session)
+
+    def _touch(self, session):
+        if session.pk:
+            self._dirty[session.pk] = session
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self):
+        """Write logs and session changes.  Call inside transaction.atomic()."""
+        if self.logs:
+            StaffLocationLog.objects.bulk_create(self.logs, batch_size=500)
+        if self.latest is not None:
+            log = self.latest
+            StaffLastPosition.objects.bulk_create(
+                [StaffLastPosition(
+                    user=self.user, log=log,
+                    latitude=log.latitude, longitude=log.longitude,
+                    accuracy=log.accuracy, timestamp=log.timestamp,
+                    is_on_site=log.is_on_site, project=log.project,
+                )],
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=POSITION_FIELDS,
+            )
+        if self._new:
+            StaffPresenceSession.objects.bulk_create(self._new)
+        if self._dirty:
+            StaffPresenceSession.objects.bulk_update(list(self._dirty.values()), SESSION_FIELDS)
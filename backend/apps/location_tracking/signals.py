@@ -0,0 +1,16 @@
+"""
+location_tracking/signals.py
+─────────────────────────────────────────────────────────────────────────────
+ProjectGeofence saved/deleted → invalidate the in-process geofence index
+(see geofence_index.py) so pings match against the current fences.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .geofence_index import geofence_index
+from .models import ProjectGeofence
+
+
+@receiver([post_save, post_delete], sender=ProjectGeofence, dispatch_uid="project_geofence_changed")
+def project_geofence_changed(sender, **kwargs):
+    geofence_index.invalidate()
@@ -0,0 +1,13 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def compact_location_logs_task():
+    from .tracks import compact_location_logs
+
+    tracks, removed = compact_location_logs()
+    logger.info("Compacted %d raw location log(s) into %d track(s)", removed, tracks)
+    return f"tracks={tracks} removed={removed}"
@@ -0,0 +1,325 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.core.models import HouseProject
+from apps.location_tracking import geofence_index as geofence_module
+from apps.location_tracking.geofence_index import GeofenceIndex, geofence_index
+from apps.location_tracking.models import (
+    ProjectGeofence,
+    StaffLastPosition,
+    StaffLocationLog,
+    StaffLocationTrack,
+    StaffPresenceSession,
+)
+from apps.location_tracking.tracks import (
+    compact_location_logs,
+    day_bounds,
+    decode_track,
+    encode_track,
+)
+
+
+User = get_user_model()
+
+
+def _project(name):
+    return HouseProject.objects.create(
+        name=name,
+        owner_name="Owner",
+        address="Site",
+        total_budget=100000,
+        start_date=date(2026, 1, 1),
+        expected_completion_date=date(2026, 12, 31),
+        area_sqft=1200,
+    )
+
+
+class GeofenceIndexTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="location-user",
+            email="location@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.project = _project("Kathmandu Site")
+        self.other = _project("Pokhara Site")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fence = ProjectGeofence.objects.create(
+                project=self.project, name="Main Gate",
+                latitude=27.7172, longitude=85.3240, radius_meters=150,
+            )
+            ProjectGeofence.objects.create(
+                project=self.other, name="Main Gate",
+                latitude=28.2096, longitude=83.9856, radius_meters=150,
+            )
+
+    def test_match_respects_radius_and_project_scope(self):
+        self.assertEqual(geofence_index.match(27.7175, 85.3242), self.fence)
+        self.assertIsNone(geofence_index.match(27.7300, 85.3240))
+        self.assertIsNone(geofence_index.match(27.7175, 85.3242, {self.other.id}))
+
+    def test_fence_near_cell_edge_is_found_from_neighbouring_cell(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            edge = ProjectGeofence.objects.create(
+                project=self.project, name="Store",
+                latitude=27.7299, longitude=85.3299, radius_meters=200,
+            )
+        self.assertEqual(geofence_index.match(27.7305, 85.3305), edge)
+
+    def test_deactivated_fence_is_dropped_from_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fence.is_active = False
+            self.fence.save()
+        self.assertIsNone(geofence_index.match(27.7175, 85.3242))
+
+    def test_unreachable_cache_is_polled_outside_the_lock_with_backoff(self):
+        index = GeofenceIndex()
+        clock = [1000.0]
+        reads = []
+
+        def cache_get(key):
+            reads.append(index._lock.locked())
+            return None
+
+        with patch.object(geofence_module.time, "monotonic", side_effect=lambda: clock[0]), \
+                patch.object(geofence_module, "cache") as cache:
+            cache.get.side_effect = cache_get
+            cache.add.return_value = None
+            index.match(27.7172, 85.3240)
+            for _ in range(5):
+                clock[0] += geofence_module.VERSION_CHECK_SECS
+                self.assertEqual(index.match(27.7172, 85.3240), self.fence)
+            self.assertEqual(reads, [False])
+
+            clock[0] += geofence_module.CACHE_BACKOFF_SECS
+            index.match(27.7172, 85.3240)
+
+        self.assertEqual(reads, [False, False])
+
+    def test_ping_matches_fence_without_scanning_all_fences(self):
+        geofence_index.match(0, 0)  # warm the index
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                "/api/v1/location/ping/",
+                {"latitude": 27.7175, "longitude": 85.3242, "accuracy": 10},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["status"], "on_site")
+        self.assertEqual(response.data["geofence_id"], self.fence.id)
+        self.assertTrue(StaffLocationLog.objects.get(pk=response.data["log_id"]).is_on_site)
+        fence_reads = [q for q in ctx.captured_queries
+                       if q["sql"].startswith("SELECT") and "location_tracking_projectgeofence" in q["sql"].split("FROM")[1]]
+        self.assertEqual(fence_reads, [])
+
+
+class LocationPingBatchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="batch-user",
+            email="batch@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.project = _project("Batch Site")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fence = ProjectGeofence.objects.create(
+                project=self.project, name="Main Gate",
+                latitude=27.7172, longitude=85.3240, radius_meters=150,
+            )
+
+    def _ping(self, minute, on_site=True, **extra):
+        ping = {
+            "latitude": 27.7175 if on_site else 27.7400,
+            "longitude": 85.3242,
+            "accuracy": 10,
+            "recorded_at": f"2026-03-01T08:{minute:02d}:00+00:00",
+        }
+        ping.update(extra)
+        return ping
+
+    def test_batch_replays_sessions_and_bulk_inserts_logs(self):
+        pings = [
+            self._ping(0),
+            self._ping(5),
+            self._ping(8, on_site=False),
+            self._ping(9, accuracy=80),
+            {"latitude": "north"},
+            self._ping(25, on_site=False),
+        ]
+        response = self.client.post("/api/v1/location/ping/batch/", {"pings": pings}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["accepted"], 4)
+        self.assertEqual(
+            [r["status"] for r in response.data["results"]],
+            ["on_site", "on_site", "off_site", "ignored", "invalid", "exited_site"],
+        )
+        self.assertEqual(StaffLocationLog.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            StaffLocationLog.objects.filter(user=self.user).latest("timestamp").timestamp.minute, 25,
+        )
+
+        session = StaffPresenceSession.objects.get(user=self.user)
+        self.assertFalse(session.is_active)
+        self.assertEqual(session.duration_minutes, 5)
+
+    def test_batch_extends_existing_session(self):
+        self.client.post("/api/v1/location/ping/batch/", {"pings": [self._ping(0)]}, format="json")
+        self.client.post("/api/v1/location/ping/batch/", {"pings": [self._ping(30)]}, format="json")
+
+        session = StaffPresenceSession.objects.get(user=self.user)
+        self.assertTrue(session.is_active)
+        self.assertEqual(session.duration_minutes, 30)
+
+    def test_empty_batch_is_rejected(self):
+        response = self.client.post("/api/v1/location/ping/batch/", {"pings": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LivePositionsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="live-user",
+            email="live@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.project = _project("Live Site")
+        self.user.active_project = self.project
+        self.user.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectGeofence.objects.create(
+                project=self.project, name="Main Gate",
+                latitude=27.7172, longitude=85.3240, radius_meters=150,
+            )
+
+    def _ping(self, lat):
+        return self.client.post(
+            "/api/v1/location/ping/",
+            {"latitude": lat, "longitude": 85.3242, "accuracy": 10},
+            format="json",
+        )
+
+    def test_ping_upserts_last_position(self):
+        self._ping(27.7175)
+        second = self._ping(27.7400)
+
+        position = StaffLastPosition.objects.get(user=self.user)
+        self.assertEqual(position.log_id, second.data["log_id"])
+        self.assertFalse(position.is_on_site)
+
+    def test_live_map_reads_last_position_and_honours_etag(self):
+        self._ping(27.7175)
+        url = f"/api/v1/location/live/?project={self.project.id}"
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data), 1)
+        self.assertFalse(first.data[0]["is_off_site"])
+
+        unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self._ping(27.7400)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertTrue(changed.data[0]["is_off_site"])
+
+    def test_live_map_etag_ignores_the_clock(self):
+        self._ping(27.7175)
+        url = f"/api/v1/location/live/?project={self.project.id}"
+        first = self.client.get(url)
+        self.assertFalse(first.data[0]["is_stale"])
+
+        later = timezone.now() + timedelta(minutes=10)
+        with patch("django.utils.timezone.now", return_value=later):
+            unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            aged = self.client.get(url)
+
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual((aged.data[0]["minutes_since_ping"], aged.data[0]["is_stale"]), (10, True))
+        self.assertEqual(aged["ETag"], first["ETag"])
+
+
+class LocationRetentionTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="track-user",
+            email="track@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.project = _project("Track Site")
+        self.fence = ProjectGeofence.objects.create(
+            project=self.project, name="Main Gate",
+            latitude=27.7172, longitude=85.3240, radius_meters=150,
+        )
+        self.day = timezone.localdate() - timedelta(days=40)
+        start, _ = day_bounds(self.day)
+        # Walk in along a straight line (collinear → simplified away),
+        # then three on-site pings, then leave.
+        rows = []
+        for i in range(10):
+            on_site = 4 <= i <= 6
+            rows.append(StaffLocationLog(
+                user=self.user,
+                latitude=27.7100 + i * 0.001,
+                longitude=85.3240,
+                accuracy=5,
+                timestamp=start + timedelta(hours=9, minutes=i),
+                is_on_site=on_site,
+                project=self.project if on_site else None,
+                geofence=self.fence if on_site else None,
+            ))
+        StaffLocationLog.objects.bulk_create(rows)
+
+    def test_track_codec_round_trips(self):
+        start, _ = day_bounds(self.day)
+        points = [
+            (27.7172, 85.3240, start, self.fence.id, self.project.id),
+            (27.7173, 85.3239, start + timedelta(seconds=30), None, None),
+        ]
+        decoded = decode_track(encode_track(points))
+
+        self.assertEqual([p[2] for p in decoded], [p[2] for p in points])
+        self.assertEqual([p[3:] for p in decoded], [p[3:] for p in points])
+        self.assertAlmostEqual(decoded[1][1], 85.3239, places=6)
+
+    def test_compaction_keeps_geofence_transitions_and_serves_history(self):
+        tracks, removed = compact_location_logs(days=30, tolerance_m=5)
+
+        self.assertEqual((tracks, removed), (1, 10))
+        self.assertFalse(StaffLocationLog.objects.filter(user=self.user).exists())
+        track = StaffLocationTrack.objects.get(user=self.user)
+        # first, last, and both sides of entry (3/4) and exit (6/7)
+        self.assertEqual(track.point_count, 6)
+
+        response = self.client.get(
+            f"/api/v1/location/history/?user={self.user.id}&date={self.day.isoformat()}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual({p["geofence_name"] for p in response.data}, {"Main Gate"})
+        self.assertLess(response.data[0]["timestamp"], response.data[1]["timestamp"])
+
+    def test_recent_logs_are_not_compacted(self):
+        tracks, removed = compact_location_logs(days=60)
+
+        self.assertEqual((tracks, removed), (0, 0))
+        self.assertEqual(StaffLocationLog.objects.filter(user=self.user).count(), 10)
@@ -0,0 +1,213 @@
+"""
+tracks.py — location log retention and compacted history
+════════════════════════════════════════════════════════
+StaffLocationLog gets a row per ping and is the fastest-growing table in
+the database.  Raw pings are only needed while they are fresh (speed,
+live map, same-week playback); after LOCATION_LOG_RETENTION_DAYS they are
+folded into one StaffLocationTrack per user-day:
+
+  1. simplify — Douglas–Peucker with LOCATION_TRACK_TOLERANCE_M, run
+     separately on every stretch between geofence entry/exit points so
+     those transitions always survive
+  2. encode   — each point is (lat·1e6, lon·1e6, epoch s, geofence id,
+     project id); consecutive deltas are written as zig-zag base-64
+     varints, the same scheme as Google's encoded polyline format
+  3. delete   — the raw rows for that user-day, in the same transaction
+
+`compact_location_logs()` is run nightly by the Celery beat task
+"Compact Location Logs" (see apps.py / tasks.py) and by the
+`compact_location_logs` management command.  LocationHistoryView merges
+raw rows and decoded tracks, so playback does not change when a day ages
+out.
+"""
+import logging
+import math
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import StaffLocationLog, StaffLocationTrack
+from .utils import EARTH_RADIUS_M
+
+logger = logging.getLogger(__name__)
+
+COORD_SCALE = 1_000_000   # 1e-6° ≈ 0.11 m
+
+
+# ── Simplification ────────────────────────────────────────────────────────────
+
+def _offset_from_segment(p, a, b, cos_lat):
+    """Distance in meters from point p to segment a→b (local flat projection)."""
+    ax, ay = a[1] * cos_lat, a[0]
+    bx, by = b[1] * cos_lat, b[0]
+    px, py = p[1] * cos_lat, p[0]
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        t = 0.0
+    else:
+        t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.radians(math.hypot(px - (ax + t * dx), py - (ay + t * dy))) * EARTH_RADIUS_M
+
+
+def _douglas_peucker(points, first, last, tolerance_m, keep, cos_lat):
+    stack = [(first, last)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        worst, worst_i = -1.0, None
+        for i in range(lo + 1, hi):
+            d = _offset_from_segment(points[i], points[lo], points[hi], cos_lat)
+            if d > worst:
+                worst, worst_i = d, i
+        if worst > tolerance_m:
+            keep.add(worst_i)
+            stack.append((lo, worst_i))
+            stack.append((worst_i, hi))
+
+
+def simplify_track(points, tolerance_m):
+    """
+    Douglas–Peucker over (lat, lon, at, geofence_id, project_id) tuples in
+    time order.  The first and last points and both sides of every change
+    of geofence are always kept.
+    """
+    if len(points) <= 2:
+        return list(points)
+
+    anchors = {0, len(points) - 1}
+    for i in range(1, len(points)):
+        if points[i][3:] != points[i - 1][3:]:
+            anchors.update((i - 1, i))
+
+    cos_lat = math.cos(math.radians(points[0][0]))
+    keep = set(anchors)
+    ordered = sorted(anchors)
+    for lo, hi in zip(ordered, ordered[1:]):
+        _douglas_peucker(points, lo, hi, tolerance_m, keep, cos_lat)
+    return [points[i] for i in sorted(keep)]
+
+
+# ── Encoding ──────────────────────────────────────────────────────────────────
+
+def _encode_int(value, out):
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_track(points):
+    """Encode (lat, lon, at, geofence_id, project_id) tuples into a string."""
+    out = []
+    prev = (0, 0, 0, 0, 0)
+    for lat, lon, at, geofence_id, project_id in points:
+        row = (
+            round(lat * COORD_SCALE),
+            round(lon * COORD_SCALE),
+            int(at.timestamp()),
+            geofence_id or 0,
+            project_id or 0,
+        )
+        for value, last in zip(row, prev):
+            _encode_int(value - last, out)
+        prev = row
+    return "".join(out)
+
+
+def decode_track(encoded):
+    """Inverse of encode_track(); timestamps come back as aware UTC datetimes."""
+    values = []
+    shift = result = 0
+    for ch in encoded:
+        chunk = ord(ch) - 63
+        result |= (chunk & 0x1F) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(result >> 1) if result & 1 else result >> 1)
+            shift = result = 0
+
+    points = []
+    row = [0, 0, 0, 0, 0]
+    for i in range(0, len(values) - len(values) % 5, 5):
+        row = [a + b for a, b in zip(row, values[i:i + 5])]
+        points.append((
+            row[0] / COORD_SCALE,
+            row[1] / COORD_SCALE,
+            datetime.fromtimestamp(row[2], tz=dt_timezone.utc),
+            row[3] or None,
+            row[4] or None,
+        ))
+    return points
+
+
+# ── Retention ─────────────────────────────────────────────────────────────────
+
+def day_bounds(day):
+    """[start, end) of a calendar day in the project timezone."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def compact_user_day(user_id, day, before, tolerance_m):
+    """Fold one user-day of raw logs older than `before` into a track."""
+    start, end = day_bounds(day)
+    raw = StaffLocationLog.objects.filter(
+        user_id=user_id, timestamp__gte=start, timestamp__lt=min(end, before),
+    )
+    with transaction.atomic():
+        rows = list(
+            raw.order_by("timestamp", "id")
+            .values_list("latitude", "longitude", "timestamp", "geofence_id", "project_id")
+        )
+        if not rows:
+            return None, 0
+        points = [(float(lat), float(lon), at, g, p) for lat, lon, at, g, p in rows]
+        kept = simplify_track(points, tolerance_m)
+        track = StaffLocationTrack.objects.create(
+            user_id=user_id,
+            date=day,
+            started_at=points[0][2],
+            ended_at=points[-1][2],
+            raw_count=len(points),
+            point_count=len(kept),
+            encoded=encode_track(kept),
+        )
+        raw.delete()
+    return track, len(points)
+
+
+def compact_location_logs(days=None, user_id=None, tolerance_m=None):
+    """
+    Compact every user-day of raw logs older than `days` (default
+    LOCATION_LOG_RETENTION_DAYS).  Returns (tracks_written, raw_rows_removed).
+    """
+    days = settings.LOCATION_LOG_RETENTION_DAYS if days is None else days
+    tolerance_m = settings.LOCATION_TRACK_TOLERANCE_M if tolerance_m is None else tolerance_m
+    before, _ = day_bounds(timezone.localdate() - timedelta(days=days))
+
+    old = StaffLocationLog.objects.filter(timestamp__lt=before)
+    if user_id:
+        old = old.filter(user_id=user_id)
+    groups = (
+        old.order_by()
+        .annotate(day=TruncDate("timestamp", tzinfo=timezone.get_current_timezone()))
+        .values_list("user_id", "day")
+        .distinct()
+    )
+
+    tracks = removed = 0
+    for uid, day in sorted(groups):
+        try:
+            track, count = compact_user_day(uid, day, before, tolerance_m)
+        except Exception as exc:
+            logger.error("Location log compaction failed for user %s on %s — %s", uid, day, exc)
+            continue
+        if track:
+            tracks += 1
+            removed += count
+    return tracks, removed
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     GeofenceViewSet,
     LocationPingView,
+    LocationPingBatchView,
     LivePositionsView,
     LocationHistoryView,
     PresenceAnalyticsView,
@@ -16,6 +17,7 @@ router.register(r'pins', SitePinViewSet, basename='site-pin')
 
 urlpatterns = [
     path('ping/', LocationPingView.as_view(), name='location-ping'),
+    path('ping/batch/', LocationPingBatchView.as_view(), name='location-ping-batch'),
     path('live/', LivePositionsView.as_view(), name='location-live'),
     path('history/', LocationHistoryView.as_view(), name='location-history'),
     path('', include(router.urls)),
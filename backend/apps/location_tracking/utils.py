@@ -1,5 +1,13 @@
 import math
 
+try:
+    import numpy as np
+except ImportError:  # requirements-local.txt — pure-Python fallbacks below
+    np = None
+
+EARTH_RADIUS_M = 6371000  # Radius of earth in meters
+
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
     Calculate the great circle distance in meters between two points 
@@ -13,8 +21,7 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     dlat = lat2 - lat1 
     a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
     c = 2 * math.asin(math.sqrt(a)) 
-    r = 6371000 # Radius of earth in meters
-    return c * r
+    return c * EARTH_RADIUS_M
 
 def is_point_in_geofence(point_lat, point_lon, center_lat, center_lon, radius_meters):
     """
@@ -22,3 +29,29 @@ def is_point_in_geofence(point_lat, point_lon, center_lat, center_lon, radius_me
     """
     distance = haversine_distance(point_lat, point_lon, center_lat, center_lon)
     return distance <= radius_meters
+
+
+def haversine_many(lat, lon, lats, lons):
+    """
+    Distances in meters from one point to many points, in one vectorized pass.
+
+    Works both ways round: one ping against many fence centres, or one
+    fence centre against many pings.  Returns a NumPy array (or a list when
+    NumPy is not installed).
+    """
+    if np is None:
+        return [haversine_distance(lat, lon, a, b) for a, b in zip(lats, lons)]
+
+    lat1 = math.radians(lat)
+    lon1 = math.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0))) * EARTH_RADIUS_M
+
+
+def points_in_geofence(lats, lons, center_lat, center_lon, radius_meters):
+    """Many pings against one fence → list of booleans, one per ping."""
+    distances = haversine_many(center_lat, center_lon, lats, lons)
+    return [bool(d <= radius_meters) for d in distances]
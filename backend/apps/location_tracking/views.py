@@ -1,20 +1,31 @@
+import hashlib
+import json
 from datetime import timedelta
+
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
 from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, views, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.fields import DateTimeField
 
-from .models import ProjectGeofence, StaffLocationLog, StaffPresenceSession, ProjectSitePin
+from .models import (
+    ProjectGeofence, ProjectSitePin, StaffLastPosition, StaffLocationLog, StaffLocationTrack,
+    StaffPresenceSession,
+)
 from .serializers import (
     ProjectGeofenceSerializer,
     StaffLocationLogSerializer,
     StaffPresenceSessionSerializer,
     ProjectSitePinSerializer,
 )
-from .utils import haversine_distance, is_point_in_geofence
+from .presence import MAX_ACCURACY_M, PingReplay
+from .tracks import day_bounds, decode_track
 
 
 def _user_avatar_url(request, user):
@@ -30,6 +41,50 @@ def _user_avatar_url(request, user):
         return None
 
 
+def _parse_ping(data):
+    """(lat, lon, accuracy, heading) from a ping payload; raises ValueError/TypeError."""
+    lat = float(data.get('latitude'))
+    lon = float(data.get('longitude'))
+    accuracy = float(data.get('accuracy', 0) or 0)
+    heading = data.get('heading', None)
+    if heading is not None:
+        heading = float(heading)
+    return lat, lon, accuracy, heading
+
+
+def _parse_recorded_at(value, now):
+    """Device timestamp of a queued ping — never in the future, defaults to now."""
+    if not value:
+        return now
+    at = parse_datetime(str(value))
+    if at is None:
+        raise ValueError("Invalid recorded_at.")
+    if timezone.is_naive(at):
+        at = timezone.make_aware(at)
+    return min(at, now)
+
+
+def _conditional_response(request, data, etag_exclude=()):
+    """
+    200 with an ETag of `data`, or 304 when the client already has it.
+    Keys in `etag_exclude` (values derived from the clock rather than the
+    rows) are left out of the hash so they alone never change the ETag.
+    """
+    hashed = data
+    if etag_exclude:
+        hashed = [{k: v for k, v in row.items() if k not in etag_exclude} for row in data]
+    etag = '"%s"' % hashlib.md5(
+        json.dumps(hashed, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    ).hexdigest()
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 def _allowed_project_ids_for_user(user):
     """
     Scope location tracking to the projects the current user actually belongs to.
@@ -84,7 +139,7 @@ class LocationPingView(views.APIView):
     """
     Receives periodic GPS pings from staff mobile devices.
     - Accuracy filter (>50m rejected)
-    - Matches against all active geofences via haversine
+    - Matches against nearby active geofences via the cached grid index
     - Calculates speed from previous ping
     - Logs raw ping with geofence match
     - Creates/updates presence sessions with last known position
@@ -94,21 +149,15 @@ class LocationPingView(views.APIView):
 
     def post(self, request):
         user = request.user
-        lat = request.data.get('latitude')
-        lon = request.data.get('longitude')
-        accuracy = request.data.get('accuracy', 0)
-        heading = request.data.get('heading', None)
 
-        if lat is None or lon is None:
+        if request.data.get('latitude') is None or request.data.get('longitude') is None:
             return Response(
                 {"error": "Latitude and longitude are required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         try:
-            lat = float(lat)
-            lon = float(lon)
-            accuracy = float(accuracy)
+            lat, lon, accuracy, heading = _parse_ping(request.data)
         except (ValueError, TypeError):
             return Response(
                 {"error": "Invalid coordinates format."},
@@ -116,120 +165,97 @@ class LocationPingView(views.APIView):
             )
 
         # 1. Accuracy Filter
-        if accuracy > 50:
+        if accuracy > MAX_ACCURACY_M:
             return Response(
                 {"status": "ignored", "message": f"Accuracy too low ({accuracy}m). Ping ignored."},
                 status=status.HTTP_200_OK,
             )
 
-        # 2. Calculate speed from previous ping
-        speed = None
-        try:
-            prev_log = (
-                StaffLocationLog.objects
-                .filter(user=user)
-                .order_by('-timestamp')
-                .first()
-            )
-            if prev_log:
-                time_delta = (timezone.now() - prev_log.timestamp).total_seconds()
-                if time_delta > 0:
-                    dist = haversine_distance(
-                        lat, lon,
-                        float(prev_log.latitude), float(prev_log.longitude),
-                    )
-                    speed = dist / time_delta  # m/s
-        except Exception:
-            pass
-
-        # 3. Find if ping is inside any active geofence
-        allowed_project_ids = _allowed_project_ids_for_user(user)
-        active_geofences = ProjectGeofence.objects.filter(is_active=True).select_related('project')
-        if allowed_project_ids:
-            active_geofences = active_geofences.filter(project_id__in=allowed_project_ids)
-        matched_project = None
-        matched_geofence = None
-
-        for fence in active_geofences:
-            if is_point_in_geofence(
-                lat, lon,
-                float(fence.latitude), float(fence.longitude),
-                fence.radius_meters,
-            ):
-                matched_project = fence.project
-                matched_geofence = fence
-                break
-
-        # 4. Log the raw ping
-        log = StaffLocationLog.objects.create(
-            user=user,
-            latitude=lat,
-            longitude=lon,
-            accuracy=accuracy,
-            speed=speed,
-            heading=heading,
-            is_on_site=(matched_project is not None),
-            project=matched_project,
-            geofence=matched_geofence,
+        # 2. Speed, geofence match and presence sessions (see presence.py)
+        with transaction.atomic():
+            replay = PingReplay(user, _allowed_project_ids_for_user(user))
+            log, status_msg = replay.apply(lat, lon, accuracy, heading)
+            replay.save()
+
+        return Response(
+            {
+                "status": status_msg,
+                "project_id": log.project_id,
+                "geofence_id": log.geofence_id,
+                "geofence_name": log.geofence.name if log.geofence else None,
+                "speed_ms": round(log.speed, 2) if log.speed is not None else None,
+                "log_id": log.id,
+            },
+            status=status.HTTP_201_CREATED,
         )
 
-        now = timezone.now()
 
-        # 5. Handle Presence Sessions
-        if matched_project:
-            session, created = StaffPresenceSession.objects.get_or_create(
-                user=user,
-                project=matched_project,
-                is_active=True,
-                defaults={
-                    'entry_at': now,
-                    'exit_at': now,
-                    'last_known_lat': lat,
-                    'last_known_lon': lon,
-                    'last_ping_at': now,
-                },
-            )
+class LocationPingBatchView(views.APIView):
+    """
+    Uploads pings queued on a device while it was offline.
 
-            if not created:
-                session.exit_at = now
-                session.last_known_lat = lat
-                session.last_known_lon = lon
-                session.last_ping_at = now
-                duration = session.exit_at - session.entry_at
-                session.duration_minutes = int(duration.total_seconds() / 60)
-                session.save()
-
-            # Close sessions for OTHER projects
-            StaffPresenceSession.objects.filter(
-                user=user,
-                is_active=True,
-            ).exclude(project=matched_project).update(is_active=False)
-
-            status_msg = "on_site"
-        else:
-            # Outside all geofences — apply 10-minute grace period
-            active_sessions = StaffPresenceSession.objects.filter(user=user, is_active=True)
-            status_msg = "off_site"
-
-            for session in active_sessions:
-                if session.last_ping_at and (now - session.last_ping_at) > timedelta(minutes=10):
-                    session.is_active = False
-                    session.save()
-                    status_msg = "exited_site"
-                elif session.exit_at and (now - session.exit_at) > timedelta(minutes=10):
-                    session.is_active = False
-                    session.save()
-                    status_msg = "exited_site"
+    POST /api/v1/location/ping/batch/
+        {"pings": [{"latitude", "longitude", "accuracy", "heading",
+                    "recorded_at": ISO-8601}, ...]}
 
-        return Response(
-            {
+    Pings are applied oldest-first in one transaction: logs are written with
+    a single bulk insert and presence sessions are replayed in memory, so the
+    grace period is measured against each ping's recorded time.  Returns one
+    status per ping, in request order.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_PINGS = 500
+
+    def post(self, request):
+        user = request.user
+        pings = request.data.get('pings') if isinstance(request.data, dict) else request.data
+        if not isinstance(pings, list) or not pings:
+            return Response(
+                {"error": "pings must be a non-empty list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(pings) > self.MAX_PINGS:
+            return Response(
+                {"error": f"At most {self.MAX_PINGS} pings per batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        now = timezone.now()
+        results = [None] * len(pings)
+        accepted = []
+        for index, ping in enumerate(pings):
+            try:
+                lat, lon, accuracy, heading = _parse_ping(ping)
+                at = _parse_recorded_at(ping.get('recorded_at'), now)
+            except (ValueError, TypeError, AttributeError):
+                results[index] = {"index": index, "status": "invalid"}
+                continue
+            if accuracy > MAX_ACCURACY_M:
+                results[index] = {"index": index, "status": "ignored"}
+                continue
+            accepted.append((at, index, lat, lon, accuracy, heading))
+
+        accepted.sort(key=lambda p: (p[0], p[1]))
+        with transaction.atomic():
+            replay = PingReplay(user, _allowed_project_ids_for_user(user))
+            applied = []
+            for at, index, lat, lon, accuracy, heading in accepted:
+                log, status_msg = replay.apply(lat, lon, accuracy, heading, at=at)
+                applied.append((index, log, status_msg))
+            replay.save()
+
+        for index, log, status_msg in applied:
+            results[index] = {
+                "index": index,
                 "status": status_msg,
-                "project_id": matched_project.id if matched_project else None,
-                "geofence_id": matched_geofence.id if matched_geofence else None,
-                "geofence_name": matched_geofence.name if matched_geofence else None,
-                "speed_ms": round(speed, 2) if speed is not None else None,
+                "project_id": log.project_id,
+                "geofence_id": log.geofence_id,
+                "speed_ms": round(log.speed, 2) if log.speed is not None else None,
                 "log_id": log.id,
-            },
+            }
+
+        return Response(
+            {"accepted": len(applied), "results": results},
             status=status.HTTP_201_CREATED,
         )
 
@@ -239,6 +265,12 @@ class LivePositionsView(views.APIView):
     Returns the current GPS position and status of all active staff
     for a given project. Used by the live map to render worker markers.
 
+    Reads StaffLastPosition, so the cost is O(active users) rather than
+    O(pings today).  Responses carry an ETag; a polling map that sends
+    If-None-Match gets a bodyless 304 while no ping or session has changed
+    (minutes_since_ping/is_stale are left out of it; the map recomputes
+    them from last_ping_at).
+
     GET /api/v1/location/live/?project=<id>
     """
     permission_classes = [IsAuthenticated]
@@ -248,35 +280,33 @@ class LivePositionsView(views.APIView):
         if not project_id:
             return Response({"error": "project query param required."}, status=400)
 
-        allowed_user_ids = set()
         User = get_user_model()
         project_users = User.objects.filter(
             Q(active_project_id=project_id) |
             Q(assigned_projects__id=project_id) |
             Q(project_memberships__project_id=project_id) |
             Q(workforce_profile__current_project_id=project_id)
-        ).distinct()
-        allowed_user_ids.update(project_users.values_list('id', flat=True))
+        ).values('id')
 
-        # 1. Fetch the absolute latest GPS logs for users related to this project in the last 12 hours
+        # 1. Latest position of each project user seen in the last 12 hours —
+        #    one row per user, maintained by the ping path.
         time_limit = timezone.now() - timedelta(hours=12)
-        recent_logs = (
-            StaffLocationLog.objects
-            .filter(timestamp__gte=time_limit, user_id__in=allowed_user_ids)
-            .select_related('user')
-            .order_by('-timestamp')
-        )
-
-        latest_logs = {}
-        for log in recent_logs:
-            if log.user_id not in latest_logs:
-                latest_logs[log.user_id] = log
+        latest_logs = {
+            pos.user_id: pos
+            for pos in (
+                StaffLastPosition.objects
+                .filter(timestamp__gte=time_limit, user_id__in=project_users)
+                .select_related('user')
+                .order_by('user_id')
+            )
+        }
 
         # 2. Get active sessions (users currently inside the geofence OR in the 10-min grace period)
         sessions = (
             StaffPresenceSession.objects
             .filter(project_id=project_id, is_active=True)
             .select_related('user', 'project')
+            .order_by('user_id')
         )
         active_user_ids = {s.user_id for s in sessions}
 
@@ -328,7 +358,7 @@ class LivePositionsView(views.APIView):
                 minutes_since_ping = int((timezone.now() - log.timestamp).total_seconds() / 60)
                 full_name = f"{log.user.first_name} {log.user.last_name}".strip() or log.user.username
                 data.append({
-                    "session_id": f"offsite-{log.id}",
+                    "session_id": f"offsite-{log.log_id or log.user_id}",
                     "user_id": log.user.id,
                     "username": log.user.username,
                     "full_name": f"{full_name} (Off-Site)",
@@ -343,7 +373,9 @@ class LivePositionsView(views.APIView):
                     "is_off_site": True,
                 })
 
-        return Response(data)
+        # The ETag follows the rows (ping/entry timestamps), not the wall
+        # clock — a map polling an idle site keeps getting 304s.
+        return _conditional_response(request, data, etag_exclude=('minutes_since_ping', 'is_stale'))
 
 
 class LocationHistoryView(views.APIView):
@@ -351,6 +383,11 @@ class LocationHistoryView(views.APIView):
     Returns all GPS pings for a specific user on a specific date.
     Used for path playback in presence reports.
 
+    Raw pings are read with a timestamp range (index-friendly, unlike
+    timestamp__date=) and merged with the decoded StaffLocationTrack for days
+    the retention job has already compacted.  Compacted points have no id,
+    accuracy, speed or heading.
+
     GET /api/v1/location/history/?user=<id>&date=YYYY-MM-DD&project=<id>
     """
     permission_classes = [IsAuthenticated]
@@ -363,17 +400,76 @@ class LocationHistoryView(views.APIView):
         if not user_id or not date_str:
             return Response({"error": "user and date are required."}, status=400)
 
+        try:
+            day = parse_date(date_str)
+        except ValueError:
+            day = None
+        if day is None:
+            return Response({"error": "date must be YYYY-MM-DD."}, status=400)
+        start, end = day_bounds(day)
+
         qs = (
             StaffLocationLog.objects
-            .filter(user_id=user_id, timestamp__date=date_str, is_on_site=True)
+            .filter(user_id=user_id, timestamp__gte=start, timestamp__lt=end, is_on_site=True)
             .select_related('user', 'project', 'geofence')
             .order_by('timestamp')
         )
         if project_id:
             qs = qs.filter(project_id=project_id)
 
-        serializer = StaffLocationLogSerializer(qs, many=True)
-        return Response(serializer.data)
+        data = list(StaffLocationLogSerializer(qs, many=True).data)
+
+        tracks = StaffLocationTrack.objects.filter(
+            user_id=user_id, started_at__lt=end, ended_at__gte=start,
+        )
+        compacted = []
+        for track in tracks:
+            for lat, lon, at, geofence_id, point_project_id in decode_track(track.encoded):
+                if not point_project_id or not (start <= at < end):
+                    continue
+                if project_id and str(point_project_id) != str(project_id):
+                    continue
+                compacted.append((lat, lon, at, geofence_id, point_project_id))
+
+        if compacted:
+            data.extend(_track_points(user_id, compacted))
+            data.sort(key=lambda p: p['timestamp'])
+        return Response(data)
+
+
+def _track_points(user_id, points):
+    """Decoded track points in the StaffLocationLogSerializer shape."""
+    from apps.core.models import HouseProject
+
+    user = get_user_model().objects.filter(pk=user_id).first()
+    full_name = (f"{user.first_name} {user.last_name}".strip() or user.username) if user else None
+    project_names = dict(
+        HouseProject.objects.filter(id__in={p[4] for p in points}).values_list('id', 'name')
+    )
+    geofence_names = dict(
+        ProjectGeofence.objects.filter(id__in={p[3] for p in points if p[3]}).values_list('id', 'name')
+    )
+    as_time = DateTimeField().to_representation
+    return [
+        {
+            "id": None,
+            "user": int(user_id),
+            "username": user.username if user else None,
+            "full_name": full_name,
+            "latitude": f"{lat:.16f}",
+            "longitude": f"{lon:.16f}",
+            "accuracy": None,
+            "speed": None,
+            "heading": None,
+            "timestamp": as_time(timezone.localtime(at)),
+            "is_on_site": True,
+            "project": project_id,
+            "project_name": project_names.get(project_id),
+            "geofence": geofence_id,
+            "geofence_name": geofence_names.get(geofence_id),
+        }
+        for lat, lon, at, geofence_id, project_id in points
+    ]
 
 
 class PresenceAnalyticsView(viewsets.ReadOnlyModelViewSet):
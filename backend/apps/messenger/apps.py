@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MessengerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.messenger"
+
+    def ready(self):
+        from apps.messenger import inbox
+
+        inbox.connect_signals()
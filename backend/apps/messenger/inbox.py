@@ -0,0 +1,115 @@
+"""
+Per-member conversation inbox.
+
+Every ChatConversationMember row carries that member's view of the
+conversation: the last message (plus a short text preview), when the
+conversation was last active, how many messages the member has not read
+and when they last read it.  The chat list is then one query on the
+(user, -last_activity_at) index, and unread badges need no counting.
+
+The rows are updated with F() expressions in the transaction that writes
+the message:
+
+    ChatMessage created     all members: last message, preview, activity
+                            sender: unread_count = 0, last_read_at = sent
+                            others: unread_count + 1
+    ChatMessage deleted     members pointing at it fall back to the
+                            previous message; unread ones are uncounted
+    member joins            starts from the current last message, unread 0
+    mark_read()             unread_count = 0, last_read_at = now
+                            (POST conversations/<id>/read/)
+
+The last-message columns only move forward (by message id), so two
+messages committed out of order cannot leave the older one in the inbox.
+"""
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import PREVIEW_LENGTH, ChatConversationMember, ChatMessage
+
+IMAGE_PREVIEW = "Photo"
+
+
+def preview(text, has_image=False):
+    """One-line summary of a message for the conversation list."""
+    text = " ".join((text or "").split())
+    if not text:
+        return IMAGE_PREVIEW if has_image else ""
+    if len(text) > PREVIEW_LENGTH:
+        text = text[: PREVIEW_LENGTH - 1].rstrip() + "…"
+    return text
+
+
+def _last_message_fields(message):
+    return {
+        "last_message_id": message.pk,
+        "last_message_preview": preview(message.text, bool(message.image)),
+        "last_activity_at": message.created_at,
+    }
+
+
+def _if_newer(message):
+    """Last-message updates that leave rows already pointing at a newer message alone."""
+    newer = Q(last_message__isnull=True) | Q(last_message_id__lt=message.pk)
+    return {
+        name: Case(
+            When(newer, then=Value(value)),
+            default=F(name),
+            output_field=ChatConversationMember._meta.get_field(name),
+        )
+        for name, value in _last_message_fields(message).items()
+    }
+
+
+def record_message(message):
+    members = ChatConversationMember.objects.filter(conversation_id=message.conversation_id)
+    members.exclude(user_id=message.sender_id).update(unread_count=F("unread_count") + 1, **_if_newer(message))
+    members.filter(user_id=message.sender_id).update(unread_count=0, last_read_at=message.created_at, **_if_newer(message))
+
+
+def mark_read(conversation_id, user, at=None):
+    """Clear `user`'s unread count; returns 0 when they are not a member."""
+    return ChatConversationMember.objects.filter(conversation_id=conversation_id, user=user).update(
+        unread_count=0, last_read_at=at or timezone.now()
+    )
+
+
+def _refresh_last_message(members, conversation_id):
+    latest = ChatMessage.objects.filter(conversation_id=conversation_id).order_by("-id").first()
+    if latest is not None:
+        members.update(**_last_message_fields(latest))
+    else:
+        members.update(last_message_id=None, last_message_preview="")
+
+
+# ── Signal handlers ───────────────────────────────────────────────────────────
+
+def _message_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_message(instance)
+
+
+def _message_deleted(sender, instance, **kwargs):
+    members = ChatConversationMember.objects.filter(conversation_id=instance.conversation_id)
+    # The SET_NULL on last_message has already run, so the rows that pointed
+    # at this message are the ones without one.
+    _refresh_last_message(members.filter(last_message__isnull=True), instance.conversation_id)
+    members.exclude(user_id=instance.sender_id).filter(
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=instance.created_at),
+        unread_count__gt=0,
+    ).update(unread_count=F("unread_count") - 1)
+
+
+def _member_saved(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    latest = ChatMessage.objects.filter(conversation_id=instance.conversation_id).order_by("-id").first()
+    if latest is not None:
+        ChatConversationMember.objects.filter(pk=instance.pk).update(**_last_message_fields(latest))
+
+
+def connect_signals():
+    post_save.connect(_message_saved, sender=ChatMessage, dispatch_uid="messenger.inbox:message")
+    post_delete.connect(_message_deleted, sender=ChatMessage, dispatch_uid="messenger.inbox:message")
+    post_save.connect(_member_saved, sender=ChatConversationMember, dispatch_uid="messenger.inbox:member")
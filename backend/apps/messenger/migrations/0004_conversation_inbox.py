@@ -0,0 +1,79 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# Frozen copies of apps.messenger.models.PREVIEW_LENGTH / inbox.preview().
+PREVIEW_LENGTH = 140
+
+
+def preview(text, has_image=False):
+    text = " ".join((text or "").split())
+    if not text:
+        return "Photo" if has_image else ""
+    if len(text) > PREVIEW_LENGTH:
+        text = text[: PREVIEW_LENGTH - 1].rstrip() + "…"
+    return text
+
+
+def backfill_inbox(apps, schema_editor):
+    """
+    Point every member at their conversation's last message.  Read state
+    used to live only in the browser, so nothing starts out unread.
+    """
+    ChatConversation = apps.get_model("messenger", "ChatConversation")
+    ChatConversationMember = apps.get_model("messenger", "ChatConversationMember")
+    ChatMessage = apps.get_model("messenger", "ChatMessage")
+
+    now = django.utils.timezone.now()
+    ChatConversationMember.objects.update(last_read_at=now, unread_count=0)
+    for conversation in ChatConversation.objects.only("id", "created_at").iterator():
+        latest = ChatMessage.objects.filter(conversation_id=conversation.pk).order_by("-id").first()
+        members = ChatConversationMember.objects.filter(conversation_id=conversation.pk)
+        if latest is None:
+            members.update(last_activity_at=conversation.created_at)
+        else:
+            members.update(
+                last_message_id=latest.pk,
+                last_message_preview=preview(latest.text, bool(latest.image)),
+                last_activity_at=latest.created_at,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messenger", "0003_chatmessage_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatconversationmember",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="chatconversationmember",
+            name="last_message",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to="messenger.chatmessage"),
+        ),
+        migrations.AddField(
+            model_name="chatconversationmember",
+            name="last_message_preview",
+            field=models.CharField(blank=True, default="", max_length=140),
+        ),
+        migrations.AddField(
+            model_name="chatconversationmember",
+            name="last_read_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="chatconversationmember",
+            name="unread_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="chatconversationmember",
+            index=models.Index(fields=["user", "-last_activity_at"], name="chat_member_inbox_idx"),
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,9 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+PREVIEW_LENGTH = 140
+
+
 def chat_image_upload_path(instance, filename):
     return f"chat/{instance.conversation_id}/{filename}"
 
@@ -40,9 +43,19 @@ class ChatConversationMember(models.Model):
     role = models.CharField(max_length=16, choices=ROLE_CHOICES, default=ROLE_MEMBER)
     joined_at = models.DateTimeField(auto_now_add=True)
 
+    # Inbox state for this member, kept current by apps.messenger.inbox
+    last_message = models.ForeignKey("ChatMessage", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default="")
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         db_table = "chat_conversation_members"
         unique_together = ("conversation", "user")
+        indexes = [
+            models.Index(fields=["user", "-last_activity_at"], name="chat_member_inbox_idx"),
+        ]
 
 
 class ChatMessage(models.Model):
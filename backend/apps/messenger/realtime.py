@@ -0,0 +1,217 @@
+"""
+Messenger push channel and presence, both kept in Redis.
+
+Events
+------
+    Views publish JSON events once their transaction commits; the WebSocket
+    endpoint (apps/messenger/socket.py, mounted at /ws/messenger/ in
+    config/asgi.py) relays them to connected clients:
+
+        messenger:user:<id>     events for one user — 'message.new',
+                                'conversation.updated', 'call.updated'
+        messenger:presence      'presence' changes, fanned out to everyone
+
+    Publishing is best effort: a client that misses an event catches up
+    with the REST endpoints (`messages?since=`) when it reconnects.
+
+Presence
+--------
+    A user is online while `messenger:presence:<id>` exists.  It is set
+    with a MESSENGER_PRESENCE_TTL expiry by every open socket (refreshed
+    in a loop) and by the REST heartbeat; `messenger:last_seen` keeps the
+    last timestamp after the key expires.  Nothing is written to the
+    database.  Only when Redis is unreachable does presence fall back to
+    the ChatPresence table, throttled as before.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, OperationalError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+USER_CHANNEL = "messenger:user:{}"
+PRESENCE_CHANNEL = "messenger:presence"
+PRESENCE_KEY = "messenger:presence:{}"
+CONNECTIONS_KEY = "messenger:connections:{}"
+LAST_SEEN_KEY = "messenger:last_seen"
+REDIS_BACKOFF_SECS = 30
+DB_TOUCH_INTERVAL = 20
+
+_client = None
+_redis_down_until = 0.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def presence_ttl():
+    return _setting("MESSENGER_PRESENCE_TTL", 90)
+
+
+def redis_url():
+    return _setting("MESSENGER_REDIS_URL", None) or _setting("REDIS_URL", "redis://localhost:6379/0")
+
+
+def _redis():
+    """Shared client, or None while Redis is known to be down."""
+    global _client
+    if time.monotonic() < _redis_down_until:
+        return None
+    if _client is None:
+        try:
+            import redis
+        except ImportError as e:  # local dev (requirements-local.txt) runs without it
+            _redis_failed(e)
+            return None
+        _client = redis.Redis.from_url(redis_url(), socket_connect_timeout=2, socket_timeout=2)
+    return _client
+
+
+def _redis_failed(e):
+    global _redis_down_until
+    logger.warning("Redis unavailable for messenger (%s); falling back.", e)
+    _redis_down_until = time.monotonic() + REDIS_BACKOFF_SECS
+
+
+def encode(event):
+    return json.dumps(event, cls=DjangoJSONEncoder)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Publishing
+# ─────────────────────────────────────────────────────────────────────
+def publish(user_ids, event):
+    """Push `event` to each of `user_ids` once the current transaction commits."""
+    user_ids = sorted(set(user_ids))
+    if user_ids:
+        payload = encode(event)
+        transaction.on_commit(lambda: _publish([USER_CHANNEL.format(uid) for uid in user_ids], payload))
+
+
+def _publish(channels, payload):
+    client = _redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for channel in channels:
+            pipe.publish(channel, payload)
+        pipe.execute()
+    except Exception as e:  # noqa: BLE001
+        _redis_failed(e)
+
+
+def conversation_member_ids(conversation_id):
+    from .models import ChatConversationMember
+
+    return ChatConversationMember.objects.filter(conversation_id=conversation_id).values_list("user_id", flat=True)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Presence
+# ─────────────────────────────────────────────────────────────────────
+def _now_iso():
+    return timezone.now().isoformat()
+
+
+def mark_online(client, user_id):
+    """Set/refresh the presence key; announces the user when it was absent."""
+    now = _now_iso()
+    pipe = client.pipeline(transaction=False)
+    pipe.set(PRESENCE_KEY.format(user_id), now, ex=presence_ttl(), get=True)
+    pipe.hset(LAST_SEEN_KEY, user_id, now)
+    previous, _ = pipe.execute()
+    if previous is None:
+        client.publish(PRESENCE_CHANNEL, encode(
+            {"type": "presence", "user_id": user_id, "is_online": True, "last_seen_at": now}
+        ))
+
+
+def touch(user, force=False):
+    """Record that `user` is active (REST calls and the heartbeat endpoint)."""
+    client = _redis()
+    if client is not None:
+        try:
+            mark_online(client, user.pk)
+            return
+        except Exception as e:  # noqa: BLE001
+            _redis_failed(e)
+    _touch_db(user, force)
+
+
+def _touch_db(user, force=False):
+    """
+    ChatPresence fallback for when Redis is down.
+    SQLite can lock under concurrent writes; never let presence crash chat APIs.
+    """
+    from .models import ChatPresence
+
+    now = timezone.now()
+    try:
+        presence = ChatPresence.objects.filter(user=user).only("id", "last_seen_at").first()
+    except OperationalError:
+        return
+
+    if presence and not force:
+        # Throttle writes to reduce DB lock contention.
+        if (now - presence.last_seen_at).total_seconds() < DB_TOUCH_INTERVAL:
+            return
+
+    try:
+        if presence:
+            ChatPresence.objects.filter(pk=presence.pk).update(last_seen_at=now)
+        else:
+            ChatPresence.objects.create(user=user, last_seen_at=now)
+    except IntegrityError:
+        # Row may be created concurrently in another request.
+        try:
+            ChatPresence.objects.filter(user=user).update(last_seen_at=now)
+        except OperationalError:
+            return
+    except OperationalError:
+        return
+
+
+def presence_for(user_ids):
+    """{user_id: (is_online, last_seen_at)} for `user_ids`; None when Redis is down."""
+    user_ids = list(user_ids)
+    client = _redis()
+    if client is None or not user_ids:
+        return None if client is None else {}
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.mget([PRESENCE_KEY.format(uid) for uid in user_ids])
+        pipe.hmget(LAST_SEEN_KEY, user_ids)
+        online, last_seen = pipe.execute()
+    except Exception as e:  # noqa: BLE001
+        _redis_failed(e)
+        return None
+    return {
+        uid: (live is not None, _parse(live or seen))
+        for uid, live, seen in zip(user_ids, online, last_seen)
+    }
+
+
+def db_presence(presence):
+    """(is_online, last_seen_at) from a ChatPresence row, as the fallback reads it."""
+    if presence is None:
+        return False, None
+    cutoff = timezone.now() - timedelta(seconds=presence_ttl())
+    return presence.last_seen_at >= cutoff, presence.last_seen_at
+
+
+def _parse(value):
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.decode() if isinstance(value, bytes) else value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=dt_timezone.utc)
@@ -1,8 +1,7 @@
-from datetime import timedelta
-from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from . import realtime
 from .models import ChatConversation, ChatConversationMember, ChatMessage, CallSession
 
 User = get_user_model()
@@ -31,18 +30,18 @@ class ChatUserSerializer(serializers.ModelSerializer):
         ]
 
     def _presence(self, obj):
-        return getattr(obj, "chat_presence", None)
+        # Views put {user_id: (is_online, last_seen_at)} from Redis in the
+        # context; without it (Redis down) read the ChatPresence fallback row.
+        presence = self.context.get("presence")
+        if presence is not None and obj.pk in presence:
+            return presence[obj.pk]
+        return realtime.db_presence(getattr(obj, "chat_presence", None))
 
     def get_last_seen_at(self, obj):
-        presence = self._presence(obj)
-        return presence.last_seen_at if presence else None
+        return self._presence(obj)[1]
 
     def get_is_online(self, obj):
-        presence = self._presence(obj)
-        if not presence:
-            return False
-        # Keep a wider window to avoid false "offline" due to network jitter.
-        return presence.last_seen_at >= timezone.now() - timedelta(seconds=120)
+        return self._presence(obj)[0]
 
     def get_role_label(self, obj):
         if getattr(obj, "role", None):
@@ -98,6 +97,10 @@ class ChatConversationMemberSerializer(serializers.ModelSerializer):
 class ChatConversationSerializer(serializers.ModelSerializer):
     members = ChatConversationMemberSerializer(many=True, read_only=True)
     last_message = serializers.SerializerMethodField()
+    last_message_preview = serializers.SerializerMethodField()
+    last_activity_at = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+    last_read_at = serializers.SerializerMethodField()
 
     class Meta:
         model = ChatConversation
@@ -110,14 +113,47 @@ class ChatConversationSerializer(serializers.ModelSerializer):
             "updated_at",
             "members",
             "last_message",
+            "last_message_preview",
+            "last_activity_at",
+            "unread_count",
+            "last_read_at",
         ]
         read_only_fields = ["id", "created_by", "created_at", "updated_at", "members", "last_message"]
 
+    def _inbox(self, obj):
+        """The requesting user's member row (ConversationViewSet.list attaches it)."""
+        if hasattr(obj, "inbox"):
+            return obj.inbox
+        request = self.context.get("request")
+        user_id = getattr(getattr(request, "user", None), "pk", None)
+        obj.inbox = next((m for m in obj.members.all() if m.user_id == user_id), None)
+        return obj.inbox
+
     def get_last_message(self, obj):
-        msg = obj.messages.order_by("-created_at").first()
+        inbox = self._inbox(obj)
+        if inbox is not None:
+            msg = inbox.last_message
+        else:
+            msg = obj.messages.select_related("sender").order_by("-created_at").first()
         if not msg:
             return None
-        return ChatMessageSerializer(msg).data
+        return ChatMessageSerializer(msg, context=self.context).data
+
+    def get_last_message_preview(self, obj):
+        inbox = self._inbox(obj)
+        return inbox.last_message_preview if inbox is not None else ""
+
+    def get_last_activity_at(self, obj):
+        inbox = self._inbox(obj)
+        return inbox.last_activity_at if inbox is not None else obj.updated_at
+
+    def get_unread_count(self, obj):
+        inbox = self._inbox(obj)
+        return inbox.unread_count if inbox is not None else 0
+
+    def get_last_read_at(self, obj):
+        inbox = self._inbox(obj)
+        return inbox.last_read_at if inbox is not None else None
 
 
 class StartDirectConversationSerializer(serializers.Serializer):
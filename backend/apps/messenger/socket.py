@@ -0,0 +1,175 @@
+"""
+WebSocket endpoint for the messenger, mounted by config/asgi.py at
+
+    /ws/messenger/?token=<JWT access token>
+
+A plain ASGI app (no Channels): one Redis pub/sub subscription per socket
+on the user's channel and the presence channel, relayed to the client as
+text frames (see apps/messenger/realtime.py for the event types).
+
+While the socket is open the user's presence key is refreshed every
+MESSENGER_PRESENCE_TTL / 3 seconds, so clients need no heartbeat.  A
+per-user connection counter marks the user offline only when their last
+socket closes.  Clients may send {"type": "ping"} and get {"type": "pong"}.
+
+Close codes: 4401 bad/missing token, 1013 Redis unavailable (retry later).
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import realtime
+
+logger = logging.getLogger(__name__)
+
+PATH = "/ws/messenger"
+
+
+def _user_for_token(raw):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+    close_old_connections()
+    try:
+        auth = JWTAuthentication()
+        user = auth.get_user(auth.get_validated_token(raw))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    finally:
+        close_old_connections()
+    return user if user.is_active else None
+
+
+async def _authenticate(scope):
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token", [""])[0]
+    if not token:
+        return None
+    return await sync_to_async(_user_for_token)(token)
+
+
+async def _send_json(send, event):
+    await send({"type": "websocket.send", "text": realtime.encode(event)})
+
+
+# ── Presence (async twin of realtime.mark_online, plus connection counting) ──
+
+async def _mark_online(client, user_id):
+    now = timezone.now().isoformat()
+    ttl = realtime.presence_ttl()
+    pipe = client.pipeline(transaction=False)
+    pipe.set(realtime.PRESENCE_KEY.format(user_id), now, ex=ttl, get=True)
+    pipe.hset(realtime.LAST_SEEN_KEY, user_id, now)
+    pipe.expire(realtime.CONNECTIONS_KEY.format(user_id), ttl * 2)
+    previous, _, _ = await pipe.execute()
+    if previous is None:
+        await client.publish(realtime.PRESENCE_CHANNEL, realtime.encode(
+            {"type": "presence", "user_id": user_id, "is_online": True, "last_seen_at": now}
+        ))
+
+
+async def _connect(client, user_id):
+    await client.incr(realtime.CONNECTIONS_KEY.format(user_id))
+    await _mark_online(client, user_id)
+
+
+async def _disconnect(client, user_id):
+    remaining = await client.decr(realtime.CONNECTIONS_KEY.format(user_id))
+    if remaining > 0:
+        return
+    now = timezone.now().isoformat()
+    pipe = client.pipeline(transaction=False)
+    pipe.delete(realtime.CONNECTIONS_KEY.format(user_id), realtime.PRESENCE_KEY.format(user_id))
+    pipe.hset(realtime.LAST_SEEN_KEY, user_id, now)
+    pipe.publish(realtime.PRESENCE_CHANNEL, realtime.encode(
+        {"type": "presence", "user_id": user_id, "is_online": False, "last_seen_at": now}
+    ))
+    await pipe.execute()
+
+
+# ── Loops ─────────────────────────────────────────────────────────────────────
+
+async def _relay(pubsub, send):
+    async for message in pubsub.listen():
+        if message["type"] == "message":
+            data = message["data"]
+            await send({"type": "websocket.send", "text": data.decode() if isinstance(data, bytes) else data})
+
+
+async def _keepalive(client, user_id):
+    interval = max(realtime.presence_ttl() // 3, 5)
+    while True:
+        await asyncio.sleep(interval)
+        await _mark_online(client, user_id)
+
+
+async def _listen(receive, send):
+    while True:
+        event = await receive()
+        if event["type"] == "websocket.disconnect":
+            return
+        if event["type"] != "websocket.receive":
+            continue
+        try:
+            data = json.loads(event.get("text") or "{}")
+        except ValueError:
+            continue
+        if isinstance(data, dict) and data.get("type") == "ping":
+            await _send_json(send, {"type": "pong", "ts": timezone.now()})
+
+
+async def messenger_socket(scope, receive, send):
+    event = await receive()
+    if event["type"] != "websocket.connect":
+        return
+
+    user = await _authenticate(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": 4401})
+        return
+
+    import redis.asyncio as aioredis
+
+    client = aioredis.Redis.from_url(realtime.redis_url(), socket_connect_timeout=2)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(realtime.USER_CHANNEL.format(user.pk), realtime.PRESENCE_CHANNEL)
+        await _connect(client, user.pk)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Messenger socket refused for user=%s: Redis unavailable (%s)", user.pk, e)
+        await send({"type": "websocket.close", "code": 1013})
+        await client.aclose()
+        return
+
+    await send({"type": "websocket.accept"})
+    await _send_json(send, {"type": "hello", "user_id": user.pk, "presence_ttl": realtime.presence_ttl()})
+
+    tasks = [
+        asyncio.ensure_future(_relay(pubsub, send)),
+        asyncio.ensure_future(_keepalive(client, user.pk)),
+        asyncio.ensure_future(_listen(receive, send)),
+    ]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning("Messenger socket for user=%s ended: %s", user.pk, task.exception())
+    finally:
+        client_left = tasks[2].done()
+        for task in tasks:
+            task.cancel()
+        if not client_left:
+            try:
+                await send({"type": "websocket.close", "code": 1013})
+            except Exception:  # noqa: BLE001
+                pass
+        try:
+            await _disconnect(client, user.pk)
+            await pubsub.aclose()
+        except Exception:  # noqa: BLE001
+            pass
+        await client.aclose()
@@ -0,0 +1,171 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.messenger import realtime
+from apps.messenger.models import ChatConversation, ChatConversationMember, ChatMessage, ChatPresence
+from config.asgi import application
+
+User = get_user_model()
+
+
+def _conversation(*users):
+    conversation = ChatConversation.objects.create(created_by=users[0])
+    for user in users:
+        ChatConversationMember.objects.create(conversation=conversation, user=user)
+    return conversation
+
+
+class MessengerRealtimeTestCase(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='pass12345')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+        # No Redis in tests: presence uses the ChatPresence fallback
+        self.redis_down = patch.object(realtime, '_redis', return_value=None)
+        self.redis_down.start()
+        self.addCleanup(self.redis_down.stop)
+
+    def test_new_message_is_pushed_to_members_after_commit(self):
+        conversation = _conversation(self.alice, self.bob)
+
+        with patch.object(realtime, '_publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    f'/api/v1/messenger/conversations/{conversation.pk}/messages/',
+                    {'conversation': conversation.pk, 'text': 'Slab poured'},
+                )
+
+        self.assertEqual(response.status_code, 201)
+        channels, payload = publish.call_args.args
+        self.assertEqual(sorted(channels), sorted(realtime.USER_CHANNEL.format(u.pk) for u in (self.alice, self.bob)))
+        event = json.loads(payload)
+        self.assertEqual((event['type'], event['message']['text']), ('message.new', 'Slab poured'))
+
+    def test_call_state_changes_are_pushed(self):
+        conversation = _conversation(self.alice, self.bob)
+
+        with patch.object(realtime, '_publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                call = self.client.post('/api/v1/messenger/calls/', {'conversation': conversation.pk}).data
+                self.client.post(f"/api/v1/messenger/calls/{call['id']}/end/")
+
+        statuses = [json.loads(c.args[1])['call']['status'] for c in publish.call_args_list]
+        self.assertEqual(statuses, ['ringing', 'ended'])
+
+        outsider = _conversation(self.bob)
+        response = self.client.post('/api/v1/messenger/calls/', {'conversation': outsider.pk})
+        self.assertEqual(response.status_code, 403)
+
+    def test_conversation_list_query_count_is_flat(self):
+        for i in range(4):
+            peer = User.objects.create_user(username=f'peer{i}', email=f'peer{i}@example.com', password='pass12345')
+            conversation = _conversation(self.alice, peer)
+            ChatMessage.objects.create(conversation=conversation, sender=peer, text=f'hello {i}')
+        # inbox rows (with conversation and last message), members
+        with patch.object(realtime, 'touch'), self.assertNumQueries(2):
+            data = self.client.get('/api/v1/messenger/conversations/').data
+
+        self.assertEqual(len(data), 4)
+        self.assertEqual([c['last_message']['text'] for c in data], ['hello 3', 'hello 2', 'hello 1', 'hello 0'])
+        self.assertEqual([c['unread_count'] for c in data], [1, 1, 1, 1])
+
+    def test_presence_comes_from_redis_when_available(self):
+        seen = timezone.now() - timedelta(minutes=10)
+        ChatPresence.objects.create(user=self.bob, last_seen_at=seen)
+        bob = next(u for u in self.client.get('/api/v1/messenger/members/').data if u['id'] == self.bob.pk)
+        self.assertFalse(bob['is_online'])
+
+        live = {self.bob.pk: (True, timezone.now())}
+        with patch.object(realtime, 'touch'), patch.object(realtime, 'presence_for', return_value=live):
+            bob = next(u for u in self.client.get('/api/v1/messenger/members/').data if u['id'] == self.bob.pk)
+        self.assertTrue(bob['is_online'])
+
+
+class ConversationInboxTestCase(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='pass12345')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='pass12345')
+        self.conversation = _conversation(self.alice, self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+        self.redis_down = patch.object(realtime, '_redis', return_value=None)
+        self.redis_down.start()
+        self.addCleanup(self.redis_down.stop)
+
+    def _row(self, user):
+        return ChatConversationMember.objects.get(conversation=self.conversation, user=user)
+
+    def test_messages_update_inbox_rows(self):
+        ChatMessage.objects.create(conversation=self.conversation, sender=self.alice, text='  Pour   tomorrow ')
+        last = ChatMessage.objects.create(conversation=self.conversation, sender=self.alice, text='x' * 200)
+
+        bob, alice = self._row(self.bob), self._row(self.alice)
+        self.assertEqual((bob.unread_count, alice.unread_count), (2, 0))
+        self.assertEqual(bob.last_message_id, last.pk)
+        self.assertEqual(len(bob.last_message_preview), 140)
+        self.assertEqual(alice.last_read_at, last.created_at)
+
+        # Bob replying reads the conversation
+        ChatMessage.objects.create(conversation=self.conversation, sender=self.bob, text='ok')
+        bob, alice = self._row(self.bob), self._row(self.alice)
+        self.assertEqual((bob.unread_count, alice.unread_count), (0, 1))
+        self.assertEqual(alice.last_message_preview, 'ok')
+
+    def test_deleting_last_message_falls_back_to_previous(self):
+        first = ChatMessage.objects.create(conversation=self.conversation, sender=self.alice, text='first')
+        ChatMessage.objects.create(conversation=self.conversation, sender=self.alice, text='second').delete()
+
+        bob = self._row(self.bob)
+        self.assertEqual((bob.last_message_id, bob.last_message_preview, bob.unread_count), (first.pk, 'first', 1))
+
+    def test_read_receipt_and_unread_badges(self):
+        other = _conversation(self.alice, self.bob)
+        for conversation in (self.conversation, self.conversation, other):
+            ChatMessage.objects.create(conversation=conversation, sender=self.alice, text='hi')
+
+        badges = self.client.get('/api/v1/messenger/conversations/unread/').data
+        self.assertEqual(badges, {'total': 3, 'conversations': {self.conversation.pk: 2, other.pk: 1}})
+
+        with patch.object(realtime, '_publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f'/api/v1/messenger/conversations/{self.conversation.pk}/read/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(publish.call_args.args[1])['type'], 'conversation.read')
+
+        data = self.client.get('/api/v1/messenger/conversations/').data
+        self.assertEqual([(c['id'], c['unread_count']) for c in data], [(other.pk, 1), (self.conversation.pk, 0)])
+
+        outsider = _conversation(self.alice)
+        self.assertEqual(self.client.post(f'/api/v1/messenger/conversations/{outsider.pk}/read/').status_code, 404)
+
+
+class MessengerSocketTestCase(TestCase):
+    def _run(self, path, query=b''):
+        sent = []
+        inbox = asyncio.Queue()
+        inbox.put_nowait({'type': 'websocket.connect'})
+
+        async def receive():
+            return await inbox.get()
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'websocket', 'path': path, 'query_string': query}
+        asyncio.run(application(scope, receive, send))
+        return sent
+
+    def test_rejects_missing_or_bad_token(self):
+        self.assertEqual(self._run('/ws/messenger/'), [{'type': 'websocket.close', 'code': 4401}])
+        self.assertEqual(self._run('/ws/messenger/', b'token=nope'), [{'type': 'websocket.close', 'code': 4401}])
+
+    def test_unknown_socket_path_is_closed(self):
+        self.assertEqual(self._run('/ws/other/'), [{'type': 'websocket.close', 'code': 4404}])
@@ -1,13 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Q
-from django.db import OperationalError, IntegrityError
+from django.db.models import Prefetch, Q
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import ChatConversation, ChatConversationMember, ChatMessage, CallSession, ChatPresence
+from . import inbox, realtime
+from .models import ChatConversation, ChatConversationMember, ChatMessage, CallSession
 from .serializers import (
     CallSessionSerializer,
     ChatConversationSerializer,
@@ -20,34 +21,33 @@ User = get_user_model()
 
 
 def touch_presence(user, force=False):
-    """
-    Best-effort presence update.
-    SQLite can lock under concurrent writes; never let presence crash chat APIs.
-    """
-    now = timezone.now()
-    try:
-        presence = ChatPresence.objects.filter(user=user).only("id", "last_seen_at").first()
-    except OperationalError:
-        return
-
-    if presence and not force:
-        # Throttle writes to reduce DB lock contention.
-        if (now - presence.last_seen_at).total_seconds() < 20:
-            return
-
-    try:
-        if presence:
-            ChatPresence.objects.filter(pk=presence.pk).update(last_seen_at=now)
-        else:
-            ChatPresence.objects.create(user=user, last_seen_at=now)
-    except IntegrityError:
-        # Row may be created concurrently in another request.
-        try:
-            ChatPresence.objects.filter(user=user).update(last_seen_at=now)
-        except OperationalError:
-            return
-    except OperationalError:
-        return
+    """Best-effort presence update — a Redis key refresh (see realtime.py)."""
+    realtime.touch(user, force=force)
+
+
+def presence_context(view, users):
+    """Serializer context with the Redis presence of `users` read in one round trip."""
+    context = view.get_serializer_context()
+    context["presence"] = realtime.presence_for({u.pk for u in users if u is not None})
+    return context
+
+
+def _publish_conversation(conversation, request):
+    data = ChatConversationSerializer(conversation, context={"request": request}).data
+    # Read state is per member; recipients keep their own
+    for field in ("unread_count", "last_read_at"):
+        data.pop(field)
+    realtime.publish(
+        realtime.conversation_member_ids(conversation.pk),
+        {"type": "conversation.updated", "conversation": data},
+    )
+
+
+def _publish_call(call):
+    realtime.publish(
+        realtime.conversation_member_ids(call.conversation_id),
+        {"type": "call.updated", "call": CallSessionSerializer(call).data},
+    )
 
 
 class TeamMemberViewSet(viewsets.ReadOnlyModelViewSet):
@@ -66,7 +66,11 @@ class TeamMemberViewSet(viewsets.ReadOnlyModelViewSet):
                 | Q(last_name__icontains=q)
                 | Q(email__icontains=q)
             )
-        return queryset.order_by("first_name", "username")
+        return queryset.select_related("role").order_by("first_name", "username")
+
+    def list(self, request, *args, **kwargs):
+        users = list(self.filter_queryset(self.get_queryset()))
+        return Response(self.get_serializer_class()(users, many=True, context=presence_context(self, users)).data)
 
     @action(detail=False, methods=["post"], url_path="presence-heartbeat")
     def presence_heartbeat(self, request):
@@ -80,7 +84,53 @@ class ConversationViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         touch_presence(self.request.user)
-        return ChatConversation.objects.filter(members__user=self.request.user).distinct()
+        members = ChatConversationMember.objects.select_related("user__role", "user__chat_presence")
+        return (
+            ChatConversation.objects.filter(members__user=self.request.user)
+            .distinct()
+            .prefetch_related(Prefetch("members", queryset=members))
+        )
+
+    def list(self, request, *args, **kwargs):
+        # The user's inbox rows (apps.messenger.inbox) in one indexed query,
+        # plus the members of those conversations for names and avatars.
+        members = ChatConversationMember.objects.select_related("user__role", "user__chat_presence")
+        rows = list(
+            ChatConversationMember.objects.filter(user=request.user)
+            .select_related("conversation", "last_message__sender__role", "last_message__sender__chat_presence")
+            .prefetch_related(Prefetch("conversation__members", queryset=members))
+            .order_by("-last_activity_at", "-id")
+        )
+        conversations = []
+        for row in rows:
+            row.conversation.inbox = row
+            conversations.append(row.conversation)
+
+        users = [m.user for c in conversations for m in c.members.all()]
+        users += [row.last_message.sender for row in rows if row.last_message is not None]
+        serializer = self.get_serializer_class()(conversations, many=True, context=presence_context(self, users))
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"], url_path="unread")
+    def unread(self, request):
+        """Unread badge counts: {"total": n, "conversations": {id: n}}."""
+        counts = dict(
+            ChatConversationMember.objects.filter(user=request.user, unread_count__gt=0)
+            .values_list("conversation_id", "unread_count")
+        )
+        return Response({"total": sum(counts.values()), "conversations": counts})
+
+    @action(detail=True, methods=["post"], url_path="read")
+    def read(self, request, pk=None):
+        """Read receipt: clears the user's unread count for the conversation."""
+        touch_presence(request.user)
+        read_at = timezone.now()
+        if not str(pk).isdigit() or not inbox.mark_read(int(pk), request.user, read_at):
+            raise NotFound()
+        event = {"type": "conversation.read", "conversation": int(pk), "unread_count": 0, "last_read_at": read_at}
+        # Lets the user's other tabs and devices clear the badge too
+        realtime.publish([request.user.pk], event)
+        return Response(event)
 
     def perform_create(self, serializer):
         touch_presence(self.request.user)
@@ -90,6 +140,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
             user=self.request.user,
             defaults={"role": ChatConversationMember.ROLE_ADMIN},
         )
+        _publish_conversation(conversation, self.request)
 
     @action(detail=False, methods=["post"], url_path="start-direct")
     def start_direct(self, request):
@@ -118,6 +169,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
         )
         ChatConversationMember.objects.create(conversation=conversation, user=request.user, role=ChatConversationMember.ROLE_ADMIN)
         ChatConversationMember.objects.create(conversation=conversation, user_id=target_id, role=ChatConversationMember.ROLE_MEMBER)
+        _publish_conversation(conversation, request)
         return Response(ChatConversationSerializer(conversation).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["get", "post"], url_path="messages")
@@ -127,10 +179,12 @@ class ConversationViewSet(viewsets.ModelViewSet):
 
         if request.method == "GET":
             since = request.query_params.get("since")
-            qs = conversation.messages.select_related("sender").all()
+            qs = conversation.messages.select_related("sender__role", "sender__chat_presence").all()
             if since:
                 qs = qs.filter(created_at__gt=since)
-            return Response(ChatMessageSerializer(qs, many=True, context={"request": request}).data)
+            messages = list(qs)
+            context = presence_context(self, [m.sender for m in messages])
+            return Response(ChatMessageSerializer(messages, many=True, context=context).data)
 
         serializer = ChatMessageSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
@@ -142,7 +196,12 @@ class ConversationViewSet(viewsets.ModelViewSet):
         )
         conversation.updated_at = timezone.now()
         conversation.save(update_fields=["updated_at"])
-        return Response(ChatMessageSerializer(message, context={"request": request}).data, status=status.HTTP_201_CREATED)
+        data = ChatMessageSerializer(message, context={"request": request}).data
+        realtime.publish(
+            realtime.conversation_member_ids(conversation.pk),
+            {"type": "message.new", "conversation": conversation.pk, "message": data},
+        )
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
 class CallSessionViewSet(viewsets.ModelViewSet):
@@ -155,7 +214,10 @@ class CallSessionViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         touch_presence(self.request.user)
-        serializer.save(initiated_by=self.request.user)
+        conversation = serializer.validated_data["conversation"]
+        if not conversation.members.filter(user=self.request.user).exists():
+            raise PermissionDenied("You are not a member of this conversation.")
+        _publish_call(serializer.save(initiated_by=self.request.user))
 
     @action(detail=True, methods=["post"], url_path="accept")
     def accept(self, request, pk=None):
@@ -163,6 +225,7 @@ class CallSessionViewSet(viewsets.ModelViewSet):
         call = self.get_object()
         call.status = CallSession.STATUS_ONGOING
         call.save(update_fields=["status"])
+        _publish_call(call)
         return Response(CallSessionSerializer(call).data)
 
     @action(detail=True, methods=["post"], url_path="end")
@@ -172,4 +235,5 @@ class CallSessionViewSet(viewsets.ModelViewSet):
         call.status = CallSession.STATUS_ENDED
         call.ended_at = timezone.now()
         call.save(update_fields=["status", "ended_at"])
+        _publish_call(call)
         return Response(CallSessionSerializer(call).data)
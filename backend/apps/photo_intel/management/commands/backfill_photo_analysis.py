@@ -1,14 +1,26 @@
 """
 Backfill — run AI analysis on existing TaskMedia rows that don't have one yet.
 
+Runs through the same batch path as the upload queue
+(services/analysis_queue.py): one analyzer per batch, content-hash reuse
+for duplicate files, progress after every batch.  With --enqueue the
+batches are handed to the queue (Celery) instead of running here.
+
 Usage:
-    python manage.py backfill_photo_analysis [--limit 100] [--reanalyze]
+    python manage.py backfill_photo_analysis [--limit 100] [--reanalyze] [--enqueue]
 """
+import time
+
 from django.core.management.base import BaseCommand
 
 from apps.tasks.models import TaskMedia
 from apps.photo_intel.models import PhotoAnalysis
-from apps.photo_intel.services.analyzer import analyze_task_media
+from apps.photo_intel.services.analysis_queue import (
+    batch_size,
+    chunked,
+    enqueue_analysis,
+    run_batch,
+)
 
 
 class Command(BaseCommand):
@@ -21,6 +33,12 @@ class Command(BaseCommand):
             action="store_true",
             help="Re-run analysis even for media that already have a result.",
         )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue the batches (Celery / local pool) instead of running them here.",
+        )
+        parser.add_argument("--batch-size", type=int, default=0, help="Media per batch (default PHOTO_INTEL_BATCH_SIZE)")
 
     def handle(self, *args, **opts):
         qs = TaskMedia.objects.filter(media_type="IMAGE").order_by("pk")
@@ -32,14 +50,34 @@ class Command(BaseCommand):
         if opts["limit"] > 0:
             qs = qs[: opts["limit"]]
 
-        total = qs.count() if opts["limit"] == 0 else min(opts["limit"], qs.count())
-        self.stdout.write(f"Analyzing {total} TaskMedia row(s)…")
+        ids = list(qs.values_list("pk", flat=True))
+        total = len(ids)
+        size = opts["batch_size"] or batch_size()
+        force = opts["reanalyze"]
+
+        if opts["enqueue"]:
+            queued = enqueue_analysis(ids, force=force)
+            self.stdout.write(self.style.SUCCESS(f"Queued {queued}/{total} TaskMedia row(s)."))
+            return
+
+        self.stdout.write(f"Analyzing {total} TaskMedia row(s) in batches of {size}…")
+        totals = {"completed": 0, "reused": 0, "skipped": 0, "failed": 0}
+        processed = 0
+        started = time.monotonic()
+        for chunk in chunked(ids, size):
+            summary = run_batch(chunk, force=force)
+            for media_id in summary["failed"]:
+                self.stderr.write(f"  Failed media={media_id}")
+            totals["completed"] += summary["completed"]
+            totals["reused"] += summary["reused"]
+            totals["skipped"] += summary["skipped"]
+            totals["failed"] += len(summary["failed"])
+            processed += len(chunk)
+            rate = processed / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f"  [{processed}/{total}] completed={totals['completed']} reused={totals['reused']} "
+                f"failed={totals['failed']} ({rate:.1f}/s)"
+            )
 
-        done = 0
-        for media in qs.iterator():
-            try:
-                analyze_task_media(media)
-                done += 1
-            except Exception as e:  # noqa: BLE001
-                self.stderr.write(f"  Failed media={media.pk}: {e}")
+        done = totals["completed"] + totals["reused"]
         self.stdout.write(self.style.SUCCESS(f"Done. Completed {done}/{total}."))
@@ -0,0 +1,73 @@
+"""
+Benchmark — per-image cost of HeuristicAnalyzer, before and after the
+draft-mode decode + single NumPy histogram.
+
+"before" replays the previous pipeline: full-resolution decode, then two
+pure-Python histograms (dominant colors + phase hints each built one).
+
+Usage:
+    python manage.py benchmark_photo_analyzer [--file photo.jpg] [--runs 5]
+"""
+import io
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.photo_intel.services.analyzer import HeuristicAnalyzer
+from apps.photo_intel.services import color_utils
+
+
+def _synthetic_jpeg(width, height):
+    """A noisy 12 MP-ish site photo stand-in (gradient + texture)."""
+    from PIL import Image, ImageFilter
+
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), 64).convert("RGB")
+    img = Image.blend(img, noise, 0.5).filter(ImageFilter.SMOOTH)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _legacy_analyze(image_bytes):
+    from PIL import Image, ImageStat
+
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    ImageStat.Stat(img)
+    hist = color_utils.hsv_histogram(img, use_numpy=False)
+    color_utils.dominant_from_histogram(hist, 5)
+    color_utils.hsv_histogram(img, use_numpy=False)
+
+
+class Command(BaseCommand):
+    help = "Time HeuristicAnalyzer per image: legacy pipeline vs current."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="JPEG to analyze (default: synthetic 4000×3000)")
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        if opts.get("file"):
+            with open(opts["file"], "rb") as fh:
+                image_bytes = fh.read()
+        else:
+            image_bytes = _synthetic_jpeg(4000, 3000)
+        runs = max(1, opts["runs"])
+        analyzer = HeuristicAnalyzer()
+
+        def per_image(fn):
+            fn(image_bytes)  # warm-up
+            started = time.perf_counter()
+            for _ in range(runs):
+                fn(image_bytes)
+            return (time.perf_counter() - started) / runs * 1000
+
+        before = per_image(_legacy_analyze)
+        after = per_image(analyzer.analyze)
+        numpy = "yes" if color_utils.np is not None else "no"
+        self.stdout.write(
+            f"image={len(image_bytes) / 1024:.0f} KiB  runs={runs}  numpy={numpy}\n"
+            f"  before: {before:8.1f} ms/image\n"
+            f"  after:  {after:8.1f} ms/image"
+        )
+        self.stdout.write(self.style.SUCCESS(f"OK — {before / after:.1f}× faster"))
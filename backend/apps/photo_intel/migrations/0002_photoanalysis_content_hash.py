@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo_intel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photoanalysis',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the analyzed file — identical uploads reuse one result', max_length=64),
+        ),
+    ]
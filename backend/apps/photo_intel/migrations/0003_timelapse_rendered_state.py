@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo_intel', '0002_photoanalysis_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timelapse',
+            name='rendered_fps',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='timelapse',
+            name='rendered_media_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -88,6 +88,12 @@ class PhotoAnalysis(models.Model):
         default=dict, blank=True, help_text="Raw analyzer output for debugging"
     )
     error_message = models.TextField(blank=True)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the analyzed file — identical uploads reuse one result",
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -171,6 +177,11 @@ class Timelapse(models.Model):
     )
     duration_seconds = models.FloatField(default=0.0)
 
+    # What the current output was rendered from — lets a re-render append
+    # only the new frames (services/timelapse.py).
+    rendered_media_ids = models.JSONField(default=list, blank=True)
+    rendered_fps = models.PositiveSmallIntegerField(null=True, blank=True)
+
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="QUEUED")
     error_message = models.TextField(blank=True)
 
@@ -0,0 +1,225 @@
+"""
+Photo analysis work queue.
+
+`enqueue_analysis(media_ids)` is the one way to schedule analysis — the
+TaskMedia post-save signal, the backfill command and anything else go
+through it.
+
+Dispatch (settings.PHOTO_INTEL_QUEUE)
+-------------------------------------
+    "celery" (default) → `analyze_media_batch` Celery tasks, PHOTO_INTEL_BATCH_SIZE
+                         media per task.  If the broker is unreachable the
+                         batch drops to the local pool instead of being lost.
+    "local"            → a bounded in-process pool (PHOTO_INTEL_CONCURRENCY
+                         threads) — for dev boxes without a Celery worker.
+    "sync"             → inline; also used when PHOTO_INTEL_SYNC=True (tests).
+
+Deduplication
+-------------
+* by media id — a short-lived cache marker per queued id, so a burst of
+  saves (or the signal + an explicit enqueue) queues a row once; rows that
+  already have a COMPLETED analysis are skipped unless `force`.
+* by content — analyze_task_media() reuses the result of a byte-identical
+  image (PhotoAnalysis.content_hash) instead of decoding it again.
+
+Failures
+--------
+Rows left FAILED by a batch are retried with exponential backoff, up to
+PHOTO_INTEL_MAX_RETRIES times (Celery `retry`, or a sleep in the local
+pool).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+QUEUED_KEY = "photo-intel:queued:{}"
+QUEUED_TTL_SECS = 30 * 60
+
+BROKER_BACKOFF_SECS = 60
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_broker_down_until = 0.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _mode() -> str:
+    if _setting("PHOTO_INTEL_SYNC", False):
+        return "sync"
+    return _setting("PHOTO_INTEL_QUEUE", "celery")
+
+
+def batch_size() -> int:
+    return max(1, int(_setting("PHOTO_INTEL_BATCH_SIZE", 20)))
+
+
+def chunked(ids: List[int], size: int) -> Iterable[List[int]]:
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Running a batch (shared by Celery, the local pool and the backfill)
+# ─────────────────────────────────────────────────────────────────────
+def run_batch(media_ids: List[int], force: bool = False,
+              on_progress: Optional[Callable[[int, str], None]] = None) -> dict:
+    """
+    Analyze a list of TaskMedia ids with one analyzer instance and one
+    TaskMedia query.  Returns {"completed", "reused", "skipped", "failed":
+    [ids]} and calls `on_progress(media_id, outcome)` after each row.
+    """
+    from apps.photo_intel.models import PhotoAnalysis
+    from apps.photo_intel.services.analyzer import analyze_task_media, get_analyzer
+    from apps.tasks.models import TaskMedia
+
+    summary = {"completed": 0, "reused": 0, "skipped": 0, "failed": []}
+    ids = list(dict.fromkeys(media_ids))
+    done = set()
+    if not force:
+        done = set(
+            PhotoAnalysis.objects
+            .filter(media_id__in=ids, status="COMPLETED")
+            .values_list("media_id", flat=True)
+        )
+
+    medias = TaskMedia.objects.select_related("task__phase").in_bulk(ids)
+    analyzer = get_analyzer()
+    for media_id in ids:
+        media = medias.get(media_id)
+        if media is None or media_id in done:
+            outcome = "skipped"
+        else:
+            try:
+                analysis = analyze_task_media(media, analyzer=analyzer, reuse=not force)
+                if analysis.status == "FAILED":
+                    outcome = "failed"
+                elif analysis.status == "COMPLETED" and "reused_from_media" in (analysis.raw_response or {}):
+                    outcome = "reused"
+                elif analysis.status == "COMPLETED":
+                    outcome = "completed"
+                else:
+                    outcome = "skipped"
+            except Exception:  # noqa: BLE001
+                logger.exception("photo_intel analysis failed for media=%s", media_id)
+                outcome = "failed"
+        if outcome == "failed":
+            summary["failed"].append(media_id)
+        else:
+            summary[outcome] += 1
+        if on_progress:
+            on_progress(media_id, outcome)
+
+    release(ids)
+    return summary
+
+
+def release(media_ids: Iterable[int]):
+    """Clear the queued markers so the ids can be enqueued again."""
+    try:
+        cache.delete_many([QUEUED_KEY.format(i) for i in media_ids])
+    except Exception:  # noqa: BLE001
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Enqueueing
+# ─────────────────────────────────────────────────────────────────────
+def _claim(media_ids: Iterable[int]) -> List[int]:
+    """Ids not already queued (cache marker).  Cache down → claim all."""
+    claimed = []
+    for media_id in dict.fromkeys(media_ids):
+        try:
+            added = cache.add(QUEUED_KEY.format(media_id), 1, timeout=QUEUED_TTL_SECS)
+        except Exception:  # noqa: BLE001
+            added = None
+        if added is not False:
+            claimed.append(media_id)
+    return claimed
+
+
+def enqueue_analysis(media_ids: Iterable[int], force: bool = False) -> int:
+    """
+    Schedule analysis for TaskMedia ids.  Returns the number of ids queued
+    (after de-duplication).  Call after the rows are committed — the
+    signal uses transaction.on_commit.
+    """
+    ids = _claim(int(i) for i in media_ids)
+    if not ids:
+        return 0
+
+    mode = _mode()
+    for chunk in chunked(ids, batch_size()):
+        if mode == "sync":
+            run_batch(chunk, force=force)
+        elif mode == "local":
+            _submit_local(chunk, force)
+        else:
+            _submit_celery(chunk, force)
+    return len(ids)
+
+
+def _submit_celery(chunk: List[int], force: bool):
+    global _broker_down_until
+    from apps.photo_intel.tasks import analyze_media_batch
+
+    # A failed publish can take seconds; don't pay that on every upload.
+    if time.monotonic() < _broker_down_until:
+        _submit_local(chunk, force)
+        return
+    try:
+        analyze_media_batch.apply_async(args=[chunk], kwargs={"force": force}, retry=False)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Celery unavailable for photo analysis (%s); using local pool.", e)
+        _broker_down_until = time.monotonic() + BROKER_BACKOFF_SECS
+        _submit_local(chunk, force)
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Local bounded pool
+# ─────────────────────────────────────────────────────────────────────
+def _local_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=max(1, int(_setting("PHOTO_INTEL_CONCURRENCY", 2))),
+                thread_name_prefix="photo-intel",
+            )
+        return _pool
+
+
+def _submit_local(chunk: List[int], force: bool):
+    _local_pool().submit(_run_local, chunk, force)
+
+
+def _run_local(chunk: List[int], force: bool):
+    max_retries = int(_setting("PHOTO_INTEL_MAX_RETRIES", 3))
+    attempt = 0
+    try:
+        while chunk:
+            close_old_connections()
+            failed = run_batch(chunk, force=force)["failed"]
+            if not failed or attempt >= max_retries:
+                if failed:
+                    logger.error("photo_intel gave up on media=%s after %d retries", failed, attempt)
+                return
+            attempt += 1
+            time.sleep(min(60, 2 ** attempt))
+            chunk = failed
+    except Exception:  # noqa: BLE001
+        logger.exception("photo_intel local batch crashed for media=%s", chunk)
+    finally:
+        connection.close()
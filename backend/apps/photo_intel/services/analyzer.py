@@ -20,6 +20,7 @@ Public entry point
 """
 from __future__ import annotations
 
+import hashlib
 import io
 import logging
 import os
@@ -62,17 +63,38 @@ class BasePhotoAnalyzer:
     def analyze(self, image_bytes: bytes, filename: str = "") -> AnalysisResult:
         raise NotImplementedError
 
+    def reuse(self, twin, filename: str = "") -> Optional[AnalysisResult]:
+        """
+        Result for a byte-identical image already analyzed as `twin`
+        (a COMPLETED PhotoAnalysis from this analyzer), or None to analyze
+        from scratch.  The default copies the stored result.
+        """
+        return AnalysisResult(
+            detected_phase_key=twin.detected_phase_key,
+            detected_phase_label=twin.detected_phase_label,
+            phase_confidence=twin.phase_confidence,
+            tags=list(twin.tags or []),
+            detected_objects=list(twin.detected_objects or []),
+            quality_score=twin.quality_score,
+            brightness=twin.brightness,
+            dominant_colors=list(twin.dominant_colors or []),
+            analyzer_name=twin.analyzer_name,
+            raw_response=dict(twin.raw_response or {}),
+        )
+
 
 # ─────────────────────────────────────────────────────────────────────
 #  Heuristic (default) — works without any external API
 # ─────────────────────────────────────────────────────────────────────
 class HeuristicAnalyzer(BasePhotoAnalyzer):
     """
-    Pure-Python analyzer using Pillow + keyword heuristics.
+    Pillow (+ NumPy when installed) analyzer using keyword heuristics.
 
     Strategy
     --------
-    1. Decode image with Pillow.
+    1. Decode image with Pillow — JPEGs in draft mode at a reduced DCT
+       scale (≥ ANALYSIS_EDGE px), everything else thumbnailed to that size;
+       the original dimensions are kept for the resolution score.
     2. Compute brightness, dominant colors, resolution → `quality_score`.
     3. Use filename / description keywords + color heuristics to guess phase.
        (Rebar/shuttering photos tend to be grey + brown; brickwork has red-orange;
@@ -85,6 +107,9 @@ class HeuristicAnalyzer(BasePhotoAnalyzer):
 
     name = "heuristic"
 
+    # Longest edge the image is decoded/reduced to before analysis.
+    ANALYSIS_EDGE = 512
+
     # Rough phase → (dominant HSV hue range, saturation hint)
     # Used only as a weak secondary signal.
     _PHASE_COLOR_HINTS = {
@@ -99,18 +124,16 @@ class HeuristicAnalyzer(BasePhotoAnalyzer):
 
     def analyze(self, image_bytes: bytes, filename: str = "") -> AnalysisResult:
         from PIL import Image, ImageStat
-        from .color_utils import dominant_color_names, hsv_histogram
-        from apps.photo_intel.constants import (
-            PHASE_KEYWORDS,
-            PHASE_LABEL,
-            PHASE_UNKNOWN,
-        )
+        from .color_utils import hsv_histogram
 
         result = AnalysisResult(analyzer_name=self.name)
 
         try:
             img = Image.open(io.BytesIO(image_bytes))
+            w, h = img.size
+            img.draft("RGB", (self.ANALYSIS_EDGE, self.ANALYSIS_EDGE))
             img = img.convert("RGB")
+            img.thumbnail((self.ANALYSIS_EDGE, self.ANALYSIS_EDGE))
         except Exception as e:  # noqa: BLE001
             logger.warning("HeuristicAnalyzer: failed to decode image: %s", e)
             result.raw_response = {"error": f"decode_failed: {e}"}
@@ -119,10 +142,34 @@ class HeuristicAnalyzer(BasePhotoAnalyzer):
         # ── Brightness ─────────────────────────────────────────────
         stat = ImageStat.Stat(img)
         brightness = sum(stat.mean[:3]) / (3 * 255.0)  # 0..1
+
+        # ── Dominant colors ────────────────────────────────────────
+        histogram = hsv_histogram(img)
+
+        return self._classify(result, brightness, w, h, histogram, filename)
+
+    def reuse(self, twin, filename: str = "") -> Optional[AnalysisResult]:
+        """Re-score the pixel measurements of an identical image for `filename`."""
+        raw = twin.raw_response or {}
+        if "histogram" not in raw or "width" not in raw:
+            return None
+        return self._classify(
+            AnalysisResult(analyzer_name=self.name),
+            raw.get("brightness", twin.brightness),
+            raw["width"], raw["height"], raw["histogram"], filename,
+        )
+
+    def _classify(self, result, brightness, w, h, histogram, filename) -> AnalysisResult:
+        from .color_utils import dominant_from_histogram
+        from apps.photo_intel.constants import (
+            PHASE_KEYWORDS,
+            PHASE_LABEL,
+            PHASE_UNKNOWN,
+        )
+
         result.brightness = round(brightness, 3)
 
-        # ── Resolution-based quality ───────────────────────────────
-        w, h = img.size
+        # ── Resolution-based quality (original, not decoded, size) ─
         mp = (w * h) / 1_000_000
         resolution_score = min(1.0, mp / 2.0)  # 2MP = perfect
         brightness_score = 1.0 - abs(brightness - 0.5) * 2  # closer to 0.5 is better
@@ -130,10 +177,8 @@ class HeuristicAnalyzer(BasePhotoAnalyzer):
             (resolution_score * 0.6 + brightness_score * 0.4), 3
         )
 
-        # ── Dominant colors ────────────────────────────────────────
-        palette = dominant_color_names(img, k=5)
+        palette = dominant_from_histogram(histogram, k=5)
         result.dominant_colors = palette
-        histogram = hsv_histogram(img)
 
         # ── Phase classification — keyword path ────────────────────
         needle = (filename or "").lower()
@@ -177,6 +222,7 @@ class HeuristicAnalyzer(BasePhotoAnalyzer):
         result.raw_response = {
             "scores": scores,
             "histogram": histogram,
+            "brightness": brightness,
             "resolution_mp": round(mp, 2),
             "width": w,
             "height": h,
@@ -357,10 +403,15 @@ def get_analyzer() -> BasePhotoAnalyzer:
 # ─────────────────────────────────────────────────────────────────────
 #  Public orchestration
 # ─────────────────────────────────────────────────────────────────────
-def analyze_task_media(media):
+def analyze_task_media(media, analyzer: Optional[BasePhotoAnalyzer] = None, reuse: bool = True):
     """
     Main entry point — run analysis for a TaskMedia row and upsert PhotoAnalysis.
     Safe to call synchronously (signal handler) or asynchronously (Celery task).
+
+    `analyzer` lets batch callers share one instance.  With `reuse`, an image
+    whose bytes were already analyzed by the same analyzer (same SHA-256)
+    copies that result instead of decoding it again — re-uploads and
+    forwarded photos are common.
     """
     from apps.photo_intel.models import PhotoAnalysis
     from apps.photo_intel.services.phase_mapper import resolve_task_phase_key
@@ -393,18 +444,32 @@ def analyze_task_media(media):
         except Exception:
             pass
 
-    analyzer = get_analyzer()
-    try:
-        result: AnalysisResult = analyzer.analyze(
-            image_bytes, filename=media.file.name or ""
+    analysis.content_hash = hashlib.sha256(image_bytes).hexdigest()
+    analyzer = analyzer or get_analyzer()
+
+    twin = None
+    if reuse:
+        twin = (
+            PhotoAnalysis.objects
+            .filter(content_hash=analysis.content_hash, status="COMPLETED",
+                    analyzer_name=analyzer.name)
+            .exclude(pk=analysis.pk)
+            .first()
         )
-    except Exception as e:  # noqa: BLE001
-        logger.exception("Analyzer crashed")
-        analysis.status = "FAILED"
-        analysis.error_message = str(e)
-        analysis.analyzer_name = analyzer.name
-        analysis.save()
-        return analysis
+
+    result = analyzer.reuse(twin, filename=media.file.name or "") if twin is not None else None
+    if result is not None:
+        result.raw_response["reused_from_media"] = twin.media_id
+    else:
+        try:
+            result = analyzer.analyze(image_bytes, filename=media.file.name or "")
+        except Exception as e:  # noqa: BLE001
+            logger.exception("Analyzer crashed")
+            analysis.status = "FAILED"
+            analysis.error_message = str(e)
+            analysis.analyzer_name = analyzer.name
+            analysis.save()
+            return analysis
 
     # Phase-match verdict
     task_phase_key = resolve_task_phase_key(media.task)
@@ -1,11 +1,22 @@
 """
-Small color helpers used by HeuristicAnalyzer — no external deps beyond Pillow.
+Small color helpers used by HeuristicAnalyzer — Pillow, plus NumPy when
+installed.
+
+The histogram is the hot path: 4096 pixels of a 64×64 thumbnail, each
+converted to HSV and dropped into a named bucket.  With NumPy that is a
+handful of array operations; without it we fall back to the per-pixel
+`colorsys` loop.  Both paths give identical results.
 """
 from __future__ import annotations
 
 import colorsys
 from collections import Counter
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # requirements-local.txt — pure-Python path below
+    np = None
 
 
 # Broad human-friendly color buckets (in HSV)
@@ -27,34 +38,83 @@ _BUCKETS = [
     (0.02, 0.12, 0.10, 0.35, 0.75, "brown"),
     (0.08, 0.18, 0.10, 0.50, 0.90, "beige"),
 ]
+_FALLBACK = "grey"
 
 
 def _classify_hsv(h: float, s: float, v: float) -> str:
     for h0, h1, s_min, v_min, v_max, name in _BUCKETS:
         if h0 <= h <= h1 and s >= s_min and v_min <= v <= v_max:
             return name
-    return "grey"
+    return _FALLBACK
 
 
 def _downsample(img, size: int = 64):
-    """Return (pixels, n) for a shrunk RGB image — cheap but representative."""
-    small = img.resize((size, size))
-    return list(small.getdata()), size * size
+    """Return a shrunk RGB image — cheap but representative."""
+    return img.resize((size, size))
 
 
-def hsv_histogram(img) -> Dict[str, float]:
-    """
-    Normalised histogram mapping bucket name → fraction of pixels (0..1).
-    """
-    pixels, n = _downsample(img)
+def _histogram_python(small) -> Dict[str, float]:
+    pixels = list(small.getdata())
     counts: Counter = Counter()
     for r, g, b in pixels:
         h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
         counts[_classify_hsv(h, s, v)] += 1
-    return {k: v / n for k, v in counts.items()}
+    n = len(pixels)
+    return {k: c / n for k, c in counts.items()}
 
 
-def dominant_color_names(img, k: int = 3) -> List[str]:
-    hist = hsv_histogram(img)
+def _histogram_numpy(small) -> Dict[str, float]:
+    rgb = np.asarray(small, dtype=np.float64).reshape(-1, 3) / 255.0
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+
+    # colorsys.rgb_to_hsv, vectorized
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    v = maxc
+    span = maxc - minc
+    grey = span == 0
+    safe_span = np.where(grey, 1.0, span)
+    s = np.where(grey, 0.0, span / np.where(maxc == 0, 1.0, maxc))
+    rc = (maxc - r) / safe_span
+    gc = (maxc - g) / safe_span
+    bc = (maxc - b) / safe_span
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(grey, 0.0, (h / 6.0) % 1.0)
+
+    # First matching bucket wins, as in _classify_hsv
+    names = sorted({b[5] for b in _BUCKETS})
+    label = np.full(h.shape, names.index(_FALLBACK))
+    unassigned = np.ones(h.shape, dtype=bool)
+    for h0, h1, s_min, v_min, v_max, name in _BUCKETS:
+        hit = unassigned & (h >= h0) & (h <= h1) & (s >= s_min) & (v >= v_min) & (v <= v_max)
+        label[hit] = names.index(name)
+        unassigned &= ~hit
+
+    # Report buckets in first-seen pixel order, like the Counter path
+    present, first_seen, counts = np.unique(label, return_index=True, return_counts=True)
+    n = label.size
+    return {
+        names[idx]: int(cnt) / n
+        for _, idx, cnt in sorted(zip(first_seen, present, counts))
+    }
+
+
+def hsv_histogram(img, use_numpy: Optional[bool] = None) -> Dict[str, float]:
+    """
+    Normalised histogram mapping bucket name → fraction of pixels (0..1).
+    """
+    small = _downsample(img)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        return _histogram_numpy(small)
+    return _histogram_python(small)
+
+
+def dominant_from_histogram(hist: Dict[str, float], k: int = 3) -> List[str]:
     ranked = sorted(hist.items(), key=lambda kv: kv[1], reverse=True)
     return [name for name, _ in ranked[:k]]
+
+
+def dominant_color_names(img, k: int = 3) -> List[str]:
+    return dominant_from_histogram(hsv_histogram(img), k)
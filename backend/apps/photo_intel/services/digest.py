@@ -101,10 +101,13 @@ def build_weekly_digest(week_start: date, week_end: date) -> WeeklyDigest:
     digest.save()
 
     # ── Auto-generate project-scope timelapse for the week ─────
-    existing = digest.timelapses.filter(scope="PROJECT").first()
-    if not existing:
-        from apps.photo_intel.services.timelapse import regenerate_for_scope
+    from apps.photo_intel.services.timelapse import generate_timelapse, regenerate_for_scope
 
+    existing = digest.timelapses.filter(scope="PROJECT").first()
+    if existing:
+        # Re-running the digest mid-week only appends the new photos.
+        generate_timelapse(existing)
+    else:
         tl = regenerate_for_scope(
             scope="PROJECT",
             period_start=week_start,
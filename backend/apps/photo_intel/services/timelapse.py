@@ -4,7 +4,14 @@ Timelapse generation.
 Two backends, picked automatically:
 
   1. ffmpeg (preferred) — high-quality H.264 mp4 at configurable fps.
-  2. Pillow fallback   — animated GIF from PNG frames (always available).
+  2. Pillow fallback   — animated GIF, streamed frame by frame (always available).
+
+Frame cache
+-----------
+Each source image is decoded and letterboxed to TARGET_SIZE once, then
+kept as a JPEG under PHOTO_INTEL_FRAME_CACHE_DIR keyed by media id + size.
+Re-rendering a timelapse (or the weekly digest's project timelapse) reads
+cached frames and only appends what is new — see generate_timelapse().
 
 Scope resolution
 ----------------
@@ -14,6 +21,7 @@ queryset that matches the scope and the [period_start, period_end] window.
 """
 from __future__ import annotations
 
+import hashlib
 import io
 import logging
 import os
@@ -24,7 +32,7 @@ from datetime import date, datetime, time
 from typing import Iterable, Optional
 
 from django.conf import settings
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db.models import QuerySet
 from django.utils import timezone
 
@@ -56,34 +64,55 @@ def collect_media(timelapse) -> "QuerySet[TaskMedia]":
 
 
 # ─────────────────────────────────────────────────────────────────────
-#  Helpers
+#  Normalized frame cache
 # ─────────────────────────────────────────────────────────────────────
-def _ffmpeg_available() -> bool:
-    return shutil.which("ffmpeg") is not None
+TARGET_SIZE = (1280, 720)
+
+
+def _frame_cache_dir(size) -> str:
+    root = getattr(settings, "PHOTO_INTEL_FRAME_CACHE_DIR", "") or os.path.join(
+        settings.MEDIA_ROOT, "timelapses", "frames"
+    )
+    return os.path.join(str(root), f"{size[0]}x{size[1]}")
+
 
+def frame_cache_path(media, size=TARGET_SIZE) -> str:
+    """
+    Cache path of a media row's letterboxed frame.  The key is the media id,
+    the target size and a digest of the stored file name, so a replaced
+    upload gets a fresh frame.
+    """
+    tag = hashlib.sha1((media.file.name or "").encode()).hexdigest()[:10]
+    return os.path.join(_frame_cache_dir(size), f"{media.pk}-{tag}.jpg")
 
-def _copy_frames_to_tempdir(media_qs, tempdir: str, target_size=(1280, 720)):
+
+def cached_frame(media, size=TARGET_SIZE) -> Optional[str]:
+    """Path of the normalized frame for `media`, rendering it on first use."""
     from PIL import Image
 
-    count = 0
-    for idx, m in enumerate(media_qs):
+    path = frame_cache_path(media, size)
+    if os.path.exists(path):
+        return path
+
+    try:
+        media.file.open("rb")
+        img = Image.open(io.BytesIO(media.file.read()))
+        img.draft("RGB", size)
+        img = img.convert("RGB")
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Skipping frame %s: %s", media.pk, e)
+        return None
+    finally:
         try:
-            m.file.open("rb")
-            img = Image.open(io.BytesIO(m.file.read())).convert("RGB")
-        except Exception as e:  # noqa: BLE001
-            logger.warning("Skipping frame %s: %s", m.pk, e)
-            continue
-        finally:
-            try:
-                m.file.close()
-            except Exception:
-                pass
+            media.file.close()
+        except Exception:
+            pass
 
-        img = _letterbox(img, target_size)
-        out = os.path.join(tempdir, f"frame_{idx:05d}.png")
-        img.save(out, format="PNG")
-        count += 1
-    return count
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    _letterbox(img, size).save(tmp, format="JPEG", quality=92)
+    os.replace(tmp, path)
+    return path
 
 
 def _letterbox(img, size):
@@ -106,17 +135,22 @@ def _make_thumbnail(first_frame_path: str) -> bytes:
 # ─────────────────────────────────────────────────────────────────────
 #  Backends
 # ─────────────────────────────────────────────────────────────────────
-def _render_mp4(tempdir: str, fps: int, output_path: str) -> bool:
-    cmd = [
-        "ffmpeg", "-y",
-        "-framerate", str(fps),
-        "-i", os.path.join(tempdir, "frame_%05d.png"),
-        "-c:v", "libx264",
-        "-pix_fmt", "yuv420p",
-        "-movflags", "+faststart",
-        "-r", "30",
-        output_path,
-    ]
+def _ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def _link_sequence(frame_paths, tempdir: str) -> str:
+    """Expose cached frames as frame_%05d.jpg in `tempdir` (symlinks, no copies)."""
+    for idx, src in enumerate(frame_paths):
+        dst = os.path.join(tempdir, f"frame_{idx:05d}.jpg")
+        try:
+            os.symlink(os.path.abspath(src), dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+    return os.path.join(tempdir, "frame_%05d.jpg")
+
+
+def _run_ffmpeg(cmd) -> bool:
     try:
         subprocess.run(cmd, check=True, capture_output=True, timeout=180)
         return True
@@ -125,80 +159,195 @@ def _render_mp4(tempdir: str, fps: int, output_path: str) -> bool:
         return False
 
 
-def _render_gif(tempdir: str, fps: int, output_path: str, count: int) -> bool:
-    from PIL import Image
+def _render_mp4(frame_paths, fps: int, output_path: str) -> bool:
+    """Encode frames to H.264.  Every segment uses the same parameters so
+    segments can later be joined with stream copy."""
+    with tempfile.TemporaryDirectory() as seqdir:
+        pattern = _link_sequence(frame_paths, seqdir)
+        return _run_ffmpeg([
+            "ffmpeg", "-y",
+            "-framerate", str(fps),
+            "-i", pattern,
+            "-c:v", "libx264",
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+            "-r", "30",
+            output_path,
+        ])
+
+
+def _concat_mp4(parts, output_path: str) -> bool:
+    """Join identically-encoded mp4 segments without re-encoding."""
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w") as fh:
+        for part in parts:
+            fh.write(f"file '{os.path.abspath(part)}'\n")
+    return _run_ffmpeg([
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0",
+        "-i", list_path,
+        "-c", "copy",
+        "-movflags", "+faststart",
+        output_path,
+    ])
 
-    frames = []
-    for idx in range(count):
-        path = os.path.join(tempdir, f"frame_{idx:05d}.png")
-        if not os.path.exists(path):
-            continue
-        frames.append(Image.open(path).convert("RGB"))
-    if not frames:
-        return False
 
-    duration_ms = int(1000 / max(fps, 1))
-    frames[0].save(
-        output_path,
-        save_all=True,
-        append_images=frames[1:],
-        duration=duration_ms,
-        loop=0,
-        optimize=True,
-    )
+class GifStream:
+    """
+    Minimal streaming GIF89a writer: one frame in memory at a time, each
+    with its own local palette.  Can also reopen a file it wrote earlier
+    and append frames before the trailer.
+    """
+
+    def __init__(self, path: str, size, fps: int, append: bool = False):
+        from PIL import GifImagePlugin
+
+        self._gif = GifImagePlugin
+        self.duration_ms = int(1000 / max(fps, 1))
+        self.count = 0
+        if append:
+            self.fp = open(path, "r+b")
+            self.fp.seek(-1, os.SEEK_END)
+            if self.fp.read(1) != b";":
+                self.fp.close()
+                raise ValueError("not a complete GIF stream")
+            self.fp.seek(-1, os.SEEK_END)
+            self.fp.truncate()
+        else:
+            w, h = size
+            self.fp = open(path, "wb")
+            self.fp.write(b"GIF89a" + w.to_bytes(2, "little") + h.to_bytes(2, "little") + b"\x00\x00\x00")
+            # NETSCAPE2.0 — loop forever
+            self.fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def write(self, frame_path: str):
+        from PIL import Image
+
+        with Image.open(frame_path) as img:
+            frame = img.convert("RGB").quantize(colors=256)
+        for chunk in self._gif.getdata(frame, duration=self.duration_ms, include_color_table=True):
+            self.fp.write(chunk)
+        self.count += 1
+
+    def close(self):
+        self.fp.write(b";")
+        self.fp.close()
+
+
+def _render_gif(frame_paths, fps: int, output_path: str, append: bool = False) -> bool:
+    if not frame_paths:
+        return False
+    stream = GifStream(output_path, TARGET_SIZE, fps, append=append)
+    try:
+        for path in frame_paths:
+            stream.write(path)
+    finally:
+        stream.close()
     return True
 
 
 # ─────────────────────────────────────────────────────────────────────
 #  Public API
 # ─────────────────────────────────────────────────────────────────────
-def generate_timelapse(timelapse, fps: Optional[int] = None):
+def _local_copy(field_file, tempdir: str, name: str) -> Optional[str]:
+    """Existing output artefact → local temp file (storage-agnostic)."""
+    if not field_file:
+        return None
+    path = os.path.join(tempdir, name)
+    try:
+        field_file.open("rb")
+        with open(path, "wb") as out:
+            shutil.copyfileobj(field_file, out)
+        return path
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Could not read existing timelapse output: %s", e)
+        return None
+    finally:
+        try:
+            field_file.close()
+        except Exception:
+            pass
+
+
+def _replace_file(field, filename: str, local_path: str):
+    if field:
+        field.delete(save=False)
+    with open(local_path, "rb") as fh:
+        field.save(filename, File(fh), save=False)
+
+
+def generate_timelapse(timelapse, fps: Optional[int] = None, full: bool = False):
     """
     Render a Timelapse row's video/GIF output from its scope's TaskMedia.
     Updates the row in-place and returns it.
-    """
-    from apps.photo_intel.models import Timelapse
 
+    Frames come from the normalized frame cache, so only media never seen
+    before are decoded.  When the scope's frames are the previous render's
+    frames plus new ones at the end (the usual case — photos only get
+    added), just the new frames are encoded and appended: an mp4 segment
+    joined with stream copy, or GIF frames written onto the existing file.
+    Anything else (removed/reordered media, changed fps, `full=True`)
+    re-renders from the cache.
+    """
     fps = fps or getattr(settings, "PHOTO_INTEL_TIMELAPSE_FPS", 4)
 
     timelapse.status = "GENERATING"
     timelapse.error_message = ""
     timelapse.save(update_fields=["status", "error_message"])
 
-    media_qs = collect_media(timelapse)
-    media_list = list(media_qs)
-    if not media_list:
+    media_list = list(collect_media(timelapse))
+    frames = []
+    for m in media_list:
+        path = cached_frame(m)
+        if path:
+            frames.append((m.pk, path))
+    if not frames:
         timelapse.status = "NO_MEDIA"
         timelapse.media_count = 0
         timelapse.save()
         return timelapse
 
+    frame_ids = [pk for pk, _ in frames]
+    previous = list(timelapse.rendered_media_ids or [])
+    appendable = (
+        not full
+        and previous
+        and timelapse.rendered_fps == fps
+        and frame_ids[:len(previous)] == previous
+    )
+    new_paths = [p for _, p in frames[len(previous):]] if appendable else [p for _, p in frames]
+
     with tempfile.TemporaryDirectory() as tempdir:
-        frame_count = _copy_frames_to_tempdir(media_list, tempdir)
-        if frame_count == 0:
-            timelapse.status = "NO_MEDIA"
-            timelapse.save()
-            return timelapse
+        rendered = False
+        unchanged = appendable and not new_paths
 
         # Try mp4 first, fall back to GIF
-        mp4_ok = False
-        if _ffmpeg_available():
-            mp4_path = os.path.join(tempdir, "out.mp4")
-            mp4_ok = _render_mp4(tempdir, fps, mp4_path)
-            if mp4_ok:
-                with open(mp4_path, "rb") as fh:
-                    timelapse.video_file.save(
-                        f"timelapse_{timelapse.pk}.mp4", ContentFile(fh.read()), save=False
-                    )
-
-        if not mp4_ok:
-            gif_path = os.path.join(tempdir, "out.gif")
-            ok = _render_gif(tempdir, fps, gif_path, frame_count)
-            if ok:
-                with open(gif_path, "rb") as fh:
-                    timelapse.gif_file.save(
-                        f"timelapse_{timelapse.pk}.gif", ContentFile(fh.read()), save=False
-                    )
+        if _ffmpeg_available() and not (unchanged and timelapse.video_file):
+            out = os.path.join(tempdir, "out.mp4")
+            existing = _local_copy(timelapse.video_file, tempdir, "prev.mp4") if appendable else None
+            if existing:
+                seg = os.path.join(tempdir, "tail.mp4")
+                rendered = _render_mp4(new_paths, fps, seg) and _concat_mp4([existing, seg], out)
+            if not rendered:
+                rendered = _render_mp4([p for _, p in frames], fps, out)
+            if rendered:
+                _replace_file(timelapse.video_file, f"timelapse_{timelapse.pk}.mp4", out)
+        elif unchanged and (timelapse.video_file or timelapse.gif_file):
+            rendered = True
+
+        if not rendered:
+            out = os.path.join(tempdir, "out.gif")
+            existing = _local_copy(timelapse.gif_file, tempdir, "out.gif") if appendable else None
+            try:
+                if existing:
+                    rendered = _render_gif(new_paths, fps, out, append=True) or not new_paths
+                else:
+                    rendered = _render_gif([p for _, p in frames], fps, out)
+            except Exception as e:  # noqa: BLE001
+                logger.error("GIF render failed: %s", e)
+                rendered = False
+            if rendered:
+                _replace_file(timelapse.gif_file, f"timelapse_{timelapse.pk}.gif", out)
             else:
                 timelapse.status = "FAILED"
                 timelapse.error_message = "Failed to render gif fallback"
@@ -206,18 +355,23 @@ def generate_timelapse(timelapse, fps: Optional[int] = None):
                 return timelapse
 
         # Thumbnail (always from first frame)
-        try:
-            first = os.path.join(tempdir, "frame_00000.png")
-            thumb_bytes = _make_thumbnail(first)
-            timelapse.thumbnail.save(
-                f"thumb_{timelapse.pk}.jpg", ContentFile(thumb_bytes), save=False
-            )
-        except Exception as e:  # noqa: BLE001
-            logger.warning("Thumb generation failed: %s", e)
+        if not (appendable and timelapse.thumbnail):
+            try:
+                thumb_bytes = _make_thumbnail(frames[0][1])
+                if timelapse.thumbnail:
+                    timelapse.thumbnail.delete(save=False)
+                timelapse.thumbnail.save(
+                    f"thumb_{timelapse.pk}.jpg", ContentFile(thumb_bytes), save=False
+                )
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Thumb generation failed: %s", e)
 
     # M2M + stats
+    frame_count = len(frames)
     timelapse.media_count = frame_count
     timelapse.duration_seconds = round(frame_count / fps, 2)
+    timelapse.rendered_media_ids = frame_ids
+    timelapse.rendered_fps = fps
     timelapse.status = "READY"
     timelapse.save()
     timelapse.source_media.set(media_list)
@@ -0,0 +1,33 @@
+from celery import shared_task
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, acks_late=True)
+def analyze_media_batch(self, media_ids, force=False):
+    """Analyze a batch of TaskMedia ids; retry the ones that failed."""
+    from .services.analysis_queue import run_batch
+
+    summary = run_batch(media_ids, force=force)
+    failed = summary["failed"]
+    if failed:
+        max_retries = getattr(settings, "PHOTO_INTEL_MAX_RETRIES", 3)
+        if self.request.retries < max_retries:
+            raise self.retry(
+                args=[failed], kwargs={"force": force},
+                countdown=min(600, 30 * 2 ** self.request.retries),
+                max_retries=max_retries,
+            )
+        logger.error("photo_intel gave up on media=%s after %d retries", failed, self.request.retries)
+    return {**summary, "failed": len(failed)}
+
+
+@shared_task
+def analyse_task_media(media_id):
+    """Single-media entry point kept for callers that queue one upload."""
+    from .services.analysis_queue import enqueue_analysis
+
+    return enqueue_analysis([media_id])
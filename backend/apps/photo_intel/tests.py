@@ -0,0 +1,294 @@
+import io
+import os
+import random
+import shutil
+import unittest
+import tempfile
+from datetime import date
+from unittest.mock import ANY, patch
+
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image, ImageStat
+
+from apps.core.models import HouseProject
+from apps.photo_intel.models import PhotoAnalysis, Timelapse
+from apps.photo_intel.services import analysis_queue, color_utils, timelapse
+from apps.photo_intel.services.analyzer import HeuristicAnalyzer
+from apps.photo_intel.tasks import analyze_media_batch
+from apps.tasks.models import TaskMedia
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def _jpeg_bytes(color=(200, 120, 40)):
+    buf = io.BytesIO()
+    Image.new("RGB", (320, 240), color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def _noise_image(size, seed):
+    return Image.frombytes("RGB", size, random.Random(seed).randbytes(size[0] * size[1] * 3))
+
+
+@unittest.skipIf(color_utils.np is None, "NumPy not installed")
+class ColorUtilsTestCase(TestCase):
+    def test_numpy_histogram_matches_colorsys_loop(self):
+        images = [
+            _noise_image((96, 80), seed=7),
+            _noise_image((64, 64), seed=11),
+            Image.linear_gradient("L").convert("RGB"),      # greys: span == 0
+            Image.new("RGB", (10, 10), (0, 0, 0)),
+            Image.new("RGB", (10, 10), (180, 60, 40)),
+        ]
+        for img in images:
+            with self.subTest(size=img.size, first=img.getpixel((0, 0))):
+                fast = color_utils.hsv_histogram(img, use_numpy=True)
+                slow = color_utils.hsv_histogram(img, use_numpy=False)
+                self.assertEqual(list(fast.items()), list(slow.items()))
+                self.assertEqual(color_utils.dominant_from_histogram(fast, 5),
+                                 color_utils.dominant_from_histogram(slow, 5))
+
+
+class HeuristicDecodeTestCase(TestCase):
+    def _encode(self, img, fmt):
+        buf = io.BytesIO()
+        img.save(buf, fmt)
+        return buf.getvalue()
+
+    def _decoded_sizes(self, data):
+        """Sizes seen by convert("RGB") and by the histogram during analyze()."""
+        with patch.object(Image.Image, "convert", autospec=True, side_effect=Image.Image.convert) as convert, \
+                patch.object(color_utils, "hsv_histogram", wraps=color_utils.hsv_histogram) as histogram:
+            result = HeuristicAnalyzer().analyze(data, "site.jpg")
+        return convert.call_args_list[0].args[0].size, histogram.call_args.args[0].size, result
+
+    def test_large_jpeg_is_decoded_at_reduced_scale(self):
+        decoded, analysed, result = self._decoded_sizes(self._encode(_noise_image((2048, 1536), seed=3), "JPEG"))
+
+        self.assertEqual(decoded, (1024, 768))   # DCT scaling, before any pixels are materialised
+        self.assertEqual(analysed, (512, 384))
+        self.assertEqual((result.raw_response["width"], result.raw_response["height"]), (2048, 1536))
+
+    def test_png_is_fully_decoded_then_thumbnailed(self):
+        decoded, analysed, result = self._decoded_sizes(self._encode(_noise_image((1600, 1200), seed=5), "PNG"))
+
+        self.assertEqual((decoded, analysed), ((1600, 1200), (512, 384)))
+        self.assertEqual((result.raw_response["width"], result.raw_response["height"]), (1600, 1200))
+
+    def test_small_images_decode_as_before(self):
+        for fmt in ("JPEG", "PNG"):
+            with self.subTest(fmt=fmt):
+                data = self._encode(_noise_image((320, 240), seed=9), fmt)
+                decoded, analysed, result = self._decoded_sizes(data)
+
+                reference = Image.open(io.BytesIO(data)).convert("RGB")
+                self.assertEqual((decoded, analysed), ((320, 240), (320, 240)))
+                self.assertEqual(result.raw_response["histogram"], color_utils.hsv_histogram(reference))
+                self.assertEqual(result.brightness, round(sum(ImageStat.Stat(reference).mean) / (3 * 255.0), 3))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PHOTO_INTEL_QUEUE="celery", PHOTO_INTEL_BATCH_SIZE=2)
+class AnalysisQueueTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        for target in (
+            patch.object(analysis_queue, "_broker_down_until", 0.0),
+            patch.object(analyze_media_batch, "apply_async"),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def _queued(self):
+        return [c.kwargs["args"][0] for c in analyze_media_batch.apply_async.call_args_list]
+
+    def test_queued_ids_are_deduplicated_and_batched(self):
+        self.assertEqual(analysis_queue.enqueue_analysis([1, 2, 2, 3]), 3)
+        self.assertEqual(analysis_queue.enqueue_analysis([3, 4]), 1)
+
+        self.assertEqual(self._queued(), [[1, 2], [3], [4]])
+
+    def test_finished_batch_releases_its_ids(self):
+        analysis_queue.enqueue_analysis([1, 2])
+        analysis_queue.run_batch([1])   # no such TaskMedia → skipped, but released
+
+        self.assertEqual(analysis_queue.enqueue_analysis([1, 2]), 1)
+        self.assertEqual(self._queued(), [[1, 2], [1]])
+
+    def test_unreachable_broker_falls_back_to_local_pool(self):
+        analyze_media_batch.apply_async.side_effect = OSError("no broker")
+        with patch.object(analysis_queue, "_local_pool") as pool:
+            analysis_queue.enqueue_analysis([1, 2, 3])
+
+        submitted = [c.args[1] for c in pool.return_value.submit.call_args_list]
+        self.assertEqual(submitted, [[1, 2], [3]])
+        self.assertEqual(analyze_media_batch.apply_async.call_count, 1)   # backed off after the first failure
+
+
+@override_settings(PHOTO_INTEL_MAX_RETRIES=2)
+class AnalysisRetryTestCase(TestCase):
+    def test_celery_task_retries_only_the_failed_ids(self):
+        summary = {"completed": 1, "reused": 0, "skipped": 0, "failed": [7]}
+        with patch.object(analysis_queue, "run_batch", return_value=summary), \
+                patch.object(analyze_media_batch, "retry", side_effect=Retry()) as retry:
+            with self.assertRaises(Retry):
+                analyze_media_batch.run([6, 7])
+
+        retry.assert_called_once_with(args=[[7]], kwargs={"force": False}, countdown=30, max_retries=2)
+
+    def test_local_pool_retries_failed_ids_then_gives_up(self):
+        failed = {"completed": 0, "reused": 0, "skipped": 0, "failed": [7]}
+        with patch.object(analysis_queue, "run_batch", return_value=failed) as run_batch, \
+                patch.object(analysis_queue.time, "sleep") as sleep:
+            analysis_queue._run_local([6, 7], False)
+
+        self.assertEqual([c.args[0] for c in run_batch.call_args_list], [[6, 7], [7], [7]])
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [2, 4])
+
+
+@override_settings(PHOTO_INTEL_ANALYZER="heuristic")
+class ContentHashReuseTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage_override = override_settings(MEDIA_ROOT=self.media_root)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        self.project = HouseProject.objects.create(
+            name="Photo Project", owner_name="Owner", address="Site",
+            total_budget="100000.00", start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31), area_sqft=1200,
+        )
+
+    def _media(self, name, data):
+        return TaskMedia.objects.create(
+            project=self.project, file=SimpleUploadedFile(name, data, content_type="image/jpeg"),
+        )
+
+    def test_identical_bytes_reuse_the_existing_analysis(self):
+        data = _jpeg_bytes()
+        first = self._media("slab.jpg", data)
+        copy = self._media("forwarded.jpg", data)
+        other = self._media("brick.jpg", _jpeg_bytes((180, 60, 40)))
+
+        with patch.object(HeuristicAnalyzer, "analyze", autospec=True,
+                          side_effect=HeuristicAnalyzer.analyze) as analyze:
+            summary = analysis_queue.run_batch([first.pk, copy.pk, other.pk])
+
+        self.assertEqual((summary["completed"], summary["reused"], summary["failed"]), (2, 1, []))
+        self.assertEqual(analyze.call_count, 2)   # the copy was never decoded
+        original = PhotoAnalysis.objects.get(media=first)
+        reused = PhotoAnalysis.objects.get(media=copy)
+        self.assertEqual(reused.content_hash, original.content_hash)
+        self.assertEqual(reused.raw_response["reused_from_media"], first.pk)
+        self.assertEqual(reused.brightness, original.brightness)
+
+    def test_force_analyzes_again(self):
+        data = _jpeg_bytes()
+        first = self._media("slab.jpg", data)
+        copy = self._media("forwarded.jpg", data)
+        analysis_queue.run_batch([first.pk, copy.pk])
+
+        summary = analysis_queue.run_batch([copy.pk], force=True)
+
+        self.assertEqual((summary["completed"], summary["reused"]), (1, 0))
+        self.assertNotIn("reused_from_media", PhotoAnalysis.objects.get(media=copy).raw_response)
+
+
+class TimelapseTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage_override = override_settings(MEDIA_ROOT=self.media_root, PHOTO_INTEL_TIMELAPSE_FPS=4)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        self.project = HouseProject.objects.create(
+            name="Timelapse Project", owner_name="Owner", address="Site",
+            total_budget="100000.00", start_date=date(2026, 1, 1),
+            expected_completion_date=date(2026, 12, 31), area_sqft=1200,
+        )
+        today = timezone.localdate()
+        self.timelapse = Timelapse.objects.create(
+            title="Site", scope="PROJECT", project=self.project, period_start=today, period_end=today,
+        )
+
+    def _media(self, shade):
+        return TaskMedia.objects.create(
+            project=self.project,
+            file=SimpleUploadedFile(f"day{shade}.jpg", _jpeg_bytes((shade, shade, shade)), content_type="image/jpeg"),
+        )
+
+    def _gif_frames(self):
+        with Image.open(self.timelapse.gif_file.path) as gif:
+            return gif.n_frames
+
+    def test_gif_stream_appends_before_the_trailer(self):
+        frames = [timelapse.cached_frame(self._media(shade)) for shade in (40, 120, 200)]
+        out = os.path.join(self.media_root, "out.gif")
+
+        self.assertTrue(timelapse._render_gif(frames[:2], 4, out))
+        self.assertTrue(timelapse._render_gif(frames[2:], 4, out, append=True))
+
+        with Image.open(out) as gif:
+            self.assertEqual((gif.n_frames, gif.size), (3, timelapse.TARGET_SIZE))
+            gif.seek(2)
+            self.assertEqual(gif.info["duration"], 250)
+
+    def test_frames_are_cached_once(self):
+        media = self._media(80)
+        with patch.object(timelapse, "_letterbox", wraps=timelapse._letterbox) as letterbox:
+            path = timelapse.cached_frame(media)
+            self.assertEqual(timelapse.cached_frame(media), path)
+
+        self.assertEqual(letterbox.call_count, 1)
+        self.assertTrue(path.startswith(os.path.join(self.media_root, "timelapses", "frames")))
+
+    @patch.object(timelapse, "_ffmpeg_available", return_value=False)
+    def test_new_media_is_appended_to_the_gif(self, _):
+        first, second = self._media(40), self._media(120)
+        timelapse.generate_timelapse(self.timelapse)
+        self.assertEqual((self.timelapse.status, self._gif_frames()), ("READY", 2))
+
+        third = self._media(200)
+        with patch.object(timelapse, "_letterbox", wraps=timelapse._letterbox) as letterbox, \
+                patch.object(timelapse, "_render_gif", wraps=timelapse._render_gif) as render_gif:
+            timelapse.generate_timelapse(self.timelapse)
+
+        self.assertEqual(letterbox.call_count, 1)   # only the new photo is decoded
+        render_gif.assert_called_once_with([timelapse.frame_cache_path(third)], 4, ANY, append=True)
+        self.assertEqual(self.timelapse.rendered_media_ids, [first.pk, second.pk, third.pk])
+        self.assertEqual((self.timelapse.media_count, self._gif_frames()), (3, 3))
+
+    @patch.object(timelapse, "_ffmpeg_available", return_value=False)
+    def test_removed_media_renders_from_scratch(self, _):
+        first, second = self._media(40), self._media(120)
+        timelapse.generate_timelapse(self.timelapse)
+        first.delete()
+
+        with patch.object(timelapse, "_render_gif", wraps=timelapse._render_gif) as render_gif:
+            timelapse.generate_timelapse(self.timelapse)
+
+        render_gif.assert_called_once_with([timelapse.frame_cache_path(second)], 4, ANY)
+        self.assertEqual((self.timelapse.rendered_media_ids, self._gif_frames()), ([second.pk], 1))
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+    def test_new_media_is_concatenated_onto_the_mp4(self):
+        self._media(40)
+        self._media(120)
+        timelapse.generate_timelapse(self.timelapse)
+        self.assertTrue(self.timelapse.video_file)
+
+        self._media(200)
+        with patch.object(timelapse, "_concat_mp4", wraps=timelapse._concat_mp4) as concat, \
+                patch.object(timelapse, "_render_mp4", wraps=timelapse._render_mp4) as render_mp4:
+            timelapse.generate_timelapse(self.timelapse)
+
+        concat.assert_called_once()
+        self.assertEqual(len(render_mp4.call_args.args[0]), 1)   # only the tail segment is encoded
+        self.assertEqual((self.timelapse.status, self.timelapse.media_count), ("READY", 3))
+        self.assertFalse(self.timelapse.gif_file)
@@ -47,7 +47,7 @@ class PhotoAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
     def reanalyze(self, request, pk=None):
         """Force re-analysis of a single media row."""
         analysis = self.get_object()
-        analyze_task_media(analysis.media)
+        analyze_task_media(analysis.media, reuse=False)
         analysis.refresh_from_db()
         return Response(self.get_serializer(analysis).data)
 
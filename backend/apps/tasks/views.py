@@ -9,6 +9,7 @@ from .models import Task, TaskUpdate, TaskMedia
 from .serializers import TaskSerializer, TaskUpdateSerializer, TaskMediaSerializer
 from apps.accounts.permissions import CanManagePhases
 from apps.core.mixins import ProjectScopedMixin
+from apps.core.sync import record_changes
 
 
 class TaskViewSet(ProjectScopedMixin, viewsets.ModelViewSet):
@@ -54,6 +55,7 @@ class TaskViewSet(ProjectScopedMixin, viewsets.ModelViewSet):
                 except Exception:
                     pass
                 Task.objects.filter(pk=task.pk).update(assigned_team=None)
+                record_changes(Task, [task.pk])
 
             # ② Remove stale WorkerAssignments for other workers on this task
             WorkerAssignment.objects.filter(task=task).exclude(worker=worker).delete()
@@ -28,5 +28,21 @@ def setup_periodic_tasks(sender, **kwargs):
             name='Send Daily Telegram Report',
             task='apps.telegram_bot.tasks.send_daily_telegram_report',
         )
+
+        # Files sent to the bot whose ingest task was lost or failed
+        # (apps.telegram_bot.media_ingest)
+        every_five, created = CrontabSchedule.objects.get_or_create(
+            minute='*/5',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*'
+        )
+
+        PeriodicTask.objects.get_or_create(
+            crontab=every_five,
+            name='Ingest Pending Telegram Media',
+            task='apps.telegram_bot.tasks.ingest_pending_telegram_media',
+        )
     except Exception as e:
         print("Failed to setup periodic tasks for telegram bot:", str(e))
@@ -0,0 +1,99 @@
+"""
+Telegram Bot API client.
+
+One pooled requests.Session per process keeps connections to
+api.telegram.org alive between calls, and every call has a timeout.
+Idempotent GETs (getFile, file downloads) are retried on connection
+errors and 5xx responses; sendMessage is not, so a slow reply is never
+sent twice.
+"""
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+API_BASE = "https://api.telegram.org"
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+DOWNLOAD_CHUNK = 256 * 1024
+# Bots can only download files up to 20 MB through the cloud Bot API
+MAX_DOWNLOAD_SIZE = 20 * 1024 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TelegramError(Exception):
+    """The Bot API answered with ok=false."""
+
+
+class FileTooLarge(TelegramError):
+    pass
+
+
+def session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset({"GET"}),
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+        return _session
+
+
+def _timeout(read=READ_TIMEOUT):
+    return (CONNECT_TIMEOUT, read)
+
+
+def send_message(token, chat_id, text, **extra):
+    """Best effort: failures are logged, never raised into the caller."""
+    try:
+        response = session().post(
+            f"{API_BASE}/bot{token}/sendMessage",
+            json={"chat_id": chat_id, "text": text, **extra},
+            timeout=_timeout(10),
+        )
+        if not response.json().get("ok"):
+            logger.warning("Telegram sendMessage to %s failed: %s", chat_id, response.text[:200])
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Telegram sendMessage to %s failed: %s", chat_id, e)
+
+
+def get_file_path(token, file_id):
+    response = session().get(f"{API_BASE}/bot{token}/getFile", params={"file_id": file_id}, timeout=_timeout())
+    data = response.json()
+    if not data.get("ok"):
+        description = data.get("description", "")
+        if "too big" in description.lower():
+            raise FileTooLarge(description)
+        raise TelegramError(description or f"getFile failed with HTTP {response.status_code}")
+    return data["result"]["file_path"]
+
+
+def download(token, file_path, dest, max_size=MAX_DOWNLOAD_SIZE):
+    """
+    Stream a file into the writable `dest` in DOWNLOAD_CHUNK pieces and
+    return its size.  Raises FileTooLarge as soon as it passes `max_size`.
+    """
+    url = f"{API_BASE}/file/bot{token}/{file_path}"
+    with session().get(url, stream=True, timeout=_timeout()) as response:
+        response.raise_for_status()
+        if int(response.headers.get("Content-Length") or 0) > max_size:
+            raise FileTooLarge(f"{file_path} is larger than {max_size} bytes")
+        size = 0
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK):
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLarge(f"{file_path} is larger than {max_size} bytes")
+            dest.write(chunk)
+    return size
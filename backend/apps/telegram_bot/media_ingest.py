@@ -0,0 +1,352 @@
+"""
+Telegram media ingestion.
+
+The webhook only records what was sent (`accept(message, chat_id)`) and
+answers Telegram straight away; the file is fetched in the background:
+
+    QUEUED ─▶ SAVING ─▶ DONE     TaskMedia saved, AI analysis run, task
+                     │           picker sent to the chat
+                     └▶ FAILED   too large, not an allowed file, or out of
+                                 attempts; the chat is told
+
+Download
+--------
+    getFile, then the file is streamed in chunks into a temporary file on
+    disk (never held in memory) and handed to storage from there.  Size is
+    checked while streaming and validate_safe_upload runs before the save.
+    The Bot API serves at most 20 MB, so larger files fail without a request.
+
+Deduplication
+-------------
+    Rows are unique on Telegram's `file_unique_id`: a webhook retry, or the
+    same photo sent again, finds the existing row and is ignored — unless
+    that row FAILED, in which case sending the file again queues a fresh
+    attempt.
+
+Dispatch
+--------
+    As for thumbnails (core/thumbnails.py): the `ingest_telegram_media`
+    Celery task once the row commits, a local pool while the broker is
+    unreachable, TELEGRAM_MEDIA_SYNC=True inline (tests).  The "Ingest
+    Pending Telegram Media" beat task retries rows left QUEUED, and SAVING
+    rows abandoned by a crashed worker, until MAX_ATTEMPTS.
+"""
+from __future__ import annotations
+
+import logging
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import client
+
+logger = logging.getLogger(__name__)
+
+BROKER_BACKOFF_SECS = 60
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=15)
+SWEEP_BATCH = 50
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_broker_down_until = 0.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def describe(message):
+    """TelegramMediaIngest fields for the file in `message`, or None."""
+    if 'photo' in message:
+        item = message['photo'][-1]
+        media_type, ext, label = 'IMAGE', 'jpg', '📸 Photo'
+    elif 'video' in message:
+        item = message['video']
+        media_type, ext, label = 'VIDEO', 'mp4', '🎥 Video'
+    elif 'document' in message:
+        item = message['document']
+        media_type, label = 'DOCUMENT', '📄 Document'
+        ext = item.get('file_name', 'file').split('.')[-1].lower()
+        mime = item.get('mime_type', '')
+        if 'image' in mime:
+            media_type = 'IMAGE'
+        if 'video' in mime:
+            media_type = 'VIDEO'
+    else:
+        return None
+
+    from_user = message.get('from', {})
+    uploader = f"{from_user.get('first_name', '')} {from_user.get('last_name', '')}".strip()
+    return {
+        'file_unique_id': item.get('file_unique_id') or item['file_id'],
+        'file_id': item['file_id'],
+        'file_size': item.get('file_size'),
+        'media_type': media_type,
+        'extension': ext[:16],
+        'label': label,
+        'caption': message.get('caption', 'Uploaded via Telegram'),
+        'uploader_name': uploader or 'Telegram User',
+    }
+
+
+def accept(message, chat_id):
+    """Record the file in `message` for download; returns (row, created)."""
+    from .models import TelegramMediaIngest
+
+    fields = describe(message)
+    if fields is None:
+        return None, False
+    unique_id = fields.pop('file_unique_id')
+    fields['chat_id'] = str(chat_id)
+    job, created = TelegramMediaIngest.objects.get_or_create(file_unique_id=unique_id, defaults=fields)
+    if created:
+        enqueue([job.pk])
+    elif TelegramMediaIngest.objects.filter(pk=job.pk, status='FAILED').update(
+        **fields, status='QUEUED', attempts=0, error='', updated_at=timezone.now(),
+    ):
+        logger.info("Telegram file %s sent again after failing; retrying.", unique_id)
+        job.refresh_from_db()
+        enqueue([job.pk])
+    else:
+        logger.info("Telegram file %s already received (%s); ignoring.", unique_id, job.status)
+    return job, created
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Ingestion
+# ─────────────────────────────────────────────────────────────────────
+def ingest(job_ids: Iterable[int]) -> int:
+    """Download and save QUEUED rows among `job_ids`; returns how many were saved."""
+    from .models import TelegramMediaIngest
+
+    saved = 0
+    for pk in job_ids:
+        claimed = TelegramMediaIngest.objects.filter(pk=pk, status='QUEUED').update(
+            status='SAVING', attempts=F('attempts') + 1, updated_at=timezone.now(),
+        )
+        if not claimed:
+            continue
+        job = TelegramMediaIngest.objects.get(pk=pk)
+        try:
+            media = _save(job)
+        except (client.FileTooLarge, ValidationError) as e:
+            _fail(job, e, f"❌ {job.label} is too large or not a supported file. Please upload it in the app.")
+        except Exception as e:  # noqa: BLE001
+            if job.attempts >= MAX_ATTEMPTS:
+                _fail(job, e, f"❌ Failed to save {job.label.lower()} to ConstructPro.")
+            else:
+                logger.warning("Telegram media %s failed (attempt %s), will retry: %s", pk, job.attempts, e)
+                TelegramMediaIngest.objects.filter(pk=pk).update(
+                    status='QUEUED', error=str(e)[:1000], updated_at=timezone.now(),
+                )
+        else:
+            saved += 1
+            try:
+                _announce(job, media)
+            except Exception:  # noqa: BLE001
+                logger.exception("Telegram media %s saved but the reply failed", pk)
+    return saved
+
+
+def _token():
+    from .models import TelegramSettings
+
+    bot = TelegramSettings.get_settings()
+    if not bot.is_active or not bot.bot_token:
+        raise ValidationError("The Telegram bot is not active.")
+    return bot.bot_token
+
+
+def _save(job):
+    from apps.tasks.models import TaskMedia
+    from utils.file_validation import MAX_UPLOAD_SIZE, TASK_MEDIA_EXTENSIONS, validate_safe_upload
+
+    max_size = min(MAX_UPLOAD_SIZE, client.MAX_DOWNLOAD_SIZE)
+    if job.file_size and job.file_size > max_size:
+        raise client.FileTooLarge(f"{job.file_size} bytes")
+
+    token = _token()
+    file_path = client.get_file_path(token, job.file_id)
+    filename = f"telegram_{uuid.uuid4().hex[:8]}.{job.extension}"
+    with tempfile.TemporaryFile() as tmp:
+        client.download(token, file_path, tmp, max_size=max_size)
+        tmp.seek(0)
+        upload = File(tmp, name=filename)
+        validate_safe_upload(upload, allowed_extensions=TASK_MEDIA_EXTENSIONS, label="telegram media")
+        with transaction.atomic():
+            media = TaskMedia.objects.create(
+                media_type=job.media_type,
+                description=job.caption,
+                telegram_uploader_name=job.uploader_name,
+            )
+            media.file.save(filename, upload)
+            job.media = media
+            job.status, job.error = 'DONE', ''
+            job.save(update_fields=['media', 'status', 'error', 'updated_at'])
+    return media
+
+
+def _fail(job, error, reply):
+    logger.warning("Telegram media %s failed: %s", job.pk, error)
+    job.status, job.error = 'FAILED', str(error)[:1000]
+    job.save(update_fields=['status', 'error', 'updated_at'])
+    try:
+        client.send_message(_token(), job.chat_id, reply)
+    except Exception as e:  # noqa: BLE001 — the rest of the batch must still run
+        logger.warning("Could not tell chat %s that media %s failed: %s", job.chat_id, job.pk, e)
+
+
+def _announce(job, media):
+    """AI phase detection on photos, then ask the chat which task the file belongs to."""
+    from django.core.cache import cache
+
+    from apps.photo_intel.constants import PHASE_UNKNOWN
+    from apps.photo_intel.services.analyzer import analyze_task_media
+    from apps.photo_intel.services.phase_mapper import resolve_task_phase_key
+    from apps.tasks.models import Task
+
+    detected_phase_key = PHASE_UNKNOWN
+    detected_phase_label = ""
+    phase_confidence = 0.0
+    ai_tags = []
+
+    if media.media_type == 'IMAGE':
+        try:
+            analysis = analyze_task_media(media)
+            detected_phase_key = analysis.detected_phase_key or PHASE_UNKNOWN
+            detected_phase_label = analysis.detected_phase_label or ""
+            phase_confidence = analysis.phase_confidence or 0.0
+            ai_tags = analysis.tags[:5] if analysis.tags else []
+        except Exception as ai_err:  # noqa: BLE001
+            logger.warning("AI analysis failed for telegram media %s (non-fatal): %s", media.pk, ai_err)
+
+    # Active tasks for assignment — AI-prioritized
+    active_tasks = list(Task.objects.filter(
+        status__in=['PENDING', 'IN_PROGRESS']
+    ).select_related('phase').order_by('-updated_at')[:15])
+
+    if active_tasks and not media.project_id:
+        media.project = active_tasks[0].phase.project
+        media.save(update_fields=['project'])
+
+    if not active_tasks:
+        client.send_message(_token(), job.chat_id, f"✅ {job.label} successfully saved to ConstructPro!\nID: {media.id}")
+        return
+
+    # Tasks matching the AI-detected phase come first
+    recommended = []
+    others = []
+    for t in active_tasks:
+        if detected_phase_key != PHASE_UNKNOWN and resolve_task_phase_key(t) == detected_phase_key:
+            recommended.append(t)
+        else:
+            others.append(t)
+    ordered_tasks = (recommended + others)[:10]
+
+    # The webhook reads this when the chat replies with a number
+    cache.set(f"telegram_pending_photo_{job.chat_id}", {
+        'media_id': media.id,
+        'task_ids': [t.id for t in ordered_tasks],
+    }, timeout=900)
+
+    ai_header = ""
+    if detected_phase_key != PHASE_UNKNOWN and phase_confidence >= 0.3:
+        ai_header = f"🤖 AI Detected: {detected_phase_label} ({int(phase_confidence * 100)}% confidence)\n"
+        if ai_tags:
+            ai_header += f"🏷️ Tags: {', '.join(ai_tags)}\n"
+        ai_header += "\n"
+
+    task_lines = []
+    num = 1
+    if recommended:
+        task_lines.append("🌟 Recommended Tasks:")
+        for t in recommended:
+            task_lines.append(f"  {num}. ✅ {t.title}")
+            num += 1
+        if others[:10 - len(recommended)]:
+            task_lines.append("\nOther Active Tasks:")
+            for t in others[:10 - len(recommended)]:
+                task_lines.append(f"  {num}. {t.title}")
+                num += 1
+    else:
+        task_lines.append("Active Tasks:")
+        for t in ordered_tasks:
+            task_lines.append(f"  {num}. {t.title}")
+            num += 1
+
+    task_list_text = "\n".join(task_lines)
+    client.send_message(_token(), job.chat_id, (
+        f"✅ {job.label} saved by {job.uploader_name}!\n\n"
+        f"{ai_header}"
+        f"Which task is this for?\n\n"
+        f"{task_list_text}\n\n"
+        f"Reply with the number (or 0 for General Upload)."
+    ))
+
+
+def ingest_pending(limit: int = SWEEP_BATCH) -> int:
+    """Retry QUEUED rows and requeue SAVING rows a crashed worker left behind."""
+    from .models import TelegramMediaIngest
+
+    stale = TelegramMediaIngest.objects.filter(status='SAVING', updated_at__lt=timezone.now() - STALE_AFTER)
+    stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='QUEUED')
+    stale.update(status='FAILED', error='Abandoned while saving.')
+
+    ids = list(TelegramMediaIngest.objects.filter(status='QUEUED').order_by('pk').values_list('pk', flat=True)[:limit])
+    return ingest(ids) if ids else 0
+
+
+# ─────────────────────────────────────────────────────────────────────
+#  Dispatch
+# ─────────────────────────────────────────────────────────────────────
+def enqueue(job_ids: List[int]) -> None:
+    """Ingest TelegramMediaIngest `job_ids` once the current transaction commits."""
+    if job_ids:
+        transaction.on_commit(lambda: dispatch(list(job_ids)))
+
+
+def dispatch(job_ids: List[int]) -> None:
+    global _broker_down_until
+    if _setting('TELEGRAM_MEDIA_SYNC', False):
+        ingest(job_ids)
+        return
+
+    if time.monotonic() >= _broker_down_until:
+        try:
+            from .tasks import ingest_telegram_media
+            ingest_telegram_media.apply_async(args=[job_ids], retry=False)
+            return
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Celery unavailable for telegram media (%s); using local pool.", e)
+            _broker_down_until = time.monotonic() + BROKER_BACKOFF_SECS
+    _local_pool().submit(_run_local, job_ids)
+
+
+def _local_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='telegram-media')
+        return _pool
+
+
+def _run_local(job_ids: List[int]):
+    try:
+        close_old_connections()
+        ingest(job_ids)
+    except Exception:  # noqa: BLE001
+        logger.exception("Local telegram media batch crashed for jobs=%s", job_ids)
+    finally:
+        connection.close()
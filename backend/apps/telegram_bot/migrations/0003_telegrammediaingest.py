@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskmedia_project'),
+        ('telegram_bot', '0002_telegramsettings_notification_chat_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramMediaIngest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_unique_id', models.CharField(max_length=128, unique=True)),
+                ('file_id', models.CharField(max_length=255)),
+                ('file_size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('chat_id', models.CharField(max_length=50)),
+                ('media_type', models.CharField(default='IMAGE', max_length=10)),
+                ('extension', models.CharField(max_length=16)),
+                ('label', models.CharField(help_text="How replies name the file, e.g. '📸 Photo'", max_length=50)),
+                ('caption', models.TextField(blank=True, default='')),
+                ('uploader_name', models.CharField(blank=True, default='', max_length=150)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('SAVING', 'Saving'), ('DONE', 'Done'), ('FAILED', 'Failed')], db_index=True, default='QUEUED', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('media', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.taskmedia')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
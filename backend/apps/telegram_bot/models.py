@@ -27,3 +27,40 @@ class TelegramSettings(models.Model):
 
     def __str__(self):
         return "Telegram Integration Settings"
+
+
+class TelegramMediaIngest(models.Model):
+    """
+    One photo/video/document received by the webhook, downloaded in the
+    background by apps.telegram_bot.media_ingest.  `file_unique_id` is the
+    same for every copy of a file, so webhook retries and re-sends of the
+    same file are only saved once.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('SAVING', 'Saving'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    file_unique_id = models.CharField(max_length=128, unique=True)
+    file_id = models.CharField(max_length=255)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    chat_id = models.CharField(max_length=50)
+    media_type = models.CharField(max_length=10, default='IMAGE')
+    extension = models.CharField(max_length=16)
+    label = models.CharField(max_length=50, help_text="How replies name the file, e.g. '📸 Photo'")
+    caption = models.TextField(blank=True, default='')
+    uploader_name = models.CharField(max_length=150, blank=True, default='')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED', db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    media = models.ForeignKey('tasks.TaskMedia', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Telegram {self.media_type.lower()} {self.file_unique_id} ({self.status})"
@@ -50,3 +50,19 @@ def send_daily_telegram_report():
         return "Daily report sent successfully."
     except Exception as e:
         return f"Failed to send daily report: {str(e)}"
+
+
+@shared_task
+def ingest_telegram_media(job_ids):
+    """Download and save files sent to the bot (see telegram_bot/media_ingest.py)."""
+    from .media_ingest import ingest
+
+    return ingest(job_ids)
+
+
+@shared_task
+def ingest_pending_telegram_media():
+    """Retry Telegram files whose ingest task was lost or failed."""
+    from .media_ingest import ingest_pending
+
+    return ingest_pending()
@@ -1,3 +1,169 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.tasks.models import TaskMedia
+from apps.telegram_bot import client, media_ingest
+from apps.telegram_bot.models import TelegramMediaIngest, TelegramSettings
+
+
+def _jpeg_bytes():
+    buf = io.BytesIO()
+    Image.new('RGB', (64, 48), (200, 120, 40)).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, json_data=None, body=b'', status_code=200):
+        self._json = json_data
+        self.body = body
+        self.status_code = status_code
+        self.headers = {'Content-Length': str(len(body))}
+        self.text = ''
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, body):
+        self.body = body
+        self.gets = []
+        self.sent = []
+
+    def get(self, url, params=None, stream=False, timeout=None):
+        self.gets.append(url)
+        if url.endswith('/getFile'):
+            return FakeResponse({'ok': True, 'result': {'file_path': 'photos/file_1.jpg'}})
+        return FakeResponse(body=self.body)
+
+    def post(self, url, json=None, timeout=None):
+        self.sent.append(json['text'])
+        return FakeResponse({'ok': True})
+
+
+@override_settings(TELEGRAM_MEDIA_SYNC=True)
+class TelegramMediaIngestTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage_override = override_settings(MEDIA_ROOT=self.media_root)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        TelegramSettings.objects.create(pk=1, bot_token='123:abc', is_active=True)
+        self.session = FakeSession(_jpeg_bytes())
+        for target in (
+            patch.object(client, 'session', return_value=self.session),
+            patch.object(client, 'DOWNLOAD_CHUNK', 256),
+            patch('apps.photo_intel.services.analyzer.analyze_task_media', side_effect=RuntimeError('offline')),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+        self.api = APIClient()
+
+    def _post_photo(self, update_id, unique_id='AQADuniq', file_size=1024):
+        update = {
+            'update_id': update_id,
+            'message': {
+                'chat': {'id': 42},
+                'from': {'first_name': 'Site', 'last_name': 'Lead'},
+                'caption': 'Slab',
+                'photo': [{'file_id': 'FILE1', 'file_unique_id': unique_id, 'file_size': file_size}],
+            },
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.api.post('/api/v1/telegram-bot/webhook/', update, format='json')
+
+    def test_photo_is_streamed_to_task_media_once(self):
+        self.assertEqual(self._post_photo(1).status_code, 200)
+        self.assertEqual(self._post_photo(2).status_code, 200)  # webhook retry / re-send
+
+        media = TaskMedia.objects.get()
+        self.assertEqual((media.media_type, media.description, media.telegram_uploader_name), ('IMAGE', 'Slab', 'Site Lead'))
+        self.assertEqual(media.file.read(), self.session.body)
+        job = TelegramMediaIngest.objects.get()
+        self.assertEqual((job.status, job.media_id, job.attempts), ('DONE', media.pk, 1))
+        self.assertEqual(len(self.session.gets), 2)  # getFile + download, once
+        self.assertIn('successfully saved', self.session.sent[0])
+
+    def test_files_over_the_bot_api_limit_fail_without_downloading(self):
+        self._post_photo(1, file_size=client.MAX_DOWNLOAD_SIZE + 1)
+
+        self.assertEqual(TelegramMediaIngest.objects.get().status, 'FAILED')
+        self.assertFalse(TaskMedia.objects.exists())
+        self.assertEqual(self.session.gets, [])
+        self.assertIn('too large', self.session.sent[0])
+
+    def test_resending_a_failed_file_retries_it(self):
+        self._post_photo(1, file_size=client.MAX_DOWNLOAD_SIZE + 1)
+        self._post_photo(2)
+
+        job = TelegramMediaIngest.objects.get()
+        self.assertEqual((job.status, job.attempts, job.error), ('DONE', 1, ''))
+        self.assertEqual(TaskMedia.objects.get().pk, job.media_id)
+
+    def test_failed_reply_does_not_stop_the_batch(self):
+        too_large = TelegramMediaIngest.objects.create(
+            file_unique_id='big', file_id='F1', file_size=client.MAX_DOWNLOAD_SIZE + 1,
+            media_type='IMAGE', extension='jpg', label='📸 Photo', chat_id='42',
+        )
+        fine = TelegramMediaIngest.objects.create(
+            file_unique_id='ok', file_id='F2', media_type='IMAGE', extension='jpg', label='📸 Photo', chat_id='42',
+        )
+        with patch.object(client, 'send_message', side_effect=ConnectionError('api.telegram.org unreachable')):
+            self.assertEqual(media_ingest.ingest([too_large.pk, fine.pk]), 1)
+
+        too_large.refresh_from_db()
+        fine.refresh_from_db()
+        self.assertEqual((too_large.status, fine.status), ('FAILED', 'DONE'))
+
+    def test_freshly_claimed_old_row_is_not_swept_as_stale(self):
+        job = TelegramMediaIngest.objects.create(
+            file_unique_id='old', file_id='F1', media_type='IMAGE', extension='jpg', label='📸 Photo', chat_id='42',
+        )
+        TelegramMediaIngest.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        seen = []
+
+        def save_while_sweeping(claimed):
+            media_ingest.ingest_pending()   # another worker's periodic sweep
+            seen.append(TelegramMediaIngest.objects.get(pk=claimed.pk).status)
+            raise ConnectionError('reset')
+
+        with patch.object(media_ingest, '_save', side_effect=save_while_sweeping):
+            media_ingest.ingest([job.pk])
+
+        job.refresh_from_db()
+        self.assertEqual(seen, ['SAVING'])
+        self.assertEqual((job.status, job.attempts), ('QUEUED', 1))
+        self.assertGreater(job.updated_at, timezone.now() - media_ingest.STALE_AFTER)
+
+    @override_settings(TELEGRAM_MEDIA_SYNC=False)
+    def test_webhook_only_queues_the_download(self):
+        with patch('apps.telegram_bot.media_ingest.dispatch') as dispatch:
+            self._post_photo(1)
+
+        job = TelegramMediaIngest.objects.get()
+        dispatch.assert_called_once_with([job.pk])
+        self.assertEqual(job.status, 'QUEUED')
+        self.assertEqual(self.session.gets, [])
@@ -1,6 +1,7 @@
 import requests
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from . import client, media_ingest
 from .models import TelegramSettings
 from .serializers import TelegramSettingsSerializer
 
@@ -72,184 +73,15 @@ class TelegramWebhookView(APIView):
                 settings.save(update_fields=['notification_chat_id'])
                 
                 # Send a welcome message back to the chat
-                telegram_api_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                payload = {
-                    'chat_id': chat_id,
-                    'text': "✅ ConstructPro: Successfully connected! You will now receive notifications here."
-                }
-                try:
-                    requests.post(telegram_api_url, json=payload)
-                except Exception as e:
-                    print("Error sending welcome message:", e)
+                client.send_message(
+                    settings.bot_token, chat_id,
+                    "✅ ConstructPro: Successfully connected! You will now receive notifications here."
+                )
 
-            # Handle incoming media (photos, videos, documents)
+            # Handle incoming media (photos, videos, documents). The file is
+            # downloaded in the background so Telegram gets its 200 right away.
             elif any(k in message for k in ['photo', 'video', 'document']):
-                if 'photo' in message:
-                    file_id = message['photo'][-1]['file_id']
-                    media_type = 'IMAGE'
-                    ext = 'jpg'
-                    emoji = '📸 Photo'
-                elif 'video' in message:
-                    file_id = message['video']['file_id']
-                    media_type = 'VIDEO'
-                    ext = 'mp4'
-                    emoji = '🎥 Video'
-                else:
-                    file_id = message['document']['file_id']
-                    media_type = 'DOCUMENT'
-                    mime = message['document'].get('mime_type', '')
-                    ext = message['document'].get('file_name', 'file').split('.')[-1]
-                    emoji = '📄 Document'
-                    if 'image' in mime: media_type = 'IMAGE'
-                    if 'video' in mime: media_type = 'VIDEO'
-
-                caption = message.get('caption', 'Uploaded via Telegram')
-                
-                try:
-                    # 1. Get file path from Telegram API
-                    get_file_url = f"https://api.telegram.org/bot{settings.bot_token}/getFile?file_id={file_id}"
-                    file_res = requests.get(get_file_url).json()
-                    
-                    if file_res.get('ok'):
-                        file_path = file_res['result']['file_path']
-                        # 2. Download the actual file
-                        download_url = f"https://api.telegram.org/file/bot{settings.bot_token}/{file_path}"
-                        img_res = requests.get(download_url)
-                        
-                        if img_res.status_code == 200:
-                            # 3. Save it to TaskMedia
-                            from django.core.files.base import ContentFile
-                            from apps.tasks.models import TaskMedia
-                            from utils.file_validation import TASK_MEDIA_EXTENSIONS, validate_safe_upload
-                            import uuid
-                            
-                            from_user = message.get('from', {})
-                            first_name = from_user.get('first_name', '')
-                            last_name = from_user.get('last_name', '')
-                            uploader_name = f"{first_name} {last_name}".strip() or "Telegram User"
-
-                            filename = f"telegram_{uuid.uuid4().hex[:8]}.{ext}"
-                            upload_file = ContentFile(img_res.content, name=filename)
-                            validate_safe_upload(
-                                upload_file,
-                                allowed_extensions=TASK_MEDIA_EXTENSIONS,
-                                label="telegram media",
-                            )
-                            media = TaskMedia.objects.create(
-                                media_type=media_type,
-                                description=caption,
-                                telegram_uploader_name=uploader_name
-                            )
-                            media.file.save(filename, upload_file)
-                            
-                            # 4. Run AI Photo Analysis synchronously
-                            from apps.photo_intel.services.analyzer import analyze_task_media
-                            from apps.photo_intel.services.phase_mapper import resolve_task_phase_key
-                            from apps.photo_intel.constants import PHASE_UNKNOWN, PHASE_LABEL
-
-                            analysis = None
-                            detected_phase_key = PHASE_UNKNOWN
-                            detected_phase_label = ""
-                            phase_confidence = 0.0
-                            ai_tags = []
-
-                            if media_type == 'IMAGE':
-                                try:
-                                    analysis = analyze_task_media(media)
-                                    detected_phase_key = analysis.detected_phase_key or PHASE_UNKNOWN
-                                    detected_phase_label = analysis.detected_phase_label or ""
-                                    phase_confidence = analysis.phase_confidence or 0.0
-                                    ai_tags = analysis.tags[:5] if analysis.tags else []
-                                except Exception as ai_err:
-                                    print(f"AI analysis failed (non-fatal): {ai_err}")
-
-                            # 5. Fetch Active Tasks for assignment — AI-prioritized
-                            from apps.tasks.models import Task
-                            from django.core.cache import cache
-
-                            active_tasks = list(Task.objects.filter(
-                                status__in=['PENDING', 'IN_PROGRESS']
-                            ).select_related('phase').order_by('-updated_at')[:15])
-
-                            if active_tasks and not media.project_id:
-                                media.project = active_tasks[0].phase.project
-                                media.save(update_fields=['project'])
-
-                            if active_tasks:
-                                # Sort: tasks matching AI-detected phase come first
-                                recommended = []
-                                others = []
-                                for t in active_tasks:
-                                    task_phase_key = resolve_task_phase_key(t)
-                                    if detected_phase_key != PHASE_UNKNOWN and task_phase_key == detected_phase_key:
-                                        recommended.append(t)
-                                    else:
-                                        others.append(t)
-
-                                # Ordered task list: recommended first, then others (max 10 total)
-                                ordered_tasks = (recommended + others)[:10]
-
-                                # Save ordered task IDs in cache for 15 minutes
-                                cache_key = f"telegram_pending_photo_{chat_id}"
-                                cache.set(cache_key, {
-                                    'media_id': media.id,
-                                    'task_ids': [t.id for t in ordered_tasks]
-                                }, timeout=900)
-
-                                # Build the AI analysis header
-                                ai_header = ""
-                                if detected_phase_key != PHASE_UNKNOWN and phase_confidence >= 0.3:
-                                    confidence_pct = int(phase_confidence * 100)
-                                    ai_header = (
-                                        f"🤖 AI Detected: {detected_phase_label} ({confidence_pct}% confidence)\n"
-                                    )
-                                    if ai_tags:
-                                        ai_header += f"🏷️ Tags: {', '.join(ai_tags)}\n"
-                                    ai_header += "\n"
-
-                                # Build task list sections
-                                task_lines = []
-                                num = 1
-                                if recommended:
-                                    task_lines.append("🌟 Recommended Tasks:")
-                                    for t in recommended:
-                                        task_lines.append(f"  {num}. ✅ {t.title}")
-                                        num += 1
-                                    if others[:10 - len(recommended)]:
-                                        task_lines.append("\nOther Active Tasks:")
-                                        for t in others[:10 - len(recommended)]:
-                                            task_lines.append(f"  {num}. {t.title}")
-                                            num += 1
-                                else:
-                                    task_lines.append("Active Tasks:")
-                                    for t in ordered_tasks:
-                                        task_lines.append(f"  {num}. {t.title}")
-                                        num += 1
-
-                                task_list_text = "\n".join(task_lines)
-
-                                reply_text = (
-                                    f"✅ {emoji} saved by {uploader_name}!\n\n"
-                                    f"{ai_header}"
-                                    f"Which task is this for?\n\n"
-                                    f"{task_list_text}\n\n"
-                                    f"Reply with the number (or 0 for General Upload)."
-                                )
-                            else:
-                                reply_text = f"✅ {emoji} successfully saved to ConstructPro!\nID: {media.id}"
-
-                            reply_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                            requests.post(reply_url, json={
-                                'chat_id': chat_id,
-                                'text': reply_text
-                            })
-                except Exception as e:
-                    print(f"Error downloading/saving telegram media: {e}")
-                    error_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                    requests.post(error_url, json={
-                        'chat_id': chat_id,
-                        'text': f"❌ Failed to save {emoji.lower()} to ConstructPro."
-                    })
+                media_ingest.accept(message, chat_id)
             
             # Handle text responses for pending photo assignments
             elif text:
@@ -269,11 +101,7 @@ class TelegramWebhookView(APIView):
                         if choice == 0:
                             # User wants it as general photo
                             cache.delete(cache_key)
-                            reply_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                            requests.post(reply_url, json={
-                                'chat_id': chat_id,
-                                'text': "✅ Saved as General Upload."
-                            })
+                            client.send_message(settings.bot_token, chat_id, "✅ Saved as General Upload.")
                         elif 1 <= choice <= len(task_ids):
                             # User selected a valid task
                             selected_task_id = task_ids[choice - 1]
@@ -285,25 +113,13 @@ class TelegramWebhookView(APIView):
                                 media.save(update_fields=['task', 'project'])
                                 
                                 cache.delete(cache_key)
-                                reply_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                                requests.post(reply_url, json={
-                                    'chat_id': chat_id,
-                                    'text': f"✅ Successfully assigned to:\n👷‍♂️ {task.title}"
-                                })
+                                client.send_message(settings.bot_token, chat_id, f"✅ Successfully assigned to:\n👷‍♂️ {task.title}")
                             except Exception as e:
                                 print("Error updating media task:", e)
-                                reply_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                                requests.post(reply_url, json={
-                                    'chat_id': chat_id,
-                                    'text': "❌ Error assigning file to task."
-                                })
+                                client.send_message(settings.bot_token, chat_id, "❌ Error assigning file to task.")
                         else:
                             # Invalid number
-                            reply_url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-                            requests.post(reply_url, json={
-                                'chat_id': chat_id,
-                                'text': f"❌ Invalid number. Please reply with a number between 0 and {len(task_ids)}."
-                            })
+                            client.send_message(settings.bot_token, chat_id, f"❌ Invalid number. Please reply with a number between 0 and {len(task_ids)}.")
                     else:
                         # They have a pending state but didn't send a number. Ignore or warn.
                         # For simplicity, we just ignore standard chatter.
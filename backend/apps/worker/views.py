@@ -285,12 +285,7 @@ class WorkerPhotoUploadView(APIView):
             description=d.get("description", ""),
         )
 
-        # Kick off async photo analysis if available
-        try:
-            from apps.photo_intel.tasks import analyse_task_media
-            analyse_task_media.delay(media.pk)
-        except Exception:
-            pass  # photo_intel / Celery not configured — continue silently
+        # Photo analysis is queued by the photo_intel TaskMedia post_save signal.
 
         return Response(
             WorkerPhotoSerializer(media, context={"request": request}).data,
@@ -1,4 +1,4 @@
-from .member import WorkforceMember
+from .member import EmployeeIdSequence, WorkforceMember
 from .categories import WorkforceCategory, WorkforceRole
 from .skills import Skill, WorkerSkill
 from .document import WorkerDocument, WorkerContract
@@ -11,6 +11,7 @@ from .team import Team
 __all__ = [
     # Member
     'WorkforceMember',
+    'EmployeeIdSequence',
     # Categories
     'WorkforceCategory',
     'WorkforceRole',
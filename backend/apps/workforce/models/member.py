@@ -246,13 +246,55 @@ class WorkforceMember(models.Model):
         super().save(*args, **kwargs)
 
     def _generate_employee_id(self):
+        return self.allocate_employee_ids(1)[0]
+
+    @classmethod
+    def allocate_employee_ids(cls, count):
+        """
+        Reserve `count` consecutive WF-YYYY-NNNN ids in one locked step —
+        bulk imports use this instead of save() per row.
+        """
         from django.utils import timezone
         year = timezone.now().year
+        first = EmployeeIdSequence.reserve(year, count)
+        return [f'WF-{year}-{seq:04d}' for seq in range(first, first + count)]
+
+
+class EmployeeIdSequence(models.Model):
+    """
+    Last employee_id number handed out per year.  Advanced under a row lock
+    so concurrent saves and imports never get the same number, and caught
+    up with the highest existing WF-YYYY-NNNN id on every reservation so
+    rows written around it (restores, fixtures, admin) cannot collide.
+    """
+    year = models.PositiveIntegerField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('Employee ID Sequence')
+
+    def __str__(self):
+        return f'WF-{self.year}: {self.last_value}'
+
+    @staticmethod
+    def _highest_issued(year):
+        from django.db.models.functions import Length
         last = (
             WorkforceMember.objects
             .filter(employee_id__startswith=f'WF-{year}-')
-            .order_by('employee_id')
+            .order_by(Length('employee_id'), 'employee_id')   # WF-2026-10000 > WF-2026-9999
+            .values_list('employee_id', flat=True)
             .last()
         )
-        seq = int(last.employee_id.split('-')[-1]) + 1 if last else 1
-        return f'WF-{year}-{seq:04d}'
+        return int(last.split('-')[-1]) if last else 0
+
+    @classmethod
+    def reserve(cls, year, count):
+        """Advance the year's counter by `count`; returns the first number reserved."""
+        from django.db import transaction
+        with transaction.atomic():
+            seq, _ = cls.objects.select_for_update().get_or_create(pk=year)
+            first = max(seq.last_value, cls._highest_issued(year)) + 1
+            seq.last_value = first + count - 1
+            seq.save(update_fields=['last_value'])
+        return first
@@ -235,7 +235,6 @@ class PayrollRecord(models.Model):
             record.calculate_net()
             record.save()
         """
-        from django.db.models import Sum, Count
         from apps.attendance.models import DailyAttendance
 
         aw = self.worker.attendance_worker
@@ -249,33 +248,18 @@ class PayrollRecord(models.Model):
         if self.project:
             qs = qs.filter(project=self.project)
 
-        agg = qs.aggregate(total_ot=Sum('overtime_hours'))
-
-        # Tally effective_days manually (computed property, not a DB field)
-        present = Decimal('0')
-        absent = leave = holiday = 0
-        for rec in qs.only('status', 'overtime_hours', 'daily_rate_snapshot'):
-            if rec.status == 'PRESENT':
-                present += Decimal('1')
-            elif rec.status == 'HALF_DAY':
-                present += Decimal('0.5')
-            elif rec.status == 'ABSENT':
-                absent += 1
-            elif rec.status == 'LEAVE':
-                leave += 1
-            elif rec.status == 'HOLIDAY':
-                holiday += 1
-
-        self.total_days_present   = present
-        self.total_days_absent    = absent
-        self.total_days_leave     = leave
-        self.total_days_holiday   = holiday
-        self.total_overtime_hours = agg['total_ot'] or Decimal('0')
+        # One aggregate query — effective days and wages are computed in SQL
+        # with the same rules as DailyAttendance.effective_days / wage_earned.
+        agg = qs.wage_summary()
+
+        self.total_days_present   = agg['effective_days']
+        self.total_days_absent    = agg['absent_count']
+        self.total_days_leave     = agg['leave_count']
+        self.total_days_holiday   = agg['holiday_count']
+        self.total_overtime_hours = agg['overtime_hours']
 
         # Base pay using snapshot rates from DailyAttendance
         # (already captured at record creation — immutable)
-        base = Decimal('0')
-        for rec in qs.only('status', 'daily_rate_snapshot', 'overtime_rate_snapshot', 'overtime_hours'):
-            base += rec.wage_earned   # uses the property from DailyAttendance
+        base = agg['wage_total']
         self.base_pay      = base
         self.overtime_pay  = Decimal('0')   # already included in wage_earned
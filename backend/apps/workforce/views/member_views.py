@@ -783,7 +783,7 @@ class WorkforceMemberViewSet(viewsets.ModelViewSet):
         )
 
         if ok:
-            return Response({'message': f'Credentials sent to {recipient_email}.'})
+            return Response({'message': f'Credentials queued for delivery to {recipient_email}.'})
         else:
             return Response({'error': 'Email delivery failed. Check server email settings.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -32,6 +32,7 @@ class WorkerAssignmentViewSet(viewsets.ModelViewSet):
         if not assignment.task_id:
             return
 
+        from apps.core.sync import record_changes
         from apps.tasks.models import Task
         from apps.workforce.models import WorkerAssignment, WorkforceMember, Team
 
@@ -51,6 +52,7 @@ class WorkerAssignmentViewSet(viewsets.ModelViewSet):
             Task.objects.filter(pk=task.pk).update(
                 assigned_to=None, assigned_team=None
             )
+            record_changes(Task, [task.pk])
 
         elif len(worker_ids) == 1:
             # ── Single worker: individual assignment ─────────────────────────
@@ -58,6 +60,7 @@ class WorkerAssignmentViewSet(viewsets.ModelViewSet):
             Task.objects.filter(pk=task.pk).update(
                 assigned_to_id=worker_ids[0], assigned_team=None
             )
+            record_changes(Task, [task.pk])
 
         else:
             # ── Multiple workers: create / refresh auto-team ─────────────────
@@ -78,6 +81,7 @@ class WorkerAssignmentViewSet(viewsets.ModelViewSet):
             Task.objects.filter(pk=task.pk).update(
                 assigned_team=team, assigned_to=None
             )
+            record_changes(Task, [task.pk])
 
     @staticmethod
     def _delete_auto_team(task):
@@ -1,5 +1,14 @@
 """
 ASGI config for construction management project.
+
+Serves the messenger WebSocket (/ws/messenger/, apps.messenger.socket) in
+its own process, next to the gunicorn WSGI server that handles the API:
+
+    uvicorn config.asgi:application --lifespan off
+
+The reverse proxy routes /ws/ here.  Plain HTTP still reaches Django (the
+container healthcheck uses it), but the API itself is not served from
+this process: sync views under ASGI run one at a time per worker.
 """
 
 import os
@@ -8,4 +17,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup: the socket app uses Django models and settings
+from apps.messenger.socket import PATH as MESSENGER_SOCKET_PATH, messenger_socket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'].rstrip('/') == MESSENGER_SOCKET_PATH:
+            return await messenger_socket(scope, receive, send)
+        await receive()
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    return await django_application(scope, receive, send)
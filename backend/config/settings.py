@@ -181,8 +181,18 @@ MIGRATION_MODULES = {
 # API. Falls back to the heuristic analyzer automatically when credentials
 # are missing. PHOTO_INTEL_SYNC=True makes the post-save signal run the
 # analyzer inline (used by tests).
+# PHOTO_INTEL_QUEUE picks how uploads are analyzed: 'celery' (batched tasks,
+# local-pool fallback when the broker is down), 'local' (bounded in-process
+# pool) or 'sync' — see apps/photo_intel/services/analysis_queue.py.
 PHOTO_INTEL_ANALYZER = config('PHOTO_INTEL_ANALYZER', default='heuristic')
 PHOTO_INTEL_SYNC = config('PHOTO_INTEL_SYNC', default=False, cast=bool)
+PHOTO_INTEL_QUEUE = config('PHOTO_INTEL_QUEUE', default='celery')
+PHOTO_INTEL_BATCH_SIZE = config('PHOTO_INTEL_BATCH_SIZE', default=20, cast=int)
+PHOTO_INTEL_CONCURRENCY = config('PHOTO_INTEL_CONCURRENCY', default=2, cast=int)
+PHOTO_INTEL_MAX_RETRIES = config('PHOTO_INTEL_MAX_RETRIES', default=3, cast=int)
+# Letterboxed timelapse frames, rendered once per photo and reused by every
+# re-render. Defaults to MEDIA_ROOT/timelapses/frames.
+PHOTO_INTEL_FRAME_CACHE_DIR = config('PHOTO_INTEL_FRAME_CACHE_DIR', default='')
 GOOGLE_VISION_API_KEY = config('GOOGLE_VISION_API_KEY', default='')
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 
@@ -251,6 +261,9 @@ import dj_database_url
 # ── Database ──────────────────────────────────────────────────
 # Production: PostgreSQL via DB_* env vars.
 # Dev fallback: DATABASE_URL env var, or SQLite.
+# DB_CONN_MAX_AGE=0 for ASGI processes (the realtime service), where
+# persistent connections are not reused between requests.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
 if config('DB_NAME', default=None):
     DATABASES = {
         'default': {
@@ -260,7 +273,7 @@ if config('DB_NAME', default=None):
             'PASSWORD': config('DB_PASSWORD', default=''),
             'HOST': config('DB_HOST', default='db'),
             'PORT': config('DB_PORT', default='5432'),
-            'CONN_MAX_AGE': 600,
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
             'OPTIONS': {
                 'connect_timeout': 10,
             },
@@ -270,7 +283,7 @@ else:
     DATABASES = {
         'default': dj_database_url.config(
             default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-            conn_max_age=600,
+            conn_max_age=DB_CONN_MAX_AGE,
             conn_health_checks=True,
         )
     }
@@ -306,6 +319,61 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# The prod worker consumes `-Q default,emails,reports` (docker-compose.prod.yml);
+# anything published to Celery's stock 'celery' queue would never run.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'apps.core.tasks.send_queued_emails': {'queue': 'emails'},
+    'apps.core.tasks.flush_email_queue': {'queue': 'emails'},
+    'apps.telegram_bot.tasks.send_daily_telegram_report': {'queue': 'reports'},
+}
+
+# ── Location tracking retention ───────────────────────────────
+# Raw GPS pings older than this are compacted into simplified daily tracks
+# by the nightly "Compact Location Logs" task (apps/location_tracking/tracks.py).
+LOCATION_LOG_RETENTION_DAYS = config('LOCATION_LOG_RETENTION_DAYS', default=30, cast=int)
+LOCATION_TRACK_TOLERANCE_M = config('LOCATION_TRACK_TOLERANCE_M', default=5.0, cast=float)
+
+# ── Backups ───────────────────────────────────────────────────
+# Incremental backups ship only media changed since the last successful
+# BackupLog's manifest, as content-addressed ZIP packs streamed to the
+# destination in resumable chunks (apps/backup/incremental.py).
+# BACKUP_DESTINATION: 'gdrive' (BackupSettings credentials) or 'local'
+# (BACKUP_LOCAL_DIR — a stand-in for a mounted disk or dev box).
+BACKUP_INCREMENTAL = config('BACKUP_INCREMENTAL', default=True, cast=bool)
+BACKUP_DESTINATION = config('BACKUP_DESTINATION', default='gdrive')
+BACKUP_LOCAL_DIR = config('BACKUP_LOCAL_DIR', default=str(BASE_DIR / 'backups'))
+BACKUP_PACK_SIZE_MB = config('BACKUP_PACK_SIZE_MB', default=1024, cast=int)
+
+# ── Dashboard delta sync ──────────────────────────────────────
+# DashboardDataView ?since=<cursor> replays the SyncChange log (core/sync.py).
+# Cursors older than the retention window get a full reload; the overlap
+# re-reads changes from transactions that committed just after the cursor.
+SYNC_CHANGE_RETENTION_DAYS = config('SYNC_CHANGE_RETENTION_DAYS', default=30, cast=int)
+SYNC_CURSOR_OVERLAP = config('SYNC_CURSOR_OVERLAP', default=30, cast=int)
+
+# ── Messenger realtime ────────────────────────────────────────
+# /ws/messenger/ (config/asgi.py → apps/messenger/socket.py, run by the
+# `realtime` uvicorn service) pushes messages,
+# call state and presence over Redis pub/sub.  Presence lives in Redis keys
+# with this TTL; ChatPresence rows are only written while Redis is down.
+MESSENGER_REDIS_URL = config('MESSENGER_REDIS_URL', default=REDIS_URL)
+MESSENGER_PRESENCE_TTL = config('MESSENGER_PRESENCE_TTL', default=90, cast=int)
+
+# ── Data imports (CSV / Excel / SQL) ──────────────────────────
+# Imports run as Celery tasks (thread fallback when the broker is down);
+# DATA_IMPORT_SYNC=True runs them inside the request (tests).
+DATA_IMPORT_SYNC = config('DATA_IMPORT_SYNC', default=False, cast=bool)
+
+# ── Audit-log geo-IP ──────────────────────────────────────────
+# Activity logs never wait on ip-api.com: locations come from an in-process
+# LRU, the shared cache or GEOIP_DB_PATH (CSV of CIDR ranges), and unknown
+# addresses are filled in by a batch task (utils/geoip.py).
+GEOIP_DB_PATH = config('GEOIP_DB_PATH', default='')
+GEOIP_REMOTE_LOOKUP = config('GEOIP_REMOTE_LOOKUP', default=True, cast=bool)
+GEOIP_CACHE_TTL = config('GEOIP_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+GEOIP_LRU_SIZE = config('GEOIP_LRU_SIZE', default=4096, cast=int)
+GEOIP_ENRICH_DELAY = config('GEOIP_ENRICH_DELAY', default=30, cast=int)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -341,6 +409,20 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = config('MEDIA_URL', default='/media/')
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# ── Gallery thumbnails ────────────────────────────────────────
+# Gallery images get sm/md/lg derivatives under MEDIA_ROOT/thumbs/
+# (core/thumbnails.py), rendered by a Celery task after upload.
+# MEDIA_THUMBNAILS_SYNC=True renders inline once the upload commits (tests).
+MEDIA_THUMBNAIL_FORMAT = config('MEDIA_THUMBNAIL_FORMAT', default='WEBP')
+MEDIA_THUMBNAIL_QUALITY = config('MEDIA_THUMBNAIL_QUALITY', default=80, cast=int)
+MEDIA_THUMBNAILS_SYNC = config('MEDIA_THUMBNAILS_SYNC', default=False, cast=bool)
+
+# ── Telegram media ────────────────────────────────────────────
+# Photos/videos sent to the bot are downloaded by a Celery task after the
+# webhook has answered (telegram_bot/media_ingest.py).
+# TELEGRAM_MEDIA_SYNC=True downloads inline once the webhook commits (tests).
+TELEGRAM_MEDIA_SYNC = config('TELEGRAM_MEDIA_SYNC', default=False, cast=bool)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -406,6 +488,14 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+# Outgoing mail is queued (apps/core/email_queue.py): Celery task, local-pool
+# fallback when the broker is down, one pooled SMTP connection per process.
+# EMAIL_QUEUE_SYNC=True sends inline once the request's transaction commits (tests).
+EMAIL_QUEUE_SYNC = config('EMAIL_QUEUE_SYNC', default=False, cast=bool)
+EMAIL_MAX_ATTEMPTS = config('EMAIL_MAX_ATTEMPTS', default=4, cast=int)
+EMAIL_CONNECTION_IDLE = config('EMAIL_CONNECTION_IDLE', default=60, cast=int)
+# Seconds before a row left SENDING by a crashed sender may be claimed again.
+EMAIL_SENDING_LEASE = config('EMAIL_SENDING_LEASE', default=900, cast=int)
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=52428800, cast=int)
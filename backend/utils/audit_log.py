@@ -1,10 +1,20 @@
-import requests
+import logging
+
 from user_agents import parse
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.forms.models import model_to_dict
 from apps.accounts.models import ActivityLog
 from django.contrib.contenttypes.models import ContentType
 
+from utils import geoip
+from utils.geoip import is_internal_ip  # noqa: F401 — re-exported
+
+logger = logging.getLogger(__name__)
+
+ENRICH_QUEUED_KEY = 'geoip:enrich-queued'
+
 def get_client_ip(request):
     if not request: return None
     
@@ -20,55 +30,62 @@ def get_client_ip(request):
     
     return request.META.get('REMOTE_ADDR')
 
-def is_internal_ip(ip):
-    """Checks if IP is in private/internal ranges."""
-    if not ip: return True
-    if ip in ['127.0.0.1', 'localhost', '::1']: return True
-    
-    # 10.0.0.0/8
-    if ip.startswith('10.'): return True
-    # 192.168.0.0/16
-    if ip.startswith('192.168.'): return True
-    # 172.16.0.0/12 (Docker/Internal Proxy range)
-    if ip.startswith('172.'):
-        try:
-            parts = ip.split('.')
-            if len(parts) >= 2:
-                second_octet = int(parts[1])
-                if 16 <= second_octet <= 31:
-                    return True
-        except (ValueError, IndexError):
-            pass
-            
-    return False
-
 def resolve_ip_location(ip):
     """
-    Resolves IP to geographic location using ip-api.com.
-    Returns {city, region, country}
+    Resolves IP to geographic location from local sources only (LRU,
+    shared cache, offline database — see utils/geoip.py).
+    Returns {city, region, country}, or None when the address still needs a
+    remote lookup: the log row is written without a location and
+    enrich_pending_locations() fills it in from a batch task.
     """
-    if is_internal_ip(ip):
-        return {
-            'city': 'Internal Workspace', 
-            'region': 'Secure Network', 
-            'country': 'Local Access'
-        }
-    
+    return geoip.lookup(ip)
+
+
+def schedule_location_enrichment():
+    """
+    Queue an enrichment run, at most one per GEOIP_ENRICH_DELAY seconds.
+    If Celery is unreachable the periodic "Enrich Activity Log Locations"
+    job picks the rows up instead.
+    """
+    delay = getattr(settings, 'GEOIP_ENRICH_DELAY', 30)
+    try:
+        if cache.add(ENRICH_QUEUED_KEY, 1, timeout=delay) is False:
+            return
+    except Exception:
+        pass
     try:
-        # Using ip-api.com (free, no key required for low volume)
-        response = requests.get(f"http://ip-api.com/json/{ip}?fields=status,message,country,regionName,city", timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == 'success':
-                return {
-                    'city': data.get('city') or 'Unknown City',
-                    'region': data.get('regionName') or 'Unknown Region',
-                    'country': data.get('country') or 'Unknown Country'
-                }
+        from apps.accounts.tasks import enrich_activity_locations
+        enrich_activity_locations.apply_async(countdown=delay, retry=False)
     except Exception as e:
-        print(f"IP Resolution Failed for {ip}: {e}")
-        
-    return {'city': 'Remote Origin', 'region': 'Distributed', 'country': 'Global'}
+        logger.info("Location enrichment not queued (%s); left to the periodic job.", e)
+
+
+def enrich_pending_locations(limit=1000):
+    """
+    Fill city/region/country on ActivityLog rows written without them.
+    Resolves up to `limit` distinct addresses per run.  Returns rows updated.
+    """
+    pending = list(
+        ActivityLog.objects
+        .filter(city__isnull=True, ip_address__isnull=False)
+        .order_by()
+        .values_list('ip_address', flat=True)
+        .distinct()[:limit]
+    )
+    locations, remote = {}, []
+    for ip in pending:
+        location = geoip.lookup(ip)
+        if location is None:
+            remote.append(ip)
+        else:
+            locations[ip] = location
+    locations.update(geoip.resolve_remote(remote))
+
+    updated = 0
+    for ip, location in locations.items():
+        updated += ActivityLog.objects.filter(ip_address=ip, city__isnull=True).update(**location)
+    return updated
+
 
 def get_model_diff(old_instance, new_instance, exclude_fields=None):
     """
@@ -107,8 +124,10 @@ def log_activity_automated(request, user, action, instance, description='', chan
         object_repr = str(instance)
         ip = get_client_ip(request) if request else None
         
-        # Resolve geographic location
+        # Resolve geographic location (None → filled in later by a batch task)
         location = resolve_ip_location(ip) if ip else {'city': 'System', 'region': 'Process', 'country': 'Internal'}
+        if location is None:
+            location = {}
         
         # Parse User Agent for human-readable browser details
         ua_string = request.META.get('HTTP_USER_AGENT', '') if request else ""
@@ -141,5 +160,7 @@ def log_activity_automated(request, user, action, instance, description='', chan
             method=request.method if request else "SIGNAL",
             success=True
         )
+        if not location:
+            schedule_location_enrichment()
     except Exception as e:
         print(f"FAILED TO LOG AUTOMATED ACTIVITY: {e}")
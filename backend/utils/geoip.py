@@ -0,0 +1,222 @@
+"""
+IP → {city, region, country} lookups for the audit log.
+
+`lookup(ip)` only consults local sources and never blocks on the network:
+
+  1. internal ranges        → 'Internal Workspace'
+  2. in-process LRU         (GEOIP_LRU_SIZE entries, GEOIP_CACHE_TTL)
+  3. shared cache           ('geoip:<ip>', GEOIP_CACHE_TTL)
+  4. offline CIDR database  (GEOIP_DB_PATH, optional)
+
+It returns None when none of them know the address; the ActivityLog row is
+then written without a location and `resolve_remote(ips)` fills it in later
+from the batch task (utils.audit_log.enrich_pending_locations), one
+ip-api.com batch request per GEOIP_BATCH_SIZE addresses.
+
+GEOIP_DB_PATH is a CSV with one range per line, either
+    network,city,region,country             27.34.0.0/17,Kathmandu,Bagmati,Nepal
+or  first_ip,last_ip,city,region,country
+Lines starting with '#' are ignored.
+"""
+import bisect
+import csv
+import ipaddress
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'geoip:{}'
+REMOTE_BATCH_URL = 'http://ip-api.com/batch?fields=status,query,country,regionName,city'
+
+INTERNAL = {'city': 'Internal Workspace', 'region': 'Secure Network', 'country': 'Local Access'}
+UNRESOLVED = {'city': 'Remote Origin', 'region': 'Distributed', 'country': 'Global'}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_internal_ip(ip):
+    """Checks if IP is in private/internal ranges."""
+    if not ip or ip == 'localhost':
+        return True
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return addr.is_private or addr.is_loopback or addr.is_link_local
+
+
+# ── In-process LRU ────────────────────────────────────────────────────────────
+
+class _LRU:
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl, max_size):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU()
+
+
+def remember(ip, location):
+    """Store a resolved location in the LRU and the shared cache."""
+    ttl = _setting('GEOIP_CACHE_TTL', 7 * 24 * 3600)
+    _lru.set(ip, location, ttl, _setting('GEOIP_LRU_SIZE', 4096))
+    try:
+        cache.set(CACHE_KEY.format(ip), location, timeout=ttl)
+    except Exception:  # noqa: BLE001
+        pass
+
+
+# ── Offline database ──────────────────────────────────────────────────────────
+
+_ranges = None          # {version: (starts, [(end, location)])}
+_ranges_lock = threading.Lock()
+
+
+def _load_ranges(path):
+    rows = {4: [], 6: []}
+    with open(path, newline='', encoding='utf-8') as fh:
+        for row in csv.reader(fh):
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                if '/' in row[0]:
+                    net = ipaddress.ip_network(row[0].strip(), strict=False)
+                    first, last, rest = net[0], net[-1], row[1:]
+                else:
+                    first, last, rest = ipaddress.ip_address(row[0].strip()), ipaddress.ip_address(row[1].strip()), row[2:]
+            except (ValueError, IndexError):
+                continue
+            rest = [c.strip() for c in rest] + ['', '', '']
+            location = {
+                'city': rest[0] or 'Unknown City',
+                'region': rest[1] or 'Unknown Region',
+                'country': rest[2] or 'Unknown Country',
+            }
+            rows[first.version].append((int(first), int(last), location))
+
+    table = {}
+    for version, entries in rows.items():
+        entries.sort(key=lambda e: e[0])
+        table[version] = ([e[0] for e in entries], [(e[1], e[2]) for e in entries])
+    return table
+
+
+def _offline_lookup(addr):
+    global _ranges
+    path = _setting('GEOIP_DB_PATH', '')
+    if not path:
+        return None
+    if _ranges is None:
+        with _ranges_lock:
+            if _ranges is None:
+                try:
+                    _ranges = _load_ranges(path)
+                except OSError as e:
+                    logger.warning("GeoIP database %s unreadable: %s", path, e)
+                    _ranges = {4: ([], []), 6: ([], [])}
+    starts, entries = _ranges[addr.version]
+    i = bisect.bisect_right(starts, int(addr)) - 1
+    if i >= 0 and int(addr) <= entries[i][0]:
+        return entries[i][1]
+    return None
+
+
+def reset():
+    """Drop the LRU and the loaded offline database (tests, settings changes)."""
+    global _ranges
+    _lru.clear()
+    _ranges = None
+
+
+# ── Lookups ───────────────────────────────────────────────────────────────────
+
+def lookup(ip):
+    """Location for `ip` from local sources only, or None if unknown."""
+    if is_internal_ip(ip):
+        return INTERNAL
+    location = _lru.get(ip)
+    if location is not None:
+        return location
+    try:
+        location = cache.get(CACHE_KEY.format(ip))
+    except Exception:  # noqa: BLE001
+        location = None
+    if location is None:
+        try:
+            location = _offline_lookup(ipaddress.ip_address(ip))
+        except ValueError:
+            location = UNRESOLVED
+    if location is not None:
+        _lru.set(ip, location, _setting('GEOIP_CACHE_TTL', 7 * 24 * 3600), _setting('GEOIP_LRU_SIZE', 4096))
+    return location
+
+
+def resolve_remote(ips):
+    """
+    Resolve addresses through ip-api.com's batch endpoint (100 per request)
+    and cache the answers.  Returns {ip: location}; addresses the service
+    could not place map to UNRESOLVED, and ones it never answered (network
+    errors) are left out so a later run retries them.
+    """
+    import requests
+
+    resolved = {}
+    ips = [ip for ip in dict.fromkeys(ips) if ip]
+    if not _setting('GEOIP_REMOTE_LOOKUP', True):
+        return {ip: UNRESOLVED for ip in ips}
+
+    size = max(1, min(100, _setting('GEOIP_BATCH_SIZE', 100)))
+    for i in range(0, len(ips), size):
+        chunk = ips[i:i + size]
+        try:
+            response = requests.post(REMOTE_BATCH_URL, json=chunk, timeout=10)
+            response.raise_for_status()
+            answers = response.json()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("GeoIP batch lookup failed for %d address(es): %s", len(chunk), e)
+            continue
+        for answer in answers:
+            ip = answer.get('query')
+            if ip not in chunk:
+                continue
+            if answer.get('status') == 'success':
+                location = {
+                    'city': answer.get('city') or 'Unknown City',
+                    'region': answer.get('regionName') or 'Unknown Region',
+                    'country': answer.get('country') or 'Unknown Country',
+                }
+            else:
+                location = UNRESOLVED
+            remember(ip, location)
+            resolved[ip] = location
+    return resolved
@@ -4,6 +4,7 @@ import Login from './components/Login';
 import ProtectedRoute from './components/ProtectedRoute';
 import { authService } from './services/auth';
 import { messengerService } from './services/messengerService';
+import { messengerSocket } from './services/messengerSocket';
 import { ConstructionProvider } from './context/ConstructionContext';
 import { ThemeProvider } from './context/ThemeContext';
 import OfflineStatus from './components/common/OfflineStatus';
@@ -121,10 +122,18 @@ function App() {
 
   useEffect(() => {
     if (!isAuthenticated) return undefined;
-    const heartbeat = () => messengerService.heartbeatPresence().catch(() => {});
+    // The messenger socket keeps presence alive; the REST heartbeat only
+    // runs while it is down.
+    messengerSocket.connect();
+    const heartbeat = () => {
+      if (!messengerSocket.isConnected()) messengerService.heartbeatPresence().catch(() => {});
+    };
     heartbeat();
     const t = window.setInterval(heartbeat, 20000);
-    return () => window.clearInterval(t);
+    return () => {
+      window.clearInterval(t);
+      messengerSocket.disconnect();
+    };
   }, [isAuthenticated]);
 
   return (
@@ -133,7 +133,7 @@ const MediaThumbnail = ({ item, fallback }) => {
     if (item.type === 'IMAGE') {
         return (
             <img
-                src={item.url}
+                src={item.thumbnail || item.url}
                 alt={item.title}
                 loading="lazy"
                 className="w-full h-full object-cover"
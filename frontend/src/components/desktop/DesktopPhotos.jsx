@@ -58,6 +58,7 @@ const normalizeItem = (item) => {
     return {
         ...item,
         url: getMediaUrl(item.url),
+        thumbnail: item.thumbnail ? getMediaUrl(item.thumbnail) : null,
         type: safeType,
         subtitle: finalSubtitle,
         uploadedAt,
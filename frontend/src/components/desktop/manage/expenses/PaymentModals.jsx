@@ -19,11 +19,11 @@ export const EmailLogHistoryModal = ({ isOpen, onClose, logs, paymentTitle }) =>
                         <div className="space-y-4">
                             {logs.map((log, i) => (
                                 <div key={log.id} className="relative pl-8 border-l border-[var(--t-border)] pb-2 last:pb-0">
-                                    <div className={`absolute -left-2 top-0 w-4 h-4 rounded-full border-2 border-[var(--t-surface)] shadow-sm ${log.status === 'SENT' ? 'bg-green-500' : 'bg-red-500'}`} />
+                                    <div className={`absolute -left-2 top-0 w-4 h-4 rounded-full border-2 border-[var(--t-surface)] shadow-sm ${log.status === 'SENT' ? 'bg-green-500' : log.status === 'FAILED' ? 'bg-red-500' : 'bg-amber-500'}`} />
                                     <div className="bg-[var(--t-surface2)] border border-[var(--t-border)] rounded-xl p-4 shadow-sm hover:border-[var(--t-primary)]/30 transition-colors">
                                         <div className="flex justify-between items-start mb-2">
                                             <div>
-                                                <span className={`text-[10px] font-black uppercase tracking-widest px-2 py-0.5 rounded ${log.status === 'SENT' ? 'bg-green-500/10 text-green-500' : 'bg-red-500/10 text-red-500'}`}>
+                                                <span className={`text-[10px] font-black uppercase tracking-widest px-2 py-0.5 rounded ${log.status === 'SENT' ? 'bg-green-500/10 text-green-500' : log.status === 'FAILED' ? 'bg-red-500/10 text-red-500' : 'bg-amber-500/10 text-amber-500'}`}>
                                                     {log.status}
                                                 </span>
                                             </div>
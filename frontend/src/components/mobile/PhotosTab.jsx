@@ -106,6 +106,15 @@ const getPhotoViewConfig = (view) => {
     return { scope: 'timeline', mode: 'group', timeMode: ['all', 'date', 'week', 'month'].includes(view) ? view : 'all' };
 };
 
+const getCursor = (nextUrl) => {
+    if (!nextUrl) return null;
+    try {
+        return new URL(nextUrl, window.location.origin).searchParams.get('cursor');
+    } catch {
+        return null;
+    }
+};
+
 const normalizeItem = (item) => {
     const type = (item.media_type || item.file_type || 'FILE').toUpperCase();
     const safeType = TYPE_META[type] ? type : 'FILE';
@@ -115,6 +124,7 @@ const normalizeItem = (item) => {
         ...item,
         type: safeType,
         url: getMediaUrl(item.url),
+        thumbnail: item.thumbnail ? getMediaUrl(item.thumbnail) : null,
         subtitle: item.subtitle || item.category || TYPE_META[safeType].label,
         uploadedAt,
         uploadedLabel: uploadedAt && !Number.isNaN(uploadedAt.getTime())
@@ -522,33 +532,64 @@ const PhotosTab = () => {
     const [selectedAlbum, setSelectedAlbum] = useState(null);
     const [assignItem, setAssignItem] = useState(null);
     const [reloadKey, setReloadKey] = useState(0);
+    const [feedCursor, setFeedCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const phases = dashboardData?.phases || [];
     const tasks = dashboardData?.tasks || [];
     const viewConfig = useMemo(() => getPhotoViewConfig(photoView), [photoView]);
     const albumScope = viewConfig.scope;
     const organizeMode = viewConfig.mode;
     const timeAlbumMode = viewConfig.timeMode;
+    const galleryProjectId = activeProjectId || dashboardData?.project?.id;
+    // "All photos" is one flat, newest-first grid — page it instead of loading every album
+    const isFeedView = albumScope === 'timeline' && organizeMode === 'group' && timeAlbumMode === 'all';
 
     useEffect(() => {
         const fetchGallery = async () => {
             setLoading(true);
             try {
-                const response = await dashboardService.getGallery(albumScope, activeProjectId || dashboardData?.project?.id);
+                if (isFeedView) {
+                    const response = await dashboardService.getGalleryFeed(albumScope, galleryProjectId);
+                    setGroupedGallery([{ groupName: 'All Photos', items: response.data.results.map(normalizeItem) }]);
+                    setFeedCursor(getCursor(response.data.next));
+                    return;
+                }
+                const response = await dashboardService.getGallery(albumScope, galleryProjectId);
                 const processedData = response.data.map((group) => ({
                     ...group,
                     items: group.items.map(normalizeItem),
                 }));
                 setGroupedGallery(processedData);
+                setFeedCursor(null);
             } catch (error) {
                 console.error('Failed to load gallery', error);
                 setGroupedGallery([]);
+                setFeedCursor(null);
             } finally {
                 setLoading(false);
             }
         };
 
         fetchGallery();
-    }, [activeProjectId, albumScope, dashboardData?.project?.id, reloadKey]);
+    }, [albumScope, galleryProjectId, isFeedView, reloadKey]);
+
+    const loadMoreFeed = async () => {
+        if (!feedCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const response = await dashboardService.getGalleryFeed(albumScope, galleryProjectId, feedCursor);
+            const nextItems = response.data.results.map(normalizeItem);
+            setGroupedGallery((prev) => [{
+                groupName: 'All Photos',
+                items: [...(prev[0]?.items || []), ...nextItems],
+            }]);
+            setFeedCursor(getCursor(response.data.next));
+        } catch (error) {
+            console.error('Failed to load more photos', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
 
     useEffect(() => {
         setSelectedAlbum(null);
@@ -777,15 +818,27 @@ const PhotosTab = () => {
                     ) : (
                         <div className="space-y-6">
                             {isTimelineFlatGrid ? (
-                                <div className="grid grid-cols-2 gap-2.5">
-                                    {displayGroups.flatMap((group) => group.items).map((item) => (
-                                        <MobileMediaCard
-                                            key={item.id}
-                                            item={item}
-                                            onOpen={setPreviewItem}
-                                            onAssign={setAssignItem}
-                                        />
-                                    ))}
+                                <div className="space-y-4">
+                                    <div className="grid grid-cols-2 gap-2.5">
+                                        {displayGroups.flatMap((group) => group.items).map((item) => (
+                                            <MobileMediaCard
+                                                key={item.id}
+                                                item={item}
+                                                onOpen={setPreviewItem}
+                                                onAssign={setAssignItem}
+                                            />
+                                        ))}
+                                    </div>
+                                    {feedCursor && (
+                                        <button
+                                            type="button"
+                                            onClick={loadMoreFeed}
+                                            disabled={loadingMore}
+                                            className="w-full rounded-xl border border-[var(--t-border)] bg-[var(--t-surface)] px-4 py-3 text-[12px] font-black uppercase tracking-[0.16em] text-[var(--t-text2)] disabled:opacity-50"
+                                        >
+                                            {loadingMore ? 'Loading...' : 'Load more'}
+                                        </button>
+                                    )}
                                 </div>
                             ) : isAlbumGrid ? (
                                 <div className="grid grid-cols-2 gap-2.5">
@@ -1,5 +1,5 @@
-import React, { createContext, useContext, useState, useEffect, useMemo, useCallback } from 'react';
-import { dashboardService, constructionService, permitService, accountingService } from '../services/api';
+import React, { createContext, useContext, useState, useEffect, useMemo, useCallback, useRef } from 'react';
+import { dashboardService, constructionService, permitService, accountingService, mergeDashboardDelta } from '../services/api';
 import { authService } from '../services/auth';
 
 // Create Context
@@ -96,18 +96,27 @@ export const ConstructionProvider = ({ children }) => {
         return localStorage.getItem('active-project-id') || null;
     });
 
+    // Cursor of the last dashboard load; silent refreshes of the same
+    // project only fetch what changed since then.
+    const syncRef = useRef({ projectId: null, cursor: null });
+
     // Fetch all dashboard data for the active project
     const fetchData = useCallback(async (silent = false, projectId = null) => {
         if (!authService.isAuthenticated()) return;
         const resolvedProjectId = projectId ?? activeProjectId;
+        const previous = syncRef.current;
+        const since = silent && previous.cursor && previous.projectId === resolvedProjectId
+            ? previous.cursor
+            : null;
         try {
             if (!silent) setLoading(true);
             const [data, overview, projectList] = await Promise.all([
-                dashboardService.getDashboardData(resolvedProjectId),
+                dashboardService.getDashboardData(resolvedProjectId, { since }),
                 accountingService.getSummary(resolvedProjectId),
                 dashboardService.getProjects(),
             ]);
-            setDashboardData(data);
+            syncRef.current = { projectId: resolvedProjectId, cursor: data.sync?.cursor ?? null };
+            setDashboardData(prev => (since ? mergeDashboardDelta(prev, data) : data));
             setFinanceOverview(overview.data);
             const projectsList = projectList.data?.results ?? projectList.data ?? [];
             setProjects(projectsList);
@@ -157,6 +166,7 @@ export const ConstructionProvider = ({ children }) => {
 
     const logout = useCallback(async () => {
         await authService.logout();
+        syncRef.current = { projectId: null, cursor: null };
         setUser(null);
         setDashboardData({
             project: null, rooms: [], tasks: [], phases: [], expenses: [],
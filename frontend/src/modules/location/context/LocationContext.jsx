@@ -5,6 +5,15 @@ import locationApi from '../../../services/locationApi';
 
 const LocationContext = createContext(null);
 const LIVE_POLL_MS = 30_000;
+const STALE_AFTER_MIN = 5;
+
+// The live endpoint's ETag ignores the wall clock, so a 304 replays the
+// cached body — recompute the age fields from last_ping_at on every poll.
+const withPingAge = (w) => {
+    if (!w.last_ping_at) return w;
+    const minutes = Math.floor((Date.now() - new Date(w.last_ping_at).getTime()) / 60_000);
+    return { ...w, minutes_since_ping: minutes, is_stale: minutes > STALE_AFTER_MIN };
+};
 
 export function LocationProvider({ projectId, children }) {
     const [geofences,      setGeofences]      = useState([]);
@@ -78,7 +87,7 @@ export function LocationProvider({ projectId, children }) {
         try {
             setLiveLoading(true);
             const data = await locationApi.getLivePositions(projectId);
-            setLivePositions(Array.isArray(data) ? data : []);
+            setLivePositions(Array.isArray(data) ? data.map(withPingAge) : []);
         } catch (err) {
             console.error('fetchLivePositions:', err);
         } finally {
@@ -2,6 +2,21 @@ import { useEffect, useRef } from 'react';
 import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || '/api/v1';
+const QUEUE_KEY = 'gps_ping_queue';
+const MAX_QUEUED = 500; // matches LocationPingBatchView.MAX_PINGS
+
+const readQueue = () => {
+    try {
+        return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+    } catch {
+        return [];
+    }
+};
+
+const writeQueue = (queue) => {
+    if (queue.length) localStorage.setItem(QUEUE_KEY, JSON.stringify(queue.slice(-MAX_QUEUED)));
+    else localStorage.removeItem(QUEUE_KEY);
+};
 
 export default function useGPSBackgroundTracker(isActive = true, tokenKey = 'access_token') {
     const watchIdRef = useRef(null);
@@ -24,23 +39,49 @@ export default function useGPSBackgroundTracker(isActive = true, tokenKey = 'acc
             return R * c;
         };
 
-        const pingServer = async (coords) => {
+        const authHeaders = () => {
             const token = localStorage.getItem(tokenKey);
-            if (!token) return;
+            return token ? { Authorization: `Bearer ${token}` } : null;
+        };
+
+        // Upload pings queued while offline, oldest first, in one request.
+        const flushQueue = async () => {
+            const headers = authHeaders();
+            const queue = readQueue();
+            if (!headers || !queue.length) return;
+            try {
+                await axios.post(`${API_URL}/location/ping/batch/`, { pings: queue }, { headers });
+                writeQueue(readQueue().slice(queue.length));
+            } catch (err) {
+                if (err.response && err.response.status === 400) writeQueue([]); // unrecoverable payload
+                console.error('Failed to upload queued GPS pings:', err);
+            }
+        };
+
+        const pingServer = async (coords, recordedAt) => {
+            const headers = authHeaders();
+            if (!headers) return;
 
+            const ping = {
+                latitude: coords.latitude,
+                longitude: coords.longitude,
+                accuracy: coords.accuracy,
+                recorded_at: new Date(recordedAt).toISOString(),
+            };
+            lastPingRef.current = { lat: coords.latitude, lng: coords.longitude, time: Date.now() };
+
+            if (readQueue().length) {
+                // Keep ordering: append behind the backlog and send it all.
+                writeQueue([...readQueue(), ping]);
+                await flushQueue();
+                return;
+            }
             try {
-                await axios.post(`${API_URL}/location/ping/`, {
-                    latitude: coords.latitude,
-                    longitude: coords.longitude,
-                    accuracy: coords.accuracy
-                }, {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                lastPingRef.current = { lat: coords.latitude, lng: coords.longitude, time: Date.now() };
+                await axios.post(`${API_URL}/location/ping/`, ping, { headers });
                 console.log('GPS Ping Sent', coords.latitude, coords.longitude);
             } catch (err) {
+                if (!err.response) writeQueue([...readQueue(), ping]); // offline — retry as a batch
                 console.error('Failed to send GPS ping:', err);
-                // Note: Offline sync mechanism can be built on top of this by caching to IndexedDB/localStorage
             }
         };
 
@@ -60,10 +101,13 @@ export default function useGPSBackgroundTracker(isActive = true, tokenKey = 'acc
             const timeElapsed = now - last.time;
 
             if (distance > 20 || timeElapsed > 5 * 60 * 1000) {
-                pingServer(coords);
+                pingServer(coords, position.timestamp || now);
             }
         };
 
+        window.addEventListener('online', flushQueue);
+        flushQueue();
+
         // Start watching position
         watchIdRef.current = navigator.geolocation.watchPosition(
             handlePosition,
@@ -72,6 +116,7 @@ export default function useGPSBackgroundTracker(isActive = true, tokenKey = 'acc
         );
 
         return () => {
+            window.removeEventListener('online', flushQueue);
             if (watchIdRef.current !== null) {
                 navigator.geolocation.clearWatch(watchIdRef.current);
             }
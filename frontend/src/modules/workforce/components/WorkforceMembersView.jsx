@@ -584,7 +584,7 @@ function CreateAccountModal({ member, projects = [], defaultProjectId = '', onCl
 
                         {sendEmail && emailStatus === 'sent' && (
                             <div style={{ background: '#eff6ff', border: '1px solid #93c5fd', borderRadius: 8, padding: '10px 14px', fontSize: 13, color: '#1e40af', fontWeight: 700, marginBottom: 16 }}>
-                                ✉️ Email sent successfully!
+                                ✉️ Email queued for delivery!
                             </div>
                         )}
                         {sendEmail && emailStatus === 'failed' && (
@@ -340,6 +340,7 @@ function ImportTab({ user }) {
     // Import state
     const [loading, setLoading]   = useState(false);
     const [progress, setProgress] = useState(0);
+    const [stage, setStage]       = useState('uploading');   // 'uploading' | 'importing'
     const [result, setResult]     = useState(null);
     const [error, setError]       = useState(null);
 
@@ -379,13 +380,21 @@ function ImportTab({ user }) {
     const handleImport = async () => {
         if (!file || !canImport) return;
         if (mode === 'project' && !targetProject) return;
-        setLoading(true); setError(null); setResult(null); setProgress(0);
+        setLoading(true); setError(null); setResult(null); setProgress(0); setStage('uploading');
         try {
             const onProgress = e => { if (e.total) setProgress(Math.round(e.loaded / e.total * 100)); };
             const r = mode === 'system'
                 ? await dataTransferService.importSql(file, onProgress)
                 : await dataTransferService.importSqlToProject(targetProject.id, file, onProgress);
-            setResult(r.data);
+            // The import runs as a background job — poll its progress.
+            setStage('importing'); setProgress(0);
+            let job = r.data;
+            while (job.status !== 'done' && job.status !== 'failed') {
+                await new Promise(res => setTimeout(res, 1000));
+                job = await dataTransferService.sqlImportJob(r.data.job_id);
+                setProgress(job.progress_percent || 0);
+            }
+            setResult(job);
         } catch (e) {
             setError(e.response?.data?.error || e.response?.data?.message || 'Import failed.');
         } finally { setLoading(false); setProgress(0); }
@@ -562,7 +571,7 @@ function ImportTab({ user }) {
             {loading && progress > 0 && (
                 <div className="space-y-1.5">
                     <div className="flex justify-between text-[11px] text-slate-500">
-                        <span>Uploading…</span><span>{progress}%</span>
+                        <span>{stage === 'importing' ? 'Importing…' : 'Uploading…'}</span><span>{progress}%</span>
                     </div>
                     <div className="w-full bg-slate-100 rounded-full h-1.5 overflow-hidden">
                         <div className="bg-slate-800 h-1.5 rounded-full transition-all" style={{ width: `${progress}%` }} />
@@ -1135,6 +1144,7 @@ function CsvTab({ user }) {
     const [jobs,      setJobs]      = useState([]);
     const [busy,      setBusy]      = useState('');     // 'dryrun'|'import'|'export'|''
     const [error,     setError]     = useState('');
+    const [importProgress, setImportProgress] = useState(0);
 
     const fileRef = useRef();
 
@@ -1200,7 +1210,15 @@ function CsvTab({ user }) {
         setBusy('import'); setError(''); setResult(null);
         try {
             const res = await dtSvc.csvImport(projectId, csvType, file);
-            setResult(res.data);
+            // The import runs in the background — poll until it finishes.
+            let job = { status: res.data.status, progress_percent: 0 };
+            while (job.status !== 'done' && job.status !== 'failed') {
+                setImportProgress(job.progress_percent || 0);
+                await new Promise(r => setTimeout(r, 1000));
+                job = await dtSvc.csvJob(projectId, res.data.job_id);
+            }
+            if (job.status === 'failed') throw new Error(job.message);
+            setResult({ message: job.message, errors: job.errors });
             setPreview(null);
             setFile(null);
             if (fileRef.current) fileRef.current.value = '';
@@ -1209,6 +1227,7 @@ function CsvTab({ user }) {
             setError(e?.response?.data?.error || e.message || 'Import failed');
         } finally {
             setBusy('');
+            setImportProgress(0);
         }
     };
 
@@ -1296,7 +1315,7 @@ function CsvTab({ user }) {
                                 <div style={{ marginTop: 12 }}>
                                     <ActionRow label="3. Commit import">
                                         <CsvBtn onClick={handleImport} disabled={busy === 'import'} color="#059669">
-                                            {busy === 'import' ? '⏳ Importing…' : `✅ Import ${preview.new_rows} rows`}
+                                            {busy === 'import' ? `⏳ Importing… ${importProgress}%` : `✅ Import ${preview.new_rows} rows`}
                                         </CsvBtn>
                                     </ActionRow>
                                 </div>
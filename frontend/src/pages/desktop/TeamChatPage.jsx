@@ -1,6 +1,7 @@
 import React, { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import { authService } from '../../services/auth';
 import { messengerService } from '../../services/messengerService';
+import { applyPresence, useMessengerSocket } from '../../services/messengerSocket';
 
 const me = authService.getCurrentUser();
 
@@ -13,16 +14,6 @@ const getDisplayName = (user) => {
   return base;
 };
 const avatarUrl = (user) => user?.profile_image_url || '';
-const READ_KEY = 'messenger_read_map_v1';
-
-const loadReadMap = () => {
-  try { return JSON.parse(localStorage.getItem(READ_KEY) || '{}'); } catch { return {}; }
-};
-
-const saveReadMap = (map) => {
-  localStorage.setItem(READ_KEY, JSON.stringify(map));
-};
-
 const formatLastSeen = (iso) => {
   if (!iso) return 'offline';
   const d = new Date(iso);
@@ -49,17 +40,16 @@ export default function TeamChatPage() {
   const [query, setQuery] = useState('');
   const [sending, setSending] = useState(false);
   const [previewUrl, setPreviewUrl] = useState('');
-  const [readMap, setReadMap] = useState(() => loadReadMap());
   const lastMessageAtRef = useRef('');
 
-  const markConversationRead = (conversationId, ts = '') => {
+  const setUnread = (conversationId, count) => {
+    setConversations((prev) => prev.map((c) => (c.id === conversationId ? { ...c, unread_count: count } : c)));
+  };
+
+  const markConversationRead = (conversationId) => {
     if (!conversationId) return;
-    const stamp = ts || new Date().toISOString();
-    setReadMap((prev) => {
-      const next = { ...prev, [String(conversationId)]: stamp };
-      saveReadMap(next);
-      return next;
-    });
+    setUnread(conversationId, 0);
+    messengerService.markRead(conversationId).catch(() => {});
   };
 
   const activePeer = useMemo(() => {
@@ -85,7 +75,7 @@ export default function TeamChatPage() {
 
   const loadMessages = useCallback(async (conversationId, incremental = false) => {
     const list = await messengerService.listMessages(conversationId, incremental ? lastMessageAtRef.current : '');
-    if (!list.length) return;
+    if (!list.length) return 0;
     setMessages((prev) => {
       if (!incremental) return list;
       const seen = new Set(prev.map((m) => m.id));
@@ -95,6 +85,7 @@ export default function TeamChatPage() {
     const nextTs = list[list.length - 1]?.created_at || lastMessageAtRef.current;
     lastMessageAtRef.current = nextTs;
     setLastMessageAt(nextTs);
+    return list.length;
   }, []);
 
   useEffect(() => {
@@ -108,20 +99,54 @@ export default function TeamChatPage() {
     setMessages([]);
     setLastMessageAt('');
     loadMessages(activeConversation.id, false);
-    markConversationRead(activeConversation.id, activeConversationLastMessageAt || new Date().toISOString());
+    markConversationRead(activeConversation.id);
   }, [activeConversation?.id, activeConversationLastMessageAt, loadMessages]);
 
   useEffect(() => {
     lastMessageAtRef.current = lastMessageAt;
   }, [lastMessageAt]);
 
+  const socketConnected = useMessengerSocket((event) => {
+    if (event.type === 'presence') {
+      const withPresence = (conv) => conv && ({
+        ...conv,
+        members: (conv.members || []).map((m) => ({ ...m, user: applyPresence(m.user, event) })),
+      });
+      setMembers((prev) => prev.map((m) => applyPresence(m, event)));
+      setConversations((prev) => prev.map(withPresence));
+      setActiveConversation(withPresence);
+    } else if (event.type === 'message.new') {
+      if (event.conversation === activeConversation?.id) {
+        setMessages((prev) => (prev.some((m) => m.id === event.message.id) ? prev : [...prev, event.message]));
+        lastMessageAtRef.current = event.message.created_at;
+        setLastMessageAt(event.message.created_at);
+        if (event.message.sender?.id !== me?.id) markConversationRead(event.conversation);
+      }
+      loadBase(query).catch(() => {});
+    } else if (event.type === 'conversation.read') {
+      setUnread(event.conversation, 0);
+    } else if (event.type === 'conversation.updated') {
+      loadBase(query).catch(() => {});
+    } else if (event.type === 'call.updated' && event.call.conversation === activeConversation?.id) {
+      setActiveCall(event.call);
+    }
+  });
+
+  // Events arrive over the socket; poll only while it is down, and catch up once it (re)connects.
   useEffect(() => {
-    const t = setInterval(() => {
+    if (socketConnected) {
       if (activeConversation?.id) loadMessages(activeConversation.id, true);
+      return undefined;
+    }
+    const t = setInterval(() => {
+      if (activeConversation?.id) {
+        const conversationId = activeConversation.id;
+        loadMessages(conversationId, true).then((count) => count && markConversationRead(conversationId)).catch(() => {});
+      }
       loadBase(query).catch(() => {});
     }, 5000);
     return () => clearInterval(t);
-  }, [activeConversation?.id, loadBase, loadMessages, query]);
+  }, [socketConnected, activeConversation?.id, loadBase, loadMessages, query]);
 
   const startChatWithMember = async (memberId) => {
     const conv = await messengerService.startDirectConversation(memberId);
@@ -148,7 +173,10 @@ export default function TeamChatPage() {
     setMessages((prev) => [...prev, optimistic]);
     try {
       const msg = await messengerService.sendMessage(activeConversation.id, { text: payload, imageFile });
-      setMessages((prev) => prev.map((m) => (m.id === tempId ? msg : m)));
+      // The socket may have delivered the message before this response.
+      setMessages((prev) => (prev.some((m) => m.id === msg.id)
+        ? prev.filter((m) => m.id !== tempId)
+        : prev.map((m) => (m.id === tempId ? msg : m))));
       lastMessageAtRef.current = msg.created_at;
       setLastMessageAt(msg.created_at);
       setImageFile(null);
@@ -221,21 +249,14 @@ export default function TeamChatPage() {
               {loading && <div style={{ fontSize: 12, color: '#64748b' }}>Loading...</div>}
               {conversations.map((c) => {
                 const peer = (c.members || []).map((m) => m.user).find((u) => u?.id !== me?.id);
-                const lastMsgAt = c?.last_message?.created_at;
-                const lastReadAt = readMap[String(c.id)];
-                const hasUnread = !!(
-                  c?.last_message?.sender?.id &&
-                  c.last_message.sender.id !== me?.id &&
-                  lastMsgAt &&
-                  (!lastReadAt || new Date(lastMsgAt).getTime() > new Date(lastReadAt).getTime())
-                );
+                const hasUnread = c.unread_count > 0 && c.id !== activeConversation?.id;
                 return (
                   <button
                     className={`ms-item ${c.id === activeConversation?.id ? 'active' : ''}`}
                     key={c.id}
                     onClick={() => {
                       setActiveConversation(c);
-                      markConversationRead(c.id, c?.last_message?.created_at || new Date().toISOString());
+                      markConversationRead(c.id);
                     }}
                     style={hasUnread ? { background: '#eef4ff', border: '1px solid #bfdbfe' } : undefined}
                   >
@@ -250,10 +271,10 @@ export default function TeamChatPage() {
                     <div style={{ minWidth: 0, flex: 1 }}>
                       <div style={{ fontWeight: hasUnread ? 900 : 800, color: '#0f172a', display: 'flex', alignItems: 'center', gap: 6 }}>
                         <span style={{ overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap' }}>{getDisplayName(peer)}</span>
-                        {hasUnread ? <span style={{ width: 9, height: 9, borderRadius: 999, background: '#2563eb', flexShrink: 0 }} /> : null}
+                        {hasUnread ? <span style={{ minWidth: 18, padding: '1px 6px', borderRadius: 999, background: '#2563eb', color: '#fff', fontSize: 11, fontWeight: 800, textAlign: 'center', flexShrink: 0 }}>{c.unread_count}</span> : null}
                       </div>
                       <div style={{ fontSize: 12, color: hasUnread ? '#1d4ed8' : '#64748b', fontWeight: hasUnread ? 700 : 500, overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap' }}>
-                        {c.last_message?.text || 'Start conversation'}
+                        {c.last_message_preview || c.last_message?.text || 'Start conversation'}
                       </div>
                     </div>
                   </button>
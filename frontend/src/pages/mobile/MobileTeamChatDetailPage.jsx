@@ -2,6 +2,7 @@ import React, { useCallback, useEffect, useMemo, useRef, useState } from 'react'
 import { useNavigate, useParams } from 'react-router-dom';
 import { authService } from '../../services/auth';
 import { messengerService } from '../../services/messengerService';
+import { applyPresence, useMessengerSocket } from '../../services/messengerSocket';
 
 const me = authService.getCurrentUser();
 const getName = (u) => u?.first_name || u?.last_name || u?.username || u?.email || 'User';
@@ -13,7 +14,6 @@ const getDisplayName = (u) => {
   return base;
 };
 const avatarUrl = (u) => u?.profile_image_url || '';
-const READ_KEY = 'messenger_read_map_v1';
 
 function formatClock(date) {
   try {
@@ -48,7 +48,7 @@ export default function MobileTeamChatDetailPage() {
 
   const loadMessages = useCallback(async (incremental = false) => {
     const list = await messengerService.listMessages(conversationId, incremental ? lastMessageAtRef.current : '');
-    if (!list.length) return;
+    if (!list.length) return 0;
     setMessages((prev) => {
       if (!incremental) return list;
       const seen = new Set(prev.map((m) => m.id));
@@ -58,33 +58,50 @@ export default function MobileTeamChatDetailPage() {
     const nextTs = list[list.length - 1]?.created_at || lastMessageAtRef.current;
     lastMessageAtRef.current = nextTs;
     setLastMessageAt(nextTs);
+    return list.length;
+  }, [conversationId]);
+
+  const markRead = useCallback(() => {
+    messengerService.markRead(conversationId).catch(() => {});
   }, [conversationId]);
 
   useEffect(() => {
     loadConversation();
     loadMessages(false);
-    const map = (() => {
-      try { return JSON.parse(localStorage.getItem(READ_KEY) || '{}'); } catch { return {}; }
-    })();
-    map[String(conversationId)] = new Date().toISOString();
-    localStorage.setItem(READ_KEY, JSON.stringify(map));
-  }, [conversationId, loadConversation, loadMessages]);
+    markRead();
+  }, [conversationId, loadConversation, loadMessages, markRead]);
 
   useEffect(() => {
     lastMessageAtRef.current = lastMessageAt;
   }, [lastMessageAt]);
 
+  const socketConnected = useMessengerSocket((event) => {
+    if (event.type === 'presence') {
+      setConversation((prev) => prev && ({
+        ...prev,
+        members: (prev.members || []).map((m) => ({ ...m, user: applyPresence(m.user, event) })),
+      }));
+    } else if (event.type === 'message.new' && String(event.conversation) === String(conversationId)) {
+      setMessages((prev) => (prev.some((m) => m.id === event.message.id) ? prev : [...prev, event.message]));
+      lastMessageAtRef.current = event.message.created_at;
+      setLastMessageAt(event.message.created_at);
+      if (event.message.sender?.id !== me?.id) markRead();
+    } else if (event.type === 'conversation.updated' && String(event.conversation.id) === String(conversationId)) {
+      setConversation(event.conversation);
+    }
+  });
+
+  // Events arrive over the socket; poll only while it is down, and catch up once it (re)connects.
   useEffect(() => {
-    const t = setInterval(() => {
+    if (socketConnected) {
       loadMessages(true).catch(() => {});
-      const map = (() => {
-        try { return JSON.parse(localStorage.getItem(READ_KEY) || '{}'); } catch { return {}; }
-      })();
-      map[String(conversationId)] = new Date().toISOString();
-      localStorage.setItem(READ_KEY, JSON.stringify(map));
+      return undefined;
+    }
+    const t = setInterval(() => {
+      loadMessages(true).then((count) => count && markRead()).catch(() => {});
     }, 5000);
     return () => clearInterval(t);
-  }, [conversationId, loadMessages]);
+  }, [socketConnected, loadMessages, markRead]);
 
   const sendMessage = async () => {
     const payload = text.trim();
@@ -105,7 +122,10 @@ export default function MobileTeamChatDetailPage() {
     setMessages((prev) => [...prev, optimistic]);
     try {
       const msg = await messengerService.sendMessage(conversationId, { text: payload, imageFile });
-      setMessages((prev) => prev.map((m) => (m.id === tempId ? msg : m)));
+      // The socket may have delivered the message before this response.
+      setMessages((prev) => (prev.some((m) => m.id === msg.id)
+        ? prev.filter((m) => m.id !== tempId)
+        : prev.map((m) => (m.id === tempId ? msg : m))));
       lastMessageAtRef.current = msg.created_at;
       setLastMessageAt(msg.created_at);
       setImageFile(null);
@@ -2,6 +2,7 @@ import React, { useEffect, useMemo, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { authService } from '../../services/auth';
 import { messengerService } from '../../services/messengerService';
+import { applyPresence, useMessengerSocket } from '../../services/messengerSocket';
 
 const me = authService.getCurrentUser();
 const getName = (u) => u?.first_name || u?.last_name || u?.username || u?.email || 'User';
@@ -12,10 +13,6 @@ const getDisplayName = (u) => {
   if (u.role_label) return `${base} (${u.role_label})`;
   return base;
 };
-const READ_KEY = 'messenger_read_map_v1';
-const loadReadMap = () => {
-  try { return JSON.parse(localStorage.getItem(READ_KEY) || '{}'); } catch { return {}; }
-};
 
 function Avatar({ user, size = 64 }) {
   const profileUrl = user?.profile_image_url || '';
@@ -55,7 +52,6 @@ export default function MobileTeamChatListPage() {
   const [members, setMembers] = useState([]);
   const [conversations, setConversations] = useState([]);
   const [query, setQuery] = useState('');
-  const [readMap, setReadMap] = useState(() => loadReadMap());
 
   const loadBase = async (q = '') => {
     const [memberList, convList] = await Promise.all([
@@ -70,12 +66,28 @@ export default function MobileTeamChatListPage() {
     loadBase();
   }, []);
 
+  const socketConnected = useMessengerSocket((event) => {
+    if (event.type === 'presence') {
+      setMembers((prev) => prev.map((m) => applyPresence(m, event)));
+      setConversations((prev) => prev.map((c) => ({
+        ...c,
+        members: (c.members || []).map((m) => ({ ...m, user: applyPresence(m.user, event) })),
+      })));
+    } else if (event.type === 'conversation.read') {
+      setConversations((prev) => prev.map((c) => (c.id === event.conversation ? { ...c, unread_count: 0 } : c)));
+    } else if (event.type === 'message.new' || event.type === 'conversation.updated') {
+      loadBase(query).catch(() => {});
+    }
+  });
+
+  // Poll only while the socket is down.
   useEffect(() => {
+    if (socketConnected) return undefined;
     const t = setInterval(() => {
       loadBase(query).catch(() => {});
     }, 5000);
     return () => clearInterval(t);
-  }, [query]);
+  }, [socketConnected, query]);
 
   const recentPeople = useMemo(() => {
     const ids = new Set();
@@ -90,12 +102,8 @@ export default function MobileTeamChatListPage() {
     navigate(`/dashboard/mobile/team-chat/${conv.id}`);
   };
 
+  // The detail page sends the read receipt.
   const openConversation = (conversationId) => {
-    const conv = conversations.find((c) => String(c.id) === String(conversationId));
-    const stamp = conv?.last_message?.created_at || new Date().toISOString();
-    const next = { ...readMap, [String(conversationId)]: stamp };
-    setReadMap(next);
-    localStorage.setItem(READ_KEY, JSON.stringify(next));
     navigate(`/dashboard/mobile/team-chat/${conversationId}`);
   };
 
@@ -136,24 +144,17 @@ export default function MobileTeamChatListPage() {
       <div style={{ padding: '6px 10px 0' }}>
         {conversations.map((c) => {
           const peer = (c.members || []).map((m) => m.user).find((u) => u?.id !== me?.id);
-          const lastMsgAt = c?.last_message?.created_at;
-          const lastReadAt = readMap[String(c.id)];
-          const hasUnread = !!(
-            c?.last_message?.sender?.id &&
-            c.last_message.sender.id !== me?.id &&
-            lastMsgAt &&
-            (!lastReadAt || new Date(lastMsgAt).getTime() > new Date(lastReadAt).getTime())
-          );
+          const hasUnread = c.unread_count > 0;
           return (
             <button key={c.id} onClick={() => openConversation(c.id)} style={{ width: '100%', border: hasUnread ? '1px solid #bfdbfe' : 0, background: hasUnread ? '#eff6ff' : 'transparent', display: 'flex', gap: 12, textAlign: 'left', padding: '9px 8px', borderRadius: 14 }}>
               <Avatar user={peer} size={58} />
               <div style={{ minWidth: 0, flex: 1 }}>
                 <div style={{ fontSize: 17, fontWeight: hasUnread ? 800 : 700, color: '#111827', lineHeight: 1.2, display: 'flex', alignItems: 'center', gap: 6 }}>
                   <span style={{ overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap' }}>{getDisplayName(peer)}</span>
-                  {hasUnread ? <span style={{ width: 9, height: 9, borderRadius: 999, background: '#2563eb', flexShrink: 0 }} /> : null}
+                  {hasUnread ? <span style={{ minWidth: 20, padding: '1px 7px', borderRadius: 999, background: '#2563eb', color: '#fff', fontSize: 12, fontWeight: 800, textAlign: 'center', flexShrink: 0 }}>{c.unread_count}</span> : null}
                 </div>
                 <div style={{ marginTop: 3, fontSize: 15, color: hasUnread ? '#1d4ed8' : '#6b7280', fontWeight: hasUnread ? 700 : 500, whiteSpace: 'nowrap', overflow: 'hidden', textOverflow: 'ellipsis', lineHeight: 1.22 }}>
-                  {c.last_message?.text || 'Start conversation'}
+                  {c.last_message_preview || c.last_message?.text || 'Start conversation'}
                 </div>
               </div>
             </button>
@@ -5,7 +5,7 @@
  *   import { dashboardService } from '@/services/dashboardService';
  */
 export { default, attachResponseInterceptor, getMediaUrl } from './client';
-export { dashboardService } from './dashboardService';
+export { dashboardService, mergeDashboardDelta } from './dashboardService';
 export { accountingService } from './accountingService';
 export { constructionService, calculatorService } from './constructionService';
 export { estimateService } from './estimateService';
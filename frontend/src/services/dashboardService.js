@@ -111,6 +111,14 @@ export const dashboardService = {
             ...(projectId ? { project: projectId } : {}),
         },
     }),
+    // Newest first, cursor-paginated; pass the `cursor` from the previous page's `next`
+    getGalleryFeed: (groupBy = 'timeline', projectId = null, cursor = null) => api.get('gallery/feed/', {
+        params: {
+            group_by: groupBy,
+            ...(projectId ? { project: projectId } : {}),
+            ...(cursor ? { cursor } : {}),
+        },
+    }),
 
     // Funding (legacy — no fin equivalent; see DEPRECATED note above)
     getFundingSources: () => api.get('finance/funding-sources/'),
@@ -126,9 +134,13 @@ export const dashboardService = {
         api.patch(`finance/phase-budget-allocations/${id}/`, data),
     deletePhaseBudgetAllocation: (id) => api.delete(`finance/phase-budget-allocations/${id}/`),
 
-    // Aggregated dashboard data
-    getDashboardData: async (projectId = null) => {
+    // Aggregated dashboard data. Pass `since` (sync.cursor of an earlier
+    // response) to get only what changed, then fold it in with
+    // mergeDashboardDelta().
+    getDashboardData: async (projectId = null, { since = null, sections = null } = {}) => {
         const params = projectId ? { project_id: projectId } : {};
+        if (since) params.since = since;
+        if (sections) params.sections = sections.join(',');
         const response = await api.get('dashboard/combined/', { params });
         return response.data;
     },
@@ -168,3 +180,35 @@ export const dashboardService = {
     updateGuideSection: (id, data) => api.patch(`user-guide-sections/${id}/`, data),
     deleteGuideSection: (id) => api.delete(`user-guide-sections/${id}/`),
 };
+
+/**
+ * Fold a `?since=` dashboard response into the data already on screen.
+ * Sections in sync.full replace the old value; other sections carry only
+ * changed rows (matched by id) and sync.deleted lists removed ids.
+ */
+export const mergeDashboardDelta = (current, delta) => {
+    const { sync = {}, ...sections } = delta;
+    const full = new Set(sync.full || []);
+    const next = { ...current, sync };
+
+    Object.entries(sections).forEach(([key, value]) => {
+        if (full.has(key) || !Array.isArray(value) || !Array.isArray(current[key])) {
+            next[key] = value;
+            return;
+        }
+        const changed = new Map(value.map(row => [String(row.id), row]));
+        const merged = current[key].map(row => {
+            const fresh = changed.get(String(row.id));
+            if (fresh) changed.delete(String(row.id));
+            return fresh || row;
+        });
+        next[key] = [...merged, ...changed.values()];
+    });
+
+    Object.entries(sync.deleted || {}).forEach(([key, ids]) => {
+        if (!Array.isArray(next[key])) return;
+        const gone = new Set(ids.map(String));
+        next[key] = next[key].filter(row => !gone.has(String(row.id)));
+    });
+    return next;
+};
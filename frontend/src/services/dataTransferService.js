@@ -37,6 +37,8 @@ export const dataTransferService = {
             onUploadProgress,
         });
     },
+    // SQL imports are queued — poll until status is done/failed
+    sqlImportJob: (jobId) => api.get(`data-transfer/import/jobs/${jobId}/`).then(r => r.data),
 
     // ── CSV / Excel (Phase 2) ──────────────────────────────────────────────
 
@@ -65,7 +67,7 @@ export const dataTransferService = {
         });
     },
 
-    // Commit import (creates ImportJob)
+    // Queue import (creates ImportJob, returns job_id — poll csvJob)
     csvImport: (projectId, type, file, onProgress) => {
         const fd = new FormData();
         fd.append('file', file);
@@ -80,6 +82,10 @@ export const dataTransferService = {
     csvJobs: (projectId) =>
         api.get(`data-transfer/csv/jobs/${projectId}/`).then(r => r.data),
 
+    // Progress of one import job
+    csvJob: (projectId, jobId) =>
+        api.get(`data-transfer/csv/jobs/${projectId}/${jobId}/`).then(r => r.data),
+
     // ── GitHub Actions Deploy System ───────────────────────────────────────
     getDeployStatus: () => api.get('data-transfer/deploy/'),
     triggerDeploy: () => api.post('data-transfer/deploy/'),
@@ -45,6 +45,16 @@ export const messengerService = {
     return data;
   },
 
+  markRead: async (conversationId) => {
+    const { data } = await api.post(`messenger/conversations/${conversationId}/read/`);
+    return data;
+  },
+
+  unreadCounts: async () => {
+    const { data } = await api.get('messenger/conversations/unread/');
+    return data;
+  },
+
   startCall: async (conversationId, callType = 'audio') => {
     const { data } = await api.post('messenger/calls/', { conversation: conversationId, call_type: callType });
     return data;
@@ -0,0 +1,133 @@
+/**
+ * messengerSocket — one shared WebSocket to /ws/messenger/ per tab.
+ *
+ * The server pushes `message.new`, `conversation.updated`, `call.updated`
+ * and `presence` events (backend: apps/messenger/socket.py).  While the
+ * socket is open it also keeps the user's presence alive, so pages only
+ * fall back to REST polling when `isConnected()` is false.
+ *
+ * Usage:
+ *   messengerSocket.connect();                    // once, after login
+ *   const off = messengerSocket.subscribe((event) => { ... });
+ *   const offStatus = messengerSocket.onStatus((connected) => { ... });
+ *
+ * In components, `useMessengerSocket(onEvent)` does both and returns the
+ * current connection state.
+ */
+
+import { useEffect, useRef, useState } from 'react';
+
+const API_BASE = import.meta.env.VITE_API_URL || '/api/v1';
+const MAX_BACKOFF_MS = 30000;
+
+const socketUrl = (token) => {
+    const base = new URL(API_BASE, window.location.origin);
+    const protocol = base.protocol === 'https:' ? 'wss:' : 'ws:';
+    return `${protocol}//${base.host}/ws/messenger/?token=${encodeURIComponent(token)}`;
+};
+
+let socket = null;
+let connected = false;
+let wanted = false;
+let attempts = 0;
+let retryTimer = null;
+const listeners = new Set();
+const statusListeners = new Set();
+
+const setConnected = (value) => {
+    if (connected === value) return;
+    connected = value;
+    statusListeners.forEach((fn) => fn(value));
+};
+
+const scheduleReconnect = () => {
+    if (!wanted || retryTimer) return;
+    const delay = Math.min(MAX_BACKOFF_MS, 1000 * 2 ** attempts) + Math.random() * 1000;
+    attempts += 1;
+    retryTimer = window.setTimeout(() => {
+        retryTimer = null;
+        open();
+    }, delay);
+};
+
+function open() {
+    const token = localStorage.getItem('access_token');
+    if (!wanted || !token || typeof WebSocket === 'undefined') return;
+
+    const ws = new WebSocket(socketUrl(token));
+    socket = ws;
+
+    ws.onopen = () => {
+        attempts = 0;
+        setConnected(true);
+    };
+    ws.onmessage = (msg) => {
+        let event;
+        try {
+            event = JSON.parse(msg.data);
+        } catch {
+            return;
+        }
+        listeners.forEach((fn) => fn(event));
+    };
+    ws.onclose = () => {
+        if (socket === ws) socket = null;
+        setConnected(false);
+        scheduleReconnect();
+    };
+    ws.onerror = () => ws.close();
+}
+
+export const messengerSocket = {
+    connect() {
+        wanted = true;
+        if (!socket) open();
+    },
+
+    disconnect() {
+        wanted = false;
+        if (retryTimer) window.clearTimeout(retryTimer);
+        retryTimer = null;
+        if (socket) socket.close();
+        socket = null;
+        setConnected(false);
+    },
+
+    isConnected: () => connected,
+
+    subscribe(fn) {
+        listeners.add(fn);
+        return () => listeners.delete(fn);
+    },
+
+    onStatus(fn) {
+        statusListeners.add(fn);
+        return () => statusListeners.delete(fn);
+    },
+};
+
+export const useMessengerSocket = (onEvent) => {
+    const [isConnected, setIsConnected] = useState(connected);
+    const handlerRef = useRef(onEvent);
+    handlerRef.current = onEvent;
+
+    useEffect(() => {
+        const off = messengerSocket.subscribe((event) => handlerRef.current?.(event));
+        const offStatus = messengerSocket.onStatus(setIsConnected);
+        setIsConnected(connected);
+        return () => {
+            off();
+            offStatus();
+        };
+    }, []);
+
+    return isConnected;
+};
+
+export const applyPresence = (user, event) => (
+    user && user.id === event.user_id
+        ? { ...user, is_online: event.is_online, last_seen_at: event.last_seen_at }
+        : user
+);
+
+export default messengerSocket;
@@ -227,6 +227,16 @@ ssh_exec "
     exit 1
   fi
 
+  echo '==> Backfill the gallery media index (no-op once populated)'
+  docker compose -f '${COMPOSE_FILE}' run --rm --no-deps \
+    --entrypoint /bin/sh backend \
+    -c 'python manage.py rebuild_media_index --if-empty --no-render'
+
+  echo '==> Seed the backup media inventory (no-op once reconciled)'
+  docker compose -f '${COMPOSE_FILE}' run --rm --no-deps \
+    --entrypoint /bin/sh backend \
+    -c 'python manage.py reconcile_media_inventory --if-unseeded'
+
   echo '==> Collect static files (one-shot, bypasses entrypoint)'
   docker compose -f '${COMPOSE_FILE}' run --rm --no-deps \
     --entrypoint /bin/sh backend \
@@ -235,7 +245,7 @@ ssh_exec "
   echo '==> Restart app containers only (db + redis stay untouched)'
   docker compose -f '${COMPOSE_FILE}' up -d \
     --force-recreate --remove-orphans \
-    backend frontend celery celery-beat
+    backend realtime frontend celery celery-beat
 
   echo '==> Waiting 20s for containers to start...'
   sleep 20
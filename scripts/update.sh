@@ -84,12 +84,20 @@ run_migrations() {
     echo '!! ═══════════════════════════════════════════════════════════'
     exit 1
   fi
+  echo '==> Backfilling the gallery media index (no-op once populated)'
+  docker compose -f '${COMPOSE_FILE}' run --rm --no-deps \
+    --entrypoint /bin/sh backend \
+    -c 'python manage.py rebuild_media_index --if-empty --no-render'
+  echo '==> Seeding the backup media inventory (no-op once reconciled)'
+  docker compose -f '${COMPOSE_FILE}' run --rm --no-deps \
+    --entrypoint /bin/sh backend \
+    -c 'python manage.py reconcile_media_inventory --if-unseeded'
 }
 
 $(if [[ "$MIGRATIONS_ONLY" == "true" ]]; then cat <<'EOF'
 echo '==> Migrations only'
 run_migrations
-docker compose -f '${COMPOSE_FILE}' restart backend celery celery-beat
+docker compose -f '${COMPOSE_FILE}' restart backend realtime celery celery-beat
 EOF
 elif [[ "$NO_REBUILD" == "true" ]]; then cat <<'EOF'
 echo '==> Restart without rebuild'